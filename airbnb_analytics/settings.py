@@ -191,4 +191,35 @@ AIRBNB_BASE_URL = 'https://www.airbnb.fr'
 CHROMEDRIVER_PATH = os.environ.get('CHROMEDRIVER_PATH', '')
 MAX_RETRIES = 1
 REQUEST_TIMEOUT = 30
-DEFAULT_DESTINATION = 'Paris,France'
\ No newline at end of file
+DEFAULT_DESTINATION = 'Paris,France'
+
+# Durée maximale d'un scraping (secondes): une tâche 'running' démarrée depuis plus du double
+# est considérée abandonnée et n'absorbe plus les nouvelles demandes
+SCRAPING_JOB_TIMEOUT = int(os.environ.get('SCRAPING_JOB_TIMEOUT', 3600))
+
+# Profilage par échantillonnage (option --profile)
+PROFILES_DIR = os.path.join(LOGS_DIR, 'profiles')
+PROFILE_SAMPLING_INTERVAL = 0.01  # secondes
+
+# Mode d'extraction des prix: 'dom' (analyse de la page) ou 'network' (réponses de l'API de recherche)
+SCRAPER_EXTRACTION_MODE = os.environ.get('SCRAPER_EXTRACTION_MODE', 'dom')
+
+# Profils Chrome partagés (consentement et cache HTTP pré-chargés, clonés par navigateur)
+SCRAPER_SHARED_PROFILE = os.environ.get('SCRAPER_SHARED_PROFILE', 'True') == 'True'
+BROWSER_PROFILES_DIR = os.path.join(DATA_DIR, 'browser_profiles')
+BROWSER_PROFILE_REFRESH_HOURS = 24
+
+# Échantillonnage des dates d'arrivée par mois: 'mid_month' (le 15), 'weekdays' (lundis et vendredis)
+# 'evenly_spaced' (SCRAPER_SAMPLES_PER_MONTH arrivées réparties dans le mois) ou 'daily' (chaque jour,
+# pour le calendrier des prix)
+SCRAPER_SAMPLING_STRATEGY = os.environ.get('SCRAPER_SAMPLING_STRATEGY', 'mid_month')
+SCRAPER_SAMPLES_PER_MONTH = int(os.environ.get('SCRAPER_SAMPLES_PER_MONTH', 4))
+
+# Navigateurs se partageant les dates d'arrivée d'un mois (au plus un pour 4 dates); le nombre total
+# de navigateurs ouverts est au plus max_workers × SCRAPER_DRIVERS_PER_MONTH
+SCRAPER_DRIVERS_PER_MONTH = int(os.environ.get('SCRAPER_DRIVERS_PER_MONTH', 2))
+
+# Exploration SQL des fichiers de données (commande query_data et page réservée au staff)
+SQL_EXPLORER_ROW_LIMIT = int(os.environ.get('SQL_EXPLORER_ROW_LIMIT', 1000))
+SQL_EXPLORER_TIMEOUT = int(os.environ.get('SQL_EXPLORER_TIMEOUT', 30))  # secondes
+SQL_EXPLORER_THREADS = int(os.environ.get('SQL_EXPLORER_THREADS', 0)) or None  # tous les cœurs par défaut
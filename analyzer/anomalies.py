@@ -0,0 +1,338 @@
+"""
+Détection des mois aberrants avant leur enregistrement.
+
+Un scraping raté (prix extraits par l'expression régulière de secours,
+mois calculé sur trois annonces...) produit des mois dont le prix fausse
+le mois le moins cher et les statistiques. Chaque mois d'un nouveau
+résultat est comparé, en log-prix et par des z-scores robustes (médiane et
+écart absolu médian, MAD), à trois références:
+
+- l'historique: les prix du même mois de l'année relevés par les scrapings
+  précédents de la destination;
+- les autres mois du même scraping de la destination;
+- les destinations comparables: le prix relatif (au niveau de la
+  destination) du même mois dans l'index des profils de prix.
+
+Le score d'un mois est le plus petit des |z| disponibles: un mois n'est
+suspect que s'il s'écarte de toutes ses références (un pic d'août propre à
+toutes les destinations n'est pas une anomalie). Il est majoré pour les
+petits échantillons (l'erreur d'une moyenne décroît en racine de
+l'effectif). Les médianes et MAD de toutes les destinations sont calculées
+en une passe par des tris groupés.
+
+Les mois au-delà de FLAG_SCORE sont signalés; au-delà de QUARANTINE_SCORE,
+ou avec moins de MIN_SAMPLE_SIZE prix, ils sont mis en quarantaine: exclus
+des statistiques, et enregistrés avec leur statut pour être revus dans
+l'administration.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+
+from .data_processor import AirbnbDataProcessor
+from .bootstrap import price_uncertainty
+from .price_history import PriceHistoryCache
+from .similarity import ProfileIndex
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Score à partir duquel un mois est signalé
+FLAG_SCORE = 3.5
+
+# Score à partir duquel un mois est mis en quarantaine
+QUARANTINE_SCORE = 8.0
+
+# Nombre minimum de prix d'un mois (en dessous: quarantaine)
+MIN_SAMPLE_SIZE = 5
+
+# Effectif au-delà duquel le score n'est plus majoré
+REFERENCE_SAMPLE_SIZE = 30
+
+# Nombre minimum de valeurs d'une référence pour calculer un z-score
+MIN_REFERENCE_POINTS = 3
+
+# Écart absolu médian minimum (en log-prix), pour les références presque constantes
+MIN_MAD = 0.05
+
+# Facteur rendant la MAD comparable à un écart-type (loi normale)
+MAD_SCALE = 1.4826
+
+# Statuts d'anomalie enregistrés avec les données de prix
+ANOMALY_STATUSES = ('ok', 'flagged', 'quarantined')
+
+# Libellés des références dans les motifs
+REFERENCE_LABELS = ('historique', 'autres mois', 'destinations comparables')
+
+# Motif des mois validés manuellement (jamais signalés ni mis en quarantaine)
+VALIDATED_REASON = "validé manuellement"
+
+
+def grouped_median(codes, values, n_groups):
+    """
+    Médiane de chaque groupe, en un seul tri.
+
+    Args:
+        codes: Code du groupe de chaque valeur (0 à n_groups - 1)
+        values: Valeurs (sans NaN)
+        n_groups: Nombre de groupes
+
+    Returns:
+        Tuple (médianes, effectifs), NaN pour les groupes vides
+    """
+    order = np.lexsort((values, codes))
+    ordered = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    last = max(len(ordered) - 1, 0)
+    low = ordered[np.minimum(starts + (counts - 1) // 2, last)] if len(ordered) else np.zeros(n_groups)
+    high = ordered[np.minimum(starts + counts // 2, last)] if len(ordered) else np.zeros(n_groups)
+    return np.where(counts > 0, (low + high) / 2, np.nan), counts
+
+
+def robust_z(codes, values, n_groups, query_codes, query_values, min_points=MIN_REFERENCE_POINTS):
+    """
+    Z-scores robustes de valeurs par rapport à la médiane et à la MAD de leur groupe de référence.
+
+    Args:
+        codes: Groupe de chaque valeur de référence
+        values: Valeurs de référence
+        n_groups: Nombre de groupes
+        query_codes: Groupe de chaque valeur à évaluer
+        query_values: Valeurs à évaluer
+        min_points: Effectif minimum d'un groupe de référence
+
+    Returns:
+        Z-scores (NaN si la référence du groupe est insuffisante)
+    """
+    medians, counts = grouped_median(codes, values, n_groups)
+    mads, _ = grouped_median(codes, np.abs(values - medians[codes]), n_groups)
+    scale = MAD_SCALE * np.maximum(mads, MIN_MAD)
+    return np.where(counts[query_codes] >= min_points,
+                    (query_values - medians[query_codes]) / scale[query_codes], np.nan)
+
+
+def score_anomalies(frame, history=None, peers=None, key='destination'):
+    """
+    Score d'anomalie de chaque mois de plusieurs destinations, en une passe.
+
+    Args:
+        frame: DataFrame des nouveaux résultats (key, month, avg_price, sample_size)
+        history: DataFrame des prix précédents (key, month, avg_price), ou None
+        peers: Matrice (destinations × 12) des prix moyens mensuels de l'index des profils, ou None
+        key: Colonne identifiant la destination
+
+    Returns:
+        DataFrame aligné sur frame: anomaly_score, anomaly_status, anomaly_reason
+    """
+    codes, names = pd.factorize(frame[key])
+    months = frame['month'].to_numpy(dtype=np.int64) - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logs = np.log(frame['avg_price'].to_numpy(dtype=np.float64))
+    valid = np.isfinite(logs) & (codes >= 0) & (months >= 0) & (months < 12)
+    n_groups = len(names) * 12
+
+    scores = np.full((len(frame), len(REFERENCE_LABELS)), np.nan)
+
+    # Historique: même destination, même mois de l'année
+    if history is not None and not history.empty:
+        history_codes = pd.Index(names).get_indexer(history[key])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            history_logs = np.log(history['avg_price'].to_numpy(dtype=np.float64))
+        cells = history_codes * 12 + history['month'].to_numpy(dtype=np.int64) - 1
+        keep = (history_codes >= 0) & np.isfinite(history_logs)
+        scores[valid, 0] = robust_z(cells[keep], history_logs[keep], n_groups,
+                                    codes[valid] * 12 + months[valid], logs[valid])
+
+    # Autres mois du même scraping
+    scores[valid, 1] = robust_z(codes[valid], logs[valid], len(names), codes[valid], logs[valid],
+                                min_points=MIN_REFERENCE_POINTS + 1)
+
+    # Destinations comparables: prix du mois relatif au niveau (médiane) de la destination
+    if peers is not None and len(peers):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            peer_logs = np.log(peers)
+        peer_relative = peer_logs - np.nanmedian(peer_logs, axis=1, keepdims=True)
+        peer_month, peer_values = np.nonzero(np.isfinite(peer_relative))[1], peer_relative[np.isfinite(peer_relative)]
+        levels, _ = grouped_median(codes[valid], logs[valid], len(names))
+        scores[valid, 2] = robust_z(peer_month, peer_values, 12, months[valid], logs[valid] - levels[codes[valid]])
+
+    # Plus petit écart parmi les références disponibles, majoré pour les petits échantillons
+    absolute = np.abs(scores)
+    available = np.isfinite(absolute)
+    score = np.where(available.any(axis=1), np.where(available, absolute, np.inf).min(axis=1), np.nan)
+    if 'sample_size' in frame.columns:
+        sizes = frame['sample_size'].to_numpy(dtype=np.float64)
+        sizes = np.where(np.isfinite(sizes), sizes, REFERENCE_SAMPLE_SIZE)
+        score = score * np.sqrt(REFERENCE_SAMPLE_SIZE / np.clip(sizes, 1, REFERENCE_SAMPLE_SIZE))
+    else:
+        sizes = np.full(len(frame), np.inf)
+
+    too_small = sizes < MIN_SAMPLE_SIZE
+    status = np.select(
+        [too_small | (score >= QUARANTINE_SCORE) | ~valid, score >= FLAG_SCORE],
+        ['quarantined', 'flagged'], 'ok'
+    )
+
+    # Motif: effectif insuffisant, ou références dont le mois s'écarte (avec leur sens)
+    reasons = []
+    for row, state in enumerate(status):
+        if state == 'ok':
+            reasons.append('')
+        elif not valid[row]:
+            reasons.append("prix invalide")
+        elif too_small[row]:
+            reasons.append(f"échantillon insuffisant ({int(sizes[row])} prix)")
+        else:
+            reasons.append(", ".join(
+                f"{label} ({'+' if scores[row, i] > 0 else '-'}{absolute[row, i]:.1f})"
+                for i, label in enumerate(REFERENCE_LABELS) if available[row, i]
+            ))
+
+    return pd.DataFrame({
+        'anomaly_score': np.round(score, 2),
+        'anomaly_status': status,
+        'anomaly_reason': reasons,
+    }, index=frame.index)
+
+
+def load_previous_prices(data_dir, destinations):
+    """
+    Prix relevés par les scrapings précédents (toutes les exécutions sauf la plus récente).
+
+    Args:
+        data_dir: Répertoire principal des données
+        destinations: Noms des destinations
+
+    Returns:
+        DataFrame (destination, month, avg_price)
+    """
+    history = PriceHistoryCache(data_dir)
+    frames = []
+    for destination in destinations:
+        price_matrix = history.load(destination)
+        if price_matrix is None or len(price_matrix[0]) < 2:
+            continue
+        _, _, targets, matrix = price_matrix
+        runs, columns = np.nonzero(np.isfinite(matrix[:-1]))
+        frames.append(pd.DataFrame({
+            'destination': destination,
+            'month': targets[columns].astype(np.int64) % 12 + 1,
+            'avg_price': matrix[runs, columns],
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['destination', 'month', 'avg_price'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def apply_screening(data_dir, destination, df, stats, processor=None, recompute=False):
+    """
+    Écarte des statistiques d'une destination les mois en quarantaine et liste les mois signalés.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        df: DataFrame traité avec les colonnes d'anomalie
+        stats: Statistiques calculées sur tous les mois
+        processor: AirbnbDataProcessor à réutiliser (créé si nécessaire)
+        recompute: Si True, recalcule les statistiques même sans mois en quarantaine
+            (après une validation manuelle)
+
+    Returns:
+        Tuple (DataFrame, statistiques); statistiques None si tous les mois sont en
+        quarantaine: aucun résumé (mois le moins cher...) ne doit reposer sur eux
+    """
+    score_columns = ['anomaly_score', 'anomaly_status', 'anomaly_reason']
+    quarantined = (df['anomaly_status'] == 'quarantined').to_numpy()
+
+    if quarantined.all():
+        logger.warning(f"{destination}: tous les mois sont en quarantaine, aucune analyse enregistrée")
+        return df.assign(is_cheapest=False, price_rank=0), None
+
+    if quarantined.any() or recompute:
+        # Statistiques recalculées sur les seuls mois fiables (les autres clés sont conservées)
+        processor = processor or AirbnbDataProcessor(data_dir)
+        raw_columns = [column for column in df.columns if column not in score_columns]
+        clean = processor.process_data(df.loc[~quarantined, raw_columns])
+        stats = {**(stats or {}), **processor.calculate_statistics(clean)}
+        df = pd.concat([
+            clean.assign(**{column: df.loc[~quarantined, column].to_numpy() for column in score_columns}),
+            df[quarantined].assign(is_cheapest=False, price_rank=0),
+        ]).sort_values('month')
+        # Probabilités du mois le moins cher recalculées sans les mois en quarantaine
+        uncertainty = stats.get('price_uncertainty')
+        excluded = set(df.loc[df['anomaly_status'] == 'quarantined', 'month'].astype(int))
+        if uncertainty and (recompute or excluded & {month['month'] for month in uncertainty['months']}):
+            stats['price_uncertainty'] = price_uncertainty(
+                data_dir, destination, uncertainty['year'], excluded, uncertainty['resamples'])
+        if excluded:
+            logger.warning(f"{destination}: {len(excluded)} mois en quarantaine "
+                           f"({', '.join(df.loc[df['anomaly_status'] == 'quarantined', 'month_name'].astype(str))})")
+
+    flagged = df[df['anomaly_status'] != 'ok']
+    return df, {**(stats or {}), 'anomalies': [
+        {
+            'month': row['month_name'],
+            'status': row['anomaly_status'],
+            'score': None if pd.isna(row['anomaly_score']) else float(row['anomaly_score']),
+            'reason': row['anomaly_reason'],
+        }
+        for _, row in flagged.iterrows()
+    ]}
+
+
+def screen_results(data_dir, results, validated=None):
+    """
+    Évalue les nouveaux résultats de plusieurs destinations et écarte les mois en quarantaine des statistiques.
+
+    Args:
+        data_dir: Répertoire principal des données
+        results: Dictionnaire {destination: (DataFrame traité, statistiques)}
+        validated: Dictionnaire {destination: mois validés manuellement}, jamais signalés
+
+    Returns:
+        Dictionnaire {destination: (DataFrame traité avec les colonnes d'anomalie, statistiques)};
+        les statistiques sont recalculées sans les mois en quarantaine et listent les mois
+        signalés ('anomalies'), None si tous les mois sont en quarantaine
+    """
+    results = {destination: (df, stats) for destination, (df, stats) in results.items()
+               if df is not None and not df.empty}
+    if not results:
+        return {}
+
+    frame = pd.concat(
+        [df.assign(destination=destination) for destination, (df, _) in results.items()],
+        ignore_index=True
+    )
+    history = load_previous_prices(data_dir, results)
+    try:
+        profiles = ProfileIndex(data_dir).load()
+    except Exception as e:
+        logger.warning(f"Index des profils illisible, comparaison aux autres destinations ignorée: {str(e)}")
+        profiles = None
+
+    scores = score_anomalies(frame, history, profiles.prices if profiles is not None else None)
+
+    # Mois validés manuellement: score conservé, statut rétabli
+    if validated:
+        overridden = np.array([
+            int(month) in validated.get(destination, ())
+            for destination, month in zip(frame['destination'], frame['month'])
+        ], dtype=bool)
+        scores.loc[overridden, 'anomaly_status'] = 'ok'
+        scores.loc[overridden, 'anomaly_reason'] = VALIDATED_REASON
+
+    frame = pd.concat([frame, scores], axis=1)
+
+    processor = AirbnbDataProcessor(data_dir)
+    screened = {}
+    for destination, group in frame.groupby('destination', sort=False):
+        df, stats = results[destination]
+        df = df.assign(**{column: group[column].to_numpy() for column in scores.columns})
+        if stats is not None:
+            df, stats = apply_screening(data_dir, destination, df, stats, processor)
+        screened[destination] = (df, stats)
+
+    return screened
@@ -0,0 +1,53 @@
+"""
+Micro-benchmarks des traitements de l'analyseur.
+
+Chaque benchmark compare une implémentation de référence (le code pandas
+historique) à sa version optimisée, vérifie que leurs résultats sont
+équivalents et affiche les temps médians. Les benchmarks sont regroupés
+par module mesuré (benchmarks/statistics.py pour analyzer/statistics.py,
+etc.) et partagent les données synthétiques de benchmarks/fixtures.py.
+
+Utilisation:
+    python -m analyzer.benchmarks              # tous les benchmarks
+    python -m analyzer.benchmarks stats_kernel # un benchmark précis
+"""
+
+from .statistics import benchmark_stats_kernel, benchmark_recommendations
+from .storage import benchmark_storage, benchmark_memory
+from .similarity import benchmark_similarity
+from .incremental import benchmark_incremental
+from .price_calendar import benchmark_calendar
+from .forecast import benchmark_forecast
+from .anomalies import benchmark_anomalies
+from .bootstrap import benchmark_bootstrap
+
+BENCHMARKS = {
+    'stats_kernel': benchmark_stats_kernel,
+    'storage': benchmark_storage,
+    'similarity': benchmark_similarity,
+    'recommendations': benchmark_recommendations,
+    'incremental': benchmark_incremental,
+    'calendar': benchmark_calendar,
+    'forecast': benchmark_forecast,
+    'anomalies': benchmark_anomalies,
+    'memory': benchmark_memory,
+    'bootstrap': benchmark_bootstrap,
+}
+
+
+def run(names=None):
+    """
+    Exécute des benchmarks.
+
+    Args:
+        names: Noms des benchmarks à exécuter (tous si None)
+
+    Returns:
+        Dictionnaire {nom: résultats}
+    """
+    names = names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Benchmarks inconnus: {', '.join(unknown)} (disponibles: {', '.join(BENCHMARKS)})")
+
+    return {name: BENCHMARKS[name]() for name in names}
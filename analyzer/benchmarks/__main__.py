@@ -0,0 +1,12 @@
+"""
+Point d'entrée `python -m analyzer.benchmarks [nom ...]`.
+"""
+
+import sys
+import logging
+
+from . import run
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    run(sys.argv[1:])
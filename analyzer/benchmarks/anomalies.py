@@ -0,0 +1,50 @@
+"""
+Benchmark des scores d'anomalie des mois (analyzer.anomalies).
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..anomalies import score_anomalies, MAD_SCALE, MIN_MAD, REFERENCE_SAMPLE_SIZE
+from .common import measure, report
+from .fixtures import make_raw_frame
+
+
+def reference_anomaly_scores(df):
+    """Z-scores robustes destination par destination (groupby pandas, médiane et MAD des log-prix)"""
+    scores = pd.Series(np.nan, index=df.index)
+    for _, group in df.groupby('destination'):
+        logs = np.log(group['avg_price'])
+        median = logs.median()
+        mad = max((logs - median).abs().median(), MIN_MAD)
+        sizes = group['sample_size'].clip(1, REFERENCE_SAMPLE_SIZE)
+        scores[group.index] = ((logs - median) / (MAD_SCALE * mad)).abs() * np.sqrt(REFERENCE_SAMPLE_SIZE / sizes)
+    return scores
+
+
+def benchmark_anomalies():
+    """Scores d'anomalie: boucle groupby par destination contre médianes groupées vectorisées"""
+    rows = []
+
+    for destinations in (100, 2000):
+        df = make_raw_frame(destinations)
+        # Quelques mois aberrants (prix extraits au hasard)
+        rng = np.random.default_rng(3)
+        garbage = rng.random(len(df)) < 0.01
+        df.loc[garbage, 'avg_price'] = rng.uniform(1, 10, garbage.sum())
+
+        reference = reference_anomaly_scores(df)
+        optimized = score_anomalies(df)
+        if not np.allclose(reference.round(2), optimized['anomaly_score'], atol=0.011):
+            raise AssertionError(f"Scores d'anomalie différents pour {destinations} destinations")
+        if not (optimized.loc[garbage, 'anomaly_status'] != 'ok').all():
+            raise AssertionError("Mois aberrants non détectés")
+
+        rows.append((
+            f"{destinations} destinations",
+            measure(lambda: reference_anomaly_scores(df), repeat=3),
+            measure(lambda: score_anomalies(df), repeat=3),
+        ))
+
+    report("Scores d'anomalie des mois (médiane et MAD par destination)", rows)
+    return rows
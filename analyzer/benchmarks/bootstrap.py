@@ -0,0 +1,60 @@
+"""
+Benchmark des intervalles de confiance par bootstrap (analyzer.bootstrap).
+"""
+
+import numpy as np
+
+from ..bootstrap import bootstrap_months
+from .common import measure, report
+from .fixtures import make_listing_prices
+
+
+def reference_bootstrap(prices_by_month, resamples, seed=0):
+    """Bootstrap rééchantillon par rééchantillon (boucles Python), mêmes tirages d'indices"""
+    rng = np.random.default_rng(seed)
+    months = sorted(prices_by_month)
+    means, medians = [], []
+    for month in months:
+        prices = np.asarray(prices_by_month[month], dtype=np.float64)
+        indices = rng.integers(0, len(prices), size=(resamples, len(prices)), dtype=np.int32)
+        month_means, month_medians = [], []
+        for b in range(resamples):
+            sample = prices[indices[b]]
+            month_means.append(sample.mean())
+            month_medians.append(np.median(sample))
+        means.append(month_means)
+        medians.append(month_medians)
+
+    wins = dict.fromkeys(months, 0)
+    for b in range(resamples):
+        wins[min(months, key=lambda month: means[months.index(month)][b])] += 1
+
+    return {
+        'mean_low': [np.quantile(values, 0.025) for values in means],
+        'mean_high': [np.quantile(values, 0.975) for values in means],
+        'median_low': [np.quantile(values, 0.025) for values in medians],
+        'median_high': [np.quantile(values, 0.975) for values in medians],
+        'cheapest_probability': [wins[month] / resamples for month in months],
+    }
+
+
+def benchmark_bootstrap():
+    """Intervalles de confiance par bootstrap: boucle par rééchantillon contre tirage 2-D par mois"""
+    rows = []
+
+    for listings in (20, 300):
+        prices_by_month = make_listing_prices(listings)
+        reference = reference_bootstrap(prices_by_month, 1000)
+        optimized = bootstrap_months(prices_by_month, 1000)
+        for key, values in reference.items():
+            if not np.allclose(values, optimized[key], rtol=1e-12):
+                raise AssertionError(f"{key} différent pour {listings} annonces")
+
+        rows.append((
+            f"12 mois, < {listings} annonces",
+            measure(lambda: reference_bootstrap(prices_by_month, 1000), repeat=3),
+            measure(lambda: bootstrap_months(prices_by_month, 1000), repeat=3),
+        ))
+
+    report("Bootstrap des prix mensuels (1000 rééchantillons)", rows)
+    return rows
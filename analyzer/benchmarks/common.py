@@ -0,0 +1,51 @@
+"""
+Outils communs des benchmarks: mesure des temps, affichage et comparaison des résultats.
+"""
+
+import timeit
+import numpy as np
+
+
+def measure(func, repeat=7, number=None):
+    """
+    Mesure le temps médian d'un appel.
+
+    Args:
+        func: Fonction sans argument à mesurer
+        repeat: Nombre de séries de mesures
+        number: Nombre d'appels par série (déterminé automatiquement si None)
+
+    Returns:
+        Temps médian par appel (en secondes)
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    return float(np.median(timer.repeat(repeat=repeat, number=number))) / number
+
+
+def report(name, rows):
+    """Affiche un tableau de résultats (libellé, référence, optimisé)"""
+    print(f"\n{name}")
+    print(f"{'entrée':<28}{'référence':>14}{'optimisé':>14}{'gain':>8}")
+    for label, reference, optimized in rows:
+        print(f"{label:<28}{reference * 1e6:>11.1f} µs{optimized * 1e6:>11.1f} µs{reference / optimized:>7.1f}x")
+
+
+def assert_close(reference, optimized, path='stats'):
+    """Compare récursivement deux résultats (valeurs numériques à 1e-9 près)"""
+    if isinstance(reference, dict):
+        if set(reference) != set(optimized):
+            raise AssertionError(f"{path}: clés différentes")
+        for key in reference:
+            assert_close(reference[key], optimized[key], f"{path}.{key}")
+    elif isinstance(reference, list):
+        if len(reference) != len(optimized):
+            raise AssertionError(f"{path}: longueurs différentes")
+        for i, (left, right) in enumerate(zip(reference, optimized)):
+            assert_close(left, right, f"{path}[{i}]")
+    elif isinstance(reference, (float, np.floating)):
+        if not np.isclose(reference, optimized, rtol=1e-9, atol=1e-9, equal_nan=True):
+            raise AssertionError(f"{path}: {reference} != {optimized}")
+    elif reference != optimized:
+        raise AssertionError(f"{path}: {reference!r} != {optimized!r}")
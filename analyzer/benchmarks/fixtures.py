@@ -0,0 +1,164 @@
+"""
+Données synthétiques partagées par les benchmarks (et les tests).
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..data_processor import SEASONS
+from ..forecast import TIME_ORIGIN
+
+
+def seasonal_prices(year_fraction, rng):
+    """
+    Prix moyens synthétiques: saisonnalité annuelle autour de 150 et bruit gaussien.
+
+    Args:
+        year_fraction: Position dans l'année (entre 0 et 1) de chaque ligne
+        rng: Générateur aléatoire numpy
+
+    Returns:
+        Tableau numpy des prix
+    """
+    return 150 + 60 * np.sin(year_fraction * 2 * np.pi) + rng.normal(0, 15, len(year_fraction))
+
+
+def make_price_frame(periods, seed=0):
+    """
+    Génère des prix synthétiques au format des données traitées.
+
+    Args:
+        periods: Nombre de lignes (12 pour des données mensuelles, 365 pour des données journalières)
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        DataFrame avec les colonnes month_name, avg_price, median_price et season
+    """
+    rng = np.random.default_rng(seed)
+    if periods == 12:
+        dates = pd.date_range('2026-01-01', periods=12, freq='MS')
+        labels = dates.strftime('%B')
+    else:
+        dates = pd.date_range('2026-01-01', periods=periods, freq='D')
+        labels = dates.strftime('%Y-%m-%d')
+
+    avg_price = seasonal_prices(dates.dayofyear.to_numpy() / 365.0, rng)
+
+    return pd.DataFrame({
+        'month': dates.month,
+        'month_name': labels,
+        'avg_price': avg_price,
+        'median_price': avg_price - rng.uniform(0, 10, periods),
+        'season': dates.month.map(SEASONS),
+    })
+
+
+def make_raw_frame(destinations, seed=0):
+    """
+    Génère des données brutes synthétiques au format du scraper (12 mois par destination).
+
+    Args:
+        destinations: Nombre de destinations
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        DataFrame avec les colonnes des fichiers bruts et une colonne destination
+    """
+    rng = np.random.default_rng(seed)
+    n = destinations * 12
+    months = np.tile(np.arange(1, 13), destinations)
+    avg_price = seasonal_prices(months / 12, rng)
+    check_in = pd.to_datetime({'year': 2026, 'month': months, 'day': 15})
+
+    return pd.DataFrame({
+        'destination': np.repeat([f"Ville{i},Pays" for i in range(destinations)], 12),
+        'month': months,
+        'month_name': pd.DatetimeIndex(check_in).strftime('%B'),
+        'avg_price': avg_price,
+        'median_price': avg_price - rng.uniform(0, 10, n),
+        'min_price': np.floor(avg_price * 0.4),
+        'max_price': np.ceil(avg_price * 2.5),
+        'sample_size': rng.integers(10, 300, n),
+        'check_in': check_in.dt.strftime('%Y-%m-%d'),
+        'check_out': (check_in + pd.Timedelta(days=7)).dt.strftime('%Y-%m-%d'),
+        'sampled_dates': 1,
+    })
+
+
+def make_samples_frame(days, nights=1, seed=0):
+    """
+    Génère des relevés quotidiens synthétiques (un prix par date d'arrivée).
+
+    Args:
+        days: Nombre de dates d'arrivée consécutives
+        nights: Durée des séjours relevés
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        DataFrame (check_in, check_out, nights, avg_price), environ 5 % de dates sans relevé
+    """
+    rng = np.random.default_rng(seed)
+    check_in = pd.date_range('2025-01-01', periods=days, freq='D')
+    weekly = np.where(check_in.dayofweek >= 4, 1.25, 1.0)
+    seasonal = 1 + 0.3 * np.sin(2 * np.pi * check_in.dayofyear / 365)
+    prices = np.round(120 * weekly * np.asarray(seasonal) * rng.lognormal(0, 0.1, days), 2)
+    prices[rng.random(days) < 0.05] = np.nan
+    return pd.DataFrame({
+        'check_in': check_in.strftime('%Y-%m-%d'),
+        'check_out': (check_in + pd.Timedelta(days=nights)).strftime('%Y-%m-%d'),
+        'nights': nights,
+        'avg_price': prices,
+    })
+
+
+def make_monthly_series(destinations, seed=0):
+    """
+    Génère des séries mensuelles synthétiques (saisonnalité, tendance, bruit, mois manquants).
+
+    Args:
+        destinations: Nombre de destinations
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        Liste de tuples (mois en nombre de mois depuis 1970, prix), de 12 à 48 mois chacune
+    """
+    rng = np.random.default_rng(seed)
+    series = []
+    for i in range(destinations):
+        months = TIME_ORIGIN + int(rng.integers(48, 72)) + np.arange(int(rng.integers(12, 49)))
+        seasonal = 0.3 * np.sin(2 * np.pi * (months % 12) / 12 + rng.uniform(0, 2 * np.pi))
+        trend = rng.normal(0.03, 0.05) * (months - TIME_ORIGIN) / 12
+        prices = np.exp(np.log(rng.uniform(60, 300)) + trend + seasonal + rng.normal(0, 0.05, len(months)))
+        observed = rng.random(len(months)) > 0.1
+        series.append((months[observed], np.round(prices[observed], 2)))
+    return series
+
+
+def make_history_frame(destinations, runs, seed=0):
+    """
+    Historique synthétique au format long (types historiques: object, int64 et float64).
+
+    Args:
+        destinations: Nombre de destinations
+        runs: Nombre d'exécutions par destination
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        DataFrame avec les colonnes des fichiers bruts, destination, run_id et scrape_date
+    """
+    raw = make_raw_frame(destinations, seed)
+    run_dates = pd.date_range('2024-01-01', periods=runs, freq='W')
+    history = raw.loc[np.tile(np.arange(len(raw)), runs)].reset_index(drop=True)
+    history['avg_price'] *= np.random.default_rng(seed).uniform(0.9, 1.1, len(history))
+    history['run_id'] = np.repeat(run_dates.strftime('%Y%m%d_%H%M%S'), len(raw))
+    history['scrape_date'] = np.repeat(run_dates, len(raw))
+    return history.astype({'month_name': object, 'check_in': object, 'check_out': object})
+
+
+def make_listing_prices(listings, seed=0):
+    """Prix d'annonces synthétiques par mois (loi log-normale, effectif variable)"""
+    rng = np.random.default_rng(seed)
+    return {
+        month: rng.lognormal(np.log(120 + 30 * np.cos(month / 12 * 2 * np.pi)), 0.5, int(rng.integers(listings // 2, listings)))
+        for month in range(1, 13)
+    }
@@ -0,0 +1,40 @@
+"""
+Benchmark de l'ajustement des modèles de prévision (analyzer.forecast).
+"""
+
+import numpy as np
+
+from ..forecast import fit_seasonal_models, _design, N_PARAMETERS, TREND_RIDGE, SEASONAL_RIDGE
+from .common import measure, report
+from .fixtures import make_monthly_series
+
+
+def reference_seasonal_fit(months, prices):
+    """Ajustement d'une destination par moindres carrés (système ridge augmenté résolu par lstsq)"""
+    design = _design(months)
+    ridge = np.sqrt(np.diag([0.0, TREND_RIDGE] + [SEASONAL_RIDGE] * 12))
+    return np.linalg.lstsq(np.vstack([design, ridge]),
+                           np.concatenate([np.log(prices), np.zeros(N_PARAMETERS)]), rcond=None)[0]
+
+
+def benchmark_forecast():
+    """Ajustement des modèles de prévision: lstsq destination par destination contre équations normales en lot"""
+    rows = []
+
+    for destinations in (200, 2000):
+        series = make_monthly_series(destinations)
+        fitted = fit_seasonal_models(series)
+        for i, (months, prices) in enumerate(series[:50]):
+            reference = reference_seasonal_fit(months, prices)
+            if not np.allclose(_design(months) @ reference, _design(months) @ fitted['coefficients'][i], atol=1e-9) \
+                    or not np.isclose(reference[1], fitted['coefficients'][i][1], atol=1e-9):
+                raise AssertionError(f"Modèle différent pour la série {i} ({destinations} destinations)")
+
+        rows.append((
+            f"{destinations} destinations",
+            measure(lambda: [reference_seasonal_fit(months, prices) for months, prices in series], repeat=3),
+            measure(lambda: fit_seasonal_models(series), repeat=3),
+        ))
+
+    report("Ajustement des modèles de prévision (saisonnalité + tendance)", rows)
+    return rows
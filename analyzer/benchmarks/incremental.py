@@ -0,0 +1,58 @@
+"""
+Benchmark des mises à jour incrémentales d'un mois (analyzer.incremental).
+"""
+
+import tempfile
+import numpy as np
+
+from ..data_processor import AirbnbDataProcessor
+from ..incremental import MonthlyAggregates
+from .common import measure, report, assert_close
+from .fixtures import make_raw_frame
+
+
+def benchmark_incremental():
+    """Mise à jour d'un mois: traitement complet contre agrégats courants"""
+    processor = AirbnbDataProcessor(tempfile.mkdtemp())
+    rng = np.random.default_rng(2)
+    raw = make_raw_frame(1).drop(columns='destination')
+    aggregates = MonthlyAggregates(raw)
+    columns = ['price_range', 'relative_price', 'price_rank', 'pct_diff_from_max', 'pct_diff_from_min']
+
+    # Suite de mises à jour aléatoires, vérifiées une à une contre le recalcul complet
+    for _ in range(200):
+        month = int(rng.integers(1, 13))
+        price = float(np.round(rng.normal(150, 40), 2)) if rng.random() > 0.1 else float(raw['avg_price'].iloc[0])
+        previous_price = float(raw.loc[raw['month'] == month, 'avg_price'].iloc[0])
+        raw.loc[raw['month'] == month, 'avg_price'] = price
+        changed = aggregates.update_month(raw[raw['month'] == month].iloc[0])
+
+        processed = processor.process_data(raw)
+        frame = aggregates.frame()
+        # Colonnes dérivées en float32 (PROCESSED_SCHEMA): au plus un arrondi float32 d'écart
+        if not np.allclose(processed[columns].to_numpy(float), frame[columns].to_numpy(float), rtol=1e-6) \
+                or (processed['is_cheapest'].to_numpy() != frame['is_cheapest'].to_numpy()).any():
+            raise AssertionError(f"Données traitées différentes après la mise à jour du mois {month}")
+        # Ordre des ex aequo du classement: celui du tri numpy d'un côté, celui des mois de l'autre
+        reference, optimized = processor.calculate_statistics(processed), aggregates.statistics()
+        for stats in (reference, optimized):
+            stats['price_ranking'].sort(key=lambda item: (item['price'], item['month']))
+        assert_close(reference, optimized)
+        if (month in changed) != (price != previous_price):
+            raise AssertionError(f"Mois modifiés incorrects après la mise à jour du mois {month}: {changed}")
+
+    def full():
+        processed = processor.process_data(raw)
+        return processor.calculate_statistics(processed)
+
+    def incremental():
+        aggregates.update_month(raw.iloc[5])
+        return aggregates.statistics()
+
+    rows = [
+        ("1 mois modifié (données)", measure(lambda: processor.process_data(raw)),
+         measure(lambda: aggregates.update_month(raw.iloc[5]))),
+        ("1 mois modifié (+ stats)", measure(full), measure(incremental)),
+    ]
+    report("Mise à jour d'un mois (process_data + calculate_statistics)", rows)
+    return rows
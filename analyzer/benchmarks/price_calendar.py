@@ -0,0 +1,63 @@
+"""
+Benchmark de la recherche des séjours de N nuits (analyzer.price_calendar).
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..price_calendar import PriceCalendar, build_calendar
+from .common import measure, report
+from .fixtures import make_samples_frame
+
+
+def reference_stays(samples, nights, k=3, cheapest=True):
+    """Recherche naïve: somme de chaque séjour nuit par nuit, puis séjours sans chevauchement par tri"""
+    rates = samples.set_index(pd.to_datetime(samples['check_in']))['avg_price']
+    totals = {}
+    for index in range(len(rates) - nights + 1):
+        window = rates.iloc[index:index + nights]
+        if window.notna().all():
+            totals[index] = window.sum()
+
+    stays, taken = [], set()
+    for index in sorted(totals, key=lambda index: (totals[index] if cheapest else -totals[index], index)):
+        if len(stays) == k:
+            break
+        if not taken.intersection(range(index, index + nights)):
+            stays.append((str(rates.index[index].date()), round(totals[index], 2)))
+            taken.update(range(index, index + nights))
+    return stays
+
+
+def benchmark_calendar():
+    """Séjours de N nuits les moins chers: sommes nuit par nuit contre sommes cumulées glissantes"""
+    rows = []
+
+    for days, nights in ((183, 5), (365, 7), (730, 14)):
+        samples = make_samples_frame(days)
+        calendar = PriceCalendar(*build_calendar(samples))
+        optimized = calendar.find_stays(nights, k=3, horizon_days=days)
+
+        for side, cheapest in (('cheapest', True), ('most_expensive', False)):
+            reference = reference_stays(samples, nights, cheapest=cheapest)
+            found = [(stay['check_in'], stay['total_price']) for stay in optimized[side]]
+            # Prix par nuit stockés en float32: écarts de l'ordre du centime au plus
+            if len(found) != len(reference) or not np.allclose(
+                    [price for _, price in found], [price for _, price in reference], atol=0.02):
+                raise AssertionError(f"Séjours {side} différents ({days} jours, {nights} nuits): {found} != {reference}")
+
+        rows.append((
+            f"{days} jours, {nights} nuits",
+            measure(lambda: reference_stays(samples, nights), repeat=3),
+            measure(lambda: calendar.find_stays(nights, k=3, horizon_days=days)),
+        ))
+
+    # Durée scrapée: les prix relevés sont repris tels quels
+    samples = make_samples_frame(365, nights=7, seed=1)
+    totals, observed = PriceCalendar(*build_calendar(samples)).stay_prices(7)
+    expected = samples['avg_price'].to_numpy(dtype=np.float32).astype(np.float64) * 7
+    if not np.allclose(totals[observed], expected[observed]) or observed.sum() != samples['avg_price'].notna().sum():
+        raise AssertionError("Prix des séjours relevés différents")
+
+    report("Séjours de N nuits les moins et les plus chers (3 de chaque côté)", rows)
+    return rows
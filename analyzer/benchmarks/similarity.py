@@ -0,0 +1,62 @@
+"""
+Benchmark des destinations les plus corrélées (analyzer.similarity).
+"""
+
+import numpy as np
+
+from ..similarity import ProfileMatrix
+from .common import measure, report
+from .fixtures import make_raw_frame
+
+
+def reference_top_k(frame, k=5, min_overlap=6):
+    """Corrélations historiques: matrice complète pandas (paires de mois observés) puis tri par destination"""
+    corr_matrix = frame.corr(min_periods=min_overlap)
+    results = {}
+    for dest in corr_matrix.index:
+        others = corr_matrix[dest].drop(dest).dropna().sort_values(ascending=False, kind='stable')
+        results[dest] = list(others.index[:k])
+    return results, corr_matrix
+
+
+def benchmark_similarity():
+    """Destinations les plus corrélées: DataFrame.corr complet contre corrélations masquées par blocs"""
+    rows = []
+
+    for destinations in (100, 1000):
+        df = make_raw_frame(destinations)
+        # Environ 10 % de mois non observés
+        rng = np.random.default_rng(1)
+        df.loc[rng.random(len(df)) < 0.1, 'avg_price'] = np.nan
+
+        frame = df.pivot(index='month', columns='destination', values='avg_price')
+        reference, corr_matrix = reference_top_k(frame)
+        profiles = ProfileMatrix.from_frame(df)
+        optimized = profiles.top_k(k=5)
+
+        correlation = profiles.correlate(np.arange(len(profiles)))
+        expected = corr_matrix.loc[profiles.names, profiles.names].to_numpy()
+        np.fill_diagonal(expected, np.nan)
+        np.fill_diagonal(correlation, np.nan)
+        if not np.allclose(correlation, expected, atol=1e-9, equal_nan=True):
+            raise AssertionError(f"Corrélations différentes pour {destinations} destinations")
+        for dest, neighbours in optimized.items():
+            top = [item['destination'] for item in neighbours]
+            if not np.allclose(corr_matrix.loc[dest, top], corr_matrix.loc[dest, reference[dest]]):
+                raise AssertionError(f"Top-k différent pour {dest}")
+
+        rows.append((
+            f"{destinations} destinations",
+            measure(lambda: reference_top_k(frame), repeat=3),
+            measure(lambda: ProfileMatrix.from_frame(df).top_k(k=5), repeat=3),
+        ))
+
+    report("Destinations les plus corrélées (top 5 pour chaque destination)", rows)
+
+    # Passage à l'échelle: requête interactive et top-k complet sur 5000 destinations
+    profiles = ProfileMatrix.from_frame(make_raw_frame(5000))
+    single = measure(lambda: profiles.top_k([profiles.names[0]], k=5))
+    full = measure(lambda: profiles.top_k(k=5), repeat=3, number=1)
+    print(f"\n5000 destinations: une requête {single * 1e3:.2f} ms, toutes les requêtes {full:.2f} s")
+
+    return rows
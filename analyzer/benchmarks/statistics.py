@@ -0,0 +1,163 @@
+"""
+Benchmarks des statistiques mensuelles et des recommandations de mois (analyzer.statistics).
+"""
+
+import pandas as pd
+
+from ..data_processor import SEASONS
+from ..statistics import calculate_monthly_statistics, month_recommendations
+from .common import measure, report
+from .fixtures import make_price_frame, make_raw_frame
+
+
+def reference_monthly_statistics(df):
+    """
+    Implémentation pandas historique de calculate_statistics (référence des benchmarks).
+
+    Args:
+        df: DataFrame traité
+
+    Returns:
+        Dictionnaire contenant les statistiques calculées
+    """
+    stats = {}
+
+    cheapest_month = df.loc[df['avg_price'].idxmin()]
+    stats['cheapest_month'] = {
+        'name': cheapest_month['month_name'],
+        'avg_price': round(cheapest_month['avg_price'], 2),
+        'median_price': round(cheapest_month['median_price'], 2),
+        'season': cheapest_month['season']
+    }
+
+    most_expensive_month = df.loc[df['avg_price'].idxmax()]
+    stats['most_expensive_month'] = {
+        'name': most_expensive_month['month_name'],
+        'avg_price': round(most_expensive_month['avg_price'], 2),
+        'median_price': round(most_expensive_month['median_price'], 2),
+        'season': most_expensive_month['season']
+    }
+
+    potential_savings = most_expensive_month['avg_price'] - cheapest_month['avg_price']
+    stats['potential_savings'] = round(potential_savings, 2)
+    stats['savings_percentage'] = round(
+        (potential_savings / most_expensive_month['avg_price']) * 100, 2
+    ) if most_expensive_month['avg_price'] > 0 else 0
+
+    df['season'] = df['season'].astype(str)
+    stats['season_analysis'] = {}
+    for season, group in df.groupby('season'):
+        stats['season_analysis'][season] = {
+            'avg_price': round(group['avg_price'].mean(), 2),
+            'min_price': round(group['avg_price'].min(), 2),
+            'max_price': round(group['avg_price'].max(), 2),
+            'months': ', '.join(group['month_name'].tolist()),
+        }
+
+    stats['annual_variation'] = {
+        'mean': round(df['avg_price'].mean(), 2),
+        'median': round(df['avg_price'].median(), 2),
+        'std': round(df['avg_price'].std(), 2),
+        'min': round(df['avg_price'].min(), 2),
+        'max': round(df['avg_price'].max(), 2),
+        'coefficient_of_variation': round(
+            (df['avg_price'].std() / df['avg_price'].mean()) * 100, 2
+        ) if df['avg_price'].mean() > 0 else 0
+    }
+
+    price_ranking = df.sort_values('avg_price')[['month_name', 'avg_price', 'season']]
+    stats['price_ranking'] = []
+    for _, row in price_ranking.iterrows():
+        stats['price_ranking'].append({
+            'month': row['month_name'],
+            'price': round(row['avg_price'], 2),
+            'season': row['season']
+        })
+
+    return stats
+
+
+def benchmark_stats_kernel():
+    """Noyau de statistiques mensuelles contre l'implémentation pandas historique"""
+    rows = []
+    for periods in (12, 365):
+        df = make_price_frame(periods)
+
+        reference = reference_monthly_statistics(df.copy())
+        optimized = calculate_monthly_statistics(df)
+        if reference != optimized:
+            raise AssertionError(f"Résultats différents pour {periods} lignes")
+
+        rows.append((
+            f"{periods} lignes",
+            measure(lambda: reference_monthly_statistics(df.copy())) - measure(df.copy),
+            measure(lambda: calculate_monthly_statistics(df)),
+        ))
+
+    report("Statistiques mensuelles (calculate_monthly_statistics)", rows)
+    return rows
+
+
+def reference_month_recommendation(df):
+    """Implémentation pandas historique de calculate_month_recommendation (une destination par appel)"""
+    avg_price = df['avg_price'].mean()
+    df_sorted = df.sort_values('avg_price')
+    recommendations = {'best_value': [], 'balanced': [], 'avoid': []}
+
+    for _, row in df_sorted[df_sorted['avg_price'] < 0.85 * avg_price].iterrows():
+        recommendations['best_value'].append({
+            'month': row['month_name'],
+            'price': round(row['avg_price'], 2),
+            'saving': round(avg_price - row['avg_price'], 2),
+            'saving_percentage': round((avg_price - row['avg_price']) / avg_price * 100, 1),
+            'season': row['season']
+        })
+
+    for _, row in df_sorted[(df_sorted['avg_price'] >= 0.85 * avg_price) &
+                            (df_sorted['avg_price'] <= 1.15 * avg_price)].iterrows():
+        recommendations['balanced'].append({
+            'month': row['month_name'],
+            'price': round(row['avg_price'], 2),
+            'diff_from_avg': round(row['avg_price'] - avg_price, 2),
+            'diff_percentage': round((row['avg_price'] - avg_price) / avg_price * 100, 1),
+            'season': row['season']
+        })
+
+    for _, row in df_sorted[df_sorted['avg_price'] > 1.15 * avg_price].iterrows():
+        recommendations['avoid'].append({
+            'month': row['month_name'],
+            'price': round(row['avg_price'], 2),
+            'premium': round(row['avg_price'] - avg_price, 2),
+            'premium_percentage': round((row['avg_price'] - avg_price) / avg_price * 100, 1),
+            'season': row['season']
+        })
+
+    return recommendations
+
+
+def benchmark_recommendations():
+    """Recommandations de mois: une destination par appel (iterrows) contre le noyau groupé"""
+    rows = []
+    for destinations in (1, 1000):
+        df = make_raw_frame(destinations)
+        df['season'] = df['month'].map(SEASONS)
+        frames = [group for _, group in df.groupby('destination', sort=True)]
+        codes, names = pd.factorize(df['destination'], sort=True)
+
+        def batched():
+            return month_recommendations(
+                codes, len(names), df['month_name'].to_numpy(), df['avg_price'].to_numpy(), df['season'].to_numpy()
+            )
+
+        reference = [reference_month_recommendation(frame) for frame in frames]
+        if reference != batched():
+            raise AssertionError(f"Recommandations différentes pour {destinations} destinations")
+
+        rows.append((
+            f"{destinations} destinations",
+            measure(lambda: [reference_month_recommendation(frame) for frame in frames], repeat=3),
+            measure(batched, repeat=3),
+        ))
+
+    report("Recommandations de mois (toutes les destinations)", rows)
+    return rows
@@ -0,0 +1,152 @@
+"""
+Benchmarks du stockage typé: chargement des fichiers bruts et mémoire des DataFrames (analyzer.storage).
+"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+from ..data_processor import NUMERIC_COLUMNS, SEASONS, AirbnbDataProcessor
+from ..storage import RAW_SCHEMA, KEY_SCHEMA, apply_schema, memory_report, to_bytes, read_table
+from .common import measure, report, assert_close
+from .fixtures import make_raw_frame, make_history_frame
+
+
+def reference_load_csv(file_path):
+    """Chargement CSV historique: inférence des types puis conversion numérique de process_data"""
+    df = pd.read_csv(file_path)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def benchmark_storage():
+    """Chargement des données brutes: CSV non typé contre Parquet typé (temps et mémoire)"""
+    schema = {**RAW_SCHEMA, 'destination': 'category'}
+    rows = []
+    memory = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for destinations in (1, 1000):
+            df = make_raw_frame(destinations)
+            csv_path = os.path.join(tmp_dir, f"raw_{destinations}.csv")
+            parquet_path = os.path.join(tmp_dir, f"raw_{destinations}.parquet")
+            df.to_csv(csv_path, index=False)
+            content, extension = to_bytes(df, schema, 'parquet')
+            with open(parquet_path, 'wb') as f:
+                f.write(content)
+
+            reference = reference_load_csv(csv_path)
+            typed = read_table(parquet_path, schema)
+            for column in reference.columns:
+                if not np.allclose(reference[column], typed[column].astype(reference[column].dtype), rtol=1e-6) \
+                        if reference[column].dtype.kind in 'fiu' \
+                        else not (reference[column] == typed[column].astype(object)).all():
+                    raise AssertionError(f"Colonne {column} différente pour {destinations} destinations")
+
+            label = f"{len(df)} lignes"
+            rows.append((
+                label,
+                measure(lambda: reference_load_csv(csv_path)),
+                measure(lambda: read_table(parquet_path, schema)),
+            ))
+            rows.append((
+                f"{label}, 2 colonnes",
+                measure(lambda: reference_load_csv(csv_path)[['month', 'avg_price']]),
+                measure(lambda: read_table(parquet_path, schema, ['month', 'avg_price'])),
+            ))
+            memory.append((
+                label,
+                reference.memory_usage(deep=True).sum(), typed.memory_usage(deep=True).sum(),
+                os.path.getsize(csv_path), os.path.getsize(parquet_path),
+            ))
+
+    report("Chargement des données brutes (CSV contre Parquet typé)", rows)
+
+    print(f"\n{'entrée':<28}{'mémoire CSV':>14}{'typé':>14}{'fichier CSV':>14}{'Parquet':>14}")
+    for label, csv_memory, typed_memory, csv_size, parquet_size in memory:
+        print(f"{label:<28}{csv_memory / 1024:>11.1f} Ko{typed_memory / 1024:>11.1f} Ko"
+              f"{csv_size / 1024:>11.1f} Ko{parquet_size / 1024:>11.1f} Ko")
+
+    return rows, memory
+
+
+def reference_process_batch(df, key='destination'):
+    """Traitement groupé historique: types object et float64, is_cheapest écrit par .loc"""
+    processed_df = df.reset_index(drop=True)
+    numeric_cols = [col for col in NUMERIC_COLUMNS if col in processed_df.columns]
+    processed_df[numeric_cols] = processed_df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+
+    groups = processed_df.groupby(key, sort=False)['avg_price']
+    avg_price = processed_df['avg_price']
+    processed_df['price_range'] = processed_df['max_price'] - processed_df['min_price']
+    processed_df['relative_price'] = avg_price / groups.transform('mean')
+    processed_df['season'] = processed_df['month'].map(SEASONS)
+    processed_df['is_cheapest'] = False
+    processed_df.loc[groups.idxmin().dropna(), 'is_cheapest'] = True
+    processed_df['price_rank'] = groups.rank()
+    most_expensive = groups.transform('max')
+    processed_df['pct_diff_from_max'] = (avg_price - most_expensive) / most_expensive * 100
+    cheapest = groups.transform('min')
+    processed_df['pct_diff_from_min'] = (avg_price - cheapest) / cheapest * 100
+    return processed_df.sort_values([key, 'month'], kind='mergesort')
+
+
+def _print_memory(label, legacy, typed):
+    """Affiche la mémoire de chaque colonne, types historiques contre schéma"""
+    legacy_report = memory_report(legacy).set_index('column')
+    typed_report = memory_report(typed).set_index('column')
+    print(f"\n{label}")
+    print(f"{'colonne':<22}{'historique':>30}{'schéma':>30}")
+    for column in legacy_report.index:
+        before, after = legacy_report.loc[column], typed_report.loc[column]
+        print(f"{column:<22}{before['dtype']:>16}{before['bytes'] / 2 ** 20:>11.1f} Mo"
+              f"{after['dtype']:>16}{after['bytes'] / 2 ** 20:>11.1f} Mo")
+    before, after = legacy_report['bytes'].sum(), typed_report['bytes'].sum()
+    print(f"{'total':<22}{before / 2 ** 20:>27.1f} Mo{after / 2 ** 20:>27.1f} Mo{before / after:>7.1f}x")
+    return before, after
+
+
+def benchmark_memory():
+    """Mémoire des DataFrames: types historiques (object, float64) contre schéma déclaré"""
+    processor = AirbnbDataProcessor(tempfile.mkdtemp())
+    rows = []
+
+    # Historique de 1000 destinations sur 100 exécutions (1,2 million de lignes)
+    history = make_history_frame(1000, 100)
+    typed_history = apply_schema(history, {**RAW_SCHEMA, **KEY_SCHEMA})
+    for column in ('avg_price', 'median_price', 'min_price', 'max_price', 'sample_size'):
+        if not np.allclose(history[column], typed_history[column], rtol=1e-6):
+            raise AssertionError(f"Colonne {column} différente après conversion")
+    if not (history['month_name'] == typed_history['month_name'].astype(object)).all():
+        raise AssertionError("Colonne month_name différente après conversion")
+    memory = [_print_memory(f"Historique ({len(history)} lignes)", history, typed_history)]
+
+    # Traitement et statistiques d'un lot de destinations
+    # Données brutes chargées avec leurs types historiques, ou avec le schéma (read_table)
+    raw = make_raw_frame(10000).astype({'month_name': object})
+    typed_raw = apply_schema(raw, {**RAW_SCHEMA, **KEY_SCHEMA})
+    reference = reference_process_batch(raw)
+    optimized = processor.process_batch(typed_raw)
+    columns = ['price_range', 'relative_price', 'price_rank', 'pct_diff_from_max', 'pct_diff_from_min']
+    if not np.allclose(reference[columns].to_numpy(float), optimized[columns].to_numpy(float), rtol=1e-6) \
+            or (reference['is_cheapest'].to_numpy(bool) != optimized['is_cheapest'].to_numpy()).any() \
+            or (reference['season'].to_numpy() != optimized['season'].to_numpy(object)).any():
+        raise AssertionError("Données traitées différentes")
+    assert_close(processor.calculate_statistics_batch(reference), processor.calculate_statistics_batch(optimized))
+    memory.append(_print_memory(f"Lot traité ({len(raw)} lignes)", reference, optimized))
+
+    rows.append((
+        f"{len(raw)} lignes (traitement)",
+        measure(lambda: reference_process_batch(raw), repeat=3),
+        measure(lambda: processor.process_batch(typed_raw), repeat=3),
+    ))
+    rows.append((
+        f"{len(raw)} lignes (statistiques)",
+        measure(lambda: processor.calculate_statistics_batch(reference), repeat=3),
+        measure(lambda: processor.calculate_statistics_batch(optimized), repeat=3),
+    ))
+    report("Traitement groupé (types historiques contre schéma)", rows)
+    return rows, memory
@@ -0,0 +1,165 @@
+"""
+Intervalles de confiance des prix mensuels par bootstrap sur les prix des annonces.
+
+Le prix moyen d'un mois est calculé sur quelques dizaines d'annonces: « novembre
+est le mois le moins cher » peut n'être qu'un effet de l'échantillon. Les prix
+des annonces identifiées lors de la dernière exécution (instantanés de
+ListingSnapshotStore) sont rééchantillonnés avec remise: pour chaque mois, un
+seul tirage d'une matrice d'indices (rééchantillons × annonces) donne en une
+opération les moyennes et les médianes de tous les rééchantillons, d'où leurs
+intervalles de confiance (percentiles).
+
+Les rééchantillons de rang b de tous les mois forment un scénario: la
+proportion des scénarios où un mois a la moyenne la plus basse estime la
+probabilité qu'il soit réellement le moins cher. Le générateur aléatoire est
+initialisé par l'identifiant de l'exécution: les résultats, enregistrés avec
+les statistiques de l'analyse, sont reproductibles.
+"""
+
+import logging
+import numpy as np
+from datetime import datetime
+
+from .churn import ListingSnapshotStore
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Nombre de rééchantillons par mois
+DEFAULT_RESAMPLES = 2000
+
+# Niveau de confiance des intervalles
+CONFIDENCE_LEVEL = 0.95
+
+# Nombre minimum d'annonces d'un mois pour l'inclure
+MIN_LISTINGS = 5
+
+
+def bootstrap_months(prices_by_month, resamples=DEFAULT_RESAMPLES, confidence=CONFIDENCE_LEVEL, seed=0):
+    """
+    Moyennes, médianes et intervalles de confiance par bootstrap des prix de plusieurs mois.
+
+    Args:
+        prices_by_month: Dictionnaire {mois: prix des annonces}
+        resamples: Nombre de rééchantillons
+        confidence: Niveau de confiance des intervalles
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        Dictionnaire de tableaux alignés sur les mois triés: months, listings, mean,
+        mean_low, mean_high, median, median_low, median_high et cheapest_probability
+        (proportion des rééchantillons où le mois a la moyenne la plus basse)
+    """
+    rng = np.random.default_rng(seed)
+    months = sorted(prices_by_month)
+    bounds = [(1 - confidence) / 2, (1 + confidence) / 2]
+
+    means = np.empty((len(months), resamples))
+    medians = np.empty((len(months), resamples))
+    point_means, point_medians, counts = [], [], []
+    for row, month in enumerate(months):
+        prices = np.asarray(prices_by_month[month], dtype=np.float64)
+        # Un seul tirage: indices (rééchantillons × annonces)
+        samples = prices[rng.integers(0, len(prices), size=(resamples, len(prices)), dtype=np.int32)]
+        means[row] = samples.mean(axis=1)
+        medians[row] = np.median(samples, axis=1)
+        point_means.append(prices.mean())
+        point_medians.append(np.median(prices))
+        counts.append(len(prices))
+
+    mean_low, mean_high = np.quantile(means, bounds, axis=1) if months else (np.empty(0), np.empty(0))
+    median_low, median_high = np.quantile(medians, bounds, axis=1) if months else (np.empty(0), np.empty(0))
+    winners = np.argmin(means, axis=0) if months else np.empty(0, dtype=np.intp)
+
+    return {
+        'months': np.asarray(months, dtype=np.int64),
+        'listings': np.asarray(counts, dtype=np.int64),
+        'mean': np.asarray(point_means),
+        'mean_low': mean_low,
+        'mean_high': mean_high,
+        'median': np.asarray(point_medians),
+        'median_low': median_low,
+        'median_high': median_high,
+        'cheapest_probability': np.bincount(winners, minlength=len(months)) / resamples,
+    }
+
+
+def price_uncertainty(data_dir, destination, year=None, exclude_months=(), resamples=DEFAULT_RESAMPLES):
+    """
+    Intervalles de confiance des prix mensuels de la dernière exécution d'une destination.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        year: Année scrapée (dernière année disponible si None)
+        exclude_months: Mois à ignorer (par exemple les mois mis en quarantaine)
+        resamples: Nombre de rééchantillons
+
+    Returns:
+        Dictionnaire (exécution, année, paramètres, détail par mois, mois le moins
+        cher avec sa probabilité et le mois suivant le plus probable) ou {} si
+        moins de deux mois ont assez d'annonces identifiées
+    """
+    store = ListingSnapshotStore(data_dir)
+    runs = store.list_runs(destination, year)
+    if not runs:
+        return {}
+
+    run_year, run_id, _ = runs[-1]
+    exclude_months = set(exclude_months)
+
+    # Un instantané ne contient que les mois scrapés lors de l'exécution (pas ceux servis par le
+    # cache): chaque mois est pris dans le dernier instantané de l'année qui le contient
+    prices_by_month = {}
+    for snapshot_year, _, path in reversed(runs):
+        if snapshot_year != run_year:
+            continue
+        if len(prices_by_month) + len(exclude_months - set(prices_by_month)) >= 12:
+            break
+        for month, (_, prices) in store.load(path).items():
+            if month not in prices_by_month and month not in exclude_months:
+                prices_by_month[month] = prices
+    prices_by_month = {month: prices for month, prices in prices_by_month.items() if len(prices) >= MIN_LISTINGS}
+    if len(prices_by_month) < 2:
+        return {}
+
+    result = bootstrap_months(prices_by_month, resamples, seed=int(run_id.replace('_', '')) % 2 ** 32)
+    names = {month: datetime(run_year, month, 1).strftime('%B') for month in result['months'].tolist()}
+
+    months = [
+        {
+            'month': month,
+            'month_name': names[month],
+            'listings': int(result['listings'][i]),
+            **{key: round(float(result[key][i]), 2) for key in (
+                'mean', 'mean_low', 'mean_high', 'median', 'median_low', 'median_high')},
+            'cheapest_probability': round(float(result['cheapest_probability'][i]) * 100, 1),
+        }
+        for i, month in enumerate(result['months'].tolist())
+    ]
+
+    # Mois le moins cher (moyenne des annonces) et mois suivant le plus souvent le moins cher
+    cheapest = int(np.argmin(result['mean']))
+    others = np.where(np.arange(len(months)) == cheapest, -1.0, result['cheapest_probability'])
+    runner_up = int(np.argmax(others))
+
+    logger.info(f"Intervalles de confiance de {destination}: {months[cheapest]['month_name']} le moins cher "
+                f"avec une probabilité de {months[cheapest]['cheapest_probability']}%")
+    return {
+        'run': run_id,
+        'year': run_year,
+        'resamples': resamples,
+        'confidence': round(CONFIDENCE_LEVEL * 100),
+        'months': months,
+        'cheapest_month': {
+            'month': months[cheapest]['month'],
+            'name': months[cheapest]['month_name'],
+            'listings': months[cheapest]['listings'],
+            'probability': months[cheapest]['cheapest_probability'],
+            'runner_up': {
+                'month': months[runner_up]['month'],
+                'name': months[runner_up]['month_name'],
+                'probability': months[runner_up]['cheapest_probability'],
+            },
+        },
+    }
@@ -0,0 +1,286 @@
+"""
+Suivi du renouvellement des annonces (churn) entre deux scrapings.
+
+Pour chaque exécution du scraper, les identifiants d'annonces vus par mois
+sont enregistrés (par dashboard.services, à partir des résultats du scraping)
+sous forme de tableaux d'entiers triés, avec le prix de chaque annonce. Seuls
+les mois effectivement scrapés y figurent, pas ceux servis par le cache. Les
+comparaisons entre exécutions consécutives reposent sur des opérations
+ensemblistes numpy sur ces tableaux triés.
+"""
+
+import os
+import re
+import glob
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .manifest import format_destination
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+
+class ListingSnapshotStore:
+    """
+    Stockage compact des identifiants d'annonces vus par (destination, mois, exécution).
+
+    Chaque exécution est un fichier .npz compressé contenant les identifiants
+    triés de chaque mois encodés en différences successives (très
+    compressibles), les prix alignés en float32 et les bornes de chaque mois.
+    Les coordonnées des annonces, lorsqu'elles sont connues, sont stockées de
+    la même façon (latitude et longitude en float32, NaN si inconnues).
+    """
+
+    def __init__(self, data_dir):
+        """
+        Initialise le stockage.
+
+        Args:
+            data_dir: Répertoire principal des données
+        """
+        self.listings_dir = Path(data_dir) / 'listings'
+
+    def _destination_dir(self, destination):
+        """Répertoire des instantanés d'une destination"""
+        path = self.listings_dir / format_destination(destination)
+        # Répertoire nommé avant l'alignement sur format_destination (espaces remplacés): renommé
+        legacy = self.listings_dir / format_destination(destination).replace(' ', '_')
+        if legacy != path and legacy.is_dir() and not path.exists():
+            os.replace(legacy, path)
+        return path
+
+    def save(self, destination, year, run_id, listings_by_month):
+        """
+        Enregistre les annonces vues lors d'une exécution.
+
+        Args:
+            destination: Nom de la destination
+            year: Année scrapée
+            run_id: Identifiant de l'exécution (timestamp 'YYYYmmdd_HHMMSS')
+            listings_by_month: Dict {mois: (identifiants, prix)} ou
+                {mois: (identifiants, prix, coordonnées)}, les coordonnées étant une liste
+                alignée sur les identifiants de couples (latitude, longitude) ou None
+
+        Returns:
+            Chemin du fichier écrit ou None si aucune annonce n'est identifiée
+        """
+        id_blocks, price_blocks, coordinate_blocks = [], [], []
+        counts = np.zeros(13, dtype=np.int32)
+        has_coordinates = False
+
+        for month in sorted(listings_by_month):
+            ids, prices, *extra = listings_by_month[month]
+            if len(ids) == 0:
+                continue
+
+            ids, first_idx = np.unique(np.asarray(ids, dtype=np.uint64), return_index=True)
+            id_blocks.append(np.diff(ids, prepend=np.uint64(0)))
+            price_blocks.append(np.asarray(prices, dtype=np.float32)[first_idx])
+            counts[month] = len(ids)
+
+            coordinates = np.full((len(first_idx), 2), np.nan, dtype=np.float32)
+            if extra and extra[0]:
+                known = [(row, point) for row, point in enumerate(np.asarray(extra[0], dtype=object)[first_idx])
+                         if point is not None]
+                if known:
+                    rows, points = zip(*known)
+                    coordinates[list(rows)] = np.asarray(points, dtype=np.float32)
+                    has_coordinates = True
+            coordinate_blocks.append(coordinates)
+
+        if not id_blocks:
+            return None
+
+        dest_dir = self._destination_dir(destination)
+        os.makedirs(dest_dir, exist_ok=True)
+        file_path = dest_dir / f"{year}_{run_id}.npz"
+
+        # Un seul bloc par tableau: offsets[m-1]:offsets[m] délimite le mois m
+        arrays = {
+            'offsets': np.cumsum(counts, dtype=np.int32),
+            'ids': np.concatenate(id_blocks),
+            'prices': np.concatenate(price_blocks),
+        }
+        if has_coordinates:
+            arrays['coordinates'] = np.concatenate(coordinate_blocks)
+        np.savez_compressed(file_path, **arrays)
+
+        logger.info(f"Instantané des annonces enregistré: {file_path}")
+        return file_path
+
+    @staticmethod
+    def load(file_path, month=None, coordinates=False):
+        """
+        Charge un instantané.
+
+        Args:
+            file_path: Chemin du fichier .npz
+            month: Mois à charger (tous si None)
+            coordinates: Si True, ajoute les coordonnées (tableau float32 (n, 2)
+                latitude/longitude, NaN si inconnues) à chaque mois
+
+        Returns:
+            Dict {mois: (identifiants triés uint64, prix float32)} ou
+            {mois: (identifiants, prix, coordonnées)} si coordinates=True
+        """
+        with np.load(file_path) as data:
+            offsets, ids, prices = data['offsets'], data['ids'], data['prices']
+            points = None
+            if coordinates:
+                points = data['coordinates'] if 'coordinates' in data.files else \
+                    np.full((len(ids), 2), np.nan, dtype=np.float32)
+
+        months = [month] if month is not None else range(1, 13)
+        result = {}
+        for m in months:
+            start, end = offsets[m - 1], offsets[m]
+            if end > start:
+                result[m] = (np.cumsum(ids[start:end], dtype=np.uint64), prices[start:end])
+                if points is not None:
+                    result[m] += (points[start:end],)
+
+        return result
+
+    def list_runs(self, destination, year=None):
+        """
+        Liste les exécutions enregistrées pour une destination, de la plus ancienne à la plus récente.
+
+        Args:
+            destination: Nom de la destination
+            year: Année scrapée (toutes si None)
+
+        Returns:
+            Liste de tuples (année, identifiant d'exécution, chemin)
+        """
+        pattern = f"{year}_*.npz" if year else "*.npz"
+        runs = []
+        for path in glob.glob(str(self._destination_dir(destination) / pattern)):
+            match = re.match(r'(\d{4})_(\d{8}_\d{6})\.npz$', os.path.basename(path))
+            if match:
+                runs.append((int(match.group(1)), match.group(2), path))
+
+        return sorted(runs, key=lambda run: (run[1], run[0]))
+
+
+def compare_listing_sets(previous_ids, previous_prices, current_ids, current_prices):
+    """
+    Compare deux ensembles d'annonces triés.
+
+    Args:
+        previous_ids: Identifiants triés de l'exécution précédente
+        previous_prices: Prix alignés de l'exécution précédente
+        current_ids: Identifiants triés de l'exécution courante
+        current_prices: Prix alignés de l'exécution courante
+
+    Returns:
+        Dictionnaire avec les annonces nouvelles, retirées, conservées et
+        la variation de prix des annonces conservées
+    """
+    _, prev_idx, curr_idx = np.intersect1d(
+        previous_ids, current_ids, assume_unique=True, return_indices=True
+    )
+    retained = len(prev_idx)
+
+    stats = {
+        'new_listings': len(current_ids) - retained,
+        'removed_listings': len(previous_ids) - retained,
+        'retained_listings': retained,
+        'retention_rate': round(retained / len(previous_ids) * 100, 2) if len(previous_ids) else 0,
+        'avg_price_delta': 0,
+        'median_price_delta': 0,
+        'avg_price_delta_pct': 0,
+    }
+
+    if retained:
+        old_prices = previous_prices[prev_idx].astype(np.float64)
+        deltas = current_prices[curr_idx].astype(np.float64) - old_prices
+        valid = old_prices > 0
+
+        stats['avg_price_delta'] = round(float(deltas.mean()), 2)
+        stats['median_price_delta'] = round(float(np.median(deltas)), 2)
+        if valid.any():
+            stats['avg_price_delta_pct'] = round(float((deltas[valid] / old_prices[valid]).mean() * 100), 2)
+
+    return stats
+
+
+def compute_listing_churn(data_dir, destination, year=None):
+    """
+    Calcule le renouvellement des annonces entre exécutions consécutives d'une destination.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        year: Année scrapée (toutes si None)
+
+    Returns:
+        DataFrame avec une ligne par (exécution, mois) comparée à l'exécution précédente
+    """
+    store = ListingSnapshotStore(data_dir)
+    runs = store.list_runs(destination, year)
+
+    rows = []
+    previous_by_year = {}
+    for run_year, run_id, path in runs:
+        current = store.load(path)
+        previous_run_id, previous = previous_by_year.get(run_year, (None, {}))
+
+        for month, (ids, prices) in current.items():
+            if month not in previous:
+                continue
+            rows.append({
+                'year': run_year,
+                'run': run_id,
+                'previous_run': previous_run_id,
+                'month': month,
+                **compare_listing_sets(previous[month][0], previous[month][1], ids, prices),
+            })
+
+        previous_by_year[run_year] = (run_id, current)
+
+    return pd.DataFrame(rows)
+
+
+def latest_listing_churn(data_dir, destination, year=None):
+    """
+    Résume le renouvellement des annonces entre les deux dernières exécutions.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        year: Année scrapée (toutes si None)
+
+    Returns:
+        Dictionnaire résumé (totaux et détail par mois) ou {} si moins de deux exécutions
+    """
+    store = ListingSnapshotStore(data_dir)
+    runs = store.list_runs(destination, year)
+    if year is None and runs:
+        runs = [run for run in runs if run[0] == runs[-1][0]]
+    if len(runs) < 2:
+        return {}
+
+    (_, previous_run, previous_path), (_, current_run, current_path) = runs[-2], runs[-1]
+    previous, current = store.load(previous_path), store.load(current_path)
+
+    by_month = {}
+    for month in sorted(set(previous) & set(current)):
+        by_month[str(month)] = compare_listing_sets(*previous[month], *current[month])
+
+    if not by_month:
+        return {}
+
+    totals = {
+        key: int(sum(month_stats[key] for month_stats in by_month.values()))
+        for key in ('new_listings', 'removed_listings', 'retained_listings')
+    }
+
+    return {
+        'run': current_run,
+        'previous_run': previous_run,
+        **totals,
+        'by_month': by_month,
+    }
@@ -1,33 +1,96 @@
 import os
-import glob
+import copy
+import hashlib
 import logging
+import threading
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
+from collections import OrderedDict
+
+from .statistics import (
+    monthly_price_statistics, month_recommendations, grouped_mean_std, grouped_argsort
+)
+from .manifest import DataManifest, format_destination
+from .storage import RAW_SCHEMA, PROCESSED_SCHEMA, apply_schema, read_table, to_bytes
 
 # Configuration du logger
 logger = logging.getLogger('analyzer')
 
+# Saisons correspondant aux mois
+SEASONS = {
+    12: 'Hiver', 1: 'Hiver', 2: 'Hiver',
+    3: 'Printemps', 4: 'Printemps', 5: 'Printemps',
+    6: 'Été', 7: 'Été', 8: 'Été',
+    9: 'Automne', 10: 'Automne', 11: 'Automne'
+}
+
+# Colonnes numériques des données brutes
+NUMERIC_COLUMNS = ['avg_price', 'median_price', 'min_price', 'max_price', 'sample_size']
+
+# Saisons dans l'ordre de tri des libellés (ordre des catégories de la colonne season)
+SEASON_CATEGORIES = sorted(set(SEASONS.values()))
+
+# Version du traitement: à incrémenter à chaque modification de process_data ou des
+# statistiques, pour invalider les résultats mémorisés
+PROCESSOR_VERSION = 3
+
+# Nombre de résultats de traitement conservés en mémoire
+PROCESSED_CACHE_SIZE = 64
+
+# Résultats de traitement mémorisés {clé: (DataFrame, statistiques, chemin du fichier)}, du plus ancien au plus récent
+_processed_cache = OrderedDict()
+_processed_cache_lock = threading.Lock()
+
+# Nombre maximal de mois modifiés pour une mise à jour incrémentale (au-delà: traitement complet)
+INCREMENTAL_MAX_MONTHS = 3
+
+# Agrégats des dernières données traitées {destination: MonthlyAggregates}, du plus ancien au plus récent
+_aggregates = OrderedDict()
+_aggregates_lock = threading.Lock()
+
+
+def season_column(months):
+    """
+    Saison de chaque mois, en colonne catégorielle.
+
+    Args:
+        months: Series des numéros de mois
+
+    Returns:
+        Series catégorielle (catégories SEASON_CATEGORIES)
+    """
+    seasons = pd.Categorical(months.map(SEASONS), categories=SEASON_CATEGORIES)
+    return pd.Series(seasons, index=months.index, name='season')
+
 
 class AirbnbDataProcessor:
     """
     Classe pour le traitement et l'analyse des données d'Airbnb collectées par le scraper.
     """
 
-    def __init__(self, data_dir):
+    def __init__(self, data_dir, storage_format=None):
         """
         Initialise le processeur de données.
 
         Args:
             data_dir: Répertoire principal des données
+            storage_format: Format des données traitées ('parquet' ou 'csv', défaut: Parquet si pyarrow est installé)
         """
+        self.storage_format = storage_format
         self.raw_data_dir = Path(data_dir) / 'raw'
         self.processed_data_dir = Path(data_dir) / 'processed'
 
         # S'assurer que le répertoire de données traitées existe
         os.makedirs(self.processed_data_dir, exist_ok=True)
 
+        # Index des fichiers bruts et traités
+        self.manifest = DataManifest(data_dir)
+
+        # Résultats de traitement mémorisés sur disque, par empreinte du fichier brut
+        self.cache_dir = Path(data_dir) / 'cache' / 'processed'
+
         logger.info("AirbnbDataProcessor initialisé avec succès")
 
     def get_latest_data(self, destination):
@@ -40,35 +103,30 @@ class AirbnbDataProcessor:
         Returns:
             Chemin du fichier CSV le plus récent ou None si aucun n'est trouvé
         """
-        # Formater la destination pour correspondre au format des noms de fichiers
-        formatted_dest = destination.replace(',', '_')
+        # Lecture directe dans le manifest (les anciens fichiers sont indexés à la première demande)
+        latest_file = self.manifest.latest('raw', destination)
 
-        # Trouver tous les fichiers correspondant au modèle
-        pattern = f"{formatted_dest}_*.csv"
-        files = glob.glob(str(self.raw_data_dir / pattern))
-
-        if not files:
+        if latest_file is None:
             logger.warning(f"Aucun fichier de données trouvé pour {destination}")
             return None
 
-        # Trier par date de modification (le plus récent en premier)
-        latest_file = max(files, key=os.path.getmtime)
         logger.info(f"Fichier le plus récent pour {destination}: {latest_file}")
 
-        return latest_file
+        return str(latest_file)
 
-    def load_data(self, file_path):
+    def load_data(self, file_path, columns=None):
         """
-        Charge les données à partir d'un fichier CSV.
+        Charge les données brutes à partir d'un fichier Parquet ou CSV, typées selon RAW_SCHEMA.
 
         Args:
-            file_path: Chemin vers le fichier CSV
+            file_path: Chemin vers le fichier de données
+            columns: Colonnes à charger (toutes si None)
 
         Returns:
             DataFrame pandas ou None en cas d'erreur
         """
         try:
-            df = pd.read_csv(file_path)
+            df = read_table(file_path, RAW_SCHEMA, columns)
             logger.info(f"Données chargées avec succès: {df.shape[0]} lignes, {df.shape[1]} colonnes")
             return df
         except Exception as e:
@@ -90,14 +148,8 @@ class AirbnbDataProcessor:
             return None
 
         try:
-            # Copier le DataFrame pour ne pas modifier l'original
-            processed_df = df.copy()
-
-            # S'assurer que les colonnes numériques sont du bon type
-            numeric_cols = ['avg_price', 'median_price', 'min_price', 'max_price', 'sample_size']
-            for col in numeric_cols:
-                if col in processed_df.columns:
-                    processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce')
+            # Copier le DataFrame pour ne pas modifier l'original, avec les types du schéma
+            processed_df = apply_schema(df, RAW_SCHEMA).copy()
 
             # Ajouter une colonne pour l'écart-type des prix
             processed_df['price_range'] = processed_df['max_price'] - processed_df['min_price']
@@ -107,18 +159,14 @@ class AirbnbDataProcessor:
             processed_df['relative_price'] = processed_df['avg_price'] / annual_avg
 
             # Ajouter un indicateur de saison
-            seasons = {
-                12: 'Hiver', 1: 'Hiver', 2: 'Hiver',
-                3: 'Printemps', 4: 'Printemps', 5: 'Printemps',
-                6: 'Été', 7: 'Été', 8: 'Été',
-                9: 'Automne', 10: 'Automne', 11: 'Automne'
-            }
-            processed_df['season'] = processed_df['month'].map(seasons)
-
-            # Trouver le mois le moins cher
-            cheapest_month_idx = processed_df['avg_price'].idxmin()
-            processed_df['is_cheapest'] = False
-            processed_df.loc[cheapest_month_idx, 'is_cheapest'] = True
+            processed_df['season'] = season_column(processed_df['month'])
+
+            # Trouver le mois le moins cher (première occurrence, comme idxmin)
+            prices = processed_df['avg_price'].to_numpy(dtype=np.float64)
+            is_cheapest = np.zeros(len(processed_df), dtype=bool)
+            if not np.isnan(prices).all():
+                is_cheapest[np.nanargmin(prices)] = True
+            processed_df['is_cheapest'] = is_cheapest
 
             # Calculer le rang de prix (du moins cher au plus cher)
             processed_df['price_rank'] = processed_df['avg_price'].rank()
@@ -135,8 +183,8 @@ class AirbnbDataProcessor:
                     (processed_df['avg_price'] - cheapest) / cheapest * 100
             )
 
-            # Trier par mois pour une meilleure lisibilité
-            processed_df = processed_df.sort_values('month')
+            # Trier par mois pour une meilleure lisibilité, colonnes calculées aux types du schéma
+            processed_df = apply_schema(processed_df.sort_values('month'), PROCESSED_SCHEMA)
 
             logger.info("Données traitées avec succès")
             return processed_df
@@ -160,75 +208,19 @@ class AirbnbDataProcessor:
             return {}
 
         try:
-            stats = {}
-
-            # Informations sur le mois le moins cher
-            cheapest_month = df.loc[df['avg_price'].idxmin()]
-            stats['cheapest_month'] = {
-                'name': cheapest_month['month_name'],
-                'avg_price': round(cheapest_month['avg_price'], 2),
-                'median_price': round(cheapest_month['median_price'], 2),
-                'season': cheapest_month['season']
-            }
-
-            # Informations sur le mois le plus cher
-            most_expensive_month = df.loc[df['avg_price'].idxmax()]
-            stats['most_expensive_month'] = {
-                'name': most_expensive_month['month_name'],
-                'avg_price': round(most_expensive_month['avg_price'], 2),
-                'median_price': round(most_expensive_month['median_price'], 2),
-                'season': most_expensive_month['season']
-            }
-
-            # Économie potentielle
-            potential_savings = most_expensive_month['avg_price'] - cheapest_month['avg_price']
-            stats['potential_savings'] = round(potential_savings, 2)
-            stats['savings_percentage'] = round(
-                (potential_savings / most_expensive_month['avg_price']) * 100, 2
-            ) if most_expensive_month['avg_price'] > 0 else 0
-
-            # Statistiques par saison - CORRECTION ICI
-            # Assurons-nous que la colonne 'season' contient des valeurs hashables (str)
-            df['season'] = df['season'].astype(str)
-
-            # Approche simplifiée: traiter chaque groupe séparément sans fusion
-            stats['season_analysis'] = {}
-
-            for season, group in df.groupby('season'):
-                month_names = ', '.join(group['month_name'].tolist())
-                avg_price = group['avg_price'].mean()
-                min_price = group['avg_price'].min()
-                max_price = group['avg_price'].max()
-
-                stats['season_analysis'][season] = {
-                    'avg_price': round(avg_price, 2),
-                    'min_price': round(min_price, 2),
-                    'max_price': round(max_price, 2),
-                    'months': month_names,
-                }
-
-            # Variation de prix annuelle
-            stats['annual_variation'] = {
-                'mean': round(df['avg_price'].mean(), 2),
-                'median': round(df['avg_price'].median(), 2),
-                'std': round(df['avg_price'].std(), 2),
-                'min': round(df['avg_price'].min(), 2),
-                'max': round(df['avg_price'].max(), 2),
-                'coefficient_of_variation': round(
-                    (df['avg_price'].std() / df['avg_price'].mean()) * 100, 2
-                ) if df['avg_price'].mean() > 0 else 0
-            }
-
-            # Créer une liste de tous les mois ordonnés par prix
-            price_ranking = df.sort_values('avg_price')[['month_name', 'avg_price', 'season']]
-            stats['price_ranking'] = []
-
-            for _, row in price_ranking.iterrows():
-                stats['price_ranking'].append({
-                    'month': row['month_name'],
-                    'price': round(row['avg_price'], 2),
-                    'season': row['season']
-                })
+            stats = monthly_price_statistics(
+                df['month_name'].to_numpy(),
+                df['avg_price'].to_numpy(dtype=np.float64),
+                df['median_price'].to_numpy(dtype=np.float64),
+                df['season'].to_numpy()
+            )
+            if stats:
+                stats['recommendations'] = month_recommendations(
+                    np.zeros(len(df), dtype=np.intp), 1,
+                    df['month_name'].to_numpy(),
+                    df['avg_price'].to_numpy(dtype=np.float64),
+                    df['season'].to_numpy()
+                )[0]
 
             logger.info("Statistiques calculées avec succès")
             return stats
@@ -237,9 +229,185 @@ class AirbnbDataProcessor:
             logger.error(f"Erreur lors du calcul des statistiques: {str(e)}")
             return {}
 
+    def process_batch(self, df, key='destination'):
+        """
+        Traite en une seule passe les données brutes de plusieurs destinations.
+
+        Les colonnes calculées par process_data sont obtenues par des opérations
+        groupées vectorisées sur un DataFrame au format long (une ligne par
+        destination et par mois), au lieu d'un pipeline pandas par destination.
+
+        Args:
+            df: DataFrame contenant les données brutes de toutes les destinations
+            key: Colonne identifiant la destination
+
+        Returns:
+            DataFrame traité, trié par destination puis par mois
+        """
+        if df is None or df.empty:
+            logger.warning("Aucune donnée à traiter")
+            return None
+
+        try:
+            processed_df = apply_schema(df.reset_index(drop=True), {**RAW_SCHEMA, key: 'category'})
+
+            groups = processed_df.groupby(key, sort=False, observed=True)['avg_price']
+            avg_price = processed_df['avg_price']
+            codes = groups.ngroup().to_numpy()
+            annual_avg, _ = grouped_mean_std(codes, avg_price.to_numpy(), groups.ngroups)
+
+            processed_df['price_range'] = processed_df['max_price'] - processed_df['min_price']
+            processed_df['relative_price'] = avg_price / annual_avg[codes]
+            processed_df['season'] = season_column(processed_df['month'])
+
+            # Première occurrence du prix minimal de chaque destination (comme idxmin)
+            is_cheapest = np.zeros(len(processed_df), dtype=bool)
+            is_cheapest[groups.idxmin().dropna().to_numpy(dtype=np.intp)] = True
+            processed_df['is_cheapest'] = is_cheapest
+
+            processed_df['price_rank'] = groups.rank()
+
+            most_expensive = groups.transform('max')
+            processed_df['pct_diff_from_max'] = (avg_price - most_expensive) / most_expensive * 100
+
+            cheapest = groups.transform('min')
+            processed_df['pct_diff_from_min'] = (avg_price - cheapest) / cheapest * 100
+
+            processed_df = apply_schema(
+                processed_df.sort_values([key, 'month'], kind='mergesort'), PROCESSED_SCHEMA
+            )
+
+            logger.info(f"Données traitées avec succès pour {processed_df[key].nunique()} destinations")
+            return processed_df
+
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement groupé des données: {str(e)}")
+            return None
+
+    def calculate_statistics_batch(self, df, key='destination'):
+        """
+        Calcule les statistiques de plusieurs destinations à partir d'un DataFrame traité au format long.
+
+        Args:
+            df: DataFrame traité (sortie de process_batch)
+            key: Colonne identifiant la destination
+
+        Returns:
+            Dictionnaire {destination: statistiques}, chaque entrée ayant la même
+            forme que le résultat de calculate_statistics
+        """
+        if df is None or df.empty:
+            logger.warning("Aucune donnée pour calculer les statistiques")
+            return {}
+
+        try:
+            df = df.reset_index(drop=True)
+            groups = df.groupby(key, sort=False, observed=True)['avg_price']
+
+            cheapest = df.loc[groups.idxmin()].set_index(key)
+            most_expensive = df.loc[groups.idxmax()].set_index(key)
+            annual = groups.agg(['median', 'min', 'max'])
+            annual['mean'], annual['std'] = grouped_mean_std(
+                groups.ngroup().to_numpy(), df['avg_price'].to_numpy(), groups.ngroups
+            )
+
+            # Statistiques par saison (saisons triées comme dans groupby('season'))
+            season_groups = df.groupby([key, 'season'], sort=True, observed=True)
+            seasons = season_groups['avg_price'].agg(['min', 'max'])
+            seasons['mean'], _ = grouped_mean_std(
+                season_groups.ngroup().to_numpy(), df['avg_price'].to_numpy(), season_groups.ngroups
+            )
+            # Mois de chaque saison (dans l'ordre des lignes), joints sur des tranches d'un tableau trié
+            season_codes = season_groups.ngroup().to_numpy()
+            month_names = df['month_name'].to_numpy(dtype=object)[np.argsort(season_codes, kind='stable')]
+            bounds = np.cumsum(np.bincount(season_codes, minlength=season_groups.ngroups))[:-1]
+            seasons['months'] = [', '.join(names) for names in np.split(month_names, bounds)]
+
+            season_analysis = {}
+            for (destination, season), mean, low_price, high_price, months in zip(
+                    seasons.index, seasons['mean'].to_numpy(), seasons['min'].to_numpy(),
+                    seasons['max'].to_numpy(), seasons['months']):
+                season_analysis.setdefault(destination, {})[season] = {
+                    'avg_price': round(mean, 2),
+                    'min_price': round(low_price, 2),
+                    'max_price': round(high_price, 2),
+                    'months': months,
+                }
+
+            # Classement des mois par prix
+            codes = groups.ngroup().to_numpy()
+            ranked = df.iloc[grouped_argsort(codes, df['avg_price'].to_numpy(), groups.ngroups)]
+            price_ranking = {}
+            for destination, month_name, price, season in zip(
+                    ranked[key], ranked['month_name'], ranked['avg_price'], ranked['season']):
+                price_ranking.setdefault(destination, []).append({
+                    'month': month_name,
+                    'price': round(price, 2),
+                    'season': season
+                })
+
+            # Recommandations de toutes les destinations en une passe
+            recommendations = month_recommendations(
+                codes, groups.ngroups, df['month_name'].to_numpy(), df['avg_price'].to_numpy(), df['season'].to_numpy()
+            )
+            group_codes = dict(zip(df[key], codes))
+
+            # Lignes lues par position dans des dictionnaires de tableaux (destinations dans le même ordre
+            # que les groupes): .loc sur un DataFrame aux types mélangés est coûteux ligne par ligne
+            month_columns = ['month_name', 'avg_price', 'median_price', 'season']
+            lows = {column: cheapest[column].to_numpy() for column in month_columns}
+            highs = {column: most_expensive[column].to_numpy() for column in month_columns}
+            annuals = {column: values.to_numpy() for column, values in annual.items()}
+
+            results = {}
+            for i, destination in enumerate(annual.index):
+                low = {column: values[i] for column, values in lows.items()}
+                high = {column: values[i] for column, values in highs.items()}
+                year_stats = {column: values[i] for column, values in annuals.items()}
+                potential_savings = high['avg_price'] - low['avg_price']
+
+                results[destination] = {
+                    'cheapest_month': {
+                        'name': low['month_name'],
+                        'avg_price': round(low['avg_price'], 2),
+                        'median_price': round(low['median_price'], 2),
+                        'season': low['season']
+                    },
+                    'most_expensive_month': {
+                        'name': high['month_name'],
+                        'avg_price': round(high['avg_price'], 2),
+                        'median_price': round(high['median_price'], 2),
+                        'season': high['season']
+                    },
+                    'potential_savings': round(potential_savings, 2),
+                    'savings_percentage': round(
+                        (potential_savings / high['avg_price']) * 100, 2
+                    ) if high['avg_price'] > 0 else 0,
+                    'season_analysis': season_analysis.get(destination, {}),
+                    'annual_variation': {
+                        'mean': round(year_stats['mean'], 2),
+                        'median': round(year_stats['median'], 2),
+                        'std': round(year_stats['std'], 2),
+                        'min': round(year_stats['min'], 2),
+                        'max': round(year_stats['max'], 2),
+                        'coefficient_of_variation': round(
+                            (year_stats['std'] / year_stats['mean']) * 100, 2
+                        ) if year_stats['mean'] > 0 else 0
+                    },
+                    'price_ranking': price_ranking.get(destination, []),
+                    'recommendations': recommendations[group_codes[destination]],
+                }
+
+            logger.info(f"Statistiques calculées avec succès pour {len(results)} destinations")
+            return results
+
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul groupé des statistiques: {str(e)}")
+            return {}
+
     def save_processed_data(self, df, destination):
         """
-        Sauvegarde les données traitées dans un fichier CSV.
+        Sauvegarde les données traitées (Parquet typé selon PROCESSED_SCHEMA, ou CSV).
 
         Args:
             df: DataFrame à sauvegarder
@@ -253,15 +421,24 @@ class AirbnbDataProcessor:
             return None
 
         try:
+            content, extension = to_bytes(df, PROCESSED_SCHEMA, self.storage_format)
+
+            # Ne pas réécrire un fichier identique au dernier fichier traité de la destination
+            latest_file = self.manifest.latest('processed', destination)
+            if latest_file is not None:
+                entry = self.manifest.entry(latest_file)
+                if entry and entry['sha256'] == hashlib.sha256(content).hexdigest():
+                    logger.info(f"Données traitées inchangées pour {destination}: {latest_file}")
+                    return latest_file
+
             # Formater la destination pour le nom de fichier
-            formatted_dest = destination.replace(',', '_')
+            formatted_dest = format_destination(destination)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-            # Créer le chemin de fichier
-            file_path = self.processed_data_dir / f"{formatted_dest}_processed_{timestamp}.csv"
-
-            # Sauvegarder le DataFrame
-            df.to_csv(file_path, index=False)
+            # Écriture atomique dans le répertoire de la destination, enregistrée dans le manifest
+            file_path = self.manifest.write_bytes(
+                content, 'processed', destination, f"{formatted_dest}_processed_{timestamp}.{extension}"
+            )
             logger.info(f"Données traitées sauvegardées dans {file_path}")
 
             return file_path
@@ -270,10 +447,99 @@ class AirbnbDataProcessor:
             logger.error(f"Erreur lors de la sauvegarde des données: {str(e)}")
             return None
 
+    def _memo_key(self, destination, raw_file):
+        """
+        Clé de mémorisation d'un traitement: destination, empreinte du fichier brut et version du traitement.
+
+        Args:
+            destination: Nom de la destination
+            raw_file: Chemin du fichier brut
+
+        Returns:
+            Clé (chaîne utilisable comme nom de fichier)
+        """
+        entry = self.manifest.entry(raw_file)
+        if entry is None or entry['size'] != os.path.getsize(raw_file):
+            # Fichier absent du manifest ou modifié hors du manifest: recalculer son empreinte
+            self.manifest.record(raw_file, 'raw', destination)
+            entry = self.manifest.entry(raw_file)
+
+        return f"{format_destination(destination)}_{entry['sha256']}_v{PROCESSOR_VERSION}"
+
+    def _get_memoized(self, key):
+        """
+        Récupère un résultat de traitement mémorisé, en mémoire puis sur disque.
+
+        Args:
+            key: Clé de mémorisation
+
+        Returns:
+            Tuple (DataFrame traité, statistiques, chemin du fichier) ou None
+        """
+        with _processed_cache_lock:
+            result = _processed_cache.get(key)
+            if result is not None:
+                _processed_cache.move_to_end(key)
+
+        if result is None:
+            cache_file = self.cache_dir / f"{key}.pkl"
+            if not cache_file.exists():
+                return None
+            try:
+                result = pd.read_pickle(cache_file)
+            except Exception as e:
+                logger.warning(f"Erreur lors de la lecture du cache de traitement: {str(e)}")
+                return None
+            self._remember(key, result)
+
+        df, stats, saved_file = result
+
+        # Le fichier traité a pu être supprimé depuis
+        if saved_file is None or not os.path.exists(saved_file):
+            return None
+
+        # Copies: l'appelant peut modifier le résultat sans altérer le cache
+        return df.copy(), copy.deepcopy(stats), saved_file
+
+    def _remember(self, key, result):
+        """Ajoute un résultat au cache mémoire, en évinçant les plus anciens au-delà de PROCESSED_CACHE_SIZE"""
+        with _processed_cache_lock:
+            _processed_cache[key] = result
+            _processed_cache.move_to_end(key)
+            while len(_processed_cache) > PROCESSED_CACHE_SIZE:
+                _processed_cache.popitem(last=False)
+
+    def _memoize(self, key, df, stats, saved_file):
+        """
+        Mémorise un résultat de traitement en mémoire et sur disque.
+
+        Args:
+            key: Clé de mémorisation
+            df: DataFrame traité
+            stats: Statistiques calculées
+            saved_file: Chemin du fichier traité
+        """
+        # Les échecs de traitement ne sont pas mémorisés
+        if saved_file is None or not stats:
+            return
+
+        result = (df.copy(), copy.deepcopy(stats), saved_file)
+        self._remember(key, result)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            cache_file = self.cache_dir / f"{key}.pkl"
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            pd.to_pickle(result, tmp_file)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.warning(f"Erreur lors de la sauvegarde du cache de traitement: {str(e)}")
+
     def get_or_process_data(self, destination):
         """
         Récupère et traite les données pour une destination.
-        Si des données traitées récentes existent, les utilise.
+        Si le fichier brut le plus récent a déjà été traité (même contenu, même
+        version du traitement), le résultat mémorisé est retourné.
         Sinon, charge les données brutes et les traite.
 
         Args:
@@ -289,23 +555,121 @@ class AirbnbDataProcessor:
             logger.warning(f"Aucune donnée disponible pour {destination}")
             return None, {}, None
 
+        key = self._memo_key(destination, latest_raw_file)
+        memoized = self._get_memoized(key)
+        if memoized is not None:
+            logger.info(f"Données traitées de {destination} récupérées depuis le cache")
+            return memoized
+
         # Charger les données brutes
         raw_df = self.load_data(latest_raw_file)
 
         if raw_df is None:
             return None, {}, None
 
-        # Traiter les données
-        processed_df = self.process_data(raw_df)
-
-        # Calculer les statistiques
-        stats = self.calculate_statistics(processed_df)
+        # Traiter les données et calculer les statistiques (seulement les mois modifiés si possible)
+        processed_df, stats = self._process_incremental(destination, raw_df)
 
         # Sauvegarder les données traitées
         saved_file = self.save_processed_data(processed_df, destination)
+        self._memoize(key, processed_df, stats, saved_file)
 
         return processed_df, stats, saved_file
 
+    def _process_incremental(self, destination, raw_df):
+        """
+        Traite les données brutes d'une destination en ne recalculant que les mois modifiés.
+
+        Les agrégats des dernières données traitées de la destination sont gardés
+        en mémoire: si les nouvelles données ne diffèrent que par quelques mois
+        (au plus INCREMENTAL_MAX_MONTHS), ces mois sont mis à jour un par un;
+        sinon les données sont traitées entièrement.
+
+        Args:
+            destination: Nom de la destination
+            raw_df: DataFrame des données brutes
+
+        Returns:
+            Tuple (DataFrame traité, statistiques)
+        """
+        # Import local: incremental importe SEASONS de ce module
+        from .incremental import MonthlyAggregates
+
+        raw_df = apply_schema(raw_df, RAW_SCHEMA)
+
+        # L'agrégat est retiré du cache pendant la mise à jour: un seul thread le modifie
+        with _aggregates_lock:
+            aggregates = _aggregates.pop(destination, None)
+
+        changed = aggregates.changed_rows(raw_df) if aggregates is not None else None
+        if changed is not None and len(changed) <= INCREMENTAL_MAX_MONTHS:
+            for row in changed:
+                aggregates.update_month(row)
+            processed_df, stats = aggregates.frame(), aggregates.statistics()
+            logger.info(f"Données de {destination} mises à jour de façon incrémentale ({len(changed)} mois modifiés)")
+        else:
+            processed_df = self.process_data(raw_df)
+            stats = self.calculate_statistics(processed_df)
+            try:
+                aggregates = MonthlyAggregates(raw_df) if stats else None
+            except Exception as e:
+                logger.warning(f"Erreur lors du calcul des agrégats de {destination}: {str(e)}")
+                aggregates = None
+
+        if aggregates is not None:
+            with _aggregates_lock:
+                _aggregates[destination] = aggregates
+                while len(_aggregates) > PROCESSED_CACHE_SIZE:
+                    _aggregates.popitem(last=False)
+
+        return processed_df, stats
+
+    def get_or_process_batch(self, destinations, refresh=False):
+        """
+        Récupère et traite en une seule passe les données de plusieurs destinations.
+
+        Args:
+            destinations: Liste des noms de destinations
+            refresh: Si True, retraite les données même si un résultat mémorisé existe
+
+        Returns:
+            Dictionnaire {destination: (DataFrame traité, statistiques, chemin du fichier)},
+            limité aux destinations disposant de données brutes
+        """
+        results = {}
+        keys = {}
+        frames = []
+        for destination in destinations:
+            latest_raw_file = self.get_latest_data(destination)
+            if not latest_raw_file:
+                continue
+
+            # Seules les destinations dont le fichier brut n'a pas encore été traité passent par le lot
+            keys[destination] = self._memo_key(destination, latest_raw_file)
+            memoized = None if refresh else self._get_memoized(keys[destination])
+            if memoized is not None:
+                results[destination] = memoized
+                continue
+
+            raw_df = self.load_data(latest_raw_file)
+            if raw_df is not None and not raw_df.empty:
+                frames.append(raw_df.assign(destination=destination))
+
+        if not frames:
+            return results
+
+        processed = self.process_batch(pd.concat(frames, ignore_index=True))
+        stats_by_destination = self.calculate_statistics_batch(processed)
+
+        for destination, group in processed.groupby('destination', sort=False, observed=True):
+            processed_df = group.drop(columns='destination').reset_index(drop=True)
+            stats = stats_by_destination.get(destination, {})
+            saved_file = self.save_processed_data(processed_df, destination)
+            self._memoize(keys[destination], processed_df, stats, saved_file)
+            results[destination] = (processed_df, stats, saved_file)
+
+        return results
+
 
 # Fonction pour utilisation directe du module
 def process_data_for_destination(data_dir, destination):
@@ -324,19 +688,51 @@ def process_data_for_destination(data_dir, destination):
     return df, stats
 
 
+def process_data_for_destinations(data_dir, destinations):
+    """
+    Fonction utilitaire pour traiter en une seule passe les données de plusieurs destinations.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destinations: Liste des destinations à analyser
+
+    Returns:
+        Dictionnaire {destination: (DataFrame traité, statistiques)}
+    """
+    processor = AirbnbDataProcessor(data_dir)
+    return {
+        destination: (df, stats)
+        for destination, (df, stats, _) in processor.get_or_process_batch(destinations).items()
+    }
+
+
 if __name__ == "__main__":
     # Point d'entrée pour exécution directe (tests)
+    # (DJANGO_SETTINGS_MODULE=airbnb_analytics.settings python -m analyzer.data_processor "Paris,France" --profile)
     import sys
+    import logging.config
+    import django
     from django.conf import settings
 
+    django.setup()
     logging.config.dictConfig(settings.LOGGING)
 
-    destination = sys.argv[1] if len(sys.argv) > 1 else "Paris,France"
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    destination = args[0] if args else "Paris,France"
     data_dir = settings.DATA_DIR
 
     print(f"Traitement des données pour {destination}...")
     processor = AirbnbDataProcessor(data_dir)
-    df, stats, _ = processor.get_or_process_data(destination)
+
+    if "--profile" in sys.argv:
+        from analyzer.profiling import ProfileRun
+
+        profile_run = ProfileRun(settings.PROFILES_DIR, 'data_processor', settings.PROFILE_SAMPLING_INTERVAL)
+        with profile_run.profile(destination):
+            df, stats, _ = processor.get_or_process_data(destination)
+        print(profile_run.finish())
+    else:
+        df, stats, _ = processor.get_or_process_data(destination)
 
     if df is not None:
         print("\nAperçu des données traitées:")
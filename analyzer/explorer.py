@@ -0,0 +1,486 @@
+"""
+Exploration SQL des fichiers de données.
+
+Les fichiers indexés par le manifest et les partitions de l'historique sont
+exposés comme des vues SQL, interrogeables sans script pandas:
+
+- raw: fichiers bruts du scraper (une ligne par destination, exécution et mois);
+- processed: fichiers traités;
+- history: historique complet des données brutes (partitions compactées et
+  fichiers pas encore compactés);
+- processed_history: historique complet des données traitées.
+
+Chaque vue ajoute aux colonnes des fichiers la destination, l'identifiant et
+la date de l'exécution et l'année scrapée. Par exemple, le prix médian de juin
+des destinations espagnoles sur les trois derniers scrapings:
+
+    SELECT destination, median(avg_price) FROM (
+        SELECT *, dense_rank() OVER (PARTITION BY destination ORDER BY scrape_date DESC) AS rang
+        FROM history WHERE destination LIKE '%Spain' AND month = 6
+    ) WHERE rang <= 3 GROUP BY destination
+
+duckdb est une dépendance optionnelle: avec lui, les vues lisent directement
+les fichiers Parquet et CSV (exécution en colonnes, sur plusieurs threads, en
+ne décodant que les colonnes utilisées). Sans lui, les vues utilisées par une
+requête sont chargées avec pandas dans une base SQLite en mémoire (une fois,
+tant que les fichiers ne changent pas): le SQL standard et median() restent
+disponibles, mais pas les autres fonctions propres à DuckDB.
+
+Seules les requêtes de lecture (SELECT ou WITH) sont acceptées. Le nombre de
+lignes renvoyées est limité, et une requête est interrompue au-delà de son
+délai.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # Moteur DuckDB indisponible, repli sur SQLite
+    duckdb = None
+
+from .manifest import DataManifest, FILE_KINDS
+from .history import HistoryStore, file_run_id
+from .storage import KEY_SCHEMA, SCHEMAS, read_table
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Moteurs de requêtes pris en charge
+ENGINES = ('duckdb', 'sqlite')
+
+# Nombre de lignes renvoyées par défaut, et au maximum
+DEFAULT_ROW_LIMIT = 1000
+MAX_ROW_LIMIT = 100000
+
+# Délai maximal d'une requête par défaut (secondes)
+DEFAULT_TIMEOUT = 30
+
+# Vues exposées et leur description
+VIEWS = {
+    'raw': "Fichiers bruts du scraper (une ligne par destination, exécution et mois)",
+    'processed': "Fichiers traités (colonnes calculées par process_data)",
+    'history': "Historique complet des données brutes (partitions compactées et fichiers récents)",
+    'processed_history': "Historique complet des données traitées",
+}
+
+# Vues de chaque type de fichiers
+VIEWS_BY_KIND = {
+    'raw': {'files': 'raw', 'history': 'history'},
+    'processed': {'files': 'processed', 'history': 'processed_history'},
+}
+
+# Colonnes ajoutées aux colonnes des fichiers horodatés, à partir du manifest
+FILE_COLUMNS = ['destination', 'run_id', 'scrape_date', 'year']
+
+# Nombre d'instructions SQLite entre deux vérifications du délai
+SQLITE_PROGRESS_STEPS = 10000
+
+# Explorateurs gardés en mémoire, par (répertoire, moteur): (signature des fichiers, explorateur)
+_explorers = {}
+_explorers_lock = threading.Lock()
+
+
+def _view_kind(view):
+    """Type de fichiers d'une vue ('raw' ou 'processed')"""
+    return 'processed' if view.startswith('processed') else 'raw'
+
+
+def view_columns(view):
+    """
+    Colonnes d'une vue (colonnes ajoutées puis colonnes du schéma des fichiers).
+
+    Args:
+        view: Nom de la vue
+
+    Returns:
+        Liste des noms de colonnes
+    """
+    return FILE_COLUMNS + [column for column in SCHEMAS[_view_kind(view)] if column not in FILE_COLUMNS]
+
+
+def data_catalogue(data_dir):
+    """
+    Fichiers de données exposés par les vues.
+
+    Args:
+        data_dir: Répertoire principal des données
+
+    Returns:
+        Dictionnaire {source: DataFrame}: pour 'raw' et 'processed', les fichiers
+        horodatés (path et FILE_COLUMNS); pour 'raw_partitions' et
+        'processed_partitions', les partitions de l'historique (path, destination)
+    """
+    manifest = DataManifest(data_dir)
+    store = HistoryStore(data_dir)
+
+    catalogue = {}
+    for kind in FILE_KINDS:
+        files, partitions = [], []
+        for destination in manifest.destinations(kind):
+            for entry in manifest.files(kind, destination):
+                run_id = file_run_id(entry['path'], entry['created_at'])
+                files.append({
+                    'path': str(entry['path']),
+                    'destination': destination,
+                    'run_id': run_id,
+                    'scrape_date': pd.to_datetime(run_id, format='%Y%m%d_%H%M%S'),
+                    'year': entry['year'],
+                })
+            partitions += [{'path': path, 'destination': destination}
+                           for path in store.partition_files(kind, destination)]
+
+        catalogue[kind] = pd.DataFrame(files, columns=['path'] + FILE_COLUMNS).astype({
+            'path': str, 'destination': str, 'run_id': str, 'scrape_date': 'datetime64[ns]', 'year': 'Int64'
+        })
+        catalogue[f"{kind}_partitions"] = pd.DataFrame(partitions, columns=['path', 'destination']).astype(str)
+
+    return catalogue
+
+
+def _catalogue_signature(catalogue):
+    """Signature des fichiers d'un catalogue (chemins et dates de modification)"""
+    signature = []
+    for source in sorted(catalogue):
+        for path in catalogue[source]['path']:
+            try:
+                signature.append((path, os.stat(path).st_mtime_ns))
+            except FileNotFoundError:
+                signature.append((path, None))
+    return tuple(signature)
+
+
+def validate_query(sql):
+    """
+    Vérifie qu'une requête est une unique requête de lecture.
+
+    Args:
+        sql: Texte de la requête
+
+    Returns:
+        Requête sans espaces ni point-virgule final
+
+    Raises:
+        ValueError: Requête vide, multiple ou autre qu'un SELECT/WITH
+    """
+    statement = (sql or '').strip().rstrip(';').strip()
+    # Les commentaires sont ignorés pour la vérification (pas pour l'exécution)
+    code = re.sub(r'--[^\n]*|/\*.*?\*/', ' ', statement, flags=re.DOTALL).strip()
+    if not code:
+        raise ValueError("Requête vide")
+    if ';' in re.sub(r"'(?:[^']|'')*'", "''", code):
+        raise ValueError("Une seule requête est autorisée")
+    if not re.match(r'(select|with)\b', code, re.IGNORECASE):
+        raise ValueError("Seules les requêtes de lecture (SELECT ou WITH) sont autorisées")
+    return statement
+
+
+def _quote(identifier):
+    """Identifiant SQL entre guillemets"""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _sql_list(paths):
+    """Liste SQL de chemins de fichiers"""
+    return '[' + ', '.join("'" + path.replace("'", "''") + "'" for path in paths) + ']'
+
+
+class _DuckDBEngine:
+    """Vues DuckDB lisant directement les fichiers Parquet et CSV"""
+
+    name = 'duckdb'
+
+    def __init__(self, catalogue, data_dir, threads=None):
+        self.connection = duckdb.connect(':memory:')
+        if threads:
+            self.connection.execute(f"SET threads TO {int(threads)}")
+
+        sources = {source: self._source_sql(source, files) for source, files in catalogue.items()}
+        for kind in FILE_KINDS:
+            files_view = VIEWS_BY_KIND[kind]['files']
+            history_view = VIEWS_BY_KIND[kind]['history']
+            self.connection.execute(f"CREATE VIEW {files_view} AS {sources[kind]}")
+
+            # Historique: partitions, puis exécutions pas encore compactées
+            partitions = sources[f"{kind}_partitions"]
+            if partitions is None:
+                self.connection.execute(f"CREATE VIEW {history_view} AS SELECT * FROM {files_view}")
+                continue
+            self.connection.execute(f"CREATE VIEW _{kind}_partitions AS {partitions}")
+            self.connection.execute(
+                f"CREATE VIEW {history_view} AS SELECT * FROM _{kind}_partitions "
+                f"UNION ALL BY NAME SELECT * FROM {files_view} AS f WHERE NOT EXISTS ("
+                f"SELECT 1 FROM _{kind}_partitions AS p "
+                f"WHERE p.destination = f.destination AND p.run_id = f.run_id)"
+            )
+
+        self._restrict(data_dir)
+
+    def _restrict(self, data_dir):
+        """
+        Limite les requêtes aux fichiers du répertoire des données.
+
+        Sans ces réglages, un SELECT pourrait lire n'importe quel fichier du serveur
+        (read_text, read_csv...) ou une URL (extension httpfs chargée automatiquement).
+        La configuration est ensuite verrouillée: une requête ne peut plus la modifier.
+        """
+        allowed = os.path.join(os.path.abspath(data_dir), '')
+        self.connection.execute(f"SET allowed_directories = {_sql_list([allowed])}")
+        self.connection.execute("SET enable_external_access = false")
+        self.connection.execute("SET autoinstall_known_extensions = false")
+        self.connection.execute("SET autoload_known_extensions = false")
+        self.connection.execute("SET lock_configuration = true")
+
+    def _source_sql(self, source, files):
+        """
+        Requête lisant les fichiers d'une source, avec les colonnes du catalogue.
+
+        Returns:
+            Texte SQL (requête vide aux colonnes du catalogue si la source n'a aucun
+            fichier, None pour des partitions absentes)
+        """
+        table = f"_files_{source}"
+        self.connection.register(f"{table}_frame", files)
+        self.connection.execute(f"CREATE TABLE {table} AS SELECT * FROM {table}_frame")
+        self.connection.unregister(f"{table}_frame")
+        key_columns = [column for column in files.columns if column != 'path']
+
+        selects = []
+        for extension, reader in (('.parquet', 'read_parquet'), ('.csv', 'read_csv')):
+            paths = [path for path in files['path'] if path.endswith(extension)]
+            if not paths:
+                continue
+            relation = f"{reader}({_sql_list(paths)}, filename = true, union_by_name = true)"
+            columns = [row[0] for row in self.connection.execute(f"DESCRIBE SELECT * FROM {relation}").fetchall()]
+            # Les colonnes du catalogue remplacent celles des fichiers de même nom
+            excluded = ['filename'] + [column for column in key_columns if column in columns]
+            selects.append(
+                f"SELECT {', '.join('f.' + _quote(column) for column in key_columns)}, "
+                f"d.* EXCLUDE ({', '.join(_quote(column) for column in excluded)}) "
+                f"FROM {relation} AS d JOIN {table} AS f ON f.path = d.filename"
+            )
+
+        if selects:
+            return ' UNION ALL BY NAME '.join(selects)
+        if source.endswith('_partitions'):
+            return None
+        return f"SELECT * EXCLUDE (path) FROM {table}"
+
+    def execute(self, statement, timeout):
+        """Exécute une requête, interrompue au-delà du délai"""
+        cursor = self.connection.cursor()
+        timer = threading.Timer(timeout, cursor.interrupt)
+        timer.start()
+        try:
+            cursor.execute(statement)
+            return [column[0] for column in cursor.description], cursor.fetchall()
+        except duckdb.InterruptException:
+            raise TimeoutError(f"Requête interrompue après {timeout} s")
+        except duckdb.PermissionException:
+            raise ValueError("Seuls les fichiers du répertoire des données sont accessibles")
+        except duckdb.Error as e:
+            raise ValueError(str(e))
+        finally:
+            timer.cancel()
+            cursor.close()
+
+
+class _Median:
+    """Agrégat median() de SQLite (disponible nativement dans DuckDB)"""
+
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        return float(np.median(self.values)) if self.values else None
+
+
+class _SQLiteEngine:
+    """Vues chargées à la demande avec pandas dans une base SQLite en mémoire"""
+
+    name = 'sqlite'
+
+    def __init__(self, catalogue):
+        self.catalogue = catalogue
+        self.connection = sqlite3.connect(':memory:', check_same_thread=False)
+        self.connection.create_aggregate('median', 1, _Median)
+        self.loaded = set()
+        self.lock = threading.Lock()
+
+    def _read(self, source, schema, deadline):
+        """Lit tous les fichiers d'une source, avec les colonnes du catalogue"""
+        frames = []
+        for entry in self.catalogue[source].to_dict('records'):
+            if time.monotonic() > deadline:
+                raise TimeoutError
+            try:
+                df = read_table(entry['path'], schema)
+            except Exception as e:
+                logger.warning(f"Fichier ignoré par l'exploration SQL ({entry['path']}): {str(e)}")
+                continue
+            frames.append(df.assign(**{column: value for column, value in entry.items() if column != 'path'}))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=view_columns(source))
+
+    def _load(self, view, deadline):
+        """Charge une vue dans la base en mémoire (une seule fois), avant l'échéance de la requête"""
+        kind = _view_kind(view)
+        frame = self._read(kind, SCHEMAS[kind], deadline)
+        if view == VIEWS_BY_KIND[kind]['history']:
+            # Historique: partitions, puis exécutions pas encore compactées
+            partitions = self._read(f"{kind}_partitions", {**SCHEMAS[kind], **KEY_SCHEMA}, deadline)
+            if not partitions.empty:
+                compacted = pd.MultiIndex.from_frame(partitions[['destination', 'run_id']].astype(str))
+                recent = ~pd.MultiIndex.from_frame(frame[['destination', 'run_id']].astype(str)).isin(compacted)
+                frame = pd.concat([partitions, frame[recent]], ignore_index=True)
+
+        # Colonnes catégorielles en texte (les dates sont écrites au format ISO)
+        categories = [column for column in frame.columns if isinstance(frame[column].dtype, pd.CategoricalDtype)]
+        frame = frame.astype({column: str for column in categories})
+        frame.to_sql(view, self.connection, index=False, if_exists='replace')
+        self.loaded.add(view)
+
+    def execute(self, statement, timeout):
+        """Charge les vues utilisées puis exécute une requête, interrompue au-delà du délai"""
+        # Le délai couvre aussi l'attente du verrou et le chargement des vues
+        deadline = time.monotonic() + timeout
+        if not self.lock.acquire(timeout=timeout):
+            raise TimeoutError(f"Requête interrompue après {timeout} s")
+        try:
+            self.connection.set_progress_handler(lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+            try:
+                for view in VIEWS:
+                    if view not in self.loaded and re.search(rf'\b{view}\b', statement, re.IGNORECASE):
+                        self._load(view, deadline)
+
+                cursor = self.connection.execute(statement)
+                return [column[0] for column in cursor.description], cursor.fetchall()
+            except TimeoutError:
+                raise TimeoutError(f"Requête interrompue après {timeout} s")
+            except sqlite3.OperationalError as e:
+                if 'interrupted' in str(e):
+                    raise TimeoutError(f"Requête interrompue après {timeout} s")
+                raise ValueError(str(e))
+            except sqlite3.Error as e:
+                raise ValueError(str(e))
+            finally:
+                self.connection.set_progress_handler(None, 0)
+        finally:
+            self.lock.release()
+
+
+class DataExplorer:
+    """
+    Requêtes SQL sur les fichiers de données (vues raw, processed, history et processed_history).
+    """
+
+    def __init__(self, data_dir, engine=None, threads=None, catalogue=None):
+        """
+        Initialise le moteur de requêtes et déclare les vues.
+
+        Args:
+            data_dir: Répertoire principal des données
+            engine: 'duckdb', 'sqlite' ou None (DuckDB s'il est installé)
+            threads: Nombre de threads de DuckDB (tous les cœurs si None)
+            catalogue: Fichiers exposés (voir data_catalogue), recherchés si None
+        """
+        engine = engine or ('duckdb' if duckdb is not None else 'sqlite')
+        if engine not in ENGINES:
+            raise ValueError(f"Moteur de requêtes inconnu: {engine}")
+        if engine == 'duckdb' and duckdb is None:
+            logger.warning("duckdb n'est pas installé, requêtes exécutées par SQLite")
+            engine = 'sqlite'
+
+        self.data_dir = data_dir
+        self.catalogue = catalogue if catalogue is not None else data_catalogue(data_dir)
+        self.engine = _DuckDBEngine(self.catalogue, data_dir, threads) if engine == 'duckdb' else _SQLiteEngine(self.catalogue)
+
+    def tables(self):
+        """
+        Vues disponibles.
+
+        Returns:
+            Dictionnaire {vue: {'description', 'columns', 'files'}}
+        """
+        return {
+            view: {
+                'description': description,
+                'columns': view_columns(view),
+                'files': len(self.catalogue[_view_kind(view)]) + (
+                    len(self.catalogue[f"{_view_kind(view)}_partitions"]) if 'history' in view else 0),
+            }
+            for view, description in VIEWS.items()
+        }
+
+    def query(self, sql, limit=DEFAULT_ROW_LIMIT, timeout=DEFAULT_TIMEOUT):
+        """
+        Exécute une requête de lecture.
+
+        Args:
+            sql: Requête SQL (SELECT ou WITH)
+            limit: Nombre maximal de lignes renvoyées (au plus MAX_ROW_LIMIT)
+            timeout: Délai maximal d'exécution (secondes)
+
+        Returns:
+            Dictionnaire (engine, columns, rows, row_count, truncated, seconds)
+
+        Raises:
+            ValueError: Requête refusée ou invalide
+            TimeoutError: Requête interrompue au-delà du délai
+        """
+        statement = validate_query(sql)
+        limit = min(max(int(limit), 1), MAX_ROW_LIMIT)
+
+        # Une ligne de plus que la limite indique un résultat tronqué
+        start = time.perf_counter()
+        columns, rows = self.engine.execute(f"SELECT * FROM (\n{statement}\n) AS query LIMIT {limit + 1}", timeout)
+        seconds = time.perf_counter() - start
+
+        truncated = len(rows) > limit
+        rows = rows[:limit]
+        logger.info(f"Requête SQL exécutée par {self.engine.name} en {seconds:.2f} s: {len(rows)} lignes"
+                    f"{' (tronqué)' if truncated else ''}")
+        return {
+            'engine': self.engine.name,
+            'columns': columns,
+            'rows': rows,
+            'row_count': len(rows),
+            'truncated': truncated,
+            'seconds': round(seconds, 3),
+        }
+
+
+def get_explorer(data_dir, engine=None, threads=None):
+    """
+    Explorateur des fichiers de données, réutilisé tant que les fichiers n'ont pas changé.
+
+    Args:
+        data_dir: Répertoire principal des données
+        engine: Voir DataExplorer
+        threads: Voir DataExplorer
+
+    Returns:
+        DataExplorer
+    """
+    catalogue = data_catalogue(data_dir)
+    signature = _catalogue_signature(catalogue)
+    key = (str(data_dir), engine, threads)
+
+    with _explorers_lock:
+        cached = _explorers.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+    explorer = DataExplorer(data_dir, engine, threads, catalogue)
+    with _explorers_lock:
+        _explorers[key] = (signature, explorer)
+    return explorer
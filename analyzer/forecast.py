@@ -0,0 +1,328 @@
+"""
+Prévision des prix mensuels des 12 prochains mois.
+
+Pour chaque destination, la série des prix moyens par mois visé (dernier
+prix observé de chaque mois dans l'historique des scrapings) est modélisée
+en logarithme par un niveau, une tendance linéaire et un effet propre à
+chaque mois de l'année:
+
+    log(prix) = niveau + tendance × années + saison[mois]
+
+Les paramètres sont estimés par moindres carrés pénalisés (ridge) sur la
+tendance et les effets saisonniers, ce qui rend le modèle identifiable même
+avec une seule année observée: la tendance reste alors nulle, faute de
+pouvoir la distinguer de la saisonnalité. Toutes les destinations sont
+ajustées en une fois: l'axe des mois est commun, les équations normales de
+chaque destination (matrices 14 × 14) sont formées par un seul produit
+matriciel sur les mois observés, puis résolues en lot.
+
+Les paramètres (coefficients, écart-type résiduel, facteurs d'incertitude
+des 12 horizons) sont conservés dans data/cache/forecast_models.npz. Les
+prévisions et leurs intervalles sont calculés à la demande à partir de ces
+paramètres; une destination n'est réajustée que si son historique des prix
+a reçu de nouvelles exécutions. Les modèles ajustés sont fusionnés au fichier
+sous verrou, pour ne pas écraser ceux d'un autre processus.
+"""
+
+import os
+import logging
+import threading
+import numpy as np
+from pathlib import Path
+
+from .price_history import PriceHistoryCache
+from .storage import file_lock
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Nombre de mois prévus
+FORECAST_HORIZON = 12
+
+# Nombre minimum de mois observés pour ajuster un modèle
+MIN_FORECAST_MONTHS = 6
+
+# Pénalités ridge de la tendance (log-prix par an) et des effets saisonniers
+TREND_RIDGE = 1.0
+SEASONAL_RIDGE = 0.01
+
+# Écart-type résiduel minimum (en log-prix, soit environ 5 %)
+MIN_RESIDUAL_STD = 0.05
+
+# Quantile de la loi normale des intervalles de prévision (95 %)
+CONFIDENCE_Z = 1.96
+
+# Origine de l'axe du temps (mois depuis 1970), pour un système bien conditionné
+TIME_ORIGIN = (2020 - 1970) * 12
+
+# Nombre de paramètres: niveau, tendance et 12 effets saisonniers
+N_PARAMETERS = 14
+
+# Modèles chargés en mémoire, par fichier: (date de modification, tableaux des paramètres)
+_loaded_models = {}
+_loaded_models_lock = threading.Lock()
+
+
+def monthly_series(targets, matrix):
+    """
+    Dernier prix observé de chaque mois visé d'une matrice d'historique.
+
+    Args:
+        targets: Mois visés (datetime64[M]), un par colonne
+        matrix: Matrice (exécution × mois visé) des prix, exécutions triées par date
+
+    Returns:
+        Tuple (mois visés en nombre de mois depuis 1970, prix), mois sans observation exclus
+    """
+    if not matrix.size:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    valid = np.isfinite(matrix)
+    observed = valid.any(axis=0)
+    last = matrix.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+    prices = matrix[last, np.arange(matrix.shape[1])]
+    return targets[observed].astype(np.int64), prices[observed]
+
+
+def _design(month_numbers):
+    """Lignes du modèle (niveau, tendance en années, indicatrices des mois) pour des mois donnés"""
+    month_numbers = np.asarray(month_numbers, dtype=np.int64)
+    design = np.zeros(month_numbers.shape + (N_PARAMETERS,))
+    design[..., 0] = 1.0
+    design[..., 1] = (month_numbers - TIME_ORIGIN) / 12
+    np.put_along_axis(design, (2 + month_numbers % 12)[..., None], 1.0, axis=-1)
+    return design
+
+
+def fit_seasonal_models(series):
+    """
+    Ajuste le modèle saisonnier de plusieurs destinations en une fois.
+
+    Args:
+        series: Liste de tuples (mois en nombre de mois depuis 1970, prix), un par destination
+
+    Returns:
+        Dictionnaire de tableaux alignés sur series: coefficients (n × 14), écart-type
+        résiduel, nombre de mois observés, premier mois prévu et facteurs d'incertitude
+        des 12 horizons (n × 12); coefficients NaN pour les séries trop courtes
+    """
+    n = len(series)
+    lengths = np.array([len(months) for months, _ in series], dtype=np.int64)
+    all_months = np.concatenate([months for months, _ in series]) if n else np.empty(0, dtype=np.int64)
+    first = int(all_months.min()) if all_months.size else 0
+    span = int(all_months.max()) - first + 1 if all_months.size else 0
+
+    # Aucun mois observé: aucun modèle à ajuster
+    if span == 0:
+        return {
+            'coefficients': np.full((n, N_PARAMETERS), np.nan),
+            'sigma': np.full(n, np.nan, dtype=np.float32),
+            'observations': np.zeros(n, dtype=np.int16),
+            'origin': np.zeros(n, dtype=np.int64),
+            'spread': np.full((n, FORECAST_HORIZON), np.nan, dtype=np.float32),
+        }
+
+    # Matrice (destination × mois) des log-prix sur l'axe commun des mois
+    rows = np.repeat(np.arange(n), lengths)
+    columns = all_months - first
+    values = np.concatenate([prices for _, prices in series]).astype(np.float64) if n else np.empty(0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logs = np.log(values)
+    keep = np.isfinite(logs)
+    weights = np.zeros((n, span))
+    weights[rows[keep], columns[keep]] = 1.0
+    targets = np.zeros((n, span))
+    targets[rows[keep], columns[keep]] = logs[keep]
+    counts = weights.sum(axis=1).astype(np.int64)
+
+    # Équations normales pénalisées de toutes les destinations: A = X'WX + Λ, b = X'Wy
+    design = _design(first + np.arange(span))
+    outer = (design[:, :, None] * design[:, None, :]).reshape(span, -1)
+    gram = (weights @ outer).reshape(n, N_PARAMETERS, N_PARAMETERS)
+    penalty = np.diag([0.0, TREND_RIDGE] + [SEASONAL_RIDGE] * 12)
+    fitted = counts >= MIN_FORECAST_MONTHS
+    system = gram + penalty
+    system[~fitted] = np.eye(N_PARAMETERS)
+    inverse = np.linalg.inv(system)
+    coefficients = np.einsum('nij,nj->ni', inverse, (weights * targets) @ design)
+
+    # Écart-type résiduel (degrés de liberté effectifs du ridge)
+    residuals = weights * (targets - coefficients @ design.T)
+    effective = np.einsum('nij,nji->n', inverse, gram)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt((residuals ** 2).sum(axis=1) / np.maximum(counts - effective, 1.0))
+    sigma = np.maximum(sigma, MIN_RESIDUAL_STD)
+
+    # Facteurs d'incertitude des 12 mois suivant le dernier mois observé
+    last_observed = np.full(n, -1, dtype=np.int64)
+    np.maximum.at(last_observed, rows[keep], all_months[keep])
+    origin = last_observed + 1
+    horizon = _design(origin[:, None] + np.arange(FORECAST_HORIZON))
+    spread = np.sqrt(1.0 + np.einsum('nhi,nij,nhj->nh', horizon, inverse, horizon))
+
+    coefficients[~fitted] = np.nan
+    sigma[~fitted] = np.nan
+    return {
+        'coefficients': coefficients,
+        'sigma': sigma.astype(np.float32),
+        'observations': counts.astype(np.int16),
+        'origin': origin,
+        'spread': spread.astype(np.float32),
+    }
+
+
+class ForecastModels:
+    """
+    Paramètres des modèles de prévision de toutes les destinations (data/cache/forecast_models.npz).
+    """
+
+    def __init__(self, data_dir):
+        """
+        Initialise le stockage des modèles.
+
+        Args:
+            data_dir: Répertoire principal des données
+        """
+        self.data_dir = data_dir
+        self.path = Path(data_dir) / 'cache' / 'forecast_models.npz'
+
+    def load(self):
+        """
+        Charge les modèles (gardés en mémoire tant que le fichier n'a pas changé).
+
+        Returns:
+            Dictionnaire de tableaux (names, signatures, coefficients, sigma, observations,
+            origin, spread) ou None si aucun modèle n'a été ajusté
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        key = str(self.path)
+        with _loaded_models_lock:
+            loaded = _loaded_models.get(key)
+            if loaded is not None and loaded[0] == mtime:
+                return loaded[1]
+
+        with np.load(self.path) as data:
+            models = {name: data[name] for name in data.files}
+        models['index'] = {name: i for i, name in enumerate(models['names'].tolist())}
+
+        with _loaded_models_lock:
+            _loaded_models[key] = (mtime, models)
+        return models
+
+    def _save(self, models):
+        """Écrit les modèles de façon atomique"""
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, **{name: array for name, array in models.items() if name != 'index'})
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, destinations):
+        """
+        Réajuste les modèles des destinations dont l'historique des prix a changé.
+
+        Args:
+            destinations: Noms des destinations à vérifier
+
+        Returns:
+            Noms des destinations réajustées
+        """
+        history = PriceHistoryCache(self.data_dir)
+        current = self.load()
+        known = dict(zip(current['names'].tolist(), current['signatures'].tolist())) if current else {}
+
+        stale = []
+        for destination in destinations:
+            signature = history.signature(destination)
+            if signature is None or known.get(destination) != signature:
+                stale.append(destination)
+        if not stale:
+            return []
+
+        names, signatures, series = [], [], []
+        for destination in stale:
+            try:
+                price_matrix = history.load(destination) or history.refresh(destination)
+            except Exception as e:
+                logger.warning(f"Historique des prix illisible pour {destination}: {str(e)}")
+                continue
+            months, prices = monthly_series(price_matrix[2], price_matrix[3])
+            if len(months) < MIN_FORECAST_MONTHS:
+                logger.debug(f"Historique trop court pour une prévision de {destination}: "
+                             f"{len(months)} mois observés")
+                continue
+            names.append(destination)
+            signatures.append(history.signature(destination) or '')
+            series.append((months, prices))
+        if not names:
+            return []
+
+        fitted = fit_seasonal_models(series)
+        fitted['names'] = np.array(names, dtype=str)
+        fitted['signatures'] = np.array(signatures, dtype=str)
+
+        # Les modèles des autres destinations sont conservés tels quels. Le fichier est relu
+        # sous verrou: un autre processus a pu enregistrer ses modèles depuis la première lecture
+        with file_lock(self.path):
+            current = self.load()
+            if current:
+                keep = ~np.isin(current['names'], fitted['names'])
+                fitted = {
+                    name: np.concatenate([current[name][keep], fitted[name]])
+                    for name in fitted
+                }
+            self._save(fitted)
+
+        logger.info(f"Modèles de prévision réajustés: {len(names)} destinations "
+                    f"({len(fitted['names'])} au total)")
+        return names
+
+    def forecast(self, destination, horizon=FORECAST_HORIZON, month_names=None):
+        """
+        Prévision des prix mensuels d'une destination, sans réajustement.
+
+        Args:
+            destination: Nom de la destination
+            horizon: Nombre de mois prévus (au plus FORECAST_HORIZON)
+            month_names: Noms des mois enregistrés {mois (1-12): nom}, pour nommer les mois
+                prévus comme les données; à défaut, nom donné par la locale du processus
+
+        Returns:
+            Dictionnaire (tendance annuelle en %, mois observés, écart-type résiduel,
+            liste des mois prévus avec prix et bornes de l'intervalle à 95 %) ou None
+            si la destination n'a pas de modèle
+        """
+        models = self.load()
+        if models is None or destination not in models['index']:
+            return None
+
+        i = models['index'][destination]
+        coefficients = models['coefficients'][i]
+        if not np.isfinite(coefficients).all():
+            return None
+
+        horizon = min(max(horizon, 1), FORECAST_HORIZON)
+        month_names = month_names or {}
+        months = int(models['origin'][i]) + np.arange(horizon)
+        center = _design(months) @ coefficients
+        margin = CONFIDENCE_Z * float(models['sigma'][i]) * models['spread'][i][:horizon].astype(np.float64)
+
+        return {
+            'trend_pct_per_year': round(float(np.expm1(coefficients[1])) * 100, 2),
+            'observations': int(models['observations'][i]),
+            'residual_std': round(float(models['sigma'][i]), 4),
+            'months': [
+                {
+                    'month': str(np.datetime64(int(month), 'M')),
+                    'month_name': month_names.get(int(month) % 12 + 1)
+                    or np.datetime64(int(month), 'M').astype(object).strftime('%B'),
+                    'price': round(float(np.exp(value)), 2),
+                    'lower': round(float(np.exp(value - spread)), 2),
+                    'upper': round(float(np.exp(value + spread)), 2),
+                }
+                for month, value, spread in zip(months, center, margin)
+            ],
+        }
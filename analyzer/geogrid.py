@@ -0,0 +1,316 @@
+"""
+Agrégation géographique des prix des annonces sur une grille hiérarchique.
+
+Les annonces dont le scraper a relevé les coordonnées sont regroupées dans
+des cellules carrées en degrés. La taille des cellules est divisée par deux
+à chaque niveau, à partir d'une même origine: chaque cellule d'un niveau
+contient exactement quatre cellules du niveau suivant. Les statistiques de
+prix par cellule et par mois sont précalculées pour tous les niveaux et
+stockées dans un fichier .npz par exécution, avec un membre par niveau, afin
+qu'un changement de zoom ne lise que le niveau demandé.
+"""
+
+import os
+import re
+import glob
+import logging
+import numpy as np
+from pathlib import Path
+
+from .churn import ListingSnapshotStore
+from .manifest import format_destination
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Taille des cellules du niveau 0 (en degrés, environ 4,4 km en latitude)
+GRID_BASE_CELL_DEG = 0.04
+
+# Nombre de niveaux de la grille (cellules de 0,04° à 0,0025°, environ 280 m)
+GRID_LEVELS = 5
+
+# Structure d'une cellule; le mois 0 agrège l'année entière
+CELL_DTYPE = np.dtype([
+    ('month', 'u1'),
+    ('ix', 'i4'),
+    ('iy', 'i4'),
+    ('count', 'u4'),
+    ('avg_price', 'f4'),
+    ('median_price', 'f4'),
+    ('min_price', 'f4'),
+    ('max_price', 'f4'),
+])
+
+
+def cell_size(level, base_cell=GRID_BASE_CELL_DEG):
+    """
+    Taille des cellules d'un niveau.
+
+    Args:
+        level: Niveau de la grille (0 = cellules les plus grandes)
+        base_cell: Taille des cellules du niveau 0 (en degrés)
+
+    Returns:
+        Taille des cellules en degrés
+    """
+    return base_cell / (2 ** level)
+
+
+def bin_prices(latitudes, longitudes, prices, months, size):
+    """
+    Regroupe des prix par (mois, cellule) et calcule leurs statistiques.
+
+    Le calcul est entièrement vectorisé: un tri lexicographique sur
+    (mois, ligne, colonne, prix) place les prix de chaque cellule dans des
+    segments contigus et triés, dont on déduit effectifs, sommes, extrêmes et
+    médianes sans boucle Python.
+
+    Args:
+        latitudes: Tableau des latitudes
+        longitudes: Tableau des longitudes
+        prices: Tableau des prix
+        months: Tableau des mois (0 pour l'année entière)
+        size: Taille des cellules en degrés
+
+    Returns:
+        Tableau structuré CELL_DTYPE, une ligne par (mois, cellule) non vide
+    """
+    if len(prices) == 0:
+        return np.empty(0, dtype=CELL_DTYPE)
+
+    ix = np.floor(np.asarray(longitudes, dtype=np.float64) / size).astype(np.int32)
+    iy = np.floor(np.asarray(latitudes, dtype=np.float64) / size).astype(np.int32)
+    months = np.asarray(months, dtype=np.uint8)
+    prices = np.asarray(prices, dtype=np.float64)
+
+    order = np.lexsort((prices, ix, iy, months))
+    months, ix, iy, prices = months[order], ix[order], iy[order], prices[order]
+
+    # Début de chaque segment (mois, cellule)
+    boundary = np.ones(len(prices), dtype=bool)
+    boundary[1:] = (months[1:] != months[:-1]) | (iy[1:] != iy[:-1]) | (ix[1:] != ix[:-1])
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, len(prices)))
+    ends = starts + counts - 1
+
+    cells = np.empty(len(starts), dtype=CELL_DTYPE)
+    cells['month'] = months[starts]
+    cells['ix'] = ix[starts]
+    cells['iy'] = iy[starts]
+    cells['count'] = counts
+    cells['avg_price'] = np.add.reduceat(prices, starts) / counts
+    cells['median_price'] = (prices[starts + (counts - 1) // 2] + prices[starts + counts // 2]) / 2
+    cells['min_price'] = prices[starts]
+    cells['max_price'] = prices[ends]
+
+    return cells
+
+
+class PriceGridStore:
+    """
+    Stockage des grilles de prix précalculées, un fichier .npz par exécution du scraper.
+    """
+
+    def __init__(self, data_dir):
+        """
+        Initialise le stockage.
+
+        Args:
+            data_dir: Répertoire principal des données
+        """
+        self.grids_dir = Path(data_dir) / 'grids'
+
+    def _destination_dir(self, destination):
+        """Répertoire des grilles d'une destination"""
+        path = self.grids_dir / format_destination(destination)
+        # Répertoire nommé avant l'alignement sur format_destination (espaces remplacés): renommé
+        legacy = self.grids_dir / format_destination(destination).replace(' ', '_')
+        if legacy != path and legacy.is_dir() and not path.exists():
+            os.replace(legacy, path)
+        return path
+
+    def path_for(self, destination, year, run_id):
+        """Chemin de la grille d'une exécution"""
+        return self._destination_dir(destination) / f"{year}_{run_id}.npz"
+
+    def save(self, destination, year, run_id, levels, bounds, base_cell=GRID_BASE_CELL_DEG):
+        """
+        Enregistre les cellules de tous les niveaux d'une exécution.
+
+        Args:
+            destination: Nom de la destination
+            year: Année scrapée
+            run_id: Identifiant de l'exécution (timestamp 'YYYYmmdd_HHMMSS')
+            levels: Liste des tableaux de cellules, indexée par niveau
+            bounds: Emprise des annonces (latitude min, longitude min, latitude max, longitude max)
+            base_cell: Taille des cellules du niveau 0 (en degrés)
+
+        Returns:
+            Chemin du fichier écrit
+        """
+        file_path = self.path_for(destination, year, run_id)
+        os.makedirs(file_path.parent, exist_ok=True)
+
+        np.savez_compressed(
+            file_path,
+            meta=np.array([base_cell, len(levels)], dtype=np.float64),
+            bounds=np.asarray(bounds, dtype=np.float64),
+            **{f"level_{level}": cells for level, cells in enumerate(levels)}
+        )
+
+        logger.info(f"Grille de prix enregistrée: {file_path}")
+        return file_path
+
+    def latest(self, destination, year=None):
+        """
+        Chemin de la grille la plus récente d'une destination.
+
+        Args:
+            destination: Nom de la destination
+            year: Année scrapée (toutes si None)
+
+        Returns:
+            Chemin du fichier ou None
+        """
+        pattern = f"{year}_*.npz" if year else "*.npz"
+        runs = []
+        for path in glob.glob(str(self._destination_dir(destination) / pattern)):
+            match = re.match(r'(\d{4})_(\d{8}_\d{6})\.npz$', os.path.basename(path))
+            if match:
+                runs.append((match.group(2), path))
+
+        return max(runs)[1] if runs else None
+
+    @staticmethod
+    def read_metadata(file_path):
+        """
+        Lit les métadonnées d'une grille sans charger ses cellules.
+
+        Args:
+            file_path: Chemin du fichier .npz
+
+        Returns:
+            Dictionnaire {'base_cell', 'levels', 'bounds'}
+        """
+        with np.load(file_path) as data:
+            base_cell, levels = data['meta']
+            bounds = data['bounds']
+
+        return {
+            'base_cell': float(base_cell),
+            'levels': int(levels),
+            'bounds': [round(float(value), 6) for value in bounds],
+        }
+
+    @staticmethod
+    def load_level(file_path, level, month=None):
+        """
+        Charge les cellules d'un seul niveau (les autres membres du fichier ne sont pas lus).
+
+        Args:
+            file_path: Chemin du fichier .npz
+            level: Niveau de la grille
+            month: Mois à conserver (0 pour l'année entière, tous si None)
+
+        Returns:
+            Tableau structuré CELL_DTYPE
+        """
+        with np.load(file_path) as data:
+            key = f"level_{level}"
+            if key not in data.files:
+                return np.empty(0, dtype=CELL_DTYPE)
+            cells = data[key]
+
+        if month is not None:
+            cells = cells[cells['month'] == month]
+        return cells
+
+
+def build_price_grid(data_dir, destination, year=None, levels=GRID_LEVELS, base_cell=GRID_BASE_CELL_DEG):
+    """
+    Calcule la grille de prix de la dernière exécution d'une destination.
+
+    La grille n'est calculée qu'une fois par exécution; les appels suivants
+    retournent le fichier existant.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        year: Année scrapée (toutes si None)
+        levels: Nombre de niveaux de la grille
+        base_cell: Taille des cellules du niveau 0 (en degrés)
+
+    Returns:
+        Chemin de la grille ou None si aucune annonce n'a de coordonnées
+    """
+    runs = ListingSnapshotStore(data_dir).list_runs(destination, year)
+    if not runs:
+        return None
+
+    run_year, run_id, snapshot_path = runs[-1]
+    store = PriceGridStore(data_dir)
+    grid_path = store.path_for(destination, run_year, run_id)
+    if grid_path.exists():
+        return grid_path
+
+    snapshot = ListingSnapshotStore.load(snapshot_path, coordinates=True)
+    if not snapshot:
+        return None
+
+    months = np.concatenate([np.full(len(ids), month, dtype=np.uint8) for month, (ids, _, _) in snapshot.items()])
+    prices = np.concatenate([prices for _, prices, _ in snapshot.values()])
+    points = np.concatenate([points for _, _, points in snapshot.values()])
+
+    located = np.isfinite(points).all(axis=1) & (prices > 0)
+    if not located.any():
+        logger.info(f"Aucune coordonnée d'annonce pour {destination}, grille de prix non calculée")
+        return None
+
+    months, prices, points = months[located], prices[located], points[located]
+    latitudes, longitudes = points[:, 0], points[:, 1]
+
+    # Le mois 0 regroupe toutes les annonces de l'année
+    all_latitudes = np.concatenate([latitudes, latitudes])
+    all_longitudes = np.concatenate([longitudes, longitudes])
+    all_prices = np.concatenate([prices, prices])
+    all_months = np.concatenate([months, np.zeros(len(months), dtype=np.uint8)])
+
+    grid = [
+        bin_prices(all_latitudes, all_longitudes, all_prices, all_months, cell_size(level, base_cell))
+        for level in range(levels)
+    ]
+    bounds = (latitudes.min(), longitudes.min(), latitudes.max(), longitudes.max())
+
+    logger.info(f"Grille de prix calculée pour {destination}: {located.sum()} annonces localisées, "
+                f"{', '.join(str(len(cells)) for cells in grid)} cellules par niveau")
+    return store.save(destination, run_year, run_id, grid, bounds, base_cell)
+
+
+def grid_cells(file_path, level, month=0):
+    """
+    Prépare les cellules d'un niveau pour l'affichage sur une carte.
+
+    Args:
+        file_path: Chemin de la grille
+        level: Niveau de la grille
+        month: Mois (0 pour l'année entière)
+
+    Returns:
+        Liste de dictionnaires avec l'emprise [sud, ouest, nord, est] et les statistiques de chaque cellule
+    """
+    metadata = PriceGridStore.read_metadata(file_path)
+    size = cell_size(level, metadata['base_cell'])
+    cells = PriceGridStore.load_level(file_path, level, month)
+
+    return [
+        {
+            'bounds': [round(iy * size, 6), round(ix * size, 6),
+                       round((iy + 1) * size, 6), round((ix + 1) * size, 6)],
+            'count': int(count),
+            'avg_price': round(float(avg_price), 2),
+            'median_price': round(float(median_price), 2),
+            'min_price': round(float(min_price), 2),
+            'max_price': round(float(max_price), 2),
+        }
+        for _, ix, iy, count, avg_price, median_price, min_price, max_price in cells.tolist()
+    ]
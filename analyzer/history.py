@@ -0,0 +1,396 @@
+"""
+Historique compacté des données brutes et traitées.
+
+Chaque scraping et chaque traitement laissent un fichier horodaté par
+destination. La compaction regroupe ces fichiers dans un jeu de données
+partitionné par type, destination et année:
+
+    data/history/<type>/destination=<destination>/year=<année>/part-0.parquet
+
+Chaque partition est un seul fichier contenant toutes les exécutions
+conservées, identifiées par les colonnes run_id et scrape_date et triées par
+date. Les exécutions identiques (même contenu) sont dédoublonnées, et des
+règles de rétention élaguent les plus anciennes: toutes les exécutions
+récentes sont conservées, puis une par semaine, puis une par mois. Les
+fichiers compactés sont supprimés, à l'exception du plus récent de chaque
+destination, toujours utilisé par le traitement.
+"""
+
+import os
+import re
+import glob
+import hashlib
+import logging
+import tempfile
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+
+from .manifest import DataManifest, FILE_KINDS, format_destination
+from .storage import KEY_SCHEMA, SCHEMAS, apply_schema, read_table, to_bytes
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Colonnes identifiant l'exécution d'origine de chaque ligne de l'historique
+HISTORY_RUN_COLUMNS = ['run_id', 'scrape_date']
+
+# Rétention par défaut: toutes les exécutions des 30 derniers jours, puis une par
+# semaine pendant 52 semaines, puis une par mois
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_RETENTION_WEEKS = 52
+
+
+def file_run_id(path, created_at):
+    """Identifiant d'exécution: horodatage du nom de fichier, ou date d'écriture à défaut"""
+    match = re.search(r'(\d{8}_\d{6})$', Path(path).stem)
+    if match:
+        return match.group(1)
+    return datetime.fromtimestamp(created_at).strftime('%Y%m%d_%H%M%S')
+
+
+def data_year(df, year, scrape_date):
+    """Année des données d'une exécution: manifest, colonne year, date d'arrivée ou date du scraping"""
+    if year:
+        return int(year)
+    if 'year' in df.columns and df['year'].notna().any():
+        return int(df['year'].dropna().iloc[0])
+    if 'check_in' in df.columns and df['check_in'].notna().any():
+        return int(str(df['check_in'].dropna().iloc[0])[:4])
+    return scrape_date.year
+
+
+def retained_runs(scrape_dates, now=None, daily_days=DEFAULT_RETENTION_DAYS, weekly_weeks=DEFAULT_RETENTION_WEEKS):
+    """
+    Applique les règles de rétention à une liste d'exécutions.
+
+    Args:
+        scrape_dates: Dates des exécutions
+        now: Date de référence (maintenant si None)
+        daily_days: Âge (en jours) en deçà duquel toutes les exécutions sont conservées
+        weekly_weeks: Âge (en semaines) en deçà duquel la dernière exécution de chaque semaine est conservée;
+            au-delà, seule la dernière exécution de chaque mois est conservée
+
+    Returns:
+        Tableau booléen aligné sur scrape_dates (True pour les exécutions conservées)
+    """
+    dates = pd.Series(pd.to_datetime(scrape_dates)).reset_index(drop=True)
+    age = pd.Timestamp(now or datetime.now()) - dates
+
+    daily = age <= pd.Timedelta(days=daily_days)
+    weekly = ~daily & (age <= pd.Timedelta(weeks=weekly_weeks))
+    monthly = ~daily & ~weekly
+
+    last_of_week = dates.groupby(dates.dt.to_period('W')).transform('max') == dates
+    last_of_month = dates.groupby(dates.dt.to_period('M')).transform('max') == dates
+
+    return (daily | (weekly & last_of_week) | (monthly & last_of_month)).to_numpy()
+
+
+def fold_runs(frame, now=None, daily_days=DEFAULT_RETENTION_DAYS, weekly_weeks=DEFAULT_RETENTION_WEEKS):
+    """
+    Dédoublonne les exécutions d'une partition et applique la rétention.
+
+    Deux exécutions sont identiques si toutes leurs lignes (hors run_id et
+    scrape_date) le sont; seule la plus ancienne est conservée.
+
+    Args:
+        frame: DataFrame de la partition (colonnes run_id et scrape_date comprises)
+        now: Date de référence de la rétention (maintenant si None)
+        daily_days: Voir retained_runs
+        weekly_weeks: Voir retained_runs
+
+    Returns:
+        Tuple (DataFrame conservé trié par date d'exécution et mois, nombre de doublons, nombre d'exécutions expirées)
+    """
+    data_columns = [column for column in frame.columns if column not in HISTORY_RUN_COLUMNS]
+    row_hashes = pd.util.hash_pandas_object(frame[data_columns], index=False)
+
+    runs = pd.DataFrame({
+        'run_id': frame['run_id'].astype(str).to_numpy(),
+        'scrape_date': frame['scrape_date'].to_numpy(),
+        'row_hash': row_hashes.to_numpy(),
+    }).groupby('run_id', sort=False).agg(
+        scrape_date=('scrape_date', 'first'),
+        digest=('row_hash', lambda hashes: hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()),
+    ).sort_values('scrape_date', kind='stable')
+
+    unique_runs = runs.drop_duplicates('digest', keep='first')
+    duplicates = len(runs) - len(unique_runs)
+
+    keep = retained_runs(unique_runs['scrape_date'], now, daily_days, weekly_weeks)
+    expired = int((~keep).sum())
+
+    kept = frame[frame['run_id'].astype(str).isin(unique_runs.index[keep])]
+    sort_columns = ['scrape_date', 'month'] if 'month' in kept.columns else ['scrape_date']
+    kept = kept.sort_values(sort_columns, kind='stable').reset_index(drop=True)
+
+    return kept, duplicates, expired
+
+
+class HistoryStore:
+    """
+    Jeu de données partitionné (type / destination / année) de l'historique compacté.
+    """
+
+    def __init__(self, data_dir):
+        """
+        Initialise le stockage.
+
+        Args:
+            data_dir: Répertoire principal des données
+        """
+        self.history_dir = Path(data_dir) / 'history'
+
+    def partition_dir(self, kind, destination, year):
+        """Répertoire d'une partition"""
+        return self.history_dir / kind / f"destination={format_destination(destination)}" / f"year={year}"
+
+    def partition_files(self, kind, destination, year=None):
+        """
+        Fichiers de partitions d'une destination.
+
+        Args:
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+            year: Année (toutes si None)
+
+        Returns:
+            Liste triée des chemins
+        """
+        year_pattern = f"year={year}" if year else "year=*"
+        destination_dir = self.history_dir / kind / f"destination={format_destination(destination)}"
+        return sorted(glob.glob(str(destination_dir / year_pattern / "part-0.*")))
+
+    def partition_years(self, kind, destination):
+        """
+        Années des partitions existantes d'une destination.
+
+        Args:
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+
+        Returns:
+            Liste triée des années
+        """
+        years = []
+        for path in self.partition_files(kind, destination):
+            match = re.search(r'year=(\d{4})', path)
+            if match:
+                years.append(int(match.group(1)))
+        return sorted(years)
+
+    def read(self, kind, destination, year=None, columns=None):
+        """
+        Lit l'historique compacté d'une destination.
+
+        Args:
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+            year: Année (toutes si None)
+            columns: Colonnes à lire (toutes si None; run_id et scrape_date sont toujours lues)
+
+        Returns:
+            DataFrame (vide si aucun historique)
+        """
+        if columns is not None:
+            columns = HISTORY_RUN_COLUMNS + [column for column in columns if column not in HISTORY_RUN_COLUMNS]
+
+        frames = []
+        for path in self.partition_files(kind, destination, year):
+            df = read_table(path, {**SCHEMAS[kind], **KEY_SCHEMA}, columns)
+            # L'année de la partition est portée par son répertoire
+            if 'year' not in df.columns:
+                df['year'] = int(re.search(r'year=(\d{4})', path).group(1))
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame(columns=columns or HISTORY_RUN_COLUMNS)
+
+        history = apply_schema(pd.concat(frames, ignore_index=True), {**SCHEMAS[kind], **KEY_SCHEMA})
+        history['scrape_date'] = pd.to_datetime(history['scrape_date'])
+        return history
+
+    def write(self, kind, destination, year, frame):
+        """
+        Réécrit une partition de façon atomique.
+
+        Args:
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+            year: Année
+            frame: DataFrame de la partition
+
+        Returns:
+            Chemin du fichier écrit
+        """
+        content, extension = to_bytes(frame, {**SCHEMAS[kind], **KEY_SCHEMA})
+        partition_dir = self.partition_dir(kind, destination, year)
+        os.makedirs(partition_dir, exist_ok=True)
+        target = partition_dir / f"part-0.{extension}"
+
+        fd, tmp_path = tempfile.mkstemp(dir=partition_dir, prefix='.tmp-', suffix=target.suffix)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Une partition réécrite dans un autre format remplace l'ancienne
+        for path in glob.glob(str(partition_dir / "part-0.*")):
+            if Path(path) != target:
+                os.remove(path)
+
+        return target
+
+
+def compact_destination(data_dir, destination, kind='raw', daily_days=DEFAULT_RETENTION_DAYS,
+                        weekly_weeks=DEFAULT_RETENTION_WEEKS, delete_sources=True, dry_run=False, now=None):
+    """
+    Compacte les fichiers horodatés d'une destination dans l'historique partitionné.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        kind: 'raw' ou 'processed'
+        daily_days: Voir retained_runs
+        weekly_weeks: Voir retained_runs
+        delete_sources: Si True, supprime les fichiers compactés (sauf le plus récent)
+        dry_run: Si True, calcule le résumé sans rien écrire ni supprimer
+        now: Date de référence de la rétention (maintenant si None)
+
+    Returns:
+        Dictionnaire résumant la compaction (fichiers lus, exécutions, doublons, expirées, fichiers supprimés)
+    """
+    manifest = DataManifest(data_dir)
+    store = HistoryStore(data_dir)
+    schema = SCHEMAS[kind]
+
+    manifest.sync_destination(kind, destination)
+    entries = manifest.files(kind, destination)
+    latest_file = manifest.latest(kind, destination)
+
+    summary = {'destination': destination, 'kind': kind, 'files': len(entries), 'runs': 0,
+               'duplicates': 0, 'expired': 0, 'partitions': 0, 'deleted': 0}
+
+    # Lecture des fichiers horodatés, regroupés par année
+    frames_by_year = {}
+    compacted = []
+    for entry in entries:
+        try:
+            df = read_table(entry['path'], schema)
+        except Exception as e:
+            logger.warning(f"Fichier ignoré par la compaction ({entry['path']}): {str(e)}")
+            continue
+
+        run_id = file_run_id(entry['path'], entry['created_at'])
+        scrape_date = pd.to_datetime(run_id, format='%Y%m%d_%H%M%S')
+        year = data_year(df, entry['year'], scrape_date)
+        if 'year' not in df.columns:
+            df['year'] = year
+        frames_by_year.setdefault(year, []).append(df.assign(run_id=run_id, scrape_date=scrape_date))
+        compacted.append(entry['path'])
+
+    # Les partitions existantes sont aussi repliées: leurs exécutions vieillissent et changent de règle de rétention
+    for year in sorted(set(frames_by_year) | set(store.partition_years(kind, destination))):
+        existing = store.read(kind, destination, year)
+        known_runs = set(existing['run_id'].astype(str)) if not existing.empty else set()
+
+        # Les exécutions déjà compactées (fichier le plus récent conservé) ne sont pas ajoutées deux fois
+        new_frames = [frame for frame in frames_by_year.get(year, []) if frame['run_id'].iloc[0] not in known_runs]
+        frames = ([existing] if not existing.empty else []) + new_frames
+        if not frames:
+            continue
+
+        frame = apply_schema(pd.concat(frames, ignore_index=True), schema)
+        kept, duplicates, expired = fold_runs(frame, now, daily_days, weekly_weeks)
+
+        # Partition inchangée (par exemple fichier le plus récent déjà expiré): ne pas la réécrire
+        if set(kept['run_id'].astype(str)) == known_runs:
+            continue
+
+        summary['runs'] += len(known_runs) + len(new_frames)
+        summary['duplicates'] += duplicates
+        summary['expired'] += expired
+        summary['partitions'] += 1
+
+        if not dry_run:
+            path = store.write(kind, destination, year, kept)
+            logger.info(f"Historique {kind} de {destination} ({year}): {kept['run_id'].nunique()} exécutions "
+                        f"dans {path} ({duplicates} doublons, {expired} expirées)")
+
+    if delete_sources:
+        for path in compacted:
+            if latest_file is not None and Path(path) == Path(latest_file):
+                continue
+            summary['deleted'] += 1
+            if not dry_run:
+                os.remove(path)
+                manifest.forget(path)
+
+    return summary
+
+
+def compact_history(data_dir, destinations=None, kinds=FILE_KINDS, **options):
+    """
+    Compacte les fichiers horodatés de plusieurs destinations.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destinations: Noms des destinations (toutes celles du manifest si None)
+        kinds: Types de fichiers à compacter
+        **options: Options de compact_destination (rétention, suppression, simulation)
+
+    Returns:
+        Liste des résumés de compaction, un par (type, destination)
+    """
+    manifest = DataManifest(data_dir)
+    summaries = []
+    for kind in kinds:
+        for destination in destinations or manifest.destinations(kind):
+            summaries.append(compact_destination(data_dir, destination, kind, **options))
+    return summaries
+
+
+def load_history(data_dir, destination, kind='raw', year=None, columns=None):
+    """
+    Charge l'historique complet d'une destination: partitions compactées et fichiers pas encore compactés.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        kind: 'raw' ou 'processed'
+        year: Année (toutes si None)
+        columns: Colonnes à lire (toutes si None; run_id et scrape_date sont toujours présentes)
+
+    Returns:
+        DataFrame trié par date d'exécution (colonnes run_id, scrape_date et year comprises)
+    """
+    history = HistoryStore(data_dir).read(kind, destination, year, columns)
+    known_runs = set(history['run_id'].astype(str))
+
+    frames = [history] if not history.empty else []
+    for entry in DataManifest(data_dir).files(kind, destination):
+        run_id = file_run_id(entry['path'], entry['created_at'])
+        if run_id in known_runs:
+            continue
+
+        df = read_table(entry['path'], SCHEMAS[kind], columns)
+        scrape_date = pd.to_datetime(run_id, format='%Y%m%d_%H%M%S')
+        run_year = data_year(df, entry['year'], scrape_date)
+        if year is not None and run_year != year:
+            continue
+        if 'year' not in df.columns:
+            df['year'] = run_year
+        frames.append(df.assign(run_id=run_id, scrape_date=scrape_date))
+
+    if not frames:
+        return history
+
+    # Les catégories diffèrent d'un fichier à l'autre: la concaténation repasse ces colonnes en object
+    history = apply_schema(pd.concat(frames, ignore_index=True), {**SCHEMAS[kind], **KEY_SCHEMA})
+    sort_columns = ['scrape_date', 'month'] if 'month' in history.columns else ['scrape_date']
+    return history.sort_values(sort_columns, kind='stable').reset_index(drop=True)
@@ -0,0 +1,343 @@
+"""
+Agrégats courants des prix mensuels d'une destination, mis à jour mois par mois.
+
+Quand un seul mois est rafraîchi, process_data et calculate_statistics
+recalculent toutes les valeurs dérivées de la moyenne annuelle ou du
+classement. MonthlyAggregates conserve à la place, pour une destination:
+
+- le nombre de mois et la somme des prix (décalés d'une constante pour
+  limiter les erreurs d'arrondi), d'où la moyenne annuelle;
+- la liste triée des prix (statistiques d'ordre: extrêmes, médiane, rangs);
+- la liste triée des prix de chaque saison.
+
+La mise à jour d'un mois ajuste ces agrégats en temps constant (la liste
+triée est modifiée par recherche dichotomique). Si seules les colonnes
+autres que avg_price changent, seul ce mois est recalculé; si son prix
+change, la moyenne change aussi et les prix relatifs de tous les mois sont
+recalculés, chacun en O(log n) grâce aux agrégats. update_month renvoie les
+mois dont une valeur dérivée a effectivement changé. Les résultats sont
+ceux de process_data et de calculate_statistics aux erreurs d'arrondi près
+(voir le benchmark 'incremental'); les mois ex aequo du classement sont
+rangés dans l'ordre des mois.
+
+AirbnbDataProcessor.get_or_process_data garde en mémoire les agrégats des
+dernières données traitées de chaque destination: quand un nouveau fichier
+brut ne diffère du précédent que par quelques mois (les autres ayant été
+servis par le cache du scraper), seuls ces mois sont mis à jour.
+"""
+
+import bisect
+import logging
+import numpy as np
+import pandas as pd
+
+from .data_processor import SEASONS
+from .statistics import month_recommendations, _mean_std
+from .storage import PROCESSED_SCHEMA, apply_schema
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Colonnes dérivées calculées par process_data
+DERIVED_COLUMNS = [
+    'price_range', 'relative_price', 'season', 'is_cheapest', 'price_rank', 'pct_diff_from_max', 'pct_diff_from_min',
+]
+
+# Nombre de mises à jour après lequel la somme est recalculée (erreurs d'arrondi cumulées)
+REBUILD_INTERVAL = 1000
+
+
+class _RunningSum:
+    """Effectif et somme de valeurs décalées d'une constante"""
+
+    def __init__(self, shift=0.0):
+        self.shift = shift
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value - self.shift
+
+    def remove(self, value):
+        self.count -= 1
+        self.total -= value - self.shift
+
+    def mean(self):
+        return self.shift + self.total / self.count if self.count else np.nan
+
+
+class MonthlyAggregates:
+    """
+    Données mensuelles traitées d'une destination, tenues à jour de façon incrémentale.
+    """
+
+    def __init__(self, df):
+        """
+        Construit les agrégats à partir des données brutes (ou traitées) d'une destination.
+
+        Args:
+            df: DataFrame avec au moins les colonnes month, month_name, avg_price,
+                median_price, min_price et max_price (un mois par ligne)
+        """
+        self.rows = {}
+        self.derived = {}
+        for row in df.to_dict('records'):
+            self.rows[int(row['month'])] = {
+                column: value for column, value in row.items() if column not in DERIVED_COLUMNS
+            }
+        self.rebuild()
+
+    def rebuild(self):
+        """Recalcule tous les agrégats et toutes les valeurs dérivées"""
+        prices = [(row['avg_price'], month) for month, row in self.rows.items() if not _missing(row['avg_price'])]
+        shift = float(np.mean([price for price, _ in prices])) if prices else 0.0
+
+        self.running = _RunningSum(shift)
+        self.ordered = []
+        self.season_ordered = {}
+        for price, month in prices:
+            self._add(month, price)
+
+        self.updates = 0
+        self.derived = {}
+        self._refresh_derived(self.rows)
+
+    def _add(self, month, price):
+        """Ajoute un prix aux agrégats"""
+        season = SEASONS.get(month)
+        self.running.add(price)
+        bisect.insort(self.ordered, (price, month))
+        bisect.insort(self.season_ordered.setdefault(season, []), (price, month))
+
+    def _remove(self, month, price):
+        """Retire un prix des agrégats"""
+        season = SEASONS.get(month)
+        self.running.remove(price)
+        self.ordered.pop(bisect.bisect_left(self.ordered, (price, month)))
+        self.season_ordered[season].pop(bisect.bisect_left(self.season_ordered[season], (price, month)))
+        if not self.season_ordered[season]:
+            del self.season_ordered[season]
+
+    def _rank(self, price):
+        """Rang moyen d'un prix (comme Series.rank())"""
+        below = bisect.bisect_left(self.ordered, (price, -np.inf))
+        return (below + 1 + bisect.bisect_right(self.ordered, (price, np.inf))) / 2
+
+    def _refresh_derived(self, months):
+        """
+        Recalcule les valeurs dérivées de quelques mois.
+
+        Returns:
+            Mois dont au moins une valeur dérivée a changé
+        """
+        mean = self.running.mean()
+        cheapest = self.ordered[0] if self.ordered else (np.nan, None)
+        most_expensive = self.ordered[-1][0] if self.ordered else np.nan
+
+        changed = []
+        for month in months:
+            row = self.rows[month]
+            price = row['avg_price']
+            valid = not _missing(price)
+            derived = {
+                'price_range': row['max_price'] - row['min_price'],
+                'relative_price': price / mean if valid else np.nan,
+                'season': SEASONS.get(month),
+                'is_cheapest': month == cheapest[1],
+                'price_rank': self._rank(price) if valid else np.nan,
+                'pct_diff_from_max': (price - most_expensive) / most_expensive * 100,
+                'pct_diff_from_min': (price - cheapest[0]) / cheapest[0] * 100,
+            }
+            if _changed(self.derived.get(month), derived):
+                self.derived[month] = derived
+                changed.append(month)
+
+        return changed
+
+    def changed_rows(self, df):
+        """
+        Mois de nouvelles données brutes qui diffèrent des données courantes.
+
+        Args:
+            df: DataFrame des données brutes (un mois par ligne)
+
+        Returns:
+            Liste des lignes (dictionnaires) nouvelles ou modifiées, ou None si des
+            mois ont disparu ou sont en double (mise à jour incrémentale impossible)
+        """
+        rows = df.to_dict('records')
+        months = [int(row['month']) for row in rows]
+        if len(set(months)) != len(months) or not set(self.rows) <= set(months):
+            return None
+
+        changed = []
+        for month, row in zip(months, rows):
+            row = {column: value for column, value in row.items() if column not in DERIVED_COLUMNS}
+            current = self.rows.get(month)
+            if current is None or current.keys() != row.keys() \
+                    or any(not _same(current[column], value) for column, value in row.items()):
+                changed.append(row)
+        return changed
+
+    def update_month(self, row):
+        """
+        Insère ou remplace les données d'un mois.
+
+        Args:
+            row: Dictionnaire (ou Series) des colonnes brutes du mois, dont month et avg_price
+
+        Returns:
+            Liste triée des mois dont une valeur dérivée a changé
+        """
+        month = int(row['month'])
+        new_row = {column: value for column, value in dict(row).items() if column not in DERIVED_COLUMNS}
+        old_row = self.rows.get(month)
+
+        old_price = old_row['avg_price'] if old_row is not None else np.nan
+        new_price = new_row['avg_price']
+        old_extremes = (self.ordered[0], self.ordered[-1][0]) if self.ordered else None
+
+        if not _missing(old_price):
+            self._remove(month, old_price)
+        self.rows[month] = {**(old_row or {}), **new_row}
+        if not _missing(new_price):
+            self._add(month, new_price)
+
+        self.updates += 1
+        if self.updates >= REBUILD_INTERVAL:
+            previous = self.derived
+            self.rebuild()
+            return sorted(month for month in self.rows if _changed(previous.get(month), self.derived[month]))
+
+        # Mois dont une valeur dérivée peut changer
+        if not _same(old_price, new_price):
+            # La moyenne change: tous les prix relatifs sont à recalculer
+            candidates = set(self.rows)
+        else:
+            candidates = {month}
+            extremes = (self.ordered[0], self.ordered[-1][0]) if self.ordered else None
+            if extremes != old_extremes:
+                candidates = set(self.rows)
+
+        return sorted(self._refresh_derived(sorted(candidates)))
+
+    def frame(self):
+        """
+        Données traitées (mêmes colonnes et mêmes types que process_data, triées par mois).
+
+        Returns:
+            DataFrame
+        """
+        months = sorted(self.rows)
+        return apply_schema(
+            pd.DataFrame([{**self.rows[month], **self.derived[month]} for month in months]), PROCESSED_SCHEMA
+        )
+
+    def statistics(self):
+        """
+        Statistiques de la destination (même forme que calculate_statistics).
+
+        Les extrêmes, la médiane, le classement et les mois par saison sont lus
+        dans les listes triées. Les moyennes et écarts-types publiés (arrondis
+        au centime) sont en revanche réduits dans l'ordre des mois, comme lors
+        d'un recalcul complet: une moyenne de prix au centime tombe souvent
+        exactement sur une demi-unité d'arrondi, et une différence d'un ulp
+        avec les sommes courantes changerait le résultat arrondi. Ce calcul
+        porte sur au plus 12 valeurs, que la liste du classement parcourt de
+        toute façon.
+
+        Returns:
+            Dictionnaire des statistiques
+        """
+        if not self.ordered:
+            return {}
+
+        count = len(self.ordered)
+        months = sorted(month for _, month in self.ordered)
+        prices = np.array([self.rows[month]['avg_price'] for month in months], dtype=np.float64)
+        mean, std = _mean_std(prices)
+        low_price, low_month = self.ordered[0]
+        high_price = self.ordered[-1][0]
+        # Première occurrence (dans l'ordre des mois) du prix maximal
+        high_month = self.ordered[bisect.bisect_left(self.ordered, (high_price, -np.inf))][1]
+        median = (self.ordered[(count - 1) // 2][0] + self.ordered[count // 2][0]) / 2
+        low, high = self.rows[low_month], self.rows[high_month]
+        potential_savings = high_price - low_price
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            (cheapest_price, cheapest_median, expensive_price, expensive_median, savings, savings_pct,
+             annual_mean, annual_median, annual_std, annual_min, annual_max, cv) = np.round([
+                low_price, low['median_price'], high_price, high['median_price'],
+                potential_savings, potential_savings / high_price * 100,
+                mean, median, std, low_price, high_price, std / mean * 100,
+            ], 2)
+
+        season_analysis = {}
+        for season in sorted(self.season_ordered):
+            ordered = self.season_ordered[season]
+            season_months = sorted(month for _, month in ordered)
+            season_prices = np.array([self.rows[month]['avg_price'] for month in season_months], dtype=np.float64)
+            season_avg, season_min, season_max = np.round(
+                [season_prices.sum() / len(season_prices), ordered[0][0], ordered[-1][0]], 2
+            )
+            season_analysis[season] = {
+                'avg_price': season_avg,
+                'min_price': season_min,
+                'max_price': season_max,
+                'months': ', '.join(self.rows[month]['month_name'] for month in season_months),
+            }
+
+        stats = {
+            'cheapest_month': {
+                'name': low['month_name'],
+                'avg_price': cheapest_price,
+                'median_price': cheapest_median,
+                'season': SEASONS.get(low_month)
+            },
+            'most_expensive_month': {
+                'name': high['month_name'],
+                'avg_price': expensive_price,
+                'median_price': expensive_median,
+                'season': SEASONS.get(high_month)
+            },
+            'potential_savings': savings,
+            'savings_percentage': savings_pct if high_price > 0 else 0,
+            'season_analysis': season_analysis,
+            'annual_variation': {
+                'mean': annual_mean,
+                'median': annual_median,
+                'std': annual_std,
+                'min': annual_min,
+                'max': annual_max,
+                'coefficient_of_variation': cv if mean > 0 else 0
+            },
+            'price_ranking': [
+                {'month': self.rows[month]['month_name'], 'price': round(price, 2), 'season': SEASONS.get(month)}
+                for price, month in self.ordered
+            ],
+        }
+        # Les recommandations (une entrée par mois) sont calculées dans l'ordre des mois
+        stats['recommendations'] = month_recommendations(
+            np.zeros(count, dtype=np.intp), 1,
+            [self.rows[month]['month_name'] for month in months],
+            prices,
+            [SEASONS.get(month) for month in months],
+        )[0]
+
+        return stats
+
+
+def _missing(value):
+    """Indique si une valeur est absente (None ou NaN)"""
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _same(left, right):
+    """Égalité de deux valeurs, deux NaN étant considérés égaux"""
+    return left == right or (_missing(left) and _missing(right))
+
+
+def _changed(previous, derived):
+    """Indique si des valeurs dérivées diffèrent des précédentes"""
+    return previous is None or any(not _same(previous[key], value) for key, value in derived.items())
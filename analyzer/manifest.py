@@ -0,0 +1,368 @@
+"""
+Index (manifest) des fichiers de données bruts et traités.
+
+Le manifest est une petite base SQLite (data/manifest.sqlite3) qui associe
+chaque destination et année à ses fichiers, avec leur taille, leur empreinte
+SHA-256 et leur date d'écriture. Le fichier le plus récent de chaque
+destination est tenu à jour dans une table dédiée: sa recherche est une
+simple lecture par clé primaire, quel que soit le nombre de fichiers.
+
+Les nouveaux fichiers sont rangés dans un sous-répertoire par destination
+(data/raw/Paris_France/...). Les fichiers de l'ancienne arborescence à plat
+sont indexés à la demande, une seule fois, lors de la première consultation
+d'une destination (même si de nouveaux fichiers ont été écrits entre-temps).
+"""
+
+import os
+import re
+import glob
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Types de fichiers indexés (nom du sous-répertoire de data/)
+FILE_KINDS = ('raw', 'processed')
+
+# Extensions des fichiers de données indexés
+DATA_EXTENSIONS = ('csv', 'parquet')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    year INTEGER,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_destination ON files (kind, destination, created_at);
+CREATE TABLE IF NOT EXISTS latest (
+    kind TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (kind, destination)
+);
+CREATE TABLE IF NOT EXISTS synced (
+    kind TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    PRIMARY KEY (kind, destination)
+);
+"""
+
+
+def format_destination(destination):
+    """
+    Formate une destination pour les noms de fichiers et de répertoires.
+
+    Args:
+        destination: Nom de la destination (ex: "Paris,France")
+
+    Returns:
+        Nom formaté (ex: "Paris_France")
+    """
+    return destination.replace(',', '_')
+
+
+def _file_year(path):
+    """Année encodée dans un nom de fichier brut ('<destination>_<année>_<timestamp>.<extension>')"""
+    match = re.search(r'_(\d{4})_\d{8}_\d{6}\.(csv|parquet)$', os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+class DataManifest:
+    """
+    Index SQLite des fichiers de données, mis à jour à chaque écriture.
+    """
+
+    def __init__(self, data_dir):
+        """
+        Initialise le manifest (la base est créée si nécessaire).
+
+        Args:
+            data_dir: Répertoire principal des données
+        """
+        self.data_dir = Path(data_dir)
+        self.db_path = self.data_dir / 'manifest.sqlite3'
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        """Ouvre une connexion (une par opération: le manifest est partagé entre threads et processus)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _relative(self, path):
+        """Chemin relatif au répertoire des données, au format POSIX"""
+        return Path(path).resolve().relative_to(self.data_dir.resolve()).as_posix()
+
+    def shard_dir(self, kind, destination):
+        """
+        Sous-répertoire d'une destination pour un type de fichier.
+
+        Args:
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+
+        Returns:
+            Chemin du répertoire (créé si nécessaire)
+        """
+        path = self.data_dir / kind / format_destination(destination)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def write_bytes(self, content, kind, destination, filename, year=None):
+        """
+        Écrit un contenu binaire de façon atomique et l'enregistre dans le manifest.
+
+        Le contenu est écrit dans un fichier temporaire puis renommé: un lecteur
+        ne voit jamais de fichier partiel, et le manifest n'est mis à jour
+        qu'une fois le fichier en place.
+
+        Args:
+            content: Contenu du fichier
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+            filename: Nom du fichier dans le sous-répertoire de la destination
+            year: Année des données (déduite du nom de fichier si None)
+
+        Returns:
+            Chemin du fichier écrit
+        """
+        target = self.shard_dir(kind, destination) / filename
+
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix='.tmp-', suffix=target.suffix)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._upsert(
+            self._relative(target), kind, destination,
+            year if year is not None else _file_year(target),
+            len(content), hashlib.sha256(content).hexdigest(), time.time()
+        )
+        return target
+
+    def record(self, path, kind, destination, year=None, created_at=None):
+        """
+        Enregistre un fichier existant dans le manifest.
+
+        Args:
+            path: Chemin du fichier
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+            year: Année des données (déduite du nom de fichier si None)
+            created_at: Date d'écriture (timestamp; date de modification du fichier si None)
+
+        Returns:
+            Chemin du fichier
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+
+        stat = os.stat(path)
+        self._upsert(
+            self._relative(path), kind, destination,
+            year if year is not None else _file_year(path),
+            stat.st_size, digest.hexdigest(),
+            created_at if created_at is not None else stat.st_mtime
+        )
+        return Path(path)
+
+    def _upsert(self, rel_path, kind, destination, year, size, sha256, created_at):
+        """Ajoute ou met à jour un fichier et, s'il est le plus récent, le pointeur de sa destination"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO files (path, kind, destination, year, size, sha256, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET size=excluded.size, sha256=excluded.sha256, "
+                "created_at=excluded.created_at, year=excluded.year",
+                (rel_path, kind, destination, year, size, sha256, created_at)
+            )
+            conn.execute(
+                "INSERT INTO latest (kind, destination, path, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(kind, destination) DO UPDATE SET path=excluded.path, created_at=excluded.created_at "
+                "WHERE excluded.created_at >= latest.created_at",
+                (kind, destination, rel_path, created_at)
+            )
+
+    def entry(self, path):
+        """
+        Informations du manifest sur un fichier.
+
+        Args:
+            path: Chemin du fichier
+
+        Returns:
+            Dictionnaire (path, kind, destination, year, size, sha256, created_at) ou None si non indexé
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM files WHERE path = ?", (self._relative(path),)).fetchone()
+
+        return {**dict(row), 'path': self.data_dir / row['path']} if row else None
+
+    def forget(self, path):
+        """
+        Retire un fichier du manifest (fichier supprimé ou déplacé).
+
+        Args:
+            path: Chemin du fichier
+        """
+        rel_path = self._relative(path)
+        with self._connect() as conn:
+            row = conn.execute("SELECT kind, destination FROM files WHERE path = ?", (rel_path,)).fetchone()
+            conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+            if row is None:
+                return
+
+            # Recalculer le pointeur vers le fichier le plus récent restant
+            conn.execute("DELETE FROM latest WHERE kind = ? AND destination = ? AND path = ?",
+                         (row['kind'], row['destination'], rel_path))
+            conn.execute(
+                "INSERT OR IGNORE INTO latest (kind, destination, path, created_at) "
+                "SELECT kind, destination, path, created_at FROM files "
+                "WHERE kind = ? AND destination = ? ORDER BY created_at DESC LIMIT 1",
+                (row['kind'], row['destination'])
+            )
+
+    def latest(self, kind, destination):
+        """
+        Fichier le plus récent d'une destination.
+
+        Args:
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+
+        Returns:
+            Chemin du fichier ou None si la destination n'a aucun fichier
+        """
+        self._ensure_synced(kind, destination)
+
+        while True:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT path FROM latest WHERE kind = ? AND destination = ?", (kind, destination)
+                ).fetchone()
+
+            if row is None:
+                return None
+
+            path = self.data_dir / row['path']
+            if path.exists():
+                return path
+
+            # Le pointeur passe au fichier suivant le plus récent
+            logger.warning(f"Fichier indexé introuvable, retiré du manifest: {path}")
+            self.forget(path)
+
+    def _ensure_synced(self, kind, destination):
+        """Indexe une seule fois les fichiers de l'ancienne arborescence d'une destination"""
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM synced WHERE kind = ? AND destination = ?",
+                            (kind, destination)).fetchone():
+                return
+
+        self.sync_destination(kind, destination)
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO synced (kind, destination) VALUES (?, ?)", (kind, destination))
+
+    def files(self, kind=None, destination=None, year=None):
+        """
+        Liste les fichiers indexés, du plus ancien au plus récent.
+
+        Args:
+            kind: Type de fichier (tous si None)
+            destination: Destination (toutes si None)
+            year: Année (toutes si None)
+
+        Returns:
+            Liste de dictionnaires (path, kind, destination, year, size, sha256, created_at)
+        """
+        if kind is not None and destination is not None:
+            self._ensure_synced(kind, destination)
+
+        clauses, params = [], []
+        for column, value in (('kind', kind), ('destination', destination), ('year', year)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        query = "SELECT * FROM files"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        return [{**dict(row), 'path': self.data_dir / row['path']} for row in rows]
+
+    def destinations(self, kind=None):
+        """
+        Liste les destinations ayant des fichiers indexés.
+
+        Args:
+            kind: Type de fichier (tous si None)
+
+        Returns:
+            Liste triée des noms de destinations
+        """
+        query = "SELECT DISTINCT destination FROM files"
+        params = ()
+        if kind is not None:
+            query += " WHERE kind = ?"
+            params = (kind,)
+
+        with self._connect() as conn:
+            return sorted(row['destination'] for row in conn.execute(query, params))
+
+    def sync_destination(self, kind, destination):
+        """
+        Indexe les fichiers d'une destination absents du manifest (ancienne arborescence à plat comprise).
+
+        Args:
+            kind: 'raw' ou 'processed'
+            destination: Nom de la destination
+
+        Returns:
+            Nombre de fichiers ajoutés
+        """
+        formatted_dest = format_destination(destination)
+        kind_dir = self.data_dir / kind
+        candidates = []
+        for extension in DATA_EXTENSIONS:
+            candidates += glob.glob(str(kind_dir / f"{formatted_dest}_*.{extension}"))
+            candidates += glob.glob(str(kind_dir / formatted_dest / f"*.{extension}"))
+
+        with self._connect() as conn:
+            known = {row['path'] for row in conn.execute(
+                "SELECT path FROM files WHERE kind = ? AND destination = ?", (kind, destination)
+            )}
+
+        added = 0
+        for path in candidates:
+            if self._relative(path) not in known:
+                self.record(path, kind, destination)
+                added += 1
+
+        if added:
+            logger.info(f"Manifest: {added} fichiers {kind} indexés pour {destination}")
+        return added
@@ -0,0 +1,384 @@
+"""
+Calendrier des prix jour par jour et recherche des séjours de N nuits.
+
+Avec l'échantillonnage 'daily', le scraper relève un prix pour chaque date
+d'arrivée (data/raw/samples). Ces relevés sont rangés dans une matrice
+compacte (durée de séjour × date d'arrivée, float32, NaN si non relevé),
+mise en cache par destination (data/cache/price_calendar) et complétée
+uniquement avec les nouveaux fichiers d'échantillons.
+
+Le scraper relève des séjours de la durée demandée (7 nuits par défaut): le
+prix par nuit d'une date d'arrivée est donc le prix moyen par nuit du séjour
+le plus court relevé à partir de cette date (average_night_rates), et non le
+tarif d'une nuit isolée. C'est une approximation: frais fixes répartis sur
+le séjour, remises à la semaine, prix des nuits suivantes inclus. La durée
+correspondante (rate_nights) est renvoyée avec la carte de chaleur.
+
+Le prix d'un séjour de N nuits est lu directement dans la matrice quand
+cette durée a été scrapée; sinon il est estimé comme la somme de ces prix
+moyens par nuit sur les N nuits du séjour, calculée pour toutes les dates
+d'arrivée en O(n) par différences de sommes cumulées. Les séjours les moins
+chers et les plus chers d'un horizon s'en déduisent par un simple parcours.
+"""
+
+import os
+import re
+import glob
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .manifest import format_destination
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Version du format du cache (à incrémenter si la matrice change de définition)
+PRICE_CALENDAR_CACHE_VERSION = 1
+
+# Horizon de recherche par défaut (en jours à partir de la date de début)
+DEFAULT_HORIZON_DAYS = 183
+
+# Durée de séjour maximale acceptée par la recherche (en nuits)
+MAX_STAY_NIGHTS = 60
+
+# Nom des fichiers d'échantillons après le préfixe de la destination: _<année>_<horodatage>.csv
+SAMPLE_FILE_SUFFIX = re.compile(r'_\d{4}_\d{8}_\d{6}\.csv')
+
+
+def build_calendar(samples):
+    """
+    Construit la matrice (durée de séjour × date d'arrivée) des prix par nuit.
+
+    Args:
+        samples: DataFrame des relevés par date d'arrivée (check_in, check_out ou nights, avg_price),
+            du plus ancien au plus récent: le dernier relevé d'un couple (arrivée, durée) l'emporte
+
+    Returns:
+        Tuple (première date d'arrivée datetime64[D], durées de séjour triées, matrice float32)
+    """
+    check_in = pd.to_datetime(samples['check_in']).to_numpy().astype('datetime64[D]')
+    if 'nights' in samples.columns and samples['nights'].notna().all():
+        nights = samples['nights'].to_numpy(dtype=np.int64)
+    else:
+        check_out = pd.to_datetime(samples['check_out']).to_numpy().astype('datetime64[D]')
+        nights = (check_out - check_in).astype(np.int64)
+    prices = samples['avg_price'].to_numpy(dtype=np.float64)
+
+    valid = (nights > 0) & np.isfinite(prices)
+    check_in, nights, prices = check_in[valid], nights[valid], prices[valid]
+    if not len(prices):
+        return np.datetime64('NaT', 'D'), np.empty(0, dtype=np.int16), np.empty((0, 0), dtype=np.float32)
+
+    start = check_in.min()
+    offsets = (check_in - start).astype(np.int64)
+    lengths, rows = np.unique(nights, return_inverse=True)
+
+    # Dernier relevé de chaque couple (durée, arrivée)
+    keys = rows * (offsets.max() + 1) + offsets
+    _, last = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - last
+
+    matrix = np.full((len(lengths), offsets.max() + 1), np.nan, dtype=np.float32)
+    matrix[rows[last], offsets[last]] = prices[last]
+
+    return start, lengths.astype(np.int16), matrix
+
+
+def merge_calendars(left, right):
+    """
+    Fusionne deux calendriers, les prix relevés de right remplaçant ceux de left.
+
+    Args:
+        left: Tuple (start, nights, prices) existant
+        right: Tuple (start, nights, prices) des nouveaux relevés
+
+    Returns:
+        Tuple (start, nights, prices) fusionné
+    """
+    if not left[1].size:
+        return right
+    if not right[1].size:
+        return left
+
+    start = min(left[0], right[0])
+    end = max(left[0] + left[2].shape[1], right[0] + right[2].shape[1])
+    nights = np.union1d(left[1], right[1])
+
+    matrix = np.full((len(nights), int((end - start).astype(np.int64))), np.nan, dtype=np.float32)
+    for calendar_start, calendar_nights, prices in (left, right):
+        rows = np.searchsorted(nights, calendar_nights)
+        offset = int((calendar_start - start).astype(np.int64))
+        columns = slice(offset, offset + prices.shape[1])
+        matrix[rows, columns] = np.where(np.isnan(prices), matrix[rows, columns], prices)
+
+    return start, nights, matrix
+
+
+class PriceCalendar:
+    """
+    Prix par nuit de chaque date d'arrivée et de chaque durée de séjour relevées.
+    """
+
+    def __init__(self, start, nights, prices):
+        """
+        Initialise le calendrier.
+
+        Args:
+            start: Première date d'arrivée (datetime64[D])
+            nights: Durées de séjour relevées (triées), une par ligne de prices
+            prices: Matrice float32 (durée × jour) des prix par nuit, NaN si non relevé
+        """
+        self.start = np.datetime64(start, 'D')
+        self.nights = np.asarray(nights, dtype=np.int64)
+        self.prices = prices
+
+    def __len__(self):
+        return self.prices.shape[1]
+
+    @property
+    def dates(self):
+        """Dates d'arrivée couvertes (datetime64[D])"""
+        return self.start + np.arange(len(self))
+
+    @property
+    def rate_nights(self):
+        """Durée du séjour le plus court relevé (base des prix moyens par nuit)"""
+        return int(self.nights[0]) if self.nights.size else None
+
+    def average_night_rates(self):
+        """
+        Prix moyen par nuit de chaque date d'arrivée, sur le séjour le plus court relevé.
+
+        Ce n'est le tarif d'une nuit isolée que si des séjours d'une nuit ont été
+        relevés; sinon c'est une approximation (voir rate_nights).
+
+        Returns:
+            Tableau float64 (NaN pour les jours sans relevé)
+        """
+        rates = np.full(len(self), np.nan)
+        for row in self.prices:
+            np.copyto(rates, row, where=np.isnan(rates))
+        return rates
+
+    def stay_prices(self, nights):
+        """
+        Prix total d'un séjour de N nuits pour chaque date d'arrivée.
+
+        Les prix relevés pour cette durée sont repris tels quels; les autres
+        dates sont estimées par la somme glissante des prix moyens par nuit
+        (NaN si une des nuits n'a pas de relevé).
+
+        Args:
+            nights: Durée du séjour (en nuits)
+
+        Returns:
+            Tuple (prix totaux float64, masque des prix effectivement relevés), un élément par date d'arrivée
+        """
+        rates = self.average_night_rates()
+        valid = ~np.isnan(rates)
+
+        # Somme glissante sur N nuits par différence de sommes cumulées
+        sums = np.concatenate(([0.0], np.cumsum(np.where(valid, rates, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(valid)))
+        totals = np.full(len(self), np.nan)
+        if nights <= len(self):
+            window_counts = counts[nights:] - counts[:-nights]
+            totals[:len(window_counts)] = np.where(window_counts == nights, sums[nights:] - sums[:-nights], np.nan)
+
+        observed = np.zeros(len(self), dtype=bool)
+        matches = np.flatnonzero(self.nights == nights)
+        if matches.size:
+            row = self.prices[matches[0]]
+            observed = ~np.isnan(row)
+            totals[observed] = row[observed].astype(np.float64) * nights
+
+        return totals, observed
+
+    def find_stays(self, nights, k=3, start=None, horizon_days=DEFAULT_HORIZON_DAYS):
+        """
+        Séjours de N nuits les moins chers et les plus chers d'un horizon.
+
+        Les k séjours retenus de chaque côté ne se chevauchent pas: chaque
+        séjour choisi écarte les dates d'arrivée dont le séjour le recouvre.
+
+        Args:
+            nights: Durée du séjour (en nuits)
+            k: Nombre de séjours renvoyés de chaque côté
+            start: Première date d'arrivée envisagée (date ou datetime64; début du calendrier si None)
+            horizon_days: Nombre de jours de l'horizon (le départ doit y tomber)
+
+        Returns:
+            Dictionnaire avec les listes 'cheapest' et 'most_expensive' de séjours
+            (check_in, check_out, total_price, nightly_price, observed)
+        """
+        totals, observed = self.stay_prices(nights)
+
+        first = 0 if start is None else max(int((np.datetime64(start, 'D') - self.start).astype(np.int64)), 0)
+        last = min(first + horizon_days - nights, len(self) - 1)
+        candidates = np.full(len(self), np.nan)
+        if last >= first:
+            candidates[first:last + 1] = totals[first:last + 1]
+
+        return {
+            'cheapest': self._select(candidates, observed, nights, k, np.nanargmin),
+            'most_expensive': self._select(candidates, observed, nights, k, np.nanargmax),
+        }
+
+    def _select(self, totals, observed, nights, k, pick):
+        """Sélectionne k séjours sans chevauchement (k parcours linéaires)"""
+        totals = totals.copy()
+        stays = []
+        while len(stays) < k and not np.isnan(totals).all():
+            index = int(pick(totals))
+            check_in = self.start + index
+            stays.append({
+                'check_in': str(check_in),
+                'check_out': str(check_in + nights),
+                'total_price': round(float(totals[index]), 2),
+                'nightly_price': round(float(totals[index]) / nights, 2),
+                'observed': bool(observed[index]),
+            })
+            totals[max(index - nights + 1, 0):index + nights] = np.nan
+        return stays
+
+    def heatmap(self, start=None, horizon_days=DEFAULT_HORIZON_DAYS):
+        """
+        Prix moyen par nuit de chaque jour d'un horizon (pour la carte de chaleur du calendrier).
+
+        Args:
+            start: Premier jour (début du calendrier si None)
+            horizon_days: Nombre de jours
+
+        Returns:
+            Dictionnaire (start, rate_nights, rates) avec rates une liste de prix arrondis (None sans relevé)
+            et rate_nights la durée des séjours dont ils sont la moyenne par nuit
+        """
+        first = self.start if start is None else max(np.datetime64(start, 'D'), self.start)
+        offset = int((first - self.start).astype(np.int64))
+        rates = self.average_night_rates()[offset:offset + horizon_days]
+        return {
+            'start': str(first),
+            'rate_nights': self.rate_nights,
+            'rates': [round(float(rate), 2) if np.isfinite(rate) else None for rate in rates],
+        }
+
+
+class PriceCalendarStore:
+    """
+    Cache des calendriers de prix par destination, complété avec les nouveaux relevés.
+    """
+
+    def __init__(self, data_dir):
+        """
+        Initialise le cache.
+
+        Args:
+            data_dir: Répertoire principal des données
+        """
+        self.data_dir = Path(data_dir)
+        self.samples_dir = self.data_dir / 'raw' / 'samples'
+        self.cache_dir = self.data_dir / 'cache' / 'price_calendar'
+
+    def _path(self, destination):
+        """Fichier de cache d'une destination"""
+        return self.cache_dir / f"{format_destination(destination)}.npz"
+
+    def sample_files(self, destination):
+        """
+        Fichiers d'échantillons d'une destination, du plus ancien au plus récent.
+
+        Args:
+            destination: Nom de la destination
+
+        Returns:
+            Liste de chemins (nommés '<destination>_<année>_<timestamp>.csv')
+        """
+        prefix = format_destination(destination)
+        # Le suffixe est vérifié en entier: 'Paris_France_*.csv' couvrirait aussi 'Paris_France_Sud_...'
+        paths = [
+            path for path in glob.glob(str(self.samples_dir / f"{glob.escape(prefix)}_*.csv"))
+            if SAMPLE_FILE_SUFFIX.fullmatch(os.path.basename(path)[len(prefix):])
+        ]
+        # Le timestamp (15 derniers caractères avant l'extension) donne l'ordre d'écriture
+        return sorted(paths, key=lambda path: (Path(path).stem[-15:], path))
+
+    def _load(self, destination):
+        """Lit le cache d'une destination (None s'il est absent ou d'une autre version)"""
+        path = self._path(destination)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != PRICE_CALENDAR_CACHE_VERSION:
+                    return None
+                return data['sources'], (data['start'][()], data['nights'], data['prices'])
+        except Exception as e:
+            logger.warning(f"Cache du calendrier des prix illisible pour {destination}: {str(e)}")
+            return None
+
+    def _save(self, destination, sources, calendar):
+        """Écrit le cache d'une destination de façon atomique"""
+        start, nights, prices = calendar
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(destination)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, version=PRICE_CALENDAR_CACHE_VERSION, sources=sources,
+                 start=np.array(start, dtype='datetime64[D]'), nights=nights, prices=prices)
+        os.replace(tmp_path, path)
+
+    def load(self, destination):
+        """
+        Calendrier des prix en cache d'une destination, sans lecture des nouveaux relevés.
+
+        Args:
+            destination: Nom de la destination
+
+        Returns:
+            PriceCalendar, ou None si le cache est absent ou vide
+        """
+        cached = self._load(destination)
+        if cached is None or not cached[1][1].size:
+            return None
+        return PriceCalendar(*cached[1])
+
+    def refresh(self, destination):
+        """
+        Met à jour et retourne le calendrier des prix d'une destination.
+
+        Seuls les fichiers d'échantillons absents du cache sont lus; le
+        calendrier est reconstruit entièrement si un fichier déjà lu a
+        changé ou disparu.
+
+        Args:
+            destination: Nom de la destination
+
+        Returns:
+            PriceCalendar, ou None si la destination n'a aucun relevé par date d'arrivée
+        """
+        paths = self.sample_files(destination)
+        signatures = np.array([
+            f"{os.path.basename(path)}:{os.stat(path).st_size}:{os.stat(path).st_mtime_ns}" for path in paths
+        ], dtype=str)
+
+        cached = self._load(destination)
+        if cached is not None and set(cached[0].tolist()) <= set(signatures.tolist()):
+            known = set(cached[0].tolist())
+            new_paths = [path for path, signature in zip(paths, signatures) if signature not in known]
+            calendar = cached[1]
+        else:
+            new_paths = paths
+            calendar = None
+
+        if new_paths:
+            samples = pd.concat([pd.read_csv(path) for path in new_paths], ignore_index=True)
+            update = build_calendar(samples)
+            calendar = merge_calendars(calendar, update) if calendar is not None else update
+            self._save(destination, signatures, calendar)
+            logger.info(f"Calendrier des prix de {destination} mis à jour: {len(new_paths)} fichiers lus, "
+                        f"{calendar[2].shape[1]} jours")
+
+        if calendar is None or not calendar[1].size:
+            return None
+        return PriceCalendar(*calendar)
@@ -0,0 +1,350 @@
+"""
+Évolution des prix d'un même mois au fil des scrapings successifs.
+
+L'historique d'une destination (partitions compactées et fichiers récents)
+est lu en une seule passe colonne par colonne et converti en une matrice
+(date de scraping × mois visé) des prix moyens. Tendance, volatilité et
+courbe du prix selon l'anticipation de la réservation sont calculées sur
+cette matrice par des opérations numpy vectorisées, les valeurs manquantes
+étant masquées.
+
+La matrice est mise en cache par destination (data/cache/price_history).
+Quand une nouvelle exécution arrive, seules les lignes correspondantes sont
+lues et ajoutées; la matrice n'est reconstruite entièrement que si les
+partitions compactées ont été réécrites.
+"""
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .manifest import DataManifest, format_destination
+from .history import HistoryStore, load_history, file_run_id, data_year
+from .storage import RAW_SCHEMA, read_table
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Version du format du cache (à incrémenter si la matrice change de définition)
+PRICE_HISTORY_CACHE_VERSION = 1
+
+# Largeur des tranches d'anticipation de la courbe de réservation (en jours)
+LEAD_TIME_BUCKET_DAYS = 30
+
+# Dernière tranche d'anticipation (les anticipations plus longues y sont regroupées)
+LEAD_TIME_MAX_BUCKETS = 12
+
+# Colonnes lues dans l'historique
+HISTORY_COLUMNS = ['year', 'month', 'avg_price']
+
+
+def build_price_matrix(history):
+    """
+    Construit la matrice (exécution × mois visé) des prix moyens.
+
+    Args:
+        history: DataFrame avec les colonnes run_id, scrape_date, year, month et avg_price
+
+    Returns:
+        Tuple (identifiants d'exécution, dates de scraping datetime64[s], mois visés datetime64[M],
+        matrice des prix avec NaN pour les couples non observés), exécutions triées par date
+    """
+    if history.empty:
+        return (np.empty(0, dtype=str), np.empty(0, dtype='datetime64[s]'),
+                np.empty(0, dtype='datetime64[M]'), np.empty((0, 0)))
+
+    history = history.sort_values('scrape_date', kind='stable')
+    run_codes, run_ids = pd.factorize(history['run_id'].astype(str), sort=False)
+    scrape_dates = history.groupby(run_codes, sort=True)['scrape_date'].first().to_numpy().astype('datetime64[s]')
+
+    # Mois visé en nombre de mois depuis 1970
+    month_numbers = (history['year'].to_numpy(dtype=np.int64) - 1970) * 12 + history['month'].to_numpy(dtype=np.int64) - 1
+    targets, target_codes = np.unique(month_numbers, return_inverse=True)
+
+    matrix = np.full((len(run_ids), len(targets)), np.nan)
+    matrix[run_codes, target_codes] = history['avg_price'].to_numpy(dtype=np.float64)
+
+    return np.asarray(run_ids, dtype=str), scrape_dates, targets.astype('datetime64[M]'), matrix
+
+
+def merge_price_matrices(left, right):
+    """
+    Fusionne deux matrices de prix (lignes ajoutées, colonnes réunies).
+
+    Args:
+        left: Tuple (run_ids, scrape_dates, targets, matrix) existant
+        right: Tuple (run_ids, scrape_dates, targets, matrix) des nouvelles exécutions
+
+    Returns:
+        Tuple (run_ids, scrape_dates, targets, matrix) fusionné, exécutions triées par date
+    """
+    left_runs, left_dates, left_targets, left_matrix = left
+    right_runs, right_dates, right_targets, right_matrix = right
+
+    targets = np.union1d(left_targets, right_targets)
+    matrix = np.full((len(left_runs) + len(right_runs), len(targets)), np.nan)
+    matrix[:len(left_runs), np.searchsorted(targets, left_targets)] = left_matrix
+    matrix[len(left_runs):, np.searchsorted(targets, right_targets)] = right_matrix
+
+    run_ids = np.concatenate([left_runs, right_runs])
+    scrape_dates = np.concatenate([left_dates, right_dates])
+    order = np.argsort(scrape_dates, kind='stable')
+
+    return run_ids[order], scrape_dates[order], targets, matrix[order]
+
+
+def price_history_metrics(scrape_dates, targets, matrix):
+    """
+    Calcule tendance, volatilité et courbe d'anticipation à partir de la matrice des prix.
+
+    Seules les observations faites avant le séjour (anticipation positive) sont prises en compte.
+
+    Args:
+        scrape_dates: Dates de scraping (datetime64), une par ligne
+        targets: Mois visés (datetime64[M]), un par colonne
+        matrix: Matrice des prix (NaN si non observé)
+
+    Returns:
+        Dictionnaire avec, par mois visé, le nombre d'observations, les premier et dernier prix,
+        la variation, la tendance (€ par 30 jours) et la volatilité (%), ainsi que la courbe
+        du prix relatif par tranche d'anticipation
+    """
+    n_runs, n_targets = matrix.shape
+    scrape_days = scrape_dates.astype('datetime64[D]')
+
+    # Anticipation (en jours) entre chaque scraping et le milieu du mois visé
+    stay_days = targets.astype('datetime64[D]') + np.timedelta64(14, 'D')
+    lead = (stay_days[None, :] - scrape_days[:, None]).astype(np.float64)
+
+    valid = np.isfinite(matrix) & (lead >= 0)
+    prices = np.where(valid, matrix, 0.0)
+    counts = valid.sum(axis=0)
+
+    # Premier et dernier prix observés de chaque mois visé
+    columns = np.arange(n_targets)
+    first_index = np.argmax(valid, axis=0)
+    last_index = n_runs - 1 - np.argmax(valid[::-1], axis=0)
+    first_price = np.where(counts > 0, matrix[first_index, columns], np.nan)
+    last_price = np.where(counts > 0, matrix[last_index, columns], np.nan)
+
+    # Tendance: pente des moindres carrés du prix en fonction de la date de scraping
+    days = (scrape_days - scrape_days[0]).astype(np.float64) if n_runs else np.empty(0)
+    x = np.where(valid, days[:, None], 0.0)
+    sum_x, sum_y = x.sum(axis=0), prices.sum(axis=0)
+    denominator = counts * (x * x).sum(axis=0) - sum_x ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(denominator > 0, (counts * (x * prices).sum(axis=0) - sum_x * sum_y) / denominator, np.nan)
+        change_pct = (last_price - first_price) / first_price * 100
+
+    # Volatilité: écart-type des variations relatives entre observations successives d'un même mois
+    row_index = np.where(valid, np.arange(n_runs)[:, None], -1)
+    previous = np.maximum.accumulate(row_index, axis=0)[:-1]
+    has_previous = valid[1:] & (previous >= 0)
+    previous_prices = matrix[np.maximum(previous, 0), columns]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(has_previous, np.log(matrix[1:] / previous_prices), 0.0)
+    return_counts = has_previous.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_return = returns.sum(axis=0) / return_counts
+        variance = (np.where(has_previous, (returns - mean_return) ** 2, 0.0)).sum(axis=0) / (return_counts - 1)
+    volatility = np.where(return_counts > 1, np.sqrt(variance) * 100, np.nan)
+
+    # Courbe d'anticipation: prix relatif à la moyenne du mois visé, par tranche d'anticipation
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = matrix / (sum_y / counts)
+    buckets = np.minimum(lead // LEAD_TIME_BUCKET_DAYS, LEAD_TIME_MAX_BUCKETS).astype(np.int64)
+    bucket_counts = np.bincount(buckets[valid], minlength=LEAD_TIME_MAX_BUCKETS + 1)
+    bucket_sums = np.bincount(buckets[valid], weights=relative[valid], minlength=LEAD_TIME_MAX_BUCKETS + 1)
+
+    months = [
+        {
+            'target': str(target),
+            'observations': int(count),
+            'first_price': round(float(first), 2),
+            'latest_price': round(float(last), 2),
+            'change_pct': round(float(change), 2) if np.isfinite(change) else None,
+            'trend_per_30_days': round(float(trend) * 30, 2) if np.isfinite(trend) else None,
+            'volatility_pct': round(float(vol), 2) if np.isfinite(vol) else None,
+        }
+        for target, count, first, last, change, trend, vol in zip(
+            targets, counts, first_price, last_price, change_pct, slope, volatility)
+        if count > 0
+    ]
+
+    lead_time = [
+        {
+            'lead_days': int(bucket * LEAD_TIME_BUCKET_DAYS),
+            'relative_price': round(float(bucket_sums[bucket] / bucket_counts[bucket]), 4),
+            'observations': int(bucket_counts[bucket]),
+        }
+        for bucket in np.flatnonzero(bucket_counts)
+    ]
+
+    return {'months': months, 'lead_time': lead_time}
+
+
+class PriceHistoryCache:
+    """
+    Cache de la matrice des prix d'une destination, mis à jour de façon incrémentale.
+    """
+
+    def __init__(self, data_dir):
+        """
+        Initialise le cache.
+
+        Args:
+            data_dir: Répertoire principal des données
+        """
+        self.data_dir = data_dir
+        self.cache_dir = Path(data_dir) / 'cache' / 'price_history'
+
+    def _path(self, destination):
+        """Fichier de cache d'une destination"""
+        return self.cache_dir / f"{format_destination(destination)}.npz"
+
+    def _partitions_signature(self, destination):
+        """Signature des partitions compactées (chemin, taille, date de modification)"""
+        return np.array([
+            f"{path}:{os.stat(path).st_size}:{os.stat(path).st_mtime_ns}"
+            for path in HistoryStore(self.data_dir).partition_files('raw', destination)
+        ], dtype=str)
+
+    def _load(self, destination):
+        """Lit le cache d'une destination (None s'il est absent ou d'une autre version)"""
+        path = self._path(destination)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != PRICE_HISTORY_CACHE_VERSION:
+                    return None
+                return (data['partitions'],
+                        (data['run_ids'], data['scrape_dates'], data['targets'], data['matrix']))
+        except Exception as e:
+            logger.warning(f"Cache d'historique des prix illisible pour {destination}: {str(e)}")
+            return None
+
+    def _save(self, destination, partitions, price_matrix):
+        """Écrit le cache d'une destination de façon atomique"""
+        run_ids, scrape_dates, targets, matrix = price_matrix
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(destination)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, version=PRICE_HISTORY_CACHE_VERSION, partitions=partitions,
+                 run_ids=run_ids, scrape_dates=scrape_dates, targets=targets, matrix=matrix)
+        os.replace(tmp_path, path)
+
+    def signature(self, destination):
+        """
+        Signature du cache d'une destination (modifiée à chaque ajout d'exécutions).
+
+        Args:
+            destination: Nom de la destination
+
+        Returns:
+            Chaîne 'taille:date de modification' ou None si le cache n'existe pas
+        """
+        try:
+            stat = os.stat(self._path(destination))
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def load(self, destination):
+        """
+        Matrice des prix en cache d'une destination, sans lecture des nouveaux fichiers.
+
+        Args:
+            destination: Nom de la destination
+
+        Returns:
+            Tuple (run_ids, scrape_dates, targets, matrix) ou None si le cache est absent
+        """
+        cached = self._load(destination)
+        return cached[1] if cached is not None else None
+
+    def refresh(self, destination):
+        """
+        Met à jour et retourne la matrice des prix d'une destination.
+
+        Args:
+            destination: Nom de la destination
+
+        Returns:
+            Tuple (run_ids, scrape_dates, targets, matrix)
+        """
+        partitions = self._partitions_signature(destination)
+        cached = self._load(destination)
+
+        if cached is None or not np.array_equal(cached[0], partitions):
+            # Première lecture ou partitions réécrites par la compaction: lecture complète
+            history = load_history(self.data_dir, destination, 'raw', columns=HISTORY_COLUMNS)
+            price_matrix = build_price_matrix(history)
+            self._save(destination, partitions, price_matrix)
+            logger.info(f"Historique des prix de {destination} reconstruit: {len(price_matrix[0])} exécutions")
+            return price_matrix
+
+        price_matrix = cached[1]
+        known_runs = set(price_matrix[0].tolist())
+
+        # Seuls les fichiers des nouvelles exécutions sont lus
+        frames = []
+        for entry in DataManifest(self.data_dir).files('raw', destination):
+            run_id = file_run_id(entry['path'], entry['created_at'])
+            if run_id in known_runs:
+                continue
+            df = read_table(entry['path'], RAW_SCHEMA, HISTORY_COLUMNS + ['check_in'])
+            scrape_date = pd.to_datetime(run_id, format='%Y%m%d_%H%M%S')
+            if 'year' not in df.columns:
+                df['year'] = data_year(df, entry['year'], scrape_date)
+            frames.append(df.assign(run_id=run_id, scrape_date=scrape_date))
+
+        if frames:
+            price_matrix = merge_price_matrices(price_matrix, build_price_matrix(pd.concat(frames, ignore_index=True)))
+            self._save(destination, partitions, price_matrix)
+            logger.info(f"Historique des prix de {destination}: {len(frames)} nouvelles exécutions ajoutées")
+
+        return price_matrix
+
+
+def price_history_summary(data_dir, destination, min_runs=2):
+    """
+    Résumé de l'évolution des prix d'une destination pour la page de détail.
+
+    Le cache n'est que lu: il est mis à jour après chaque scraping ou
+    retraitement (refresh_derived_data).
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        min_runs: Nombre minimum d'exécutions pour produire un résumé
+
+    Returns:
+        Dictionnaire (exécutions, séries de prix par mois visé, métriques, courbe d'anticipation) ou None
+    """
+    price_matrix = PriceHistoryCache(data_dir).load(destination)
+    if price_matrix is None or len(price_matrix[0]) < min_runs:
+        return None
+
+    run_ids, scrape_dates, targets, matrix = price_matrix
+
+    summary = price_history_metrics(scrape_dates, targets, matrix)
+
+    # Séries des mois observés au moins deux fois (une courbe par mois visé)
+    observed = np.isfinite(matrix).sum(axis=0) >= 2
+    summary.update({
+        'runs': len(run_ids),
+        'first_scrape': str(scrape_dates[0].astype('datetime64[D]')),
+        'last_scrape': str(scrape_dates[-1].astype('datetime64[D]')),
+        'scrape_dates': [str(date) for date in scrape_dates.astype('datetime64[D]')],
+        'series': [
+            {
+                'target': str(target),
+                'prices': [round(float(price), 2) if np.isfinite(price) else None for price in column],
+            }
+            for target, column in zip(targets[observed], matrix[:, observed].T)
+        ],
+    })
+    return summary
@@ -0,0 +1,262 @@
+"""
+Profileur par échantillonnage à faible surcoût pour les exécutions du scraper et de l'analyseur.
+
+Un thread d'échantillonnage relève périodiquement la pile de chaque thread
+actif (`sys._current_frames`) et agrège les piles identiques; les threads
+bloqués dans une attente (voir IDLE_FRAMES) sont ignorés. Les résultats sont
+écrits au format "collapsed stacks" (une ligne `f1;f2;f3 N` par pile),
+directement exploitable par flamegraph.pl, speedscope ou inferno.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Fonctions d'attente (fichier, fonction): un thread dont la pile se termine par l'une
+# d'elles est inactif (pool en attente de tâches, attente d'un verrou ou d'un résultat)
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('thread.py', '_worker'),
+    ('_base.py', 'result'),
+    ('_base.py', 'wait'),
+    ('queue.py', 'get'),
+}
+
+
+def _frame_label(code):
+    """Libellé d'une fonction dans une pile: 'fonction (fichier:ligne)'"""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(code):
+    """Indique si une fonction en bout de pile est une attente (voir IDLE_FRAMES)"""
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+def _safe_name(name):
+    """Nettoie un libellé pour l'utiliser comme nom de fichier"""
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in str(name))
+
+
+class SamplingProfiler:
+    """
+    Échantillonne les piles d'appels de tous les threads à intervalle régulier.
+    """
+
+    def __init__(self, interval=0.01):
+        """
+        Initialise le profileur.
+
+        Args:
+            interval: Intervalle entre deux échantillons (en secondes)
+        """
+        self.interval = interval
+        self.samples = defaultdict(Counter)
+        self.sample_count = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        """Relève la pile courante de chaque thread actif (hors thread d'échantillonnage)"""
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            # Les threads en attente fausseraient le résumé: seuls les threads actifs sont relevés
+            if thread_id == own_id or _is_idle(frame.f_code):
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+
+            self.samples[names.get(thread_id, f"thread-{thread_id}")][tuple(stack)] += 1
+
+        self.sample_count += 1
+
+    def _run(self):
+        """Boucle du thread d'échantillonnage"""
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """Démarre l'échantillonnage en arrière-plan"""
+        self.started_at = time.perf_counter()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête l'échantillonnage"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def write_collapsed(self, output_dir):
+        """
+        Écrit un fichier de piles agrégées par thread.
+
+        Args:
+            output_dir: Répertoire de sortie
+
+        Returns:
+            Liste des chemins des fichiers écrits
+        """
+        output_dir = Path(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+
+        paths = []
+        for thread_name, stacks in self.samples.items():
+            path = output_dir / f"{_safe_name(thread_name)}.collapsed"
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{';'.join(stack)} {count}\n")
+            paths.append(path)
+
+        return paths
+
+    def function_counts(self):
+        """
+        Compte les échantillons par fonction.
+
+        Returns:
+            Tuple (Counter temps propre, Counter temps inclusif)
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+
+        for stacks in self.samples.values():
+            for stack, count in stacks.items():
+                if not stack:
+                    continue
+                self_counts[stack[-1]] += count
+                for label in set(stack):
+                    total_counts[label] += count
+
+        return self_counts, total_counts
+
+
+def format_top_functions(self_counts, total_counts, top_n=20, interval=0.01):
+    """
+    Formate un résumé des fonctions les plus coûteuses.
+
+    Args:
+        self_counts: Counter des échantillons en temps propre
+        total_counts: Counter des échantillons en temps inclusif
+        top_n: Nombre de fonctions à afficher
+        interval: Intervalle d'échantillonnage (pour estimer les durées)
+
+    Returns:
+        Résumé sous forme de texte
+    """
+    total_samples = sum(self_counts.values()) or 1
+    lines = [f"{'propre':>8} {'inclusif':>9} {'~s':>8}  fonction"]
+
+    for label, count in self_counts.most_common(top_n):
+        lines.append(
+            f"{count / total_samples * 100:7.1f}% {total_counts[label] / total_samples * 100:8.1f}% "
+            f"{count * interval:8.2f}  {label}"
+        )
+
+    return '\n'.join(lines)
+
+
+class ProfileRun:
+    """
+    Regroupe les profils d'une exécution (une section par destination).
+
+    Arborescence produite:
+        <profiles_dir>/<nom>_<timestamp>/<section>/<thread>.collapsed
+        <profiles_dir>/<nom>_<timestamp>/<section>/summary.txt
+        <profiles_dir>/<nom>_<timestamp>/summary.txt
+    """
+
+    def __init__(self, profiles_dir, name, interval=0.01, top_n=20):
+        """
+        Initialise l'exécution profilée.
+
+        Args:
+            profiles_dir: Répertoire racine des profils (ex: logs/profiles)
+            name: Nom de l'exécution (ex: 'run_scraper')
+            interval: Intervalle d'échantillonnage (en secondes)
+            top_n: Nombre de fonctions listées dans les résumés
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.run_dir = Path(profiles_dir) / f"{_safe_name(name)}_{timestamp}"
+        self.interval = interval
+        self.top_n = top_n
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self.section_times = {}
+
+        os.makedirs(self.run_dir, exist_ok=True)
+
+    @contextmanager
+    def profile(self, section):
+        """
+        Profile un bloc de code (typiquement le traitement d'une destination).
+
+        Args:
+            section: Libellé de la section (ex: nom de la destination)
+        """
+        profiler = SamplingProfiler(self.interval)
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            self._record(section, profiler)
+
+    def _record(self, section, profiler):
+        """Écrit les fichiers d'une section et cumule ses compteurs"""
+        section_dir = self.run_dir / _safe_name(section)
+        profiler.write_collapsed(section_dir)
+
+        self_counts, total_counts = profiler.function_counts()
+        self.self_counts.update(self_counts)
+        self.total_counts.update(total_counts)
+        self.section_times[section] = profiler.elapsed
+
+        summary = format_top_functions(self_counts, total_counts, self.top_n, self.interval)
+        with open(section_dir / 'summary.txt', 'w', encoding='utf-8') as f:
+            f.write(f"{section}: {profiler.elapsed:.2f}s, {profiler.sample_count} échantillons\n\n{summary}\n")
+
+        logger.info(f"Profil de {section} écrit dans {section_dir} ({profiler.elapsed:.2f}s)")
+
+    def finish(self):
+        """
+        Écrit le résumé global de l'exécution.
+
+        Returns:
+            Résumé sous forme de texte
+        """
+        lines = ["Durée par section:"]
+        for section, elapsed in sorted(self.section_times.items(), key=lambda x: -x[1]):
+            lines.append(f"  {elapsed:8.2f}s  {section}")
+        lines.append("")
+        lines.append(f"Top {self.top_n} des fonctions (tous threads confondus):")
+        lines.append(format_top_functions(self.self_counts, self.total_counts, self.top_n, self.interval))
+
+        summary = '\n'.join(lines)
+        with open(self.run_dir / 'summary.txt', 'w', encoding='utf-8') as f:
+            f.write(summary + '\n')
+
+        logger.info(f"Résumé du profilage écrit dans {self.run_dir / 'summary.txt'}")
+        return summary
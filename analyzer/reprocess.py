@@ -0,0 +1,156 @@
+"""
+Retraitement groupé des données de toutes les destinations.
+
+Le travail est découpé en lots de destinations répartis sur un pool de
+processus. Chaque processus charge et traite les données brutes de son lot
+en une seule passe (get_or_process_batch), met à jour les fichiers dérivés
+(renouvellement des annonces, intervalles de confiance, grille de prix,
+historique et calendrier des prix) et renvoie un résultat compact: les colonnes utiles du DataFrame
+traité, les statistiques et les temps mesurés. Les écritures en base
+restent à la charge du processus parent.
+"""
+
+import time
+import logging
+from datetime import datetime
+
+from .data_processor import AirbnbDataProcessor
+from .manifest import DataManifest
+from .churn import latest_listing_churn
+from .bootstrap import price_uncertainty
+from .geogrid import build_price_grid
+from .price_history import PriceHistoryCache
+from .price_calendar import PriceCalendarStore
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Colonnes du DataFrame traité renvoyées au processus parent
+RESULT_COLUMNS = [
+    'month', 'month_name', 'avg_price', 'median_price', 'min_price', 'max_price',
+    'sample_size', 'season', 'price_rank', 'is_cheapest',
+]
+
+
+def latest_data_year(data_dir, destination):
+    """
+    Année des données du fichier brut le plus récent d'une destination, lue dans le manifest.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+
+    Returns:
+        Année enregistrée dans le manifest ou None si elle est inconnue
+    """
+    manifest = DataManifest(data_dir)
+    latest_file = manifest.latest('raw', destination)
+    entry = manifest.entry(latest_file) if latest_file else None
+    return entry['year'] if entry else None
+
+
+def refresh_derived_data(data_dir, destination, stats, year=None):
+    """
+    Met à jour les données dérivées des fichiers bruts d'une destination.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destination: Nom de la destination
+        stats: Statistiques de la destination
+        year: Année scrapée (année en cours si None)
+
+    Returns:
+        Statistiques complétées par le renouvellement des annonces et les
+        intervalles de confiance des prix mensuels
+    """
+    year = year or datetime.now().year
+
+    # Renouvellement des annonces depuis l'exécution précédente
+    listing_churn = latest_listing_churn(data_dir, destination, year)
+    if stats and listing_churn:
+        stats = {**stats, 'listing_churn': listing_churn}
+
+    # Intervalles de confiance des prix mensuels (bootstrap sur les prix des annonces)
+    try:
+        uncertainty = price_uncertainty(data_dir, destination, year)
+        if stats and uncertainty:
+            stats = {**stats, 'price_uncertainty': uncertainty}
+    except Exception as e:
+        logger.warning(f"Erreur lors du calcul des intervalles de confiance de {destination}: {str(e)}")
+
+    # Précalculer la grille de prix géographique de la dernière exécution
+    try:
+        build_price_grid(data_dir, destination, year)
+    except Exception as e:
+        logger.warning(f"Erreur lors du calcul de la grille de prix de {destination}: {str(e)}")
+
+    # Ajouter la nouvelle exécution à l'historique des prix (mise à jour incrémentale)
+    try:
+        PriceHistoryCache(data_dir).refresh(destination)
+    except Exception as e:
+        logger.warning(f"Erreur lors de la mise à jour de l'historique des prix de {destination}: {str(e)}")
+
+    # Ajouter les relevés par date d'arrivée au calendrier des prix
+    try:
+        PriceCalendarStore(data_dir).refresh(destination)
+    except Exception as e:
+        logger.warning(f"Erreur lors de la mise à jour du calendrier des prix de {destination}: {str(e)}")
+
+    return stats
+
+
+def reprocess_destinations(data_dir, destinations, refresh=False):
+    """
+    Retraite un lot de destinations (fonction exécutée dans un processus du pool).
+
+    Le traitement des données brutes est fait en une passe pour tout le lot;
+    son temps est réparti entre les destinations au prorata de leur nombre de
+    lignes, puis le temps de mise à jour des données dérivées de chacune y
+    est ajouté.
+
+    Args:
+        data_dir: Répertoire principal des données
+        destinations: Noms des destinations du lot
+        refresh: Si True, ignore les résultats de traitement mémorisés
+
+    Returns:
+        Liste de dictionnaires (destination, year, columns, stats, rows, seconds, error),
+        un par destination du lot
+    """
+    start = time.perf_counter()
+    try:
+        processed = AirbnbDataProcessor(data_dir).get_or_process_batch(destinations, refresh=refresh)
+    except Exception as e:
+        logger.error(f"Erreur lors du retraitement du lot {', '.join(destinations)}: {str(e)}")
+        return [{'destination': destination, 'error': str(e), 'seconds': 0.0} for destination in destinations]
+    batch_seconds = time.perf_counter() - start
+
+    total_rows = sum(len(df) for df, _, _ in processed.values()) or 1
+    results = []
+    for destination in destinations:
+        if destination not in processed or processed[destination][0] is None:
+            results.append({'destination': destination, 'error': "Aucune donnée brute", 'seconds': 0.0})
+            continue
+
+        df, stats, _ = processed[destination]
+        start = time.perf_counter()
+        # Année des données retraitées (celle du fichier brut dans le manifest, pas l'année en cours)
+        year = latest_data_year(data_dir, destination) or datetime.now().year
+        try:
+            stats = refresh_derived_data(data_dir, destination, stats, year=year)
+            error = None
+        except Exception as e:
+            error = str(e)
+
+        columns = [column for column in RESULT_COLUMNS if column in df.columns]
+        results.append({
+            'destination': destination,
+            'year': year,
+            'columns': {column: df[column].tolist() for column in columns},
+            'stats': stats,
+            'rows': len(df),
+            'seconds': batch_seconds * len(df) / total_rows + time.perf_counter() - start,
+            'error': error,
+        })
+
+    return results
@@ -0,0 +1,450 @@
+"""
+Moteur de comparaison des profils de prix mensuels entre destinations.
+
+Chaque destination est représentée par son profil de prix sur 12 mois,
+normalisé par sa moyenne (prix relatifs), stocké dans une matrice unique
+avec un masque des mois observés. Les corrélations sont calculées par blocs
+de destinations avec quelques produits matriciels: pour chaque paire, seuls
+les mois observés des deux côtés sont utilisés, sans matrice N x N complète
+ni boucle Python sur les paires. Une requête renvoie les k destinations les
+plus corrélées.
+
+Les mêmes profils servent d'index de recherche des plus proches voisins
+("destinations à la saisonnalité semblable, mais 30 % moins chères"): la
+recherche est exhaustive par produits matrice-vecteur, ce qui reste de
+l'ordre de la milliseconde pour quelques milliers de destinations. L'index
+est enregistré dans data/cache/profile_index.npz et mis à jour destination
+par destination, sous verrou de fichier: chaque profil retient l'année de ses
+prix et n'est remplacé que par une année au moins aussi récente.
+"""
+
+import os
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .storage import file_lock
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Nombre de mois d'un profil
+PROFILE_MONTHS = 12
+
+# Nombre minimum de mois observés en commun pour calculer une corrélation
+MIN_OVERLAP_MONTHS = 6
+
+# Nombre de destinations requêtes traitées par bloc (blocs de BLOCK_SIZE x N valeurs)
+CORRELATION_BLOCK_SIZE = 1024
+
+# Métriques de la recherche des plus proches voisins
+SEARCH_METRICS = ('cosine', 'euclidean')
+
+# Index chargés en mémoire, par fichier: {chemin: (date de modification, ProfileMatrix)}
+_loaded_indexes = {}
+_loaded_indexes_lock = threading.Lock()
+
+
+class ProfileMatrix:
+    """
+    Profils de prix mensuels normalisés d'un ensemble de destinations.
+    """
+
+    def __init__(self, names, prices, years=None):
+        """
+        Initialise la matrice des profils.
+
+        Args:
+            names: Noms des destinations (une par ligne)
+            prices: Matrice (destinations x 12) des prix moyens mensuels, NaN pour un mois non observé
+            years: Année des prix de chaque destination (0 si inconnue)
+        """
+        prices = np.asarray(prices, dtype=np.float64).reshape(len(names), PROFILE_MONTHS)
+
+        self.names = list(names)
+        self.prices = prices
+        self.years = (np.zeros(len(self.names), dtype=np.int64) if years is None
+                      else np.asarray(years, dtype=np.int64).reshape(len(self.names)))
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.mask = ~np.isnan(prices)
+        self.counts = self.mask.sum(axis=1)
+
+        # Niveau de prix (moyenne des mois observés) et profil relatif à ce niveau
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.levels = np.where(self.mask, prices, 0).sum(axis=1) / self.counts
+            self.profiles = np.where(self.mask, prices / self.levels[:, None], 0)
+
+        # Termes des sommes masquées, partagés par toutes les requêtes
+        self._weights = self.mask.astype(np.float64)
+        self._squares = self.profiles ** 2
+
+        # Profils complets centrés-réduits: leur corrélation est un simple produit scalaire
+        # (NaN pour un profil constant, propagé par le produit matriciel)
+        self.complete = self.counts == PROFILE_MONTHS
+        centered = self.profiles - self.profiles.mean(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            norms = np.sqrt((centered ** 2).sum(axis=1, keepdims=True))
+            self._standardized = np.where(norms > 1e-12, centered / norms, np.nan)
+
+        # Écarts saisonniers (profil relatif - 1) des mois observés, pour la recherche cosinus
+        self._deviations = np.where(self.mask, self.profiles - 1, 0)
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_frame(cls, df, key='destination'):
+        """
+        Construit la matrice à partir d'un DataFrame long (une ligne par destination et par mois).
+
+        Les prix d'un même mois observé plusieurs fois (plusieurs années) sont moyennés;
+        l'année retenue pour la destination est la plus récente.
+
+        Args:
+            df: DataFrame avec les colonnes key, month (1-12), avg_price et, facultativement, year
+            key: Colonne identifiant la destination
+
+        Returns:
+            ProfileMatrix
+        """
+        codes, names = pd.factorize(df[key], sort=True)
+        months = df['month'].to_numpy(dtype=np.int64) - 1
+        prices = df['avg_price'].to_numpy(dtype=np.float64)
+
+        valid = (codes >= 0) & (months >= 0) & (months < PROFILE_MONTHS) & ~np.isnan(prices)
+        cells = codes[valid] * PROFILE_MONTHS + months[valid]
+        size = len(names) * PROFILE_MONTHS
+
+        totals = np.bincount(cells, weights=prices[valid], minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matrix = np.where(counts > 0, totals / counts, np.nan)
+
+        years = np.zeros(len(names), dtype=np.int64)
+        if 'year' in df.columns:
+            np.maximum.at(years, codes[valid], df['year'].to_numpy(dtype=np.int64)[valid])
+
+        return cls(list(names), matrix.reshape(len(names), PROFILE_MONTHS), years)
+
+    @classmethod
+    def from_frames(cls, destinations_data):
+        """
+        Construit la matrice à partir d'un dictionnaire {destination: DataFrame mensuel}.
+
+        Args:
+            destinations_data: Dict avec les destinations comme clés et DataFrame comme valeurs
+
+        Returns:
+            ProfileMatrix
+        """
+        frames = [
+            df[['month', 'avg_price']].assign(destination=name)
+            for name, df in destinations_data.items()
+            if df is not None and not df.empty
+        ]
+        if not frames:
+            return cls([], np.empty((0, PROFILE_MONTHS)))
+
+        return cls.from_frame(pd.concat(frames, ignore_index=True))
+
+    def correlate(self, rows, min_overlap=MIN_OVERLAP_MONTHS):
+        """
+        Corrélations de Pearson de quelques profils avec tous les profils.
+
+        Les paires de profils complets sont corrélées par un seul produit
+        matriciel de profils centrés-réduits. Les paires impliquant un profil
+        incomplet n'utilisent que les mois observés des deux côtés: leurs
+        sommes partielles (effectifs, sommes, carrés et produits croisés) sont
+        obtenues par produits matriciels entre profils et masques.
+
+        Args:
+            rows: Indices des destinations requêtes
+            min_overlap: Nombre minimum de mois en commun (NaN en dessous)
+
+        Returns:
+            Matrice (len(rows) x N) des corrélations
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        correlation = np.empty((len(rows), len(self.names)))
+        complete_rows = self.complete[rows]
+        incomplete_columns = np.flatnonzero(~self.complete)
+
+        if complete_rows.any():
+            block = self._standardized[rows[complete_rows]] @ self._standardized.T
+            if min_overlap > PROFILE_MONTHS:
+                block[:] = np.nan
+            if len(incomplete_columns):
+                block[:, incomplete_columns] = self._masked_correlation(
+                    rows[complete_rows], incomplete_columns, min_overlap
+                )
+            correlation[complete_rows] = block
+
+        if not complete_rows.all():
+            correlation[~complete_rows] = self._masked_correlation(
+                rows[~complete_rows], np.arange(len(self.names)), min_overlap
+            )
+
+        return np.clip(correlation, -1.0, 1.0, out=correlation)
+
+    def _masked_correlation(self, rows, columns, min_overlap):
+        """Corrélations sur les mois observés en commun (profils incomplets)"""
+        query_weights = self._weights[rows]
+        query_profiles = self.profiles[rows]
+        weights = self._weights[columns].T
+        profiles = self.profiles[columns].T
+
+        n = query_weights @ weights
+        sum_x = query_profiles @ weights
+        sum_y = query_weights @ profiles
+        sum_xx = self._squares[rows] @ weights
+        sum_yy = query_weights @ self._squares[columns].T
+        sum_xy = query_profiles @ profiles
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = sum_xy - sum_x * sum_y / n
+            variance_x = sum_xx - sum_x ** 2 / n
+            variance_y = sum_yy - sum_y ** 2 / n
+            correlation = covariance / np.sqrt(variance_x * variance_y)
+
+        # Profils constants ou trop peu de mois en commun: corrélation indéfinie
+        tolerance = 1e-12 * n
+        correlation[(n < min_overlap) | (variance_x <= tolerance) | (variance_y <= tolerance)] = np.nan
+        return correlation
+
+    def top_k(self, destinations=None, k=5, min_overlap=MIN_OVERLAP_MONTHS, block_size=CORRELATION_BLOCK_SIZE):
+        """
+        Destinations les plus corrélées à chaque destination requête.
+
+        Les requêtes sont traitées par blocs: la mémoire utilisée est
+        proportionnelle à block_size x N, quel que soit le nombre de requêtes.
+
+        Args:
+            destinations: Noms des destinations requêtes (toutes si None)
+            k: Nombre de destinations renvoyées par requête
+            min_overlap: Nombre minimum de mois en commun
+            block_size: Nombre de requêtes par bloc
+
+        Returns:
+            Dictionnaire {destination: [{'destination', 'correlation', 'overlap'}, ...]}, par corrélation décroissante
+        """
+        if destinations is None:
+            rows = np.arange(len(self.names))
+        else:
+            missing = [name for name in destinations if name not in self.index]
+            if missing:
+                logger.warning(f"Destinations sans profil de prix ignorées: {', '.join(missing)}")
+            rows = np.array([self.index[name] for name in destinations if name in self.index], dtype=np.int64)
+
+        results = {}
+        k = min(k, len(self.names) - 1)
+        if k <= 0:
+            return {self.names[row]: [] for row in rows}
+
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            correlation = self.correlate(block, min_overlap)
+
+            # La destination elle-même et les corrélations indéfinies sont exclues
+            correlation[np.arange(len(block)), block] = np.nan
+            scores = np.where(np.isnan(correlation), -np.inf, correlation)
+
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind='stable')
+            candidates = np.take_along_axis(candidates, order, axis=1)
+            overlaps = (self.mask[block][:, None, :] & self.mask[candidates]).sum(axis=2)
+
+            for i, row in enumerate(block):
+                results[self.names[row]] = [
+                    {
+                        'destination': self.names[other],
+                        'correlation': round(float(correlation[i, other]), 4),
+                        'overlap': int(overlap),
+                    }
+                    for other, overlap in zip(candidates[i], overlaps[i])
+                    if scores[i, other] > -np.inf
+                ]
+
+        return results
+
+    def nearest(self, destination, k=10, metric='cosine', min_price_ratio=None, max_price_ratio=None,
+                min_overlap=MIN_OVERLAP_MONTHS):
+        """
+        Destinations dont le profil saisonnier est le plus proche de celui d'une destination.
+
+        Les profils sont relatifs au niveau de prix de chaque destination: la
+        forme de la saison est comparée indépendamment du niveau, qui ne sert
+        qu'au filtre par rapport de prix. Seuls les mois observés des deux
+        côtés sont comparés.
+
+        Args:
+            destination: Nom de la destination requête
+            k: Nombre de destinations renvoyées
+            metric: 'cosine' (similarité des écarts à la moyenne) ou 'euclidean' (écart quadratique moyen)
+            min_price_ratio: Rapport minimum niveau candidat / niveau requête (ex: 0.5)
+            max_price_ratio: Rapport maximum niveau candidat / niveau requête (ex: 0.7 pour 30 % moins cher)
+            min_overlap: Nombre minimum de mois en commun
+
+        Returns:
+            Liste de dictionnaires (destination, score, price_ratio, avg_price, overlap), du plus proche au moins proche
+        """
+        if metric not in SEARCH_METRICS:
+            raise ValueError(f"Métrique inconnue: {metric} (disponibles: {', '.join(SEARCH_METRICS)})")
+        if destination not in self.index:
+            raise KeyError(destination)
+
+        row = self.index[destination]
+        query_weights = self._weights[row]
+        overlap = self._weights @ query_weights
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if metric == 'cosine':
+                query = self._deviations[row]
+                norms = np.sqrt((self._deviations ** 2) @ query_weights * (self._weights @ query ** 2))
+                scores = (self._deviations @ query) / norms
+                ranking = -scores
+            else:
+                query = self.profiles[row]
+                squared = self._squares @ query_weights + self._weights @ query ** 2 - 2 * (self.profiles @ query)
+                scores = np.sqrt(np.maximum(squared, 0) / overlap)
+                ranking = scores
+
+            price_ratios = self.levels / self.levels[row]
+
+        candidates = np.isfinite(ranking) & (overlap >= min_overlap)
+        candidates[row] = False
+        if min_price_ratio is not None:
+            candidates &= price_ratios >= min_price_ratio
+        if max_price_ratio is not None:
+            candidates &= price_ratios <= max_price_ratio
+
+        candidates = np.flatnonzero(candidates)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(ranking[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(ranking[candidates], kind='stable')]
+
+        return [
+            {
+                'destination': self.names[other],
+                'score': round(float(scores[other]), 4),
+                'price_ratio': round(float(price_ratios[other]), 3),
+                'avg_price': round(float(self.levels[other]), 2),
+                'overlap': int(overlap[other]),
+            }
+            for other in candidates
+        ]
+
+
+class ProfileIndex:
+    """
+    Index persistant des profils de prix mensuels (data/cache/profile_index.npz).
+    """
+
+    def __init__(self, data_dir):
+        """
+        Initialise l'index.
+
+        Args:
+            data_dir: Répertoire principal des données
+        """
+        self.path = Path(data_dir) / 'cache' / 'profile_index.npz'
+
+    def exists(self):
+        """Indique si l'index a déjà été construit"""
+        return self.path.exists()
+
+    def load(self):
+        """
+        Charge l'index (gardé en mémoire tant que le fichier n'a pas changé).
+
+        Returns:
+            ProfileMatrix ou None si l'index n'a pas été construit
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        key = str(self.path)
+        with _loaded_indexes_lock:
+            loaded = _loaded_indexes.get(key)
+            if loaded is not None and loaded[0] == mtime:
+                return loaded[1]
+
+        with np.load(self.path) as data:
+            # Index construit avant l'enregistrement des années: années inconnues
+            years = data['years'] if 'years' in data.files else None
+            profiles = ProfileMatrix(data['names'].tolist(), data['prices'], years)
+
+        with _loaded_indexes_lock:
+            _loaded_indexes[key] = (mtime, profiles)
+        return profiles
+
+    def _save(self, names, prices, years):
+        """Écrit l'index de façon atomique"""
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, names=np.array(names, dtype=str), prices=prices, years=years)
+        os.replace(tmp_path, self.path)
+
+    def rebuild(self, df, key='destination'):
+        """
+        Reconstruit l'index complet.
+
+        Args:
+            df: DataFrame avec les colonnes key, month (1-12), avg_price et year
+            key: Colonne identifiant la destination
+
+        Returns:
+            ProfileMatrix
+        """
+        profiles = ProfileMatrix.from_frame(df, key)
+        with file_lock(self.path):
+            self._save(profiles.names, profiles.prices, profiles.years)
+        logger.info(f"Index des profils de prix reconstruit: {len(profiles)} destinations")
+        return profiles
+
+    def update(self, destination, months, prices, year):
+        """
+        Remplace (ou ajoute) le profil d'une seule destination.
+
+        Comme pour rebuild, l'index garde la dernière année de chaque destination:
+        le profil n'est pas remplacé par les prix d'une année plus ancienne.
+        La lecture-modification-écriture du fichier se fait sous verrou, pour ne
+        pas perdre la mise à jour d'un autre processus.
+
+        Args:
+            destination: Nom de la destination
+            months: Mois (1-12)
+            prices: Prix moyens correspondants
+            year: Année des prix
+
+        Returns:
+            ProfileMatrix à jour, ou None si l'index n'a pas encore été construit
+        """
+        row = ProfileMatrix.from_frame(
+            pd.DataFrame({'destination': destination, 'month': months, 'avg_price': prices})
+        ).prices
+
+        with file_lock(self.path):
+            current = self.load()
+            if current is None or len(row) == 0:
+                return current
+
+            names, matrix, years = list(current.names), current.prices.copy(), current.years.copy()
+            if destination in current.index:
+                position = current.index[destination]
+                if years[position] > year:
+                    logger.debug(f"Profil de {destination} conservé: {years[position]} plus récent que {year}")
+                    return current
+                matrix[position] = row[0]
+                years[position] = year
+            else:
+                names.append(destination)
+                matrix = np.vstack([matrix, row])
+                years = np.append(years, year)
+
+            self._save(names, matrix, years)
+            return self.load()
@@ -7,6 +7,8 @@ import numpy as np
 import pandas as pd
 from collections import defaultdict
 
+from .similarity import ProfileMatrix
+
 # Configuration du logger
 logger = logging.getLogger('analyzer')
 
@@ -21,7 +23,7 @@ def calculate_basic_stats(prices):
     Returns:
         Dictionnaire contenant les statistiques
     """
-    if not prices or len(prices) == 0:
+    if prices is None or len(prices) == 0:
         logger.warning("Aucun prix fourni pour le calcul des statistiques")
         return {
             'mean': 0,
@@ -33,18 +35,303 @@ def calculate_basic_stats(prices):
             'coefficient_of_variation': 0
         }
 
-    prices_series = pd.Series(prices)
+    values = np.asarray(prices, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    mean, std = _mean_std(values)
+
+    return {
+        'mean': mean,
+        'median': np.median(values) if len(values) else np.nan,
+        'min': values.min() if len(values) else np.nan,
+        'max': values.max() if len(values) else np.nan,
+        'std': std,
+        'count': len(prices),
+        'coefficient_of_variation': std / mean * 100 if mean > 0 else 0
+    }
+
+
+def _mean_std(values):
+    """
+    Moyenne et écart-type (ddof=1) d'un tableau contigu, calculés une seule fois.
+
+    Les opérations sont celles de Series.mean() et Series.std(), ce qui donne
+    des résultats identiques au bit près.
+
+    Args:
+        values: Tableau numpy float64 sans NaN
+
+    Returns:
+        Tuple (moyenne, écart-type)
+    """
+    count = len(values)
+    if count == 0:
+        return np.nan, np.nan
+
+    mean = values.sum() / count
+    std = np.sqrt(((mean - values) ** 2).sum() / (count - 1)) if count > 1 else np.nan
+    return mean, std
+
+
+def _group_index_matrices(codes, n_groups):
+    """
+    Regroupe les positions des lignes par groupe, en une matrice par taille de groupe.
+
+    Args:
+        codes: Numéro de groupe de chaque ligne (0 à n_groups - 1)
+        n_groups: Nombre de groupes
+
+    Yields:
+        Tuples (numéros des groupes, matrice des positions de leurs lignes dans l'ordre d'origine)
+    """
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+
+    for size in np.unique(counts[counts > 0]):
+        groups = np.flatnonzero(counts == size)
+        yield groups, order[starts[groups][:, None] + np.arange(size)]
+
+
+def grouped_mean_std(codes, values, n_groups):
+    """
+    Moyenne et écart-type (ddof=1) de valeurs par groupe.
+
+    Les groupes de même taille sont empilés en matrice et réduits ligne par
+    ligne: l'ordre des additions est alors celui de Series.mean() et
+    Series.std(), ce qui donne des résultats identiques au bit près à un
+    calcul destination par destination (contrairement à groupby().mean()).
+
+    Args:
+        codes: Numéro de groupe de chaque valeur (0 à n_groups - 1)
+        values: Valeurs, dans l'ordre où elles seraient réduites par groupe
+        n_groups: Nombre de groupes
+
+    Returns:
+        Tuple (moyennes, écarts-types) de taille n_groups (NaN pour un groupe vide)
+    """
+    codes = np.asarray(codes)
+    values = np.asarray(values, dtype=np.float64)
+
+    valid = ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+
+    means = np.full(n_groups, np.nan)
+    stds = np.full(n_groups, np.nan)
+    for groups, positions in _group_index_matrices(codes, n_groups):
+        matrix = values[positions]
+        size = matrix.shape[1]
+        group_means = matrix.sum(axis=1) / size
+        means[groups] = group_means
+        if size > 1:
+            stds[groups] = np.sqrt(((group_means[:, None] - matrix) ** 2).sum(axis=1) / (size - 1))
+
+    return means, stds
+
+
+def grouped_argsort(codes, values, n_groups):
+    """
+    Ordre des lignes trié par groupe puis par valeur croissante.
+
+    Chaque groupe est trié avec le même algorithme (quicksort) que
+    Series.sort_values(), ce qui reproduit aussi l'ordre des ex aequo.
+
+    Args:
+        codes: Numéro de groupe de chaque valeur (0 à n_groups - 1)
+        values: Valeurs à trier
+        n_groups: Nombre de groupes
+
+    Returns:
+        Positions des lignes, groupe par groupe dans l'ordre des numéros
+    """
+    codes = np.asarray(codes)
+    values = np.asarray(values, dtype=np.float64)
+
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    ranked = np.empty(len(codes), dtype=np.intp)
+
+    for groups, positions in _group_index_matrices(codes, n_groups):
+        order = np.argsort(values[positions], axis=1, kind='quicksort')
+        ranked[starts[groups][:, None] + np.arange(positions.shape[1])] = \
+            np.take_along_axis(positions, order, axis=1)
+
+    return ranked
+
+
+def month_recommendations(codes, n_groups, month_names, avg_prices, seasons):
+    """
+    Classe en une passe les mois de plusieurs destinations (bonne affaire, équilibré, à éviter).
+
+    Un mois est une bonne affaire sous 0.85 fois la moyenne annuelle de sa
+    destination, à éviter au-dessus de 1.15 fois, équilibré entre les deux.
+    Les catégories, écarts et pourcentages de toutes les lignes sont calculés
+    en une seule opération vectorisée (np.select); seul l'assemblage des
+    dictionnaires parcourt les lignes, une fois, dans l'ordre des prix.
+
+    Args:
+        codes: Numéro de destination de chaque ligne (0 à n_groups - 1)
+        n_groups: Nombre de destinations
+        month_names: Noms des mois
+        avg_prices: Prix moyens
+        seasons: Saisons
+
+    Returns:
+        Liste (une entrée par destination) de dictionnaires de même forme que
+        calculate_month_recommendation
+    """
+    codes = np.asarray(codes)
+    month_names = np.asarray(month_names, dtype=object)
+    prices = np.asarray(avg_prices, dtype=np.float64)
+    seasons = np.asarray(seasons).astype(str)
+
+    means, _ = grouped_mean_std(codes, prices, n_groups)
+    mean = means[codes]
+
+    # 0: best_value, 1: balanced, 2: avoid, -1: prix manquant
+    categories = np.select(
+        [prices < 0.85 * mean, prices > 1.15 * mean, prices >= 0.85 * mean], [0, 2, 1], default=-1
+    )
+    with np.errstate(invalid='ignore', divide='ignore'):
+        difference = prices - mean
+        rounded_prices = np.round(prices, 2)
+        rounded_differences = np.round(difference, 2)
+        percentages = np.round(difference / mean * 100, 1)
+
+    results = [{'best_value': [], 'balanced': [], 'avoid': []} for _ in range(n_groups)]
+    for row in grouped_argsort(codes, prices, n_groups):
+        category = categories[row]
+        if category == 0:
+            results[codes[row]]['best_value'].append({
+                'month': month_names[row],
+                'price': rounded_prices[row],
+                'saving': -rounded_differences[row],
+                'saving_percentage': -percentages[row],
+                'season': seasons[row]
+            })
+        elif category == 1:
+            results[codes[row]]['balanced'].append({
+                'month': month_names[row],
+                'price': rounded_prices[row],
+                'diff_from_avg': rounded_differences[row],
+                'diff_percentage': percentages[row],
+                'season': seasons[row]
+            })
+        elif category == 2:
+            results[codes[row]]['avoid'].append({
+                'month': month_names[row],
+                'price': rounded_prices[row],
+                'premium': rounded_differences[row],
+                'premium_percentage': percentages[row],
+                'season': seasons[row]
+            })
+
+    return results
+
+
+def monthly_price_statistics(month_names, avg_prices, median_prices, seasons):
+    """
+    Calcule en une passe toutes les statistiques d'une série de prix mensuels.
+
+    Chaque agrégat (moyenne, écart-type, extrêmes, médiane, classement,
+    statistiques par saison) est calculé une seule fois à partir de tableaux
+    numpy contigus, sans itération sur les lignes d'un DataFrame.
+
+    Args:
+        month_names: Noms des mois (ou libellés des périodes)
+        avg_prices: Prix moyens
+        median_prices: Prix médians
+        seasons: Saisons
+
+    Returns:
+        Dictionnaire des statistiques (même forme que calculate_monthly_statistics)
+    """
+    month_names = np.asarray(month_names, dtype=object)
+    prices = np.asarray(avg_prices, dtype=np.float64)
+    median_prices = np.asarray(median_prices, dtype=np.float64)
+    seasons = np.asarray(seasons).astype(str)
+
+    valid = ~np.isnan(prices)
+    if not valid.all():
+        month_names, prices, median_prices, seasons = (
+            month_names[valid], prices[valid], median_prices[valid], seasons[valid]
+        )
+
+    if len(prices) == 0:
+        return {}
+
+    # Un seul tri sert au classement, aux extrêmes et à la médiane
+    order = np.argsort(prices, kind='quicksort')
+    sorted_prices = prices[order]
+    count = len(prices)
+    mean, std = _mean_std(prices)
+    median = (sorted_prices[(count - 1) // 2] + sorted_prices[count // 2]) / 2
+
+    # Première occurrence des extrêmes (comme idxmin / idxmax)
+    cheapest, most_expensive = int(np.argmin(prices)), int(np.argmax(prices))
+    potential_savings = prices[most_expensive] - prices[cheapest]
+
+    # Statistiques par saison (saisons triées, mois dans l'ordre des lignes)
+    season_names, season_codes = np.unique(seasons, return_inverse=True)
+    season_stats = np.empty((len(season_names), 3))
+    season_months = []
+    for code in range(len(season_names)):
+        mask = season_codes == code
+        season_prices = prices[mask]
+        season_stats[code] = (season_prices.sum() / len(season_prices), season_prices.min(), season_prices.max())
+        season_months.append(', '.join(month_names[mask]))
+
+    # Tous les agrégats sont arrondis en une seule opération vectorisée
+    with np.errstate(divide='ignore', invalid='ignore'):
+        (cheapest_price, cheapest_median, expensive_price, expensive_median, savings, savings_pct,
+         annual_mean, annual_median, annual_std, annual_min, annual_max, cv) = np.round([
+            prices[cheapest], median_prices[cheapest], prices[most_expensive], median_prices[most_expensive],
+            potential_savings, potential_savings / prices[most_expensive] * 100,
+            mean, median, std, sorted_prices[0], sorted_prices[-1], std / mean * 100,
+        ], 2)
+    season_stats = np.round(season_stats, 2)
 
     stats = {
-        'mean': prices_series.mean(),
-        'median': prices_series.median(),
-        'min': prices_series.min(),
-        'max': prices_series.max(),
-        'std': prices_series.std(),
-        'count': len(prices_series),
-        'coefficient_of_variation': prices_series.std() / prices_series.mean() * 100 if prices_series.mean() > 0 else 0
+        'cheapest_month': {
+            'name': month_names[cheapest],
+            'avg_price': cheapest_price,
+            'median_price': cheapest_median,
+            'season': seasons[cheapest]
+        },
+        'most_expensive_month': {
+            'name': month_names[most_expensive],
+            'avg_price': expensive_price,
+            'median_price': expensive_median,
+            'season': seasons[most_expensive]
+        },
+        'potential_savings': savings,
+        'savings_percentage': savings_pct if prices[most_expensive] > 0 else 0,
+        'season_analysis': {
+            season: {
+                'avg_price': season_avg,
+                'min_price': season_min,
+                'max_price': season_max,
+                'months': months,
+            }
+            for season, (season_avg, season_min, season_max), months
+            in zip(season_names, season_stats, season_months)
+        },
+        # Variation de prix annuelle
+        'annual_variation': {
+            'mean': annual_mean,
+            'median': annual_median,
+            'std': annual_std,
+            'min': annual_min,
+            'max': annual_max,
+            'coefficient_of_variation': cv if mean > 0 else 0
+        },
     }
 
+    # Liste de tous les mois ordonnés par prix
+    stats['price_ranking'] = [
+        {'month': month, 'price': round(price, 2), 'season': season}
+        for month, price, season in zip(month_names[order], sorted_prices.tolist(), seasons[order])
+    ]
+
     return stats
 
 
@@ -63,71 +350,12 @@ def calculate_monthly_statistics(df):
         return {}
 
     try:
-        stats = {}
-
-        # Informations sur le mois le moins cher
-        cheapest_month = df.loc[df['avg_price'].idxmin()]
-        stats['cheapest_month'] = {
-            'name': cheapest_month['month_name'],
-            'avg_price': round(cheapest_month['avg_price'], 2),
-            'median_price': round(cheapest_month['median_price'], 2),
-            'season': cheapest_month['season']
-        }
-
-        # Informations sur le mois le plus cher
-        most_expensive_month = df.loc[df['avg_price'].idxmax()]
-        stats['most_expensive_month'] = {
-            'name': most_expensive_month['month_name'],
-            'avg_price': round(most_expensive_month['avg_price'], 2),
-            'median_price': round(most_expensive_month['median_price'], 2),
-            'season': most_expensive_month['season']
-        }
-
-        # Économie potentielle
-        potential_savings = most_expensive_month['avg_price'] - cheapest_month['avg_price']
-        stats['potential_savings'] = round(potential_savings, 2)
-        stats['savings_percentage'] = round(
-            (potential_savings / most_expensive_month['avg_price']) * 100, 2
-        ) if most_expensive_month['avg_price'] > 0 else 0
-
-        # Statistiques par saison
-        season_stats = df.groupby('season').agg({
-            'avg_price': ['mean', 'min', 'max'],
-            'month_name': lambda x: ', '.join(x),
-        }).reset_index()
-
-        stats['season_analysis'] = {}
-        for _, row in season_stats.iterrows():
-            season = row['season']
-            stats['season_analysis'][season] = {
-                'avg_price': round(row[('avg_price', 'mean')], 2),
-                'min_price': round(row[('avg_price', 'min')], 2),
-                'max_price': round(row[('avg_price', 'max')], 2),
-                'months': row[('month_name', '<lambda>')],
-            }
-
-        # Variation de prix annuelle
-        stats['annual_variation'] = {
-            'mean': round(df['avg_price'].mean(), 2),
-            'median': round(df['avg_price'].median(), 2),
-            'std': round(df['avg_price'].std(), 2),
-            'min': round(df['avg_price'].min(), 2),
-            'max': round(df['avg_price'].max(), 2),
-            'coefficient_of_variation': round(
-                (df['avg_price'].std() / df['avg_price'].mean()) * 100, 2
-            ) if df['avg_price'].mean() > 0 else 0
-        }
-
-        # Créer une liste de tous les mois ordonnés par prix
-        price_ranking = df.sort_values('avg_price')[['month_name', 'avg_price', 'season']]
-        stats['price_ranking'] = []
-
-        for _, row in price_ranking.iterrows():
-            stats['price_ranking'].append({
-                'month': row['month_name'],
-                'price': round(row['avg_price'], 2),
-                'season': row['season']
-            })
+        stats = monthly_price_statistics(
+            df['month_name'].to_numpy(),
+            df['avg_price'].to_numpy(dtype=np.float64),
+            df['median_price'].to_numpy(dtype=np.float64),
+            df['season'].to_numpy()
+        )
 
         logger.info("Statistiques mensuelles calculées avec succès")
         return stats
@@ -137,12 +365,13 @@ def calculate_monthly_statistics(df):
         return {}
 
 
-def calculate_comparison_statistics(destinations_data):
+def calculate_comparison_statistics(destinations_data, top_k=5):
     """
     Calcule des statistiques comparatives entre plusieurs destinations.
 
     Args:
         destinations_data: Dict avec les destinations comme clés et DataFrame comme valeurs
+        top_k: Nombre de destinations corrélées renvoyées pour chaque destination
 
     Returns:
         Dictionnaire contenant les statistiques comparatives
@@ -216,27 +445,10 @@ def calculate_comparison_statistics(destinations_data):
                 **best_savings_dest[1]
             }
 
-        # Créer une matrice de corrélation si nous avons plusieurs destinations
+        # Destinations aux profils mensuels les plus corrélés (mois manquants exclus paire par paire)
         if len(destinations_data) > 1:
-            # Créer un DataFrame combiné avec les prix moyens mensuels
-            combined_df = pd.DataFrame()
-
-            for dest_name, df in destinations_data.items():
-                if df is None or df.empty:
-                    continue
-
-                # Ajouter une colonne avec les prix moyens mensuels pour cette destination
-                combined_df[dest_name] = df.sort_values('month')['avg_price'].values
-
-            # Calculer la matrice de corrélation
-            if not combined_df.empty and combined_df.shape[1] > 1:
-                corr_matrix = combined_df.corr()
-
-                # Convertir la matrice en dictionnaire
-                for dest1 in corr_matrix.index:
-                    stats['price_correlation'][dest1] = {}
-                    for dest2 in corr_matrix.columns:
-                        stats['price_correlation'][dest1][dest2] = round(corr_matrix.loc[dest1, dest2], 2)
+            profiles = ProfileMatrix.from_frames(destinations_data)
+            stats['price_correlation'] = profiles.top_k(k=top_k)
 
         logger.info("Statistiques comparatives calculées avec succès")
         return stats
@@ -261,53 +473,16 @@ def calculate_month_recommendation(df):
         return {}
 
     try:
-        # Calculer le prix moyen annuel et l'écart-type
-        avg_price = df['avg_price'].mean()
-        std_price = df['avg_price'].std()
-
-        # Classer les mois par prix croissant
-        df_sorted = df.sort_values('avg_price')
-
-        recommendations = {
-            'best_value': [],
-            'balanced': [],
-            'avoid': []
-        }
-
-        # Les mois à moins de 0.85 * moyenne sont considérés comme "best_value"
-        for _, row in df_sorted[df_sorted['avg_price'] < 0.85 * avg_price].iterrows():
-            recommendations['best_value'].append({
-                'month': row['month_name'],
-                'price': round(row['avg_price'], 2),
-                'saving': round(avg_price - row['avg_price'], 2),
-                'saving_percentage': round((avg_price - row['avg_price']) / avg_price * 100, 1),
-                'season': row['season']
-            })
-
-        # Les mois entre 0.85 et 1.15 * moyenne sont considérés comme "balanced"
-        for _, row in df_sorted[(df_sorted['avg_price'] >= 0.85 * avg_price) &
-                                (df_sorted['avg_price'] <= 1.15 * avg_price)].iterrows():
-            recommendations['balanced'].append({
-                'month': row['month_name'],
-                'price': round(row['avg_price'], 2),
-                'diff_from_avg': round(row['avg_price'] - avg_price, 2),
-                'diff_percentage': round((row['avg_price'] - avg_price) / avg_price * 100, 1),
-                'season': row['season']
-            })
-
-        # Les mois à plus de 1.15 * moyenne sont considérés comme "avoid"
-        for _, row in df_sorted[df_sorted['avg_price'] > 1.15 * avg_price].iterrows():
-            recommendations['avoid'].append({
-                'month': row['month_name'],
-                'price': round(row['avg_price'], 2),
-                'premium': round(row['avg_price'] - avg_price, 2),
-                'premium_percentage': round((row['avg_price'] - avg_price) / avg_price * 100, 1),
-                'season': row['season']
-            })
+        recommendations = month_recommendations(
+            np.zeros(len(df), dtype=np.intp), 1,
+            df['month_name'].to_numpy(),
+            df['avg_price'].to_numpy(dtype=np.float64),
+            df['season'].to_numpy()
+        )[0]
 
         logger.info("Recommandations calculées avec succès")
         return recommendations
 
     except Exception as e:
         logger.error(f"Erreur lors du calcul des recommandations: {str(e)}")
-        return {}
\ No newline at end of file
+        return {}
@@ -0,0 +1,276 @@
+"""
+Stockage typé des jeux de données bruts et traités.
+
+Les données sont écrites au format Parquet avec un schéma déclaré: entiers
+compacts pour les compteurs et les mois, float32 pour les prix unitaires et
+les indicateurs dérivés, colonnes catégorielles (encodées en dictionnaire)
+pour les libellés répétés comme le nom du mois ou la saison. La lecture peut
+se limiter à certaines colonnes. Les DataFrames gardent ces types en mémoire:
+le traitement (process_data, process_batch) et le chargement de l'historique
+appliquent le même schéma, et memory_report mesure l'occupation par colonne.
+
+pyarrow est une dépendance optionnelle: sans lui, les données restent écrites
+en CSV, et le même schéma est appliqué à la lecture. Le CSV reste disponible
+comme format d'export.
+"""
+
+import io
+import os
+import logging
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: pas de verrou de fichier entre processus
+    fcntl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Stockage Parquet indisponible, repli sur le CSV
+    pa = None
+    pq = None
+
+# Configuration du logger
+logger = logging.getLogger('analyzer')
+
+# Formats de stockage pris en charge (extension des fichiers)
+STORAGE_FORMATS = ('parquet', 'csv')
+
+# Format utilisé pour les nouveaux fichiers
+DEFAULT_STORAGE_FORMAT = 'parquet' if pq is not None else 'csv'
+
+# Schéma des données brutes du scraper.
+# Les prix moyens et médians restent en float64: ce sont des agrégats dont les
+# statistiques sont arrondies au centime, un float32 pourrait changer l'arrondi.
+# Les prix minimum et maximum sont des prix d'annonces, exacts en float32.
+RAW_SCHEMA = {
+    'month': 'uint8',
+    'month_name': 'category',
+    'year': 'uint16',
+    'avg_price': 'float64',
+    'median_price': 'float64',
+    'min_price': 'float32',
+    'max_price': 'float32',
+    'sample_size': 'uint16',
+    'sampled_dates': 'uint16',
+    # Dates au format texte, répétées d'une exécution à l'autre dans l'historique
+    'check_in': 'category',
+    'check_out': 'category',
+}
+
+# Schéma des données traitées (données brutes et colonnes calculées par process_data)
+PROCESSED_SCHEMA = {
+    **RAW_SCHEMA,
+    'price_range': 'float32',
+    'relative_price': 'float32',
+    'season': 'category',
+    'is_cheapest': 'bool',
+    # Rang moyen des mois ex aequo (x.5): pas d'entier
+    'price_rank': 'float32',
+    'pct_diff_from_max': 'float32',
+    'pct_diff_from_min': 'float32',
+}
+
+# Colonnes des annonces identifiées ajoutées par le scraper à ses résultats (hors données brutes),
+# avec une colonne run_id, pour l'instantané des annonces (analyzer.churn)
+LISTING_COLUMNS = ['listing_ids', 'listing_prices', 'listing_coordinates']
+
+SCHEMAS = {
+    'raw': RAW_SCHEMA,
+    'processed': PROCESSED_SCHEMA,
+}
+
+# Colonnes identifiant la destination ou l'exécution dans les DataFrames au
+# format long (lots de destinations, historique): une valeur répétée par ligne
+KEY_SCHEMA = {
+    'destination': 'category',
+    'run_id': 'category',
+}
+
+
+def resolve_format(storage_format=None):
+    """
+    Détermine le format de stockage effectif.
+
+    Args:
+        storage_format: 'parquet', 'csv' ou None (format par défaut)
+
+    Returns:
+        Format de stockage ('parquet' n'est retenu que si pyarrow est installé)
+    """
+    storage_format = storage_format or DEFAULT_STORAGE_FORMAT
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError(f"Format de stockage inconnu: {storage_format}")
+
+    if storage_format == 'parquet' and pq is None:
+        logger.warning("pyarrow n'est pas installé, données enregistrées en CSV")
+        return 'csv'
+    return storage_format
+
+
+def apply_schema(df, schema):
+    """
+    Convertit les colonnes d'un DataFrame aux types déclarés.
+
+    Les colonnes absentes du schéma sont conservées telles quelles. Une colonne
+    entière contenant des valeurs manquantes est convertie en float32, une
+    colonne dont les valeurs dépassent la capacité du type déclaré en int64.
+    Les colonnes catégorielles issues d'une concaténation de catégories
+    différentes (repassées en object par pandas) sont de nouveau converties.
+
+    Args:
+        df: DataFrame à convertir
+        schema: Dictionnaire {colonne: type}
+
+    Returns:
+        DataFrame converti
+    """
+    converted = {}
+    for column, dtype in schema.items():
+        if column not in df.columns or dtype == 'str':
+            continue
+
+        series = df[column]
+        if dtype == 'category':
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                converted[column] = series.astype('category')
+            continue
+
+        if dtype == 'bool':
+            if series.dtype != bool:
+                converted[column] = series.astype(bool)
+            continue
+
+        if series.dtype == dtype:
+            continue
+
+        series = pd.to_numeric(series, errors='coerce')
+        if pd.api.types.is_integer_dtype(dtype):
+            if series.isna().any():
+                dtype = 'float32'
+            elif len(series) and (series.min() < np.iinfo(dtype).min or series.max() > np.iinfo(dtype).max):
+                dtype = 'int64'
+        converted[column] = series.astype(dtype)
+
+    return df.assign(**converted) if converted else df
+
+
+def memory_report(df):
+    """
+    Mémoire occupée par chaque colonne d'un DataFrame.
+
+    Args:
+        df: DataFrame à mesurer
+
+    Returns:
+        DataFrame (colonne, type, octets, part du total) trié par taille décroissante
+    """
+    usage = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[column].dtype) for column in usage.index],
+        'bytes': usage.to_numpy(),
+    })
+    total = report['bytes'].sum()
+    report['share'] = (report['bytes'] / total * 100).round(1) if total else 0.0
+    return report.sort_values('bytes', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def to_bytes(df, schema, storage_format=None):
+    """
+    Sérialise un DataFrame au format de stockage.
+
+    Args:
+        df: DataFrame à sérialiser
+        schema: Dictionnaire {colonne: type}
+        storage_format: 'parquet', 'csv' ou None (format par défaut)
+
+    Returns:
+        Tuple (contenu binaire, extension du fichier)
+    """
+    storage_format = resolve_format(storage_format)
+
+    if storage_format == 'csv':
+        return df.to_csv(index=False).encode('utf-8'), 'csv'
+
+    table = pa.Table.from_pandas(apply_schema(df, schema), preserve_index=False)
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression='zstd')
+    return buffer.getvalue(), 'parquet'
+
+
+def read_table(file_path, schema, columns=None):
+    """
+    Lit un fichier de données (Parquet ou CSV) avec son schéma.
+
+    Args:
+        file_path: Chemin du fichier
+        schema: Dictionnaire {colonne: type}
+        columns: Colonnes à lire (toutes si None); seules ces colonnes sont décodées
+
+    Returns:
+        DataFrame typé
+    """
+    if Path(file_path).suffix == '.parquet':
+        if pq is None:
+            raise ImportError("pyarrow est nécessaire pour lire les fichiers Parquet")
+        parquet_file = pq.ParquetFile(file_path)
+        if columns is not None:
+            available = set(parquet_file.schema_arrow.names)
+            columns = [column for column in columns if column in available]
+        df = parquet_file.read(columns=columns).to_pandas()
+    else:
+        usecols = (lambda column: column in columns) if columns is not None else None
+        df = pd.read_csv(file_path, usecols=usecols)
+
+    return apply_schema(df, schema)
+
+
+def export_csv(file_path, output_path, schema=None):
+    """
+    Exporte un fichier de données en CSV.
+
+    Args:
+        file_path: Chemin du fichier à exporter (Parquet ou CSV)
+        output_path: Chemin du fichier CSV à écrire
+        schema: Dictionnaire {colonne: type} (aucune conversion si None)
+
+    Returns:
+        Chemin du fichier CSV
+    """
+    output_path = Path(output_path)
+    os.makedirs(output_path.parent, exist_ok=True)
+
+    read_table(file_path, schema or {}).to_csv(output_path, index=False)
+    logger.info(f"Données exportées en CSV: {output_path}")
+    return output_path
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Verrou exclusif entre processus (fcntl.flock) autour d'une lecture-modification-écriture.
+
+    Le verrou porte sur un fichier voisin (<fichier>.lock): les fichiers eux-mêmes
+    sont remplacés atomiquement par os.replace et ne peuvent pas porter le verrou.
+    Sans fcntl (Windows), seul le remplacement atomique est garanti.
+
+    Args:
+        path: Chemin du fichier protégé
+    """
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+
+    with open(path.with_name(path.name + '.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
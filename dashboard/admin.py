@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Destination, PriceData, AnalysisResult, ScrapingJob
+from .models import Destination, PriceData, AnalysisResult, ScrapingJob, AnomalyOverride
+from .services import revalidate_results
 
 @admin.register(Destination)
 class DestinationAdmin(admin.ModelAdmin):
@@ -10,8 +11,32 @@ class DestinationAdmin(admin.ModelAdmin):
 
 @admin.register(PriceData)
 class PriceDataAdmin(admin.ModelAdmin):
-    list_display = ('destination', 'month_name', 'year', 'avg_price', 'is_cheapest')
-    list_filter = ('year', 'month', 'season', 'is_cheapest')
+    list_display = ('destination', 'month_name', 'year', 'avg_price', 'sample_size', 'is_cheapest',
+                    'anomaly_status', 'anomaly_score', 'anomaly_reason')
+    list_filter = ('anomaly_status', 'year', 'month', 'season', 'is_cheapest')
+    search_fields = ('destination__name',)
+    actions = ['mark_as_valid']
+
+    @admin.action(description="Marquer les mois sélectionnés comme valides")
+    def mark_as_valid(self, request, queryset):
+        # La validation est conservée: les retraitements suivants ne signalent plus ces mois
+        analyses = {}
+        rows = queryset.exclude(anomaly_status='ok').select_related('destination')
+        for row in rows:
+            AnomalyOverride.objects.get_or_create(destination=row.destination, year=row.year, month=row.month)
+            analyses[(row.destination_id, row.year)] = row.destination
+
+        # Statistiques, prix relatifs et classement recalculés avec les mois validés
+        for (_, year), destination in analyses.items():
+            revalidate_results(destination, year)
+
+        self.message_user(request, f"{len(rows)} mois marqués comme valides, "
+                                   f"{len(analyses)} analyses recalculées.")
+
+@admin.register(AnomalyOverride)
+class AnomalyOverrideAdmin(admin.ModelAdmin):
+    list_display = ('destination', 'year', 'month', 'created_at')
+    list_filter = ('year',)
     search_fields = ('destination__name',)
 
 @admin.register(AnalysisResult)
@@ -23,7 +48,7 @@ class AnalysisResultAdmin(admin.ModelAdmin):
 
 @admin.register(ScrapingJob)
 class ScrapingJobAdmin(admin.ModelAdmin):
-    list_display = ('destination', 'status', 'scheduled_time', 'started_at', 'completed_at')
+    list_display = ('destination', 'status', 'scheduled_time', 'started_at', 'completed_at', 'merged_into')
     list_filter = ('status',)
     search_fields = ('destination__name',)
     readonly_fields = ('created_at', 'updated_at')
\ No newline at end of file
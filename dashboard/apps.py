@@ -1,5 +1,8 @@
+import logging
 from django.apps import AppConfig
 
+logger = logging.getLogger('django')
+
 
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -12,4 +15,11 @@ class DashboardConfig(AppConfig):
         Peut être utilisée pour configurer des signaux, des tâches périodiques, etc.
         """
         # Import pour éviter les imports circulaires
-        import dashboard.signals  # noqa
\ No newline at end of file
+        import dashboard.signals  # noqa
+
+        # Dépendances facultatives (requirements.txt): signaler une seule fois le repli utilisé
+        from analyzer import explorer, storage
+        if storage.pq is None:
+            logger.warning("pyarrow n'est pas installé: données enregistrées et lues en CSV")
+        if explorer.duckdb is None:
+            logger.warning("duckdb n'est pas installé: l'explorateur SQL utilise SQLite en mémoire")
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from dashboard.models import Destination
+from analyzer.history import compact_history, DEFAULT_RETENTION_DAYS, DEFAULT_RETENTION_WEEKS
+
+
+class Command(BaseCommand):
+    help = "Compacte les fichiers de données horodatés dans l'historique partitionné (data/history)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--destination',
+            dest='destination_id',
+            help='ID de la destination à compacter (toutes les destinations du manifest par défaut)'
+        )
+
+        parser.add_argument(
+            '--kind',
+            choices=['raw', 'processed'],
+            default=None,
+            help='Type de données à compacter (défaut: les deux)'
+        )
+
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=DEFAULT_RETENTION_DAYS,
+            help=f'Conserver toutes les exécutions de moins de N jours (défaut: {DEFAULT_RETENTION_DAYS})'
+        )
+
+        parser.add_argument(
+            '--keep-weeks',
+            type=int,
+            default=DEFAULT_RETENTION_WEEKS,
+            help='Conserver ensuite une exécution par semaine pendant N semaines, puis une par mois '
+                 f'(défaut: {DEFAULT_RETENTION_WEEKS})'
+        )
+
+        parser.add_argument(
+            '--keep-sources',
+            action='store_true',
+            help='Ne pas supprimer les fichiers compactés'
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Afficher le résultat de la compaction sans rien écrire ni supprimer'
+        )
+
+    def handle(self, *args, **options):
+        """Point d'entrée de la commande"""
+        destinations = None
+        destination_id = options.get('destination_id')
+        if destination_id:
+            try:
+                destinations = [Destination.objects.get(id=destination_id).name]
+            except Destination.DoesNotExist:
+                raise CommandError(f"Destination avec ID {destination_id} introuvable")
+
+        kinds = [options['kind']] if options.get('kind') else ['raw', 'processed']
+
+        summaries = compact_history(
+            settings.DATA_DIR,
+            destinations,
+            kinds,
+            daily_days=options['keep_days'],
+            weekly_weeks=options['keep_weeks'],
+            delete_sources=not options['keep_sources'],
+            dry_run=options['dry_run'],
+        )
+
+        if not summaries:
+            self.stdout.write(self.style.WARNING("Aucun fichier de données à compacter"))
+            return
+
+        prefix = "[simulation] " if options['dry_run'] else ""
+        for summary in summaries:
+            self.stdout.write(
+                f"{prefix}{summary['destination']} ({summary['kind']}): {summary['files']} fichiers, "
+                f"{summary['runs']} exécutions, {summary['duplicates']} doublons, {summary['expired']} expirées, "
+                f"{summary['partitions']} partitions écrites, {summary['deleted']} fichiers supprimés"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Compaction terminée ({len(summaries)} jeux de données)"))
@@ -0,0 +1,76 @@
+import os
+import logging
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from dashboard.models import Destination
+from analyzer.manifest import DataManifest
+from analyzer.storage import SCHEMAS, export_csv
+
+logger = logging.getLogger('django')
+
+
+class Command(BaseCommand):
+    help = 'Exporte en CSV les dernières données brutes ou traitées des destinations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--destination',
+            dest='destination_id',
+            help='ID de la destination à exporter'
+        )
+
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            dest='all_destinations',
+            help='Exporter toutes les destinations'
+        )
+
+        parser.add_argument(
+            '--kind',
+            choices=['raw', 'processed'],
+            default='processed',
+            help='Données à exporter (défaut: processed)'
+        )
+
+        parser.add_argument(
+            '--output',
+            default=os.path.join(settings.DATA_DIR, 'exports'),
+            help='Répertoire des fichiers CSV (défaut: data/exports)'
+        )
+
+    def handle(self, *args, **options):
+        """Point d'entrée de la commande"""
+        destination_id = options.get('destination_id')
+        kind = options['kind']
+
+        if destination_id:
+            try:
+                destinations = [Destination.objects.get(id=destination_id)]
+            except Destination.DoesNotExist:
+                raise CommandError(f"Destination avec ID {destination_id} introuvable")
+        elif options.get('all_destinations'):
+            destinations = list(Destination.objects.all())
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Veuillez spécifier une destination (--destination) ou utiliser --all pour toutes les destinations")
+            )
+            return
+
+        manifest = DataManifest(settings.DATA_DIR)
+
+        for destination in destinations:
+            latest_file = manifest.latest(kind, destination.name)
+            if latest_file is None:
+                self.stdout.write(self.style.WARNING(f"Aucune donnée {kind} pour {destination.name}"))
+                continue
+
+            # Même nom que le fichier stocké (destination et horodatage), extension .csv
+            output_path = os.path.join(options['output'], f"{latest_file.stem}.csv")
+            try:
+                export_csv(latest_file, output_path, SCHEMAS[kind])
+                self.stdout.write(self.style.SUCCESS(f"{destination.name}: {output_path}"))
+            except Exception as e:
+                logger.error(f"Erreur lors de l'export de {destination.name}: {str(e)}")
+                self.stdout.write(self.style.ERROR(f"Erreur lors de l'export de {destination.name}: {str(e)}"))
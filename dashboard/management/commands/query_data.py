@@ -0,0 +1,105 @@
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from analyzer.explorer import get_explorer, ENGINES, MAX_ROW_LIMIT
+
+
+class Command(BaseCommand):
+    help = "Exécute une requête SQL de lecture sur les fichiers de données (vues raw, processed, history...)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sql',
+            nargs='?',
+            help='Requête SQL (SELECT ou WITH)'
+        )
+
+        parser.add_argument(
+            '--file',
+            help='Fichier contenant la requête SQL'
+        )
+
+        parser.add_argument(
+            '--tables',
+            action='store_true',
+            help='Afficher les vues disponibles et leurs colonnes'
+        )
+
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=settings.SQL_EXPLORER_ROW_LIMIT,
+            help=f'Nombre maximal de lignes affichées (défaut: {settings.SQL_EXPLORER_ROW_LIMIT}, '
+                 f'au plus {MAX_ROW_LIMIT})'
+        )
+
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=settings.SQL_EXPLORER_TIMEOUT,
+            help=f'Délai maximal d\'exécution en secondes (défaut: {settings.SQL_EXPLORER_TIMEOUT})'
+        )
+
+        parser.add_argument(
+            '--engine',
+            choices=ENGINES,
+            default=None,
+            help='Moteur de requêtes (défaut: duckdb s\'il est installé, sqlite sinon)'
+        )
+
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.SQL_EXPLORER_THREADS,
+            help='Nombre de threads de DuckDB (défaut: tous les cœurs)'
+        )
+
+        parser.add_argument(
+            '--format',
+            choices=['table', 'csv', 'json'],
+            default='table',
+            help='Format du résultat (défaut: table)'
+        )
+
+    def handle(self, *args, **options):
+        """Point d'entrée de la commande"""
+        try:
+            explorer = get_explorer(settings.DATA_DIR, options['engine'], options['threads'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['tables']:
+            for view, info in explorer.tables().items():
+                self.stdout.write(f"{view} ({info['files']} fichiers): {info['description']}")
+                self.stdout.write(f"    {', '.join(info['columns'])}")
+            return
+
+        sql = options.get('sql')
+        if options.get('file'):
+            try:
+                with open(options['file'], encoding='utf-8') as f:
+                    sql = f.read()
+            except OSError as e:
+                raise CommandError(f"Lecture de {options['file']} impossible: {str(e)}")
+        if not sql:
+            raise CommandError("Requête SQL manquante (argument, --file ou --tables)")
+
+        try:
+            result = explorer.query(sql, limit=options['limit'], timeout=options['timeout'])
+        except (ValueError, TimeoutError) as e:
+            raise CommandError(str(e))
+
+        df = pd.DataFrame(result['rows'], columns=result['columns'])
+        if options['format'] == 'csv':
+            self.stdout.write(df.to_csv(index=False), ending='')
+        elif options['format'] == 'json':
+            self.stdout.write(df.to_json(orient='records', date_format='iso', force_ascii=False))
+        else:
+            with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', None):
+                self.stdout.write(df.to_string(index=False))
+
+        # Résumé sur stderr pour garder une sortie CSV/JSON exploitable
+        suffix = f" (tronqué à {result['row_count']} lignes, voir --limit)" if result['truncated'] else ""
+        self.stderr.write(self.style.SUCCESS(
+            f"{result['row_count']} lignes en {result['seconds']} s ({result['engine']}){suffix}"
+        ))
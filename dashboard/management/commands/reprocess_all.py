@@ -0,0 +1,179 @@
+import os
+import time
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from dashboard.models import Destination, AnomalyOverride
+from dashboard.services import save_results, rebuild_profile_index
+from analyzer.reprocess import reprocess_destinations
+from analyzer.forecast import ForecastModels
+from analyzer.anomalies import screen_results
+
+logger = logging.getLogger('django')
+
+# Nombre maximum de destinations par lot envoyé à un processus
+MAX_CHUNK_SIZE = 32
+
+
+class Command(BaseCommand):
+    help = "Retraite les données brutes de toutes les destinations en parallèle et met à jour la base de données"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Nombre de processus de traitement (défaut: nombre de processeurs; 1 pour tout traiter sur place)'
+        )
+
+        parser.add_argument(
+            '--since',
+            help="Ne retraiter que les destinations scrapées depuis cette date (AAAA-MM-JJ)"
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Nombre de destinations enregistrées par transaction (défaut: 50)'
+        )
+
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Ignorer les résultats de traitement mémorisés (après une modification non versionnée du traitement)'
+        )
+
+    def handle(self, *args, **options):
+        """Point d'entrée de la commande"""
+        destinations = Destination.objects.order_by('name')
+        if options.get('since'):
+            try:
+                since = timezone.make_aware(datetime.strptime(options['since'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError(f"Date invalide pour --since: {options['since']} (format attendu: AAAA-MM-JJ)")
+            destinations = destinations.filter(last_scraping__gte=since)
+
+        destinations = {destination.name: destination for destination in destinations}
+        if not destinations:
+            self.stdout.write(self.style.WARNING("Aucune destination à retraiter"))
+            return
+
+        workers = max(1, options['workers'])
+        batch_size = max(1, options['batch_size'])
+        names = list(destinations)
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, len(names) // (workers * 4)))
+        chunks = [names[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+
+        self.stdout.write(f"Retraitement de {len(names)} destinations ({workers} processus, lots de {chunk_size})...")
+
+        start = time.perf_counter()
+        self.done, self.failed, self.timings, pending = 0, [], [], []
+        for results in self.run_chunks(chunks, workers, options['refresh']):
+            pending.extend(result for result in results if self.report(result, len(names)))
+            while len(pending) >= batch_size:
+                self.save_batch(destinations, pending[:batch_size])
+                pending = pending[batch_size:]
+        self.save_batch(destinations, pending)
+
+        # Un seul recalcul de l'index des destinations similaires pour tout le retraitement
+        try:
+            rebuild_profile_index()
+        except Exception as e:
+            logger.warning(f"Erreur lors de la reconstruction de l'index des profils: {str(e)}")
+
+        # Modèles de prévision: seules les destinations ayant reçu de nouvelles exécutions sont réajustées
+        try:
+            refitted = ForecastModels(settings.DATA_DIR).refresh(names)
+            self.stdout.write(f"Modèles de prévision réajustés: {len(refitted)} destinations")
+        except Exception as e:
+            logger.warning(f"Erreur lors de l'ajustement des modèles de prévision: {str(e)}")
+
+        elapsed = time.perf_counter() - start
+        if self.timings:
+            slowest = sorted(self.timings, key=lambda timing: timing[1], reverse=True)[:5]
+            self.stdout.write("Destinations les plus lentes: " + ", ".join(
+                f"{name} ({seconds:.2f} s)" for name, seconds in slowest
+            ))
+
+        summary = f"{len(names) - len(self.failed)} destinations retraitées en {elapsed:.1f} s"
+        if self.failed:
+            self.stdout.write(self.style.WARNING(f"{summary}, {len(self.failed)} en échec: {', '.join(self.failed)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+
+    def run_chunks(self, chunks, workers, refresh):
+        """Traite les lots de destinations (sur place ou dans un pool de processus) au fur et à mesure"""
+        if workers == 1:
+            for chunk in chunks:
+                yield reprocess_destinations(settings.DATA_DIR, chunk, refresh)
+            return
+
+        # Les processus du pool n'accèdent pas à la base: ne pas leur transmettre les connexions ouvertes
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(reprocess_destinations, settings.DATA_DIR, chunk, refresh): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.error(f"Erreur d'un processus de retraitement: {str(e)}")
+                    yield [{'destination': name, 'error': str(e), 'seconds': 0.0} for name in futures[future]]
+
+    def report(self, result, total):
+        """Affiche la progression pour une destination; retourne True si elle est à enregistrer"""
+        self.done += 1
+        name = result['destination']
+        if result.get('error') and 'columns' not in result:
+            self.failed.append(name)
+            self.stdout.write(self.style.ERROR(f"[{self.done}/{total}] {name}: {result['error']}"))
+            return False
+
+        self.timings.append((name, result['seconds']))
+        message = f"[{self.done}/{total}] {name}: {result['rows']} mois, {result['seconds']:.2f} s"
+        if result.get('error'):
+            message += f" (données dérivées non mises à jour: {result['error']})"
+        self.stdout.write(message)
+        return True
+
+    def save_batch(self, destinations, results):
+        """Enregistre un lot de résultats dans une seule transaction (un point de sauvegarde par destination)"""
+        if not results:
+            return
+
+        frames = {
+            result['destination']: (pd.DataFrame(result['columns']), result['stats'])
+            for result in results
+        }
+
+        years = {result['destination']: result.get('year') or datetime.now().year for result in results}
+
+        # Détection des mois aberrants de tout le lot en une passe
+        try:
+            validated = {}
+            for year in set(years.values()):
+                validated.update(AnomalyOverride.validated_months(
+                    [name for name, name_year in years.items() if name_year == year], year))
+            frames.update(screen_results(settings.DATA_DIR, frames, validated))
+        except Exception as e:
+            logger.warning(f"Erreur lors de la détection des anomalies du lot: {str(e)}")
+
+        # Une transaction par lot, un point de sauvegarde par destination: une destination
+        # en erreur est annulée seule, les autres sont enregistrées
+        with transaction.atomic():
+            for name, (df, stats) in frames.items():
+                try:
+                    with transaction.atomic():
+                        save_results(destinations[name], df, stats, update_index=False, year=years[name])
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'enregistrement de {name}: {str(e)}")
+                    self.stdout.write(self.style.ERROR(f"{name}: résultats non enregistrés ({str(e)})"))
+                    self.failed.append(name)
@@ -1,11 +1,13 @@
 import logging
 import traceback
+from contextlib import nullcontext
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 from django.utils import timezone
 from dashboard.models import Destination, ScrapingJob
 from scraper.scraper import scrape_destination
-from dashboard.views import process_and_save_results
+from dashboard.services import process_and_save_results
+from analyzer.profiling import ProfileRun
 
 logger = logging.getLogger('django')
 
@@ -42,13 +44,60 @@ class Command(BaseCommand):
             help='Exécuter le navigateur en mode headless (sans interface graphique)'
         )
 
+        parser.add_argument(
+            '--extraction-mode',
+            dest='extraction_mode',
+            choices=['dom', 'network'],
+            default=None,
+            help="Mode d'extraction des prix (défaut: SCRAPER_EXTRACTION_MODE)"
+        )
+
+        parser.add_argument(
+            '--sampling',
+            dest='sampling',
+            choices=['mid_month', 'weekdays', 'evenly_spaced', 'daily'],
+            default=None,
+            help="Échantillonnage des dates d'arrivée par mois (défaut: SCRAPER_SAMPLING_STRATEGY)"
+        )
+
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            dest='force_refresh',
+            help='Ignorer le cache des mois et rescraper toutes les données'
+        )
+
+        parser.add_argument(
+            '--profile',
+            action='store_true',
+            dest='profile',
+            help='Profiler chaque destination par échantillonnage (résultats dans logs/profiles)'
+        )
+
     def handle(self, *args, **options):
         """Point d'entrée de la commande"""
         destination_id = options.get('destination_id')
         all_destinations = options.get('all_destinations')
         scheduled_only = options.get('scheduled_only')
         headless = options.get('headless')
+        self.extraction_mode = options.get('extraction_mode')
+        self.sampling = options.get('sampling')
+        self.force_refresh = options.get('force_refresh', False)
+        self.profile_run = None
+
+        if options.get('profile'):
+            self.profile_run = ProfileRun(
+                settings.PROFILES_DIR, 'run_scraper', settings.PROFILE_SAMPLING_INTERVAL
+            )
+
+        try:
+            self.run_selection(destination_id, all_destinations, scheduled_only, headless)
+        finally:
+            if self.profile_run:
+                self.stdout.write(self.profile_run.finish())
 
+    def run_selection(self, destination_id, all_destinations, scheduled_only, headless):
+        """Sélectionne les destinations à scraper selon les options"""
         if scheduled_only:
             self.run_scheduled_jobs(headless)
             return
@@ -84,6 +133,12 @@ class Command(BaseCommand):
                     "Veuillez spécifier une destination (--destination) ou utiliser --all pour toutes les destinations")
             )
 
+    def profiled(self, section):
+        """Contexte de profilage d'une destination (sans effet si --profile est absent)"""
+        if self.profile_run is None:
+            return nullcontext()
+        return self.profile_run.profile(section)
+
     def scrape_destination(self, destination, headless=True):
         """
         Lance le scraping pour une destination.
@@ -92,11 +147,32 @@ class Command(BaseCommand):
             destination: Instance du modèle Destination
             headless: Si True, exécute le navigateur en mode headless
         """
+        with self.profiled(destination.name):
+            self._scrape_destination(destination, headless)
+
+    def _scrape_destination(self, destination, headless=True):
+        """Scrape une destination et enregistre le résultat dans une nouvelle tâche"""
+        running_job = ScrapingJob.find_running(destination, force_refresh=self.force_refresh)
+        if running_job:
+            # Le scraping en cours produira les mêmes données: ne pas le relancer
+            job = ScrapingJob.objects.create(
+                destination=destination,
+                scheduled_time=timezone.now(),
+                force_refresh=self.force_refresh
+            )
+            job.merge_into(running_job)
+            self.stdout.write(self.style.WARNING(
+                f"Scraping déjà en cours pour {destination.name} (tâche {running_job.id}), "
+                f"tâche {job.id} fusionnée"
+            ))
+            return
+
         job = ScrapingJob.objects.create(
             destination=destination,
             status='running',
             scheduled_time=timezone.now(),
-            started_at=timezone.now()
+            started_at=timezone.now(),
+            force_refresh=self.force_refresh
         )
 
         destination.update_scraping_status('running')
@@ -107,7 +183,10 @@ class Command(BaseCommand):
             result_df = scrape_destination(
                 destination.name,
                 settings.DATA_DIR,
-                headless=headless
+                headless=headless,
+                extraction_mode=self.extraction_mode,
+                sampling=self.sampling,
+                force_refresh=self.force_refresh
             )
 
             if result_df is not None:
@@ -161,7 +240,22 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Exécution de {due_jobs.count()} tâches planifiées...")
 
+        # Tâche exécutée par destination et par usage du cache: les tâches en double y sont
+        # fusionnées (une tâche sans cache ne se rattache qu'à une autre tâche sans cache)
+        leaders = {}
+
         for job in due_jobs:
+            leader = leaders.get((job.destination_id, True))
+            if leader is None and not job.force_refresh:
+                leader = leaders.get((job.destination_id, False))
+            leader = leader or ScrapingJob.find_running(
+                job.destination, exclude=job, force_refresh=job.force_refresh)
+            if leader:
+                job.merge_into(leader)
+                self.stdout.write(f"Tâche {job.id} fusionnée avec la tâche {leader.id} ({job.destination.name})")
+                continue
+            leaders[(job.destination_id, job.force_refresh)] = job
+
             try:
                 destination = job.destination
 
@@ -171,17 +265,22 @@ class Command(BaseCommand):
 
                 destination.update_scraping_status('running')
 
-                # Exécuter le scraper
-                result_df = scrape_destination(
-                    destination.name,
-                    settings.DATA_DIR,
-                    headless=headless
-                )
+                with self.profiled(destination.name):
+                    # Exécuter le scraper
+                    result_df = scrape_destination(
+                        destination.name,
+                        settings.DATA_DIR,
+                        headless=headless,
+                        extraction_mode=self.extraction_mode,
+                        sampling=self.sampling,
+                        force_refresh=self.force_refresh or job.force_refresh
+                    )
 
-                if result_df is not None:
-                    # Traiter et sauvegarder les résultats
-                    process_and_save_results(destination, result_df)
+                    if result_df is not None:
+                        # Traiter et sauvegarder les résultats
+                        process_and_save_results(destination, result_df)
 
+                if result_df is not None:
                     job.status = 'completed'
                     job.completed_at = timezone.now()
                     job.save()
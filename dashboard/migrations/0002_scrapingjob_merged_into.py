@@ -0,0 +1,19 @@
+# Generated by Django 4.2.10 on 2026-10-19 03:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='merged_into',
+            field=models.ForeignKey(blank=True, help_text='Tâche en cours à laquelle cette tâche en double a été rattachée', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged_jobs', to='dashboard.scrapingjob'),
+        ),
+    ]
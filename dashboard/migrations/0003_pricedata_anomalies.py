@@ -0,0 +1,28 @@
+# Generated by Django 4.2.10 on 2026-10-19 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_scrapingjob_merged_into'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pricedata',
+            name='anomaly_reason',
+            field=models.CharField(blank=True, default='', help_text="Motif de l'anomalie", max_length=255),
+        ),
+        migrations.AddField(
+            model_name='pricedata',
+            name='anomaly_score',
+            field=models.FloatField(blank=True, help_text="Score d'anomalie (z-score robuste)", null=True),
+        ),
+        migrations.AddField(
+            model_name='pricedata',
+            name='anomaly_status',
+            field=models.CharField(default='ok', help_text="Statut de la détection d'anomalies (ok, flagged, quarantined)", max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-19 05:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_pricedata_anomalies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='force_refresh',
+            field=models.BooleanField(default=False, help_text='Scraping sans utiliser le cache des mois'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.10 on 2026-10-19 05:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_scrapingjob_force_refresh'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnomalyOverride',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(help_text='Année des données')),
+                ('month', models.IntegerField(help_text='Mois (1-12)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('destination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomaly_overrides', to='dashboard.destination')),
+            ],
+            options={
+                'ordering': ['destination', 'year', 'month'],
+                'unique_together': {('destination', 'year', 'month')},
+            },
+        ),
+    ]
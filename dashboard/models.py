@@ -1,3 +1,5 @@
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 import json
@@ -47,6 +49,10 @@ class PriceData(models.Model):
     relative_price = models.FloatField(help_text="Prix relatif par rapport à la moyenne annuelle")
     price_rank = models.IntegerField(help_text="Rang du prix (du moins cher au plus cher)")
     is_cheapest = models.BooleanField(default=False, help_text="Indique si c'est le mois le moins cher")
+    anomaly_score = models.FloatField(null=True, blank=True, help_text="Score d'anomalie (z-score robuste)")
+    anomaly_status = models.CharField(
+        max_length=20, default="ok", help_text="Statut de la détection d'anomalies (ok, flagged, quarantined)")
+    anomaly_reason = models.CharField(max_length=255, blank=True, default="", help_text="Motif de l'anomalie")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -57,6 +63,54 @@ class PriceData(models.Model):
     def __str__(self):
         return f"{self.destination.name} - {self.month_name} {self.year}"
 
+    @classmethod
+    def month_names(cls, destination):
+        """
+        Noms des mois enregistrés pour une destination (tels que relevés par le scraper).
+
+        Args:
+            destination: Instance du modèle Destination
+
+        Returns:
+            Dictionnaire {mois (1-12): nom du mois}
+        """
+        return dict(cls.objects.filter(destination=destination).values_list('month', 'month_name'))
+
+
+class AnomalyOverride(models.Model):
+    """
+    Mois validé manuellement dans l'administration: la détection d'anomalies ne le signale plus.
+    """
+    destination = models.ForeignKey(Destination, on_delete=models.CASCADE, related_name="anomaly_overrides")
+    year = models.IntegerField(help_text="Année des données")
+    month = models.IntegerField(help_text="Mois (1-12)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('destination', 'year', 'month')
+        ordering = ['destination', 'year', 'month']
+
+    def __str__(self):
+        return f"{self.destination.name} - mois {self.month} {self.year} validé"
+
+    @classmethod
+    def validated_months(cls, destinations, year):
+        """
+        Mois validés manuellement de plusieurs destinations.
+
+        Args:
+            destinations: Noms des destinations
+            year: Année des données
+
+        Returns:
+            Dictionnaire {nom de destination: ensemble des mois validés}
+        """
+        validated = {}
+        for name, month in cls.objects.filter(destination__name__in=list(destinations), year=year).values_list(
+                'destination__name', 'month'):
+            validated.setdefault(name, set()).add(month)
+        return validated
+
 
 class AnalysisResult(models.Model):
     """
@@ -104,6 +158,26 @@ class AnalysisResult(models.Model):
         """Retourne le classement des mois par prix"""
         return self.statistics.get('price_ranking', [])
 
+    @property
+    def recommendations(self):
+        """Retourne les mois recommandés (bonnes affaires, équilibrés, à éviter)"""
+        return self.statistics.get('recommendations', {})
+
+    @property
+    def anomalies(self):
+        """Retourne les mois signalés ou mis en quarantaine par la détection d'anomalies"""
+        return self.statistics.get('anomalies', [])
+
+    @property
+    def listing_churn(self):
+        """Retourne le renouvellement des annonces depuis l'exécution précédente"""
+        return self.statistics.get('listing_churn', {})
+
+    @property
+    def price_uncertainty(self):
+        """Retourne les intervalles de confiance des prix mensuels et la probabilité du mois le moins cher"""
+        return self.statistics.get('price_uncertainty', {})
+
 
 class ScrapingJob(models.Model):
     """
@@ -115,6 +189,11 @@ class ScrapingJob(models.Model):
     started_at = models.DateTimeField(null=True, blank=True, help_text="Heure de début")
     completed_at = models.DateTimeField(null=True, blank=True, help_text="Heure de fin")
     error_message = models.TextField(blank=True, null=True, help_text="Message d'erreur en cas d'échec")
+    force_refresh = models.BooleanField(default=False, help_text="Scraping sans utiliser le cache des mois")
+    merged_into = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name="merged_jobs",
+        help_text="Tâche en cours à laquelle cette tâche en double a été rattachée"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -122,4 +201,66 @@ class ScrapingJob(models.Model):
         ordering = ['-scheduled_time']
 
     def __str__(self):
-        return f"Scraping de {self.destination.name} - {self.scheduled_time.strftime('%Y-%m-%d %H:%M')}"
\ No newline at end of file
+        return f"Scraping de {self.destination.name} - {self.scheduled_time.strftime('%Y-%m-%d %H:%M')}"
+
+    @classmethod
+    def stale_cutoff(cls):
+        """Heure de début avant laquelle une tâche 'running' est considérée abandonnée"""
+        return timezone.now() - timedelta(seconds=2 * settings.SCRAPING_JOB_TIMEOUT)
+
+    @classmethod
+    def expire_stale(cls, destination=None):
+        """
+        Marque en échec les tâches 'running' abandonnées (processus interrompu ou arrêté).
+
+        Args:
+            destination: Instance du modèle Destination (toutes les destinations si None)
+
+        Returns:
+            Nombre de tâches expirées
+        """
+        jobs = cls.objects.filter(status='running', started_at__lt=cls.stale_cutoff())
+        if destination is not None:
+            jobs = jobs.filter(destination=destination)
+        return jobs.update(
+            status='failed',
+            completed_at=timezone.now(),
+            error_message="Tâche abandonnée: aucune fin enregistrée dans le délai du scraping",
+        )
+
+    @classmethod
+    def find_running(cls, destination, exclude=None, force_refresh=False):
+        """
+        Retourne la tâche en cours d'exécution pour une destination, s'il y en a une.
+
+        Les tâches abandonnées (démarrées depuis plus de deux fois la durée maximale
+        d'un scraping) sont d'abord marquées en échec et ne sont jamais retournées.
+
+        Args:
+            destination: Instance du modèle Destination
+            exclude: Tâche à ignorer (typiquement la tâche appelante)
+            force_refresh: Si True, seule une tâche en cours sans cache peut être retournée
+
+        Returns:
+            Instance de ScrapingJob ou None
+        """
+        cls.expire_stale(destination)
+
+        jobs = cls.objects.filter(destination=destination, status='running', started_at__gte=cls.stale_cutoff())
+        if force_refresh:
+            jobs = jobs.filter(force_refresh=True)
+        if exclude is not None:
+            jobs = jobs.exclude(pk=exclude.pk)
+        return jobs.order_by('started_at').first()
+
+    def merge_into(self, job):
+        """
+        Rattache cette tâche à une tâche identique au lieu de l'exécuter.
+
+        Args:
+            job: Tâche qui produit effectivement le résultat
+        """
+        self.status = 'merged'
+        self.merged_into = job
+        self.completed_at = timezone.now()
+        self.save()
\ No newline at end of file
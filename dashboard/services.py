@@ -0,0 +1,225 @@
+"""
+Enregistrement des résultats d'analyse dans la base de données.
+
+Fonctions partagées par les vues et les commandes (run_scraper, reprocess_all):
+elles n'importent que l'analyseur, pas le scraper.
+"""
+
+import logging
+import pandas as pd
+from datetime import datetime
+from django.conf import settings
+
+from .models import PriceData, AnalysisResult, AnomalyOverride
+
+from analyzer.data_processor import process_data_for_destination
+from analyzer.churn import ListingSnapshotStore
+from analyzer.storage import LISTING_COLUMNS
+from analyzer.reprocess import refresh_derived_data
+from analyzer.similarity import ProfileIndex
+from analyzer.forecast import ForecastModels
+from analyzer.anomalies import screen_results, apply_screening, VALIDATED_REASON
+
+# Configuration du logger
+logger = logging.getLogger('django')
+
+
+def process_and_save_results(destination, df, stats=None, year=None):
+    """
+    Traite les résultats du scraping, calcule les statistiques
+    et les enregistre dans la base de données.
+
+    Args:
+        destination: Instance du modèle Destination
+        df: DataFrame pandas contenant les données
+        stats: Dictionnaire de statistiques (optionnel)
+        year: Année des données (année en cours par défaut)
+    """
+    year = year or datetime.now().year
+
+    # Instantané des annonces de l'exécution (absent si tous les mois venaient du cache)
+    df = save_listing_snapshot(destination, df, year=year)
+
+    # Si les statistiques ne sont pas fournies, les calculer
+    if stats is None:
+        _, stats = process_data_for_destination(settings.DATA_DIR, destination.name)
+
+    # Renouvellement des annonces, grille de prix et historique des prix
+    stats = refresh_derived_data(settings.DATA_DIR, destination.name, stats, year=year)
+
+    # Détection des mois aberrants (les mois en quarantaine sont exclus des statistiques)
+    try:
+        validated = AnomalyOverride.validated_months([destination.name], year)
+        df, stats = screen_results(settings.DATA_DIR, {destination.name: (df, stats)}, validated).get(
+            destination.name, (df, stats))
+    except Exception as e:
+        logger.warning(f"Erreur lors de la détection des anomalies de {destination.name}: {str(e)}")
+
+    save_results(destination, df, stats, year=year)
+
+
+def save_listing_snapshot(destination, df, year=None):
+    """
+    Enregistre l'instantané des annonces identifiées lors d'un scraping.
+
+    Args:
+        destination: Instance du modèle Destination
+        df: Résultats du scraping (avec les colonnes LISTING_COLUMNS si des mois ont été scrapés)
+        year: Année scrapée (année en cours par défaut)
+
+    Returns:
+        DataFrame sans les colonnes des annonces
+    """
+    if 'run_id' not in df.columns:
+        return df
+
+    try:
+        # Mois sans annonce identifiée: valeurs manquantes (NaN) au lieu de listes
+        listings_by_month = {
+            int(row['month']): tuple(
+                row.get(column) if isinstance(row.get(column), list) else default
+                for column, default in (('listing_ids', []), ('listing_prices', []), ('listing_coordinates', None))
+            )
+            for row in df.to_dict('records')
+        }
+        ListingSnapshotStore(settings.DATA_DIR).save(
+            destination.name, year or datetime.now().year, df['run_id'].iloc[0], listings_by_month)
+    except Exception as e:
+        logger.warning(f"Erreur lors de l'enregistrement des annonces de {destination.name}: {str(e)}")
+
+    return df.drop(columns=[*LISTING_COLUMNS, 'run_id'], errors='ignore')
+
+
+def save_results(destination, df, stats, update_index=True, year=None):
+    """
+    Enregistre les données de prix et l'analyse d'une destination dans la base de données.
+
+    Args:
+        destination: Instance du modèle Destination
+        df: DataFrame pandas contenant les données traitées
+        stats: Dictionnaire de statistiques (None: aucune analyse enregistrée)
+        update_index: Si True, met à jour le profil de la destination dans l'index des destinations similaires
+        year: Année des données (année en cours par défaut)
+    """
+    year = year or datetime.now().year
+
+    # Supprimer les anciennes données
+    PriceData.objects.filter(destination=destination, year=year).delete()
+    AnalysisResult.objects.filter(destination=destination, year=year).delete()
+
+    # Calculer la moyenne annuelle (hors mois mis en quarantaine)
+    if 'anomaly_status' in df.columns:
+        reliable = df[df['anomaly_status'] != 'quarantined']
+    else:
+        reliable = df
+    annual_avg = reliable['avg_price'].mean()
+    price_data = []
+    # Ajouter les nouvelles données de prix
+    for _, row in df.iterrows():
+        # Recalculer le prix relatif explicitement
+        relative_price = row['avg_price'] / annual_avg if annual_avg > 0 else 1.0
+        # S'assurer que toutes les colonnes requises existent
+        # Si 'season' n'existe pas, utiliser une valeur par défaut basée sur le mois
+        if 'season' not in row:
+            month = row.get('month', 1)
+            seasons = {
+                12: 'Hiver', 1: 'Hiver', 2: 'Hiver',
+                3: 'Printemps', 4: 'Printemps', 5: 'Printemps',
+                6: 'Été', 7: 'Été', 8: 'Été',
+                9: 'Automne', 10: 'Automne', 11: 'Automne'
+            }
+            season = seasons.get(month, 'Inconnu')
+        else:
+            season = row['season']
+
+        # S'assurer que toutes les autres colonnes requises existent
+        price_data.append(PriceData(
+            destination=destination,
+            year=year,
+            month=row.get('month', 0),
+            month_name=row.get('month_name', ''),
+            avg_price=row.get('avg_price', 0),
+            median_price=row.get('median_price', 0),
+            min_price=row.get('min_price', 0),
+            max_price=row.get('max_price', 0),
+            sample_size=row.get('sample_size', 0),
+            season=season,
+            relative_price=relative_price,
+            price_rank=row.get('price_rank', 0),
+            is_cheapest=row.get('is_cheapest', False),
+            anomaly_score=None if pd.isna(row.get('anomaly_score')) else row.get('anomaly_score'),
+            anomaly_status=row.get('anomaly_status', 'ok'),
+            anomaly_reason=row.get('anomaly_reason', '')
+        ))
+    PriceData.objects.bulk_create(price_data)
+
+    # Créer l'analyse
+    if stats:
+        analysis = AnalysisResult(
+            destination=destination,
+            year=year,
+            cheapest_month=stats.get('cheapest_month', {}).get('name', ''),
+            cheapest_month_price=stats.get('cheapest_month', {}).get('avg_price', 0),
+            most_expensive_month=stats.get('most_expensive_month', {}).get('name', ''),
+            most_expensive_month_price=stats.get('most_expensive_month', {}).get('avg_price', 0),
+            potential_savings=stats.get('potential_savings', 0),
+            savings_percentage=stats.get('savings_percentage', 0),
+            coefficient_of_variation=stats.get('annual_variation', {}).get('coefficient_of_variation', 0)
+        )
+        analysis.statistics = stats
+        analysis.save()
+
+    # Mettre à jour le profil de la destination dans l'index des destinations similaires
+    # et son modèle de prévision (réajusté seulement si de nouvelles exécutions sont arrivées)
+    if update_index and not reliable.empty:
+        try:
+            ProfileIndex(settings.DATA_DIR).update(destination.name, reliable['month'], reliable['avg_price'], year)
+        except Exception as e:
+            logger.warning(f"Erreur lors de la mise à jour de l'index des profils de {destination.name}: {str(e)}")
+        try:
+            ForecastModels(settings.DATA_DIR).refresh([destination.name])
+        except Exception as e:
+            logger.warning(f"Erreur lors de l'ajustement du modèle de prévision de {destination.name}: {str(e)}")
+
+    logger.info(f"Résultats enregistrés pour {destination.name}")
+
+
+def rebuild_profile_index():
+    """Reconstruit l'index des profils de prix à partir de la dernière année de PriceData de chaque destination."""
+    rows = pd.DataFrame.from_records(
+        PriceData.objects.exclude(anomaly_status='quarantined').values_list(
+            'destination__name', 'year', 'month', 'avg_price'),
+        columns=['destination', 'year', 'month', 'avg_price']
+    )
+    # Dernière année disponible de chaque destination
+    if not rows.empty:
+        rows = rows[rows['year'] == rows.groupby('destination')['year'].transform('max')]
+    return ProfileIndex(settings.DATA_DIR).rebuild(rows)
+
+
+def revalidate_results(destination, year):
+    """
+    Recalcule l'analyse d'une destination après la validation manuelle de mois signalés.
+
+    Les données de prix enregistrées sont reprises telles quelles: les mois validés
+    retrouvent le statut 'ok' et réintègrent les statistiques, le prix relatif et
+    le classement des mois.
+
+    Args:
+        destination: Instance du modèle Destination
+        year: Année des données
+    """
+    rows = PriceData.objects.filter(destination=destination, year=year)
+    if not rows.exists():
+        return
+
+    df = pd.DataFrame.from_records(rows.values(
+        'month', 'month_name', 'avg_price', 'median_price', 'min_price', 'max_price', 'sample_size',
+        'anomaly_score', 'anomaly_status', 'anomaly_reason'))
+    validated = AnomalyOverride.validated_months([destination.name], year).get(destination.name, set())
+    df.loc[df['month'].isin(validated), ['anomaly_status', 'anomaly_reason']] = ['ok', VALIDATED_REASON]
+
+    analysis = AnalysisResult.objects.filter(destination=destination, year=year).first()
+    df, stats = apply_screening(settings.DATA_DIR, destination.name, df,
+                                analysis.statistics if analysis else {}, recompute=True)
+    save_results(destination, df, stats, year=year)
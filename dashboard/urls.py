@@ -11,6 +11,13 @@ urlpatterns = [
     path('destinations/add/', views.AddDestinationView.as_view(), name='add_destination'),
     path('destinations/<slug:slug>/', views.DestinationDetailView.as_view(), name='destination_detail'),
     path('destinations/<slug:slug>/update-data/', views.update_data_view, name='update_data'),
+    path('destinations/<slug:slug>/price-grid/', views.price_grid_view, name='price_grid'),
+    path('destinations/<slug:slug>/similar/', views.similar_destinations_view, name='similar_destinations'),
+    path('destinations/<slug:slug>/calendar/', views.price_calendar_view, name='price_calendar'),
+    path('destinations/<slug:slug>/forecast/', views.forecast_view, name='forecast'),
+
+    # Exploration SQL des fichiers de données (staff)
+    path('sql/', views.sql_explorer_view, name='sql_explorer'),
 
     # Actions de scraping
     path('run-scraper/', views.run_scraper_view, name='run_scraper'),
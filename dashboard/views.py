@@ -1,6 +1,7 @@
 import os
 import logging
 import json
+import pandas as pd
 from datetime import datetime, timedelta
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
@@ -12,14 +13,23 @@ from django.views.generic import ListView, DetailView
 from django.views.generic.edit import FormView
 from django.db.models import Count, Avg, Max, Min
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
 from .models import Destination, PriceData, AnalysisResult, ScrapingJob
 from .forms import DestinationForm, ScrapingForm
+from .services import process_and_save_results, rebuild_profile_index
 
 from scraper.scraper import scrape_destination
 from analyzer.data_processor import process_data_for_destination
+from analyzer.reprocess import latest_data_year
+from analyzer.geogrid import PriceGridStore, grid_cells
+from analyzer.price_history import price_history_summary
+from analyzer.price_calendar import PriceCalendarStore, DEFAULT_HORIZON_DAYS, MAX_STAY_NIGHTS
+from analyzer.similarity import ProfileIndex, SEARCH_METRICS
+from analyzer.forecast import ForecastModels
+from analyzer.explorer import get_explorer, DEFAULT_ROW_LIMIT, MAX_ROW_LIMIT
 
 # Configuration du logger
 logger = logging.getLogger('django')
@@ -74,8 +84,9 @@ class DestinationDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         destination = self.object
 
-        # Récupérer les dernières données de prix
-        price_data = PriceData.objects.filter(destination=destination).order_by('month')
+        # Récupérer les dernières données de prix (hors mois mis en quarantaine)
+        price_data = PriceData.objects.filter(destination=destination).exclude(
+            anomaly_status='quarantined').order_by('month')
 
         # Récupérer la dernière analyse
         analysis = AnalysisResult.objects.filter(
@@ -123,9 +134,46 @@ class DestinationDetailView(DetailView):
             else:
                 context['price_ranking'] = []
 
+        # Grille de prix géographique (si des coordonnées ont été relevées)
+        grid_path = PriceGridStore(settings.DATA_DIR).latest(destination.name)
+        price_grid = PriceGridStore.read_metadata(grid_path) if grid_path else None
+
+        # Évolution des prix entre les scrapings successifs (historique mis en cache après le scraping)
+        try:
+            price_history = price_history_summary(settings.DATA_DIR, destination.name)
+        except Exception as e:
+            logger.warning(f"Erreur lors du calcul de l'historique des prix de {destination.name}: {str(e)}")
+            price_history = None
+
+        # Calendrier des prix jour par jour (relevés de l'échantillonnage 'daily', mis en cache après le scraping)
+        try:
+            calendar = PriceCalendarStore(settings.DATA_DIR).load(destination.name)
+        except Exception as e:
+            logger.warning(f"Erreur lors de la lecture du calendrier des prix de {destination.name}: {str(e)}")
+            calendar = None
+
+        # Prévision des 12 prochains mois (paramètres du modèle déjà ajustés)
+        try:
+            forecast = ForecastModels(settings.DATA_DIR).forecast(
+                destination.name, month_names=PriceData.month_names(destination))
+        except Exception as e:
+            logger.warning(f"Erreur lors de la lecture de la prévision des prix de {destination.name}: {str(e)}")
+            forecast = None
+
         context.update({
+            'forecast': forecast,
+            'forecast_json': json.dumps(forecast) if forecast else None,
+            'price_calendar': {
+                'start': str(calendar.start),
+                'end': str(calendar.dates[-1]),
+                'nights': int(calendar.nights[0]),
+                'rate_nights': calendar.rate_nights,
+            } if calendar else None,
+            'price_history': price_history,
+            'price_history_json': json.dumps(price_history) if price_history else None,
             'price_data': price_data,
             'analysis': analysis,
+            'price_grid': json.dumps(price_grid) if price_grid else None,
             'chart_data': json.dumps(chart_data),
             'season_data': json.dumps(season_data),
             'form': ScrapingForm(initial={'destination': destination.id}),
@@ -158,6 +206,25 @@ def run_scraper_view(request):
         if form.is_valid():
             destination = form.cleaned_data['destination']
 
+            # Un scraping est-il déjà en cours pour cette destination ?
+            running_job = ScrapingJob.find_running(destination)
+            if running_job:
+                # Le scraping en cours (ici ou dans un autre processus) enregistrera les mêmes
+                # données: la tâche en double lui est rattachée, sans scraper ni enregistrer à nouveau
+                job = ScrapingJob.objects.create(
+                    destination=destination,
+                    scheduled_time=timezone.now()
+                )
+                job.merge_into(running_job)
+                logger.info(f"Tâche {job.id} rattachée à la tâche en cours {running_job.id} "
+                            f"pour {destination.name}")
+                messages.info(
+                    request,
+                    f"Un scraping est déjà en cours pour {destination.name}: "
+                    f"les résultats seront disponibles à sa fin."
+                )
+                return redirect('destination_detail', slug=destination.slug)
+
             # Créer une tâche de scraping
             job = ScrapingJob.objects.create(
                 destination=destination,
@@ -230,8 +297,9 @@ def update_data_view(request, slug):
             df, stats = process_data_for_destination(settings.DATA_DIR, destination.name)
 
             if df is not None:
-                # Sauvegarder les résultats
-                process_and_save_results(destination, df, stats)
+                # Sauvegarder les résultats (année du fichier brut traité)
+                process_and_save_results(destination, df, stats,
+                                         year=latest_data_year(settings.DATA_DIR, destination.name))
 
                 return JsonResponse({
                     'status': 'success',
@@ -256,6 +324,208 @@ def update_data_view(request, slug):
     }, status=405)
 
 
+def price_grid_view(request, slug):
+    """API renvoyant les cellules de la grille de prix d'une destination pour un niveau de zoom."""
+    destination = get_object_or_404(Destination, slug=slug)
+
+    try:
+        level = int(request.GET.get('level', 0))
+        month = int(request.GET.get('month', 0))
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': "Paramètres 'level' et 'month' invalides."
+        }, status=400)
+
+    grid_path = PriceGridStore(settings.DATA_DIR).latest(destination.name)
+    if not grid_path:
+        return JsonResponse({
+            'status': 'error',
+            'message': "Aucune grille de prix disponible pour cette destination."
+        }, status=404)
+
+    metadata = PriceGridStore.read_metadata(grid_path)
+    level = min(max(level, 0), metadata['levels'] - 1)
+
+    return JsonResponse({
+        'status': 'success',
+        'level': level,
+        'month': month,
+        'cells': grid_cells(grid_path, level, month),
+    })
+
+
+def _profile_index():
+    """Index des profils de prix mensuels, construit à partir de PriceData au premier appel."""
+    profiles = ProfileIndex(settings.DATA_DIR).load()
+    return profiles if profiles is not None else rebuild_profile_index()
+
+
+def similar_destinations_view(request, slug):
+    """API renvoyant les destinations au profil de prix saisonnier le plus proche."""
+    destination = get_object_or_404(Destination, slug=slug)
+
+    metric = request.GET.get('metric', 'cosine')
+    try:
+        k = min(max(int(request.GET.get('k', 10)), 1), 100)
+        min_ratio = float(request.GET['min_ratio']) if request.GET.get('min_ratio') else None
+        max_ratio = float(request.GET['max_ratio']) if request.GET.get('max_ratio') else None
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': "Paramètres 'k', 'min_ratio' et 'max_ratio' invalides."
+        }, status=400)
+
+    if metric not in SEARCH_METRICS:
+        return JsonResponse({
+            'status': 'error',
+            'message': f"Métrique inconnue (disponibles: {', '.join(SEARCH_METRICS)})."
+        }, status=400)
+
+    profiles = _profile_index()
+    if destination.name not in profiles.index:
+        return JsonResponse({
+            'status': 'error',
+            'message': "Aucune donnée de prix pour cette destination."
+        }, status=404)
+
+    results = profiles.nearest(destination.name, k=k, metric=metric,
+                               min_price_ratio=min_ratio, max_price_ratio=max_ratio)
+
+    slugs = dict(Destination.objects.filter(
+        name__in=[result['destination'] for result in results]
+    ).values_list('name', 'slug'))
+    for result in results:
+        slug = slugs.get(result['destination'])
+        result['url'] = reverse('destination_detail', args=[slug]) if slug else None
+
+    return JsonResponse({
+        'status': 'success',
+        'destination': destination.name,
+        'avg_price': round(float(profiles.levels[profiles.index[destination.name]]), 2),
+        'metric': metric,
+        'results': results,
+    })
+
+
+def price_calendar_view(request, slug):
+    """API renvoyant les séjours de N nuits les moins chers et les plus chers, et la carte de chaleur du calendrier."""
+    destination = get_object_or_404(Destination, slug=slug)
+
+    try:
+        calendar = PriceCalendarStore(settings.DATA_DIR).load(destination.name)
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture du calendrier des prix de {destination.name}: {str(e)}")
+        calendar = None
+
+    if calendar is None:
+        return JsonResponse({
+            'status': 'error',
+            'message': "Aucun prix par date d'arrivée pour cette destination (scraping avec l'échantillonnage 'daily')."
+        }, status=404)
+
+    try:
+        nights = int(request.GET.get('nights', calendar.nights[0]))
+        k = min(max(int(request.GET.get('k', 3)), 1), 10)
+        horizon = min(max(int(request.GET.get('horizon', DEFAULT_HORIZON_DAYS)), 1), 730)
+        start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date() if request.GET.get('start') else None
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': "Paramètres 'nights', 'k', 'horizon' et 'start' invalides."
+        }, status=400)
+
+    if not 1 <= nights <= MAX_STAY_NIGHTS:
+        return JsonResponse({
+            'status': 'error',
+            'message': f"La durée du séjour doit être comprise entre 1 et {MAX_STAY_NIGHTS} nuits."
+        }, status=400)
+
+    # Par défaut, recherche à partir d'aujourd'hui (ou du premier jour relevé)
+    start = start or max(timezone.now().date(), calendar.start.astype(object))
+    stays = calendar.find_stays(nights, k=k, start=start, horizon_days=horizon)
+
+    return JsonResponse({
+        'status': 'success',
+        'destination': destination.name,
+        'nights': nights,
+        'observed_nights': calendar.nights.tolist(),
+        'start': str(start),
+        'horizon': horizon,
+        'cheapest': stays['cheapest'],
+        'most_expensive': stays['most_expensive'],
+        'heatmap': calendar.heatmap(start, horizon),
+    })
+
+
+def forecast_view(request, slug):
+    """API renvoyant la prévision des prix mensuels des 12 prochains mois d'une destination."""
+    destination = get_object_or_404(Destination, slug=slug)
+
+    try:
+        horizon = int(request.GET.get('horizon', 12))
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': "Paramètre 'horizon' invalide."
+        }, status=400)
+
+    forecast = ForecastModels(settings.DATA_DIR).forecast(
+        destination.name, horizon=horizon, month_names=PriceData.month_names(destination))
+    if forecast is None:
+        return JsonResponse({
+            'status': 'error',
+            'message': "Aucun modèle de prévision pour cette destination (historique des prix insuffisant)."
+        }, status=404)
+
+    return JsonResponse({
+        'status': 'success',
+        'destination': destination.name,
+        **forecast,
+    })
+
+
+# Limites de lignes proposées par la page d'exploration SQL
+SQL_EXPLORER_LIMITS = [100, 1000, 10000]
+
+
+@staff_member_required
+def sql_explorer_view(request):
+    """Page réservée au staff pour interroger les fichiers de données en SQL (lecture seule)."""
+    sql = request.POST.get('sql', '').strip()
+    max_limit = min(settings.SQL_EXPLORER_ROW_LIMIT, MAX_ROW_LIMIT)
+    limits = [limit for limit in SQL_EXPLORER_LIMITS if limit < max_limit] + [max_limit]
+
+    try:
+        limit = min(max(int(request.POST.get('limit', min(DEFAULT_ROW_LIMIT, max_limit))), 1), max_limit)
+    except ValueError:
+        limit = min(DEFAULT_ROW_LIMIT, max_limit)
+
+    tables = {}
+    result = None
+    error = None
+    try:
+        explorer = get_explorer(settings.DATA_DIR, threads=settings.SQL_EXPLORER_THREADS)
+        tables = explorer.tables()
+        if request.method == 'POST' and sql:
+            result = explorer.query(sql, limit=limit, timeout=settings.SQL_EXPLORER_TIMEOUT)
+    except (ValueError, TimeoutError) as e:
+        error = str(e)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'exploration SQL: {str(e)}")
+        error = f"Erreur inattendue: {str(e)}"
+
+    return render(request, 'dashboard/sql_explorer.html', {
+        'sql': sql,
+        'limit': limit,
+        'limits': limits,
+        'timeout': settings.SQL_EXPLORER_TIMEOUT,
+        'tables': tables,
+        'result': result,
+        'error': error,
+    })
+
+
 def dashboard_view(request):
     """Vue pour le tableau de bord principal."""
     # Récupérer toutes les destinations avec leur dernière analyse
@@ -429,82 +699,3 @@ def price_comparison_view(request):
     }
 
     return render(request, 'dashboard/price_comparison.html', context)
-
-
-# Fonctions utilitaires
-
-def process_and_save_results(destination, df, stats=None):
-    """
-    Traite les résultats du scraping, calcule les statistiques
-    et les enregistre dans la base de données.
-
-    Args:
-        destination: Instance du modèle Destination
-        df: DataFrame pandas contenant les données
-        stats: Dictionnaire de statistiques (optionnel)
-    """
-    # Si les statistiques ne sont pas fournies, les calculer
-    if stats is None:
-        _, stats = process_data_for_destination(settings.DATA_DIR, destination.name)
-
-    year = datetime.now().year
-
-    # Supprimer les anciennes données
-    PriceData.objects.filter(destination=destination, year=year).delete()
-    AnalysisResult.objects.filter(destination=destination, year=year).delete()
-
-    # Calculer la moyenne annuelle
-    annual_avg = df['avg_price'].mean()
-    # Ajouter les nouvelles données de prix
-    for _, row in df.iterrows():
-        # Recalculer le prix relatif explicitement
-        relative_price = row['avg_price'] / annual_avg if annual_avg > 0 else 1.0
-        # S'assurer que toutes les colonnes requises existent
-        # Si 'season' n'existe pas, utiliser une valeur par défaut basée sur le mois
-        if 'season' not in row:
-            month = row.get('month', 1)
-            seasons = {
-                12: 'Hiver', 1: 'Hiver', 2: 'Hiver',
-                3: 'Printemps', 4: 'Printemps', 5: 'Printemps',
-                6: 'Été', 7: 'Été', 8: 'Été',
-                9: 'Automne', 10: 'Automne', 11: 'Automne'
-            }
-            season = seasons.get(month, 'Inconnu')
-        else:
-            season = row['season']
-
-        # S'assurer que toutes les autres colonnes requises existent
-        price_data = PriceData(
-            destination=destination,
-            year=year,
-            month=row.get('month', 0),
-            month_name=row.get('month_name', ''),
-            avg_price=row.get('avg_price', 0),
-            median_price=row.get('median_price', 0),
-            min_price=row.get('min_price', 0),
-            max_price=row.get('max_price', 0),
-            sample_size=row.get('sample_size', 0),
-            season=season,
-            relative_price=relative_price,
-            price_rank=row.get('price_rank', 0),
-            is_cheapest=row.get('is_cheapest', False)
-        )
-        price_data.save()
-
-    # Créer l'analyse
-    if stats:
-        analysis = AnalysisResult(
-            destination=destination,
-            year=year,
-            cheapest_month=stats.get('cheapest_month', {}).get('name', ''),
-            cheapest_month_price=stats.get('cheapest_month', {}).get('avg_price', 0),
-            most_expensive_month=stats.get('most_expensive_month', {}).get('name', ''),
-            most_expensive_month_price=stats.get('most_expensive_month', {}).get('avg_price', 0),
-            potential_savings=stats.get('potential_savings', 0),
-            savings_percentage=stats.get('savings_percentage', 0),
-            coefficient_of_variation=stats.get('annual_variation', {}).get('coefficient_of_variation', 0)
-        )
-        analysis.statistics = stats
-        analysis.save()
-
-    logger.info(f"Résultats enregistrés pour {destination.name}")
\ No newline at end of file
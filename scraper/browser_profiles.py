@@ -0,0 +1,305 @@
+"""
+Gestion de profils Chrome partagés pour le scraping.
+
+Un profil "golden" est pré-initialisé (cookies de consentement acceptés,
+cache HTTP chargé avec les bundles JS/CSS d'Airbnb) puis cloné pour chaque
+navigateur du pool. Les clones sont isolés (un navigateur par clone, Chrome
+verrouillant son répertoire de profil) et réutilisés d'un mois à l'autre,
+ce qui conserve un cache disque chaud.
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Fichiers de verrouillage et données volatiles à ne jamais copier depuis le profil golden
+_EXCLUDED_NAMES = {
+    'SingletonLock', 'SingletonSocket', 'SingletonCookie', 'lockfile',
+    'Crashpad', 'BrowserMetrics', 'ShaderCache', 'GrShaderCache',
+}
+
+# Constante ioctl FICLONE (Linux) pour les copies "copy-on-write" (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+# Script mesurant les octets servis depuis le cache pour la page courante
+_CACHE_STATS_SCRIPT = """
+return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce(function(acc, e) {
+        if (e.transferSize === 0 && e.decodedBodySize > 0) { acc.hit += e.decodedBodySize; }
+        else { acc.network += e.transferSize || 0; }
+        return acc;
+    }, {hit: 0, network: 0});
+"""
+
+_MARKER_FILE = '.airbnb_profile.json'
+
+
+def _clone_file(src, dst):
+    """
+    Copie un fichier en "copy-on-write" si le système de fichiers le permet.
+
+    Args:
+        src: Fichier source
+        dst: Fichier destination
+
+    Returns:
+        Chemin du fichier destination
+    """
+    if fcntl is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            # Système de fichiers sans reflink: copie classique
+            pass
+
+    return shutil.copy2(src, dst)
+
+
+def clone_tree(src, dst):
+    """
+    Clone une arborescence de profil en ignorant les verrous de Chrome.
+
+    Args:
+        src: Répertoire source
+        dst: Répertoire destination (ne doit pas exister)
+    """
+    shutil.copytree(
+        src, dst,
+        ignore=lambda _, names: [name for name in names if name in _EXCLUDED_NAMES],
+        copy_function=_clone_file,
+        dirs_exist_ok=False
+    )
+
+
+class BrowserProfileManager:
+    """
+    Fournit à chaque navigateur un clone isolé d'un profil pré-initialisé.
+    """
+
+    # Durée au-delà de laquelle un verrou d'emplacement est considéré comme abandonné (en secondes)
+    SLOT_LOCK_TTL = 2 * 3600
+
+    def __init__(self, profiles_dir, refresh_hours=24):
+        """
+        Initialise le gestionnaire de profils.
+
+        Args:
+            profiles_dir: Répertoire racine des profils
+            refresh_hours: Âge maximal du profil golden avant réinitialisation (en heures)
+        """
+        self.profiles_dir = Path(profiles_dir)
+        self.golden_dir = self.profiles_dir / 'golden'
+        self.workers_dir = self.profiles_dir / 'workers'
+        self.refresh_hours = refresh_hours
+
+        self.lock_path = self.profiles_dir / 'golden.lock'
+
+        self._lock = threading.Lock()
+        self.cache_hit_bytes = 0
+        self.network_bytes = 0
+
+        os.makedirs(self.workers_dir, exist_ok=True)
+        if fcntl is None:
+            logger.warning("Verrou de fichier indisponible: le profil golden ne doit être partagé "
+                           "que par un seul processus de scraping")
+
+    @contextmanager
+    def _golden_lock(self, shared=False):
+        """
+        Verrou inter-processus du profil golden (fcntl.flock sur golden.lock).
+
+        Le remplacement du profil prend le verrou exclusif, la lecture (clonage) le
+        verrou partagé: un processus ne clone jamais un profil à moitié remplacé.
+
+        Args:
+            shared: Si True, verrou partagé (lecture), sinon exclusif (remplacement)
+        """
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_marker(profile_dir):
+        """Lit le marqueur d'initialisation d'un profil"""
+        try:
+            with open(Path(profile_dir) / _MARKER_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def golden_marker(self):
+        """Marqueur du profil golden (None s'il n'est pas initialisé)"""
+        return self._read_marker(self.golden_dir)
+
+    @property
+    def consent_seeded(self):
+        """Indique si les cookies de consentement sont présents dans le profil golden"""
+        marker = self.golden_marker
+        return bool(marker and marker.get('consent'))
+
+    def is_stale(self):
+        """Indique si le profil golden doit être (ré)initialisé"""
+        marker = self.golden_marker
+        if not marker:
+            return True
+        return time.time() - marker.get('seeded_at', 0) > self.refresh_hours * 3600
+
+    def ensure_golden(self, seed_func):
+        """
+        Initialise le profil golden s'il est absent ou trop ancien.
+
+        Args:
+            seed_func: Fonction seed_func(user_data_dir) qui ouvre un navigateur sur ce
+                profil, accepte les cookies, charge une recherche et retourne True si le
+                consentement a été enregistré
+
+        Returns:
+            True si un profil golden utilisable est disponible
+        """
+        with self._lock, self._golden_lock():
+            # Un autre processus a pu réinitialiser le profil pendant l'attente du verrou
+            if not self.is_stale():
+                return True
+
+            staging_dir = self.profiles_dir / f"golden.tmp-{os.getpid()}"
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            os.makedirs(staging_dir)
+
+            logger.info(f"Initialisation du profil navigateur golden dans {staging_dir}")
+            try:
+                consent = bool(seed_func(str(staging_dir)))
+            except Exception as e:
+                logger.warning(f"Échec de l'initialisation du profil golden: {str(e)}")
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                return self.golden_marker is not None
+
+            with open(staging_dir / _MARKER_FILE, 'w') as f:
+                json.dump({'seeded_at': time.time(), 'consent': consent}, f)
+
+            # Remplacer l'ancien profil par le nouveau (les clones seront régénérés)
+            retired_dir = self.profiles_dir / f"golden.old-{os.getpid()}"
+            if self.golden_dir.exists():
+                os.replace(self.golden_dir, retired_dir)
+            os.replace(staging_dir, self.golden_dir)
+            shutil.rmtree(retired_dir, ignore_errors=True)
+
+            logger.info(f"Profil golden prêt (consentement enregistré: {consent})")
+            return True
+
+    def _prepare_clone(self, slot):
+        """Crée ou rafraîchit le clone d'un emplacement si le golden a changé"""
+        clone_dir = self.workers_dir / f"worker-{slot}"
+
+        with self._golden_lock(shared=True):
+            golden_marker = self.golden_marker
+
+            if golden_marker is None:
+                os.makedirs(clone_dir, exist_ok=True)
+                return clone_dir
+
+            clone_marker = self._read_marker(clone_dir)
+            if clone_marker and clone_marker.get('seeded_at') == golden_marker.get('seeded_at'):
+                return clone_dir
+
+            shutil.rmtree(clone_dir, ignore_errors=True)
+            clone_tree(self.golden_dir, clone_dir)
+
+        logger.debug(f"Profil cloné pour l'emplacement {slot}: {clone_dir}")
+        return clone_dir
+
+    def _claim_slot(self):
+        """
+        Réserve un emplacement de clone libre, y compris vis-à-vis des autres processus.
+
+        La réservation repose sur la création exclusive d'un fichier de verrou;
+        un verrou plus ancien que SLOT_LOCK_TTL est considéré comme abandonné.
+
+        Returns:
+            Tuple (numéro d'emplacement, chemin du fichier de verrou)
+        """
+        slot = 0
+        while True:
+            lock_path = self.workers_dir / f"worker-{slot}.lock"
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return slot, lock_path
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > self.SLOT_LOCK_TTL:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+            slot += 1
+
+    @contextmanager
+    def acquire(self):
+        """
+        Réserve un clone de profil pour un navigateur.
+
+        Yields:
+            Chemin du répertoire de profil à passer à --user-data-dir
+        """
+        slot, lock_path = self._claim_slot()
+        try:
+            yield str(self._prepare_clone(slot))
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+    def record_cache_stats(self, driver):
+        """
+        Mesure les octets servis depuis le cache disque pour la page courante.
+
+        Args:
+            driver: Driver Selenium positionné sur une page chargée
+
+        Returns:
+            Tuple (octets servis depuis le cache, octets transférés sur le réseau)
+        """
+        try:
+            stats = driver.execute_script(_CACHE_STATS_SCRIPT) or {}
+        except Exception as e:
+            logger.debug(f"Statistiques de cache indisponibles: {str(e)}")
+            return 0, 0
+
+        hit, network = int(stats.get('hit', 0)), int(stats.get('network', 0))
+        with self._lock:
+            self.cache_hit_bytes += hit
+            self.network_bytes += network
+        return hit, network
+
+    def report(self):
+        """Journalise le volume servi depuis le cache depuis le démarrage"""
+        total = self.cache_hit_bytes + self.network_bytes
+        ratio = self.cache_hit_bytes / total * 100 if total else 0
+        logger.info(f"Cache navigateur: {self.cache_hit_bytes / 1024:.0f} Ko servis depuis le cache, "
+                    f"{self.network_bytes / 1024:.0f} Ko transférés ({ratio:.1f}% de hits)")
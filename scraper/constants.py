@@ -49,4 +49,41 @@ ERROR_MESSAGES = {
     'navigation': "Erreur lors de la navigation vers l'URL",
     'extraction': "Erreur lors de l'extraction des données",
     'parse_error': "Erreur lors de l'analyse des prix",
-}
\ No newline at end of file
+}
+# Modes d'extraction des prix
+EXTRACTION_MODES = ('dom', 'network')
+
+# Fragments d'URL des réponses de l'API de recherche interceptées en mode 'network'
+SEARCH_API_PATTERNS = (
+    '/api/v3/StaysSearch',
+    '/api/v3/StaysMapS2Search',
+    '/api/v3/ExploreSearch',
+)
+
+# Identifiants des scripts contenant l'état de recherche sérialisé (première page rendue côté serveur)
+SEARCH_STATE_SCRIPT_IDS = ('data-deferred-state-0', 'data-deferred-state')
+
+# Nombre maximum de pages de résultats parcourues via les curseurs de pagination
+NETWORK_CAPTURE_MAX_PAGES = 3
+
+# Stratégies d'échantillonnage des dates d'arrivée dans un mois
+# - 'mid_month': un seul séjour commençant le 15 (comportement historique)
+# - 'weekdays': une arrivée chaque jour de SAMPLING_WEEKDAYS du mois
+# - 'evenly_spaced': N arrivées réparties régulièrement dans le mois
+# - 'daily': une arrivée chaque jour du mois (calendrier des prix jour par jour)
+SAMPLING_STRATEGIES = ('mid_month', 'weekdays', 'evenly_spaced', 'daily')
+
+# Jours d'arrivée de la stratégie 'weekdays' (0 = lundi): lundis et vendredis (week-ends)
+SAMPLING_WEEKDAYS = (0, 4)
+
+# Nombre d'arrivées par mois de la stratégie 'evenly_spaced'
+DEFAULT_SAMPLES_PER_MONTH = 4
+
+# Navigateurs se partageant les dates d'arrivée d'un mois (chargements de pages en parallèle)
+DEFAULT_DRIVERS_PER_MONTH = 2
+
+# Nombre minimum de dates d'arrivée par navigateur avant d'en ouvrir un de plus
+MIN_DATES_PER_DRIVER = 4
+
+# Délai maximal (secondes) pour que le nombre de résultats se stabilise après le défilement
+RESULTS_SETTLE_TIMEOUT = 2
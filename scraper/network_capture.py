@@ -0,0 +1,359 @@
+"""
+Capture des réponses de l'API de recherche Airbnb via le protocole DevTools.
+
+Plutôt que d'analyser le DOM rendu, ce module intercepte les réponses JSON
+que la page récupère elle-même (XHR de recherche et état sérialisé de la
+première page) et en extrait directement les prix et identifiants d'annonces.
+"""
+
+import re
+import json
+import time
+import base64
+import logging
+from urllib.parse import quote
+
+from .constants import SEARCH_API_PATTERNS, SEARCH_STATE_SCRIPT_IDS
+from .utils import clean_price_text
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+
+def enable_network_capture(options):
+    """
+    Active la journalisation réseau DevTools sur des options Chrome.
+
+    Args:
+        options: Instance de selenium.webdriver.chrome.options.Options
+
+    Returns:
+        Les options modifiées
+    """
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def _decode_listing_id(raw_id):
+    """
+    Convertit un identifiant d'annonce Airbnb en entier.
+
+    Les identifiants sont soit numériques ("12345"), soit encodés en base64
+    sous la forme "DemandStayListing:12345".
+
+    Args:
+        raw_id: Identifiant brut issu du JSON
+
+    Returns:
+        Identifiant entier ou None si le format est inconnu
+    """
+    if raw_id is None:
+        return None
+
+    raw_id = str(raw_id)
+    if raw_id.isdigit():
+        return int(raw_id)
+
+    try:
+        decoded = base64.b64decode(raw_id + '=' * (-len(raw_id) % 4)).decode('utf-8')
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+    match = re.search(r':(\d+)$', decoded)
+    return int(match.group(1)) if match else None
+
+
+def _extract_quote_price(pricing_quote):
+    """
+    Extrait le prix affiché d'un bloc 'pricingQuote'.
+
+    Args:
+        pricing_quote: Dictionnaire 'pricingQuote' d'un résultat de recherche
+
+    Returns:
+        Prix en nombre flottant ou None
+    """
+    if not isinstance(pricing_quote, dict):
+        return None
+
+    display_price = pricing_quote.get('structuredStayDisplayPrice') or {}
+    primary_line = display_price.get('primaryLine') or {}
+
+    for key in ('discountedPrice', 'price', 'originalPrice'):
+        price_text = primary_line.get(key)
+        if price_text:
+            price = clean_price_text(price_text)
+            if price:
+                return price
+
+    # Ancien format: prix numérique directement dans le bloc
+    rate = pricing_quote.get('rate') or {}
+    amount = rate.get('amount')
+    if isinstance(amount, (int, float)) and amount > 0:
+        return float(amount)
+
+    return None
+
+
+def _extract_coordinates(*nodes):
+    """
+    Extrait les coordonnées d'une annonce à partir de ses blocs JSON.
+
+    Selon les versions de l'API, elles figurent dans 'coordinate', 'location.coordinate'
+    ou directement dans les champs 'lat'/'lng' de l'annonce.
+
+    Args:
+        nodes: Dictionnaires 'listing' / 'demandStayListing' d'un résultat de recherche
+
+    Returns:
+        Tuple (latitude, longitude) ou None
+    """
+    for node in nodes:
+        if not isinstance(node, dict):
+            continue
+
+        coordinate = node.get('coordinate') or (node.get('location') or {}).get('coordinate')
+        if isinstance(coordinate, dict):
+            lat, lng = coordinate.get('latitude'), coordinate.get('longitude')
+        else:
+            lat, lng = node.get('lat'), node.get('lng')
+
+        if isinstance(lat, (int, float)) and isinstance(lng, (int, float)):
+            return float(lat), float(lng)
+
+    return None
+
+
+def decode_search_payload(payload):
+    """
+    Extrait les annonces et le curseur de page suivante d'une réponse de recherche.
+
+    Le parcours est récursif pour ne pas dépendre de l'emplacement exact des
+    résultats dans l'arborescence GraphQL, qui varie selon les versions du site.
+
+    Args:
+        payload: Objet JSON décodé (réponse XHR ou état sérialisé de la page)
+
+    Returns:
+        Tuple (liste de dictionnaires {'id', 'price', 'coordinates'}, curseur de page suivante ou None)
+    """
+    listings = []
+    next_cursor = None
+    stack = [payload]
+
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+
+        if not isinstance(node, dict):
+            continue
+
+        if 'pricingQuote' in node and ('listing' in node or 'demandStayListing' in node):
+            listing = node.get('listing') or {}
+            demand_listing = node.get('demandStayListing') or {}
+            listing_id = (_decode_listing_id(listing.get('id'))
+                          or _decode_listing_id(demand_listing.get('id')))
+            price = _extract_quote_price(node.get('pricingQuote'))
+
+            if price is not None:
+                listings.append({
+                    'id': listing_id,
+                    'price': price,
+                    'coordinates': _extract_coordinates(listing, demand_listing),
+                })
+            continue
+
+        pagination = node.get('paginationInfo')
+        if isinstance(pagination, dict) and pagination.get('nextPageCursor'):
+            next_cursor = pagination['nextPageCursor']
+
+        stack.extend(node.values())
+
+    return listings, next_cursor
+
+
+class SearchApiCapture:
+    """
+    Collecte les réponses de l'API de recherche interceptées sur un driver Chrome.
+
+    Les annonces sont dédupliquées par identifiant au fur et à mesure de
+    l'arrivée des réponses, y compris celles des pages suivantes.
+    """
+
+    def __init__(self, driver, max_pages=3, timeout=15):
+        """
+        Initialise le collecteur.
+
+        Args:
+            driver: Driver Chrome créé avec enable_network_capture()
+            max_pages: Nombre maximum de pages de résultats à parcourir
+            timeout: Délai d'attente maximum par page (en secondes)
+        """
+        self.driver = driver
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self._listings = {}
+        self._coordinates = {}
+        self._anonymous_prices = []
+        self._pending_requests = {}
+        self._next_cursor = None
+
+    def _add_listings(self, listings, cursor):
+        """Ajoute des annonces décodées et retourne le nombre de nouvelles annonces"""
+        added = 0
+        for listing in listings:
+            if listing['id'] is None:
+                self._anonymous_prices.append(listing['price'])
+                added += 1
+            elif listing['id'] not in self._listings:
+                self._listings[listing['id']] = listing['price']
+                if listing.get('coordinates'):
+                    self._coordinates[listing['id']] = listing['coordinates']
+                added += 1
+
+        if cursor:
+            self._next_cursor = cursor
+        return added
+
+    def _read_response_body(self, request_id):
+        """Récupère et décode le corps JSON d'une réponse interceptée"""
+        try:
+            response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            logger.debug(f"Corps de réponse indisponible pour {request_id}: {str(e)}")
+            return None
+
+        body = response.get('body', '')
+        if response.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def poll(self):
+        """
+        Traite les événements réseau reçus depuis le dernier appel.
+
+        Returns:
+            Nombre de nouvelles annonces décodées
+        """
+        added = 0
+
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params', {})
+
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '')
+                if any(pattern in url for pattern in SEARCH_API_PATTERNS):
+                    self._pending_requests[params.get('requestId')] = url
+
+            elif method == 'Network.loadingFinished':
+                url = self._pending_requests.pop(params.get('requestId'), None)
+                if url is None:
+                    continue
+
+                payload = self._read_response_body(params['requestId'])
+                if payload is not None:
+                    listings, cursor = decode_search_payload(payload)
+                    added += self._add_listings(listings, cursor)
+                    logger.debug(f"Réponse de recherche interceptée ({url}): {len(listings)} annonces")
+
+        return added
+
+    def read_embedded_state(self):
+        """
+        Décode l'état de recherche sérialisé dans la page (première page rendue côté serveur).
+
+        Returns:
+            Nombre de nouvelles annonces décodées
+        """
+        added = 0
+        for script_id in SEARCH_STATE_SCRIPT_IDS:
+            try:
+                content = self.driver.execute_script(
+                    "const el = document.getElementById(arguments[0]);"
+                    "return el ? el.textContent : null;",
+                    script_id
+                )
+            except Exception:
+                content = None
+
+            if not content:
+                continue
+
+            try:
+                listings, cursor = decode_search_payload(json.loads(content))
+            except ValueError:
+                continue
+            added += self._add_listings(listings, cursor)
+
+        return added
+
+    def _wait_for_page(self):
+        """Attend l'arrivée de résultats pour la page courante"""
+        deadline = time.time() + self.timeout
+        added = self.read_embedded_state()
+
+        while time.time() < deadline:
+            added += self.poll()
+            if added:
+                # Laisser une courte fenêtre aux réponses concurrentes de la même page
+                time.sleep(0.3)
+                return added + self.poll()
+            time.sleep(0.2)
+
+        return added
+
+    def collect(self, search_url):
+        """
+        Navigue vers une recherche et collecte les annonces de toutes ses pages.
+
+        Args:
+            search_url: URL de la page de recherche
+
+        Returns:
+            Tuple (liste des prix, dict {identifiant d'annonce: prix},
+            dict {identifiant d'annonce: (latitude, longitude)})
+        """
+        # Vider le journal des événements antérieurs à la navigation
+        self.driver.get_log('performance')
+        self.driver.get(search_url)
+
+        for page in range(self.max_pages):
+            self._next_cursor = None
+            added = self._wait_for_page()
+            logger.info(f"Capture réseau: page {page + 1}, {added} nouvelles annonces")
+
+            if not added or not self._next_cursor or page == self.max_pages - 1:
+                break
+
+            separator = '&' if '?' in search_url else '?'
+            self.driver.get(f"{search_url}{separator}cursor={quote(self._next_cursor)}")
+
+        return self.prices, self.listings, self.coordinates
+
+    @property
+    def prices(self):
+        """Prix de toutes les annonces collectées"""
+        return list(self._listings.values()) + self._anonymous_prices
+
+    @property
+    def listings(self):
+        """Prix des annonces collectées, par identifiant"""
+        return dict(self._listings)
+
+    @property
+    def coordinates(self):
+        """Coordonnées des annonces collectées qui en exposent, par identifiant"""
+        return dict(self._coordinates)
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 
 # Selenium imports
 from selenium import webdriver
@@ -26,6 +27,18 @@ from selenium.common.exceptions import (
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 
+from .constants import (
+    EXTRACTION_MODES, NETWORK_CAPTURE_MAX_PAGES, DEFAULT_STAY_DURATION, DEFAULT_ADULTS,
+    SAMPLING_STRATEGIES, DEFAULT_SAMPLES_PER_MONTH, DEFAULT_DRIVERS_PER_MONTH, MIN_DATES_PER_DRIVER,
+    RESULTS_SETTLE_TIMEOUT, SELECTORS
+)
+from .utils import get_sample_dates
+from .network_capture import enable_network_capture, SearchApiCapture
+from .browser_profiles import BrowserProfileManager
+from .singleflight import get_single_flight
+from analyzer.manifest import DataManifest
+from analyzer.storage import RAW_SCHEMA, LISTING_COLUMNS, to_bytes
+
 # Configuration du logger
 logger = logging.getLogger('scraper')
 
@@ -36,7 +49,9 @@ class AirbnbScraper:
     donnée sur une période de 12 mois.
     """
 
-    def __init__(self, base_url, data_dir, headless=True, max_retries=3, timeout=15):
+    def __init__(self, base_url, data_dir, headless=True, max_retries=3, timeout=15, extraction_mode='dom',
+                 profiles_dir=None, profile_refresh_hours=24, sampling='mid_month',
+                 samples_per_month=DEFAULT_SAMPLES_PER_MONTH, drivers_per_month=DEFAULT_DRIVERS_PER_MONTH):
         """
         Initialise le scraper Airbnb.
 
@@ -46,19 +61,47 @@ class AirbnbScraper:
             headless: Si True, exécute le navigateur en mode headless (sans interface graphique)
             max_retries: Nombre maximal de tentatives en cas d'échec
             timeout: Délai d'attente maximum pour les éléments web (en secondes)
+            extraction_mode: 'dom' pour analyser la page rendue, 'network' pour intercepter
+                les réponses de l'API de recherche (avec repli sur le DOM)
+            profiles_dir: Répertoire des profils Chrome partagés (consentement et cache HTTP
+                pré-chargés); si None, chaque navigateur démarre avec un profil vierge
+            profile_refresh_hours: Âge maximal du profil de référence avant réinitialisation
+            sampling: Stratégie d'échantillonnage des dates d'arrivée de chaque mois
+                ('mid_month', 'weekdays' ou 'evenly_spaced')
+            samples_per_month: Nombre d'arrivées par mois pour la stratégie 'evenly_spaced'
+            drivers_per_month: Nombre maximal de navigateurs se partageant les dates d'arrivée
+                d'un mois (au plus un par MIN_DATES_PER_DRIVER dates)
         """
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Mode d'extraction inconnu: {extraction_mode}")
+        if sampling not in SAMPLING_STRATEGIES:
+            raise ValueError(f"Stratégie d'échantillonnage inconnue: {sampling}")
+
         self.base_url = base_url
         self.raw_data_dir = Path(data_dir) / 'raw'
         self.max_retries = max_retries
         self.timeout = timeout
+        self.extraction_mode = extraction_mode
+        self.sampling = sampling
+        self.samples_per_month = samples_per_month
+        self.drivers_per_month = max(1, drivers_per_month)
 
         # Créer le répertoire de données s'il n'existe pas
         os.makedirs(self.raw_data_dir, exist_ok=True)
 
+        # Résultats par date d'arrivée (échantillonnage multi-dates)
+        self.samples_dir = self.raw_data_dir / 'samples'
+
         # Créer un répertoire pour le cache
         self.cache_dir = Path(data_dir) / 'cache'
         os.makedirs(self.cache_dir, exist_ok=True)
 
+        # Index des fichiers de données (écritures atomiques, répertoire par destination)
+        self.manifest = DataManifest(data_dir)
+
+        # Registre partagé des scrapings en cours (coalescence des requêtes identiques)
+        self.single_flight = get_single_flight(Path(data_dir) / 'locks')
+
         # Configurer les options du navigateur
         self.chrome_options = Options()
         if headless:
@@ -86,6 +129,11 @@ class AirbnbScraper:
         self.chrome_options.add_argument(
             "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
 
+        # Gestionnaire des profils navigateur partagés (optionnel)
+        self.profile_manager = None
+        if profiles_dir:
+            self.profile_manager = BrowserProfileManager(profiles_dir, profile_refresh_hours)
+
         # Initialiser le driver à None
         self.driver = None
 
@@ -269,12 +317,17 @@ class AirbnbScraper:
         except Exception as e:
             logger.warning(f"Erreur pendant le scroll: {str(e)}")
 
-    def _get_cache_key(self, destination, year, month):
-        """Génère une clé de cache unique pour la destination et la date"""
-        return os.path.join(
-            str(self.cache_dir),
-            f"{destination.replace(',', '_').replace(' ', '_')}_{year}_{month}.json"
-        )
+    def _get_cache_key(self, destination, year, month, stay_duration=DEFAULT_STAY_DURATION, adults=DEFAULT_ADULTS):
+        """Génère une clé de cache unique pour la destination, la date et les paramètres de séjour"""
+        filename = f"{destination.replace(',', '_').replace(' ', '_')}_{year}_{month}"
+        # Les paramètres par défaut gardent l'ancien nom de fichier pour conserver le cache existant
+        if stay_duration != DEFAULT_STAY_DURATION or adults != DEFAULT_ADULTS:
+            filename += f"_{stay_duration}n_{adults}a"
+        if self.sampling != 'mid_month':
+            filename += f"_{self.sampling}"
+            if self.sampling == 'evenly_spaced':
+                filename += str(self.samples_per_month)
+        return os.path.join(str(self.cache_dir), f"{filename}.json")
 
     def _get_from_cache(self, cache_key):
         """Récupère les données depuis le cache si elles existent"""
@@ -297,208 +350,521 @@ class AirbnbScraper:
         except Exception as e:
             logger.warning(f"Erreur lors de la sauvegarde dans le cache: {str(e)}")
 
-    def _scrape_month(self, destination, year, month, stay_duration=7):
+    def _extract_prices_from_dom(self, driver, url, month, accept_cookies=True):
+        """
+        Charge la page de recherche et extrait les prix à partir du DOM rendu.
+
+        Args:
+            driver: Driver Selenium à utiliser
+            url: URL de la page de recherche
+            month: Mois scrapé (pour les logs)
+            accept_cookies: Si False, n'attend pas la bannière de cookies
+                (consentement déjà présent dans le profil)
+
+        Returns:
+            Tuple (liste des prix extraits, dict {identifiant d'annonce: prix},
+            dict {identifiant d'annonce: (latitude, longitude)})
+        """
+        html = self._load_search_page(driver, url, accept_cookies)
+        return self._parse_search_html(html, month)
+
+    def _load_search_page(self, driver, url, accept_cookies=True):
+        """
+        Charge une page de recherche, la fait défiler et retourne son HTML.
+
+        Args:
+            driver: Driver Selenium à utiliser
+            url: URL de la page de recherche
+            accept_cookies: Si False, n'attend pas la bannière de cookies
+
+        Returns:
+            HTML de la page une fois les résultats chargés
+        """
+        logger.info(f"Navigation vers {url}")
+        driver.get(url)
+
+        results = (By.CSS_SELECTOR, SELECTORS['price_container'])
+        wait = WebDriverWait(driver, self.timeout)
+
+        # Accepter les cookies si la bannière s'affiche avant les résultats
+        if accept_cookies:
+            cookie_button = (By.CSS_SELECTOR, SELECTORS['cookie_button'])
+            wait.until(EC.any_of(
+                EC.presence_of_element_located(results),
+                EC.element_to_be_clickable(cookie_button)
+            ))
+            for button in driver.find_elements(*cookie_button):
+                try:
+                    button.click()
+                    logger.info("Cookies acceptés")
+                except WebDriverException:
+                    pass
+                break
+
+        # Attendre que les éléments de prix soient chargés
+        wait.until(EC.presence_of_element_located(results))
+
+        # Faire défiler la page, puis attendre que le nombre de résultats ne change plus
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        counts = []
+
+        def settled(current_driver):
+            counts.append(len(current_driver.find_elements(*results)))
+            return len(counts) > 1 and counts[-1] == counts[-2]
+
+        try:
+            WebDriverWait(driver, RESULTS_SETTLE_TIMEOUT, poll_frequency=0.25).until(settled)
+        except TimeoutException:
+            pass
+
+        return driver.page_source
+
+    def _parse_search_html(self, html, month):
+        """
+        Extrait les prix et identifiants d'annonces du HTML d'une page de recherche.
+
+        Args:
+            html: HTML de la page de recherche
+            month: Mois scrapé (pour les logs)
+
+        Returns:
+            Tuple (liste des prix extraits, dict {identifiant d'annonce: prix},
+            dict {identifiant d'annonce: (latitude, longitude)})
+        """
+        prices = []
+        listings = {}
+        coordinates = {}
+
+        # Analyser le HTML
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Trouver les conteneurs d'hébergement
+        cards = soup.find_all('div', {'data-testid': "card-container"})
+        logger.info(f"Mois {month}: {len(cards)} hébergements trouvés")
+
+        # Récupérer les classes utilisées pour les prix dans la page actuelle
+        price_classes = []
+        test_selectors = ['._hb913q', '.u1y3vocb', '._4dhrua']
+        for selector in test_selectors:
+            if len(soup.select(selector)) > 0:
+                price_classes.append(selector.lstrip('.'))
+
+        # Si des classes ont été identifiées, les utiliser pour l'extraction
+        if price_classes:
+            for listing in cards:
+                for cls in price_classes:
+                    price_element = listing.find('span', class_=cls)
+                    if price_element:
+                        price_text = price_element.text
+                        price = re.sub(r"\D", "", price_text)
+                        if price.isdigit():
+                            prices.append(int(price))
+
+                            # Identifiant de l'annonce d'après le lien de la carte
+                            link = listing.find('a', href=re.compile(r'/rooms/\d+'))
+                            if link:
+                                listing_id = int(re.search(r'/rooms/(\d+)', link['href']).group(1))
+                                listings.setdefault(listing_id, int(price))
+
+                                # Coordonnées exposées en microdonnées, si présentes
+                                lat = listing.find('meta', itemprop='latitude')
+                                lng = listing.find('meta', itemprop='longitude')
+                                if lat and lng:
+                                    try:
+                                        coordinates[listing_id] = (float(lat['content']), float(lng['content']))
+                                    except (KeyError, ValueError):
+                                        pass
+                        break
+
+        # Si l'extraction basée sur les classes échoue, essayer une approche plus générale
+        if not prices:
+            price_spans = soup.select('span[data-testid="price-element"] span')
+            for span in price_spans:
+                price = re.sub(r"\D", "", span.text)
+                if price.isdigit():
+                    prices.append(int(price))
+
+        # Si toujours pas de prix, utiliser une regex sur toute la page
+        if not prices:
+            all_prices = re.findall(r'(\d+)\s*€', html)
+            for p in all_prices:
+                if p.isdigit() and int(p) > 10 and int(p) < 10000:  # Filtrer les valeurs improbables
+                    prices.append(int(p))
+
+        return prices, listings, coordinates
+
+    def _create_month_driver(self, user_data_dir=None):
+        """
+        Crée un navigateur dédié au scraping d'un mois.
+
+        Args:
+            user_data_dir: Répertoire de profil Chrome à utiliser (profil vierge si None)
+
+        Returns:
+            Driver Selenium initialisé
+        """
+        # Configuration des options
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-notifications")
+        options.add_argument("--disable-infobars")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-images")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--disable-animations")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+        options.add_argument(
+            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        )
+        if self.extraction_mode == 'network':
+            enable_network_capture(options)
+        if user_data_dir:
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+
+        # Chemins possibles pour le ChromeDriver - Utiliser la même logique que dans _setup_driver()
+        possible_paths = [
+            os.path.join(os.getcwd(), 'chromedriver-win64', 'chromedriver.exe'),
+            os.path.join(os.path.dirname(__file__), '..', 'chromedriver-win64', 'chromedriver.exe')
+        ]
+
+        # Trouver le chemin du ChromeDriver
+        chromedriver_path = None
+        for path in possible_paths:
+            if os.path.exists(path):
+                chromedriver_path = path
+                logger.info(f"Utilisation du ChromeDriver à l'emplacement: {chromedriver_path}")
+                break
+
+        # Si aucun chemin n'est trouvé, utiliser ChromeDriverManager
+        if not chromedriver_path:
+            chromedriver_path = ChromeDriverManager().install()
+            logger.info(f"ChromeDriver installé à: {chromedriver_path}")
+
+        # Initialiser le driver avec le chemin explicite
+        service = Service(chromedriver_path)
+        driver = webdriver.Chrome(service=service, options=options)
+        driver.implicitly_wait(5)
+        return driver
+
+    def _seed_profile(self, user_data_dir, destination):
+        """
+        Initialise un profil Chrome: accepte les cookies et charge une recherche
+        pour remplir le cache HTTP avec les ressources statiques du site.
+
+        Args:
+            user_data_dir: Répertoire du profil à initialiser
+            destination: Destination utilisée pour la recherche de préchauffage
+
+        Returns:
+            True si la bannière de consentement a été acceptée
+        """
+        driver = self._create_month_driver(user_data_dir)
+        consent = False
+        try:
+            driver.get(self.base_url)
+            try:
+                WebDriverWait(driver, 5).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-testid='accept-btn']"))
+                ).click()
+                consent = True
+                logger.info("Cookies acceptés dans le profil de référence")
+            except (TimeoutException, NoSuchElementException):
+                pass
+
+            check_in_date = datetime.now() + timedelta(days=30)
+            check_out_date = check_in_date + timedelta(days=7)
+            driver.get(self._construct_search_url(
+                destination, check_in_date.strftime('%Y-%m-%d'), check_out_date.strftime('%Y-%m-%d')
+            ))
+            try:
+                WebDriverWait(driver, self.timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='card-container']"))
+                )
+            except TimeoutException:
+                logger.warning("La recherche de préchauffage du profil n'a pas abouti")
+        finally:
+            driver.quit()
+
+        return consent
+
+    def _scrape_month(self, destination, year, month, stay_duration=7, adults=DEFAULT_ADULTS, force_refresh=False):
         """
         Scrape les prix pour un mois spécifique.
 
+        Les appels concurrents pour une même recherche (dans ce processus ou dans
+        un autre) sont coalescés: un seul navigateur est lancé et les autres
+        appelants récupèrent son résultat.
+
         Args:
             destination: Destination à rechercher (ex: "Paris,France")
             year: Année pour la recherche
             month: Mois à scraper (1-12)
             stay_duration: Durée du séjour en jours
+            adults: Nombre d'adultes
+            force_refresh: Si True, ignore les données du mois en cache
 
         Returns:
             Dictionnaire avec les données du mois ou None en cas d'échec
         """
-        # Vérifier si les données sont dans le cache
-        cache_key = self._get_cache_key(destination, year, month)
-        cached_data = self._get_from_cache(cache_key)
+        # Vérifier si les données sont dans le cache (sauf si force_refresh=True)
+        cache_key = self._get_cache_key(destination, year, month, stay_duration, adults)
+        cached_data = None if force_refresh else self._get_from_cache(cache_key)
 
-        # Si force_refresh=True dans les paramètres, ignorer le cache
         if cached_data:
             logger.info(f"Utilisation des données en cache pour {destination}, mois {month}, année {year}")
-            return cached_data
+            return {**cached_data, 'from_cache': True}
 
-        # Initialiser un nouveau navigateur pour chaque mois (évite les problèmes de réutilisation)
-        driver = None
-        try:
-            # Configuration des options
-            options = Options()
-            options.add_argument("--headless=new")
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--disable-notifications")
-            options.add_argument("--disable-infobars")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-images")
-            options.add_argument("--blink-settings=imagesEnabled=false")
-            options.add_argument("--disable-animations")
-            options.add_experimental_option("prefs", {
-                "profile.managed_default_content_settings.images": 2,
-            })
-            options.add_argument(
-                "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
+        # Un résultat partagé par un autre processus est enregistré (annonces comprises) par ce processus
+        return self.single_flight.do(
+            (destination, year, month, stay_duration, adults, self.sampling, self.samples_per_month),
+            lambda: self._fetch_month(destination, year, month, stay_duration, adults, cache_key),
+            shared_result=lambda: self._shared_from_cache(cache_key)
+        )
 
-            # Chemins possibles pour le ChromeDriver - Utiliser la même logique que dans _setup_driver()
-            possible_paths = [
-                os.path.join(os.getcwd(), 'chromedriver-win64', 'chromedriver.exe'),
-                os.path.join(os.path.dirname(__file__), '..', 'chromedriver-win64', 'chromedriver.exe')
-            ]
+    def _shared_from_cache(self, cache_key):
+        """Résultat d'un mois scrapé par un autre processus, lu dans le cache et marqué comme tel"""
+        data = self._get_from_cache(cache_key)
+        return {**data, 'from_cache': True} if data else data
 
-            # Trouver le chemin du ChromeDriver
-            chromedriver_path = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    chromedriver_path = path
-                    logger.info(f"Utilisation du ChromeDriver à l'emplacement: {chromedriver_path}")
-                    break
+    def _fetch_month(self, destination, year, month, stay_duration, adults, cache_key):
+        """
+        Lance un ou plusieurs navigateurs et récupère les prix d'un mois (sans passer par le cache).
 
-            # Si aucun chemin n'est trouvé, utiliser ChromeDriverManager
-            if not chromedriver_path:
-                chromedriver_path = ChromeDriverManager().install()
-                logger.info(f"ChromeDriver installé à: {chromedriver_path}")
+        Les dates d'arrivée échantillonnées du mois sont réparties entre au plus
+        drivers_per_month navigateurs (une session chacun, pages chargées en
+        parallèle); les agrégats du mois portent sur l'ensemble des prix collectés,
+        le détail par date étant conservé dans 'samples'.
 
-            # Initialiser le driver pour ce mois avec le chemin explicite
-            service = Service(chromedriver_path)
-            driver = webdriver.Chrome(service=service, options=options)
-            driver.implicitly_wait(5)
+        Args:
+            destination: Destination à rechercher (ex: "Paris,France")
+            year: Année pour la recherche
+            month: Mois à scraper (1-12)
+            stay_duration: Durée du séjour en jours
+            adults: Nombre d'adultes
+            cache_key: Fichier de cache où enregistrer le résultat
 
-            # Définir les dates de séjour (milieu du mois)
-            check_in_date = datetime(year, month, 15)
-            check_out_date = check_in_date + timedelta(days=stay_duration)
+        Returns:
+            Dictionnaire avec les données du mois ou None en cas d'échec
+        """
+        try:
+            # Définir les dates de séjour échantillonnées dans le mois
+            sample_dates = get_sample_dates(year, month, stay_duration, self.sampling, self.samples_per_month)
+            logger.info(f"Scraping du mois {month} ({len(sample_dates)} dates d'arrivée: "
+                        f"{', '.join(check_in for check_in, _ in sample_dates)})")
 
-            # Formater les dates pour l'URL
-            check_in_str = check_in_date.strftime('%Y-%m-%d')
-            check_out_str = check_out_date.strftime('%Y-%m-%d')
+            # Construire les URLs de recherche
+            formatted_dest = destination.replace(' ', '-').replace(',', '--')
+            urls = {
+                (check_in_str, check_out_str):
+                    f"{self.base_url}/s/{formatted_dest}/homes?checkin={check_in_str}&checkout={check_out_str}&adults={adults}&children=0&infants=0&pets=0"
+                for check_in_str, check_out_str in sample_dates
+            }
+
+            # Dates réparties entre plusieurs navigateurs: les pages se chargent en parallèle
+            n_drivers = max(1, min(self.drivers_per_month, len(sample_dates) // MIN_DATES_PER_DRIVER))
+            chunks = [sample_dates[i::n_drivers] for i in range(n_drivers)]
+            if n_drivers == 1:
+                samples = self._fetch_dates(month, chunks[0], urls)
+            else:
+                samples = {}
+                with ThreadPoolExecutor(max_workers=n_drivers) as executor:
+                    futures = [executor.submit(self._fetch_dates, month, chunk, urls) for chunk in chunks]
+                    for future in futures:
+                        try:
+                            samples.update(future.result())
+                        except Exception as e:
+                            logger.warning(f"Erreur d'un navigateur du mois {month}: {str(e)}")
+
+            # Vérifier qu'on a trouvé des prix
+            if not samples:
+                logger.error(f"Échec du scraping pour le mois {month} après {self.max_retries} tentatives")
+                return None
 
-            logger.info(f"Scraping du mois {month} ({check_in_str} à {check_out_str})")
+            # Fusionner les échantillons: agrégats sur l'ensemble des prix, détail conservé par date
+            prices = []
+            listings = {}
+            coordinates = {}
+            sample_rows = []
+            for (check_in_str, check_out_str), (sample_prices, sample_listings, sample_coordinates) \
+                    in sorted(samples.items()):
+                prices.extend(sample_prices)
+                for listing_id, price in sample_listings.items():
+                    listings.setdefault(listing_id, price)
+                coordinates.update(sample_coordinates)
+                sample_rows.append({
+                    'month': month,
+                    'check_in': check_in_str,
+                    'check_out': check_out_str,
+                    'nights': stay_duration,
+                    **self._summarize_prices(sample_prices),
+                })
+
+            first_check_in, first_check_out = min(samples)
+            month_name = datetime(year, month, 1).strftime('%B')
+
+            # Créer le dictionnaire de résultats
+            month_data = {
+                'month': month,
+                'month_name': month_name,
+                **self._summarize_prices(prices),
+                'check_in': first_check_in,
+                'check_out': first_check_out,
+                'sampled_dates': len(samples),
+                # Détail par date d'arrivée (exploration fine)
+                'samples': sample_rows,
+                # Annonces identifiées (suivi du renouvellement entre exécutions)
+                'listing_ids': list(listings.keys()),
+                'listing_prices': list(listings.values()),
+                # Coordonnées alignées sur listing_ids ([latitude, longitude] ou None)
+                'listing_coordinates': [coordinates.get(listing_id) for listing_id in listings],
+            }
+
+            # Sauvegarder dans le cache
+            self._save_to_cache(cache_key, month_data)
+
+            logger.info(f"Mois {month_name}: prix moyen = {month_data['avg_price']:.2f}€, "
+                        f"{len(prices)} échantillons sur {len(samples)} dates")
+            return month_data
 
-            # Construire l'URL de recherche
-            formatted_dest = destination.replace(' ', '-').replace(',', '--')
-            url = f"{self.base_url}/s/{formatted_dest}/homes?checkin={check_in_str}&checkout={check_out_str}&adults=2&children=0&infants=0&pets=0"
+        except Exception as e:
+            logger.error(f"Erreur lors du scraping du mois {month}: {str(e)}")
+            return None
 
+    def _fetch_dates(self, month, sample_dates, urls):
+        """
+        Scrape des dates d'arrivée d'un mois sur un navigateur dédié, avec reprises.
+
+        Args:
+            month: Mois scrapé (pour les logs)
+            sample_dates: Liste de tuples (check_in, check_out)
+            urls: Dictionnaire {(check_in, check_out): URL de recherche}
+
+        Returns:
+            Dictionnaire {(check_in, check_out): (prix, annonces, coordonnées)} des dates réussies
+        """
+        # Initialiser un nouveau navigateur (évite les problèmes de réutilisation)
+        driver = None
+        profile_scope = ExitStack()
+        try:
+            user_data_dir = None
+            if self.profile_manager:
+                user_data_dir = profile_scope.enter_context(self.profile_manager.acquire())
+            driver = self._create_month_driver(user_data_dir)
+
+            # Le consentement n'est à accepter qu'une fois par session (ou jamais s'il est dans le profil)
+            session = {'accept_cookies': not (self.profile_manager and self.profile_manager.consent_seeded)}
+
+            samples = {}
+            remaining = list(sample_dates)
             for attempt in range(self.max_retries):
-                try:
-                    logger.info(f"Navigation vers {url}")
-                    driver.get(url)
-                    time.sleep(random.uniform(1, 2))
+                for dates, result in self._fetch_samples(driver, month, [(d, urls[d]) for d in remaining], session):
+                    if result and result[0]:
+                        samples[dates] = result
 
-                    # Accepter les cookies si nécessaire
-                    try:
-                        WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-testid='accept-btn']"))
-                        ).click()
-                        logger.info("Cookies acceptés")
-                    except (TimeoutException, NoSuchElementException):
-                        pass
-
-                    # Faire défiler la page
-                    for _ in range(3):
-                        driver.execute_script("window.scrollBy(0, 1000);")
-                        time.sleep(0.5)
-                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(1)
-
-                    # Extraire les prix
-                    prices = []
-
-                    # Attendre que les éléments de prix soient chargés
-                    WebDriverWait(driver, 15).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='card-container']"))
-                    )
-
-                    # Obtenir le HTML et l'analyser
-                    html = driver.page_source
-                    soup = BeautifulSoup(html, 'html.parser')
-
-                    # Trouver les conteneurs d'hébergement
-                    listings = soup.find_all('div', {'data-testid': "card-container"})
-                    logger.info(f"Mois {month}: {len(listings)} hébergements trouvés")
-
-                    # Récupérer les classes utilisées pour les prix dans la page actuelle
-                    price_classes = []
-                    test_selectors = ['._hb913q', '.u1y3vocb', '._4dhrua']
-                    for selector in test_selectors:
-                        if len(soup.select(selector)) > 0:
-                            price_classes.append(selector.lstrip('.'))
-
-                    # Si des classes ont été identifiées, les utiliser pour l'extraction
-                    if price_classes:
-                        for listing in listings:
-                            for cls in price_classes:
-                                price_element = listing.find('span', class_=cls)
-                                if price_element:
-                                    price_text = price_element.text
-                                    price = re.sub(r"\D", "", price_text)
-                                    if price.isdigit():
-                                        prices.append(int(price))
-                                    break
-
-                    # Si l'extraction basée sur les classes échoue, essayer une approche plus générale
-                    if not prices:
-                        price_spans = soup.select('span[data-testid="price-element"] span')
-                        for span in price_spans:
-                            price = re.sub(r"\D", "", span.text)
-                            if price.isdigit():
-                                prices.append(int(price))
-
-                    # Si toujours pas de prix, utiliser une regex sur toute la page
-                    if not prices:
-                        all_prices = re.findall(r'(\d+)\s*€', html)
-                        for p in all_prices:
-                            if p.isdigit() and int(p) > 10 and int(p) < 10000:  # Filtrer les valeurs improbables
-                                prices.append(int(p))
-
-                    # Vérifier qu'on a trouvé des prix
-                    if prices:
-                        month_name = check_in_date.strftime('%B')
-                        avg_price = sum(prices) / len(prices)
-                        median_price = sorted(prices)[len(prices) // 2] if prices else 0  # Calcul simple de la médiane
-
-                        # Créer le dictionnaire de résultats
-                        month_data = {
-                            'month': month,
-                            'month_name': month_name,
-                            'avg_price': avg_price,
-                            'median_price': pd.Series(prices).median() if prices else 0,
-                            'min_price': min(prices) if prices else 0,
-                            'max_price': max(prices) if prices else 0,
-                            'sample_size': len(prices),
-                            'check_in': check_in_str,
-                            'check_out': check_out_str
-                        }
-
-                        # Sauvegarder dans le cache
-                        self._save_to_cache(cache_key, month_data)
-
-                        logger.info(f"Mois {month_name}: prix moyen = {avg_price:.2f}€, {len(prices)} échantillons")
-                        return month_data
-                    else:
-                        logger.warning(f"Aucun prix trouvé pour le mois {month} (tentative {attempt + 1})")
-                        if attempt < self.max_retries - 1:
-                            time.sleep(random.uniform(2, 4))
+                remaining = [dates for dates in remaining if dates not in samples]
+                if not remaining:
+                    break
 
-                except Exception as e:
-                    logger.warning(f"Erreur lors du scraping du mois {month} (tentative {attempt + 1}): {str(e)}")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(random.uniform(2, 4))
+                logger.warning(f"Aucun prix trouvé pour le mois {month} aux dates "
+                               f"{', '.join(check_in for check_in, _ in remaining)} (tentative {attempt + 1})")
+                if attempt < self.max_retries - 1:
+                    # Pause avant de retenter les seules dates en échec
+                    time.sleep(random.uniform(2, 4))
 
-            logger.error(f"Échec du scraping pour le mois {month} après {self.max_retries} tentatives")
-            return None
+            if self.profile_manager:
+                hit_bytes, _ = self.profile_manager.record_cache_stats(driver)
+                logger.debug(f"Mois {month}: {hit_bytes / 1024:.0f} Ko servis depuis le cache navigateur")
 
-        except Exception as e:
-            logger.error(f"Erreur lors du scraping du mois {month}: {str(e)}")
-            return None
+            return samples
         finally:
-            # Fermer le navigateur
+            # Fermer le navigateur puis libérer son profil
             if driver:
                 try:
                     driver.quit()
                 except:
                     pass
+            profile_scope.close()
+
+    def _fetch_samples(self, driver, month, targets, session):
+        """
+        Scrape une série de dates d'arrivée sur un même navigateur, en pipeline.
+
+        L'analyse du HTML d'une date (BeautifulSoup) s'exécute dans un thread
+        pendant que le navigateur charge la date suivante.
+
+        Args:
+            driver: Driver Selenium de la session du mois
+            month: Mois scrapé (pour les logs)
+            targets: Liste de tuples ((check_in, check_out), url)
+            session: État partagé de la session ({'accept_cookies': bool})
+
+        Yields:
+            Tuples ((check_in, check_out), (prix, annonces, coordonnées) ou None)
+        """
+        with ThreadPoolExecutor(max_workers=1) as parser:
+            pending = []
+
+            for dates, url in targets:
+                try:
+                    # Mode réseau: décoder directement les réponses JSON de l'API de recherche
+                    if self.extraction_mode == 'network':
+                        capture = SearchApiCapture(driver, max_pages=NETWORK_CAPTURE_MAX_PAGES,
+                                                   timeout=self.timeout)
+                        logger.info(f"Navigation vers {url} (capture réseau)")
+                        prices, listings, coordinates = capture.collect(url)
+
+                        if prices:
+                            logger.info(f"Mois {month} ({dates[0]}): {len(prices)} prix décodés depuis l'API "
+                                        f"({len(listings)} annonces identifiées)")
+                            pending.append((dates, None, (prices, listings, coordinates)))
+                            continue
+
+                        logger.info(f"Mois {month} ({dates[0]}): aucune réponse de recherche interceptée, "
+                                    f"repli sur l'extraction DOM")
+
+                    # Extraction DOM (mode par défaut et repli du mode réseau)
+                    html = self._load_search_page(driver, url, accept_cookies=session['accept_cookies'])
+                    session['accept_cookies'] = False
+                    pending.append((dates, parser.submit(self._parse_search_html, html, month), None))
+
+                except Exception as e:
+                    logger.warning(f"Erreur lors du scraping du mois {month} ({dates[0]}): {str(e)}")
+                    pending.append((dates, None, None))
+
+                # Restituer les résultats déjà analysés sans attendre la fin de la série
+                while pending and (pending[0][1] is None or pending[0][1].done()):
+                    yield self._sample_result(month, *pending.pop(0))
+
+            while pending:
+                yield self._sample_result(month, *pending.pop(0))
+
+    @staticmethod
+    def _sample_result(month, dates, future, result):
+        """Résultat d'une date d'arrivée, analysé en différé ou directement disponible"""
+        if future is None:
+            return dates, result
+        try:
+            return dates, future.result()
+        except Exception as e:
+            logger.warning(f"Erreur lors de l'analyse du mois {month} ({dates[0]}): {str(e)}")
+            return dates, None
+
+    @staticmethod
+    def _summarize_prices(prices):
+        """Agrégats d'une liste de prix"""
+        return {
+            'avg_price': sum(prices) / len(prices),
+            'median_price': pd.Series(prices).median(),
+            'min_price': min(prices),
+            'max_price': max(prices),
+            'sample_size': len(prices),
+        }
 
     def get_monthly_prices_parallel(self, destination, year=None, stay_duration=7, max_workers=3, force_refresh=False):
         """
@@ -512,7 +878,8 @@ class AirbnbScraper:
             force_refresh: Si True, ignore le cache et force la récupération de nouvelles données
 
         Returns:
-            DataFrame pandas avec les prix moyens, médians, min et max par mois
+            DataFrame pandas avec les prix moyens, médians, min et max par mois, complété par les
+            annonces identifiées (LISTING_COLUMNS et run_id) si au moins un mois a été scrapé
         """
         if not year:
             year = datetime.now().year
@@ -528,6 +895,10 @@ class AirbnbScraper:
         # Fermer le driver principal, puisque chaque worker aura son propre driver
         self.close()
 
+        # Préparer le profil de référence partagé (consentement + cache HTTP) si nécessaire
+        if self.profile_manager:
+            self.profile_manager.ensure_golden(lambda user_data_dir: self._seed_profile(user_data_dir, destination))
+
         try:
             # Liste de tous les mois à scraper
             months = list(range(1, 13))
@@ -537,7 +908,8 @@ class AirbnbScraper:
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 # Créer les tâches pour chaque mois
                 future_to_month = {
-                    executor.submit(self._scrape_month, destination, year, month, stay_duration): month
+                    executor.submit(self._scrape_month, destination, year, month, stay_duration,
+                                    force_refresh=force_refresh): month
                     for month in months
                 }
 
@@ -554,20 +926,49 @@ class AirbnbScraper:
                     except Exception as e:
                         logger.error(f"Exception pour le mois {month}: {str(e)}")
 
+            if self.profile_manager:
+                self.profile_manager.report()
+
             # Créer un DataFrame à partir des résultats
             if results:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                # Les annonces des mois servis par le cache ont été enregistrées lors de leur scraping:
+                # seuls les mois effectivement scrapés les renvoient
+                from_cache = [result.pop('from_cache', False) for result in results]
+                for result, cached in zip(results, from_cache):
+                    if cached:
+                        for column in LISTING_COLUMNS:
+                            result.pop(column, None)
+
+                # Le détail par date d'arrivée est enregistré à part pour l'exploration fine
+                sample_rows = [row for result in results for row in result.pop('samples', [])]
+                if self.sampling != 'mid_month' and sample_rows:
+                    os.makedirs(self.samples_dir, exist_ok=True)
+                    samples_file = self.samples_dir / f"{destination.replace(',', '_')}_{year}_{timestamp}.csv"
+                    pd.DataFrame(sample_rows).sort_values(['month', 'check_in']).to_csv(samples_file, index=False)
+                    logger.info(f"Détail par date d'arrivée sauvegardé dans {samples_file}")
+
                 df = pd.DataFrame(results)
 
                 # Trier par mois pour une meilleure lisibilité
                 df = df.sort_values('month')
 
-                # Sauvegarder les données brutes
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_file = self.raw_data_dir / f"{destination.replace(',', '_')}_{year}_{timestamp}.csv"
-                df.to_csv(output_file, index=False)
+                # Les annonces identifiées (colonnes LISTING_COLUMNS) ne sont pas dans les données brutes:
+                # elles sont renvoyées, avec l'identifiant de l'exécution, pour l'instantané des annonces
+                # enregistré par l'appelant; si tous les mois viennent du cache, cet instantané existe déjà
+                raw_df = df.drop(columns=LISTING_COLUMNS, errors='ignore')
+
+                # Sauvegarder les données brutes (Parquet typé si pyarrow est installé, sinon CSV)
+                content, extension = to_bytes(raw_df, RAW_SCHEMA)
+                output_file = self.manifest.write_bytes(
+                    content, 'raw', destination, f"{destination.replace(',', '_')}_{year}_{timestamp}.{extension}", year
+                )
                 logger.info(f"Données sauvegardées dans {output_file}")
 
-                return df
+                if all(from_cache):
+                    logger.info(f"Tous les mois de {destination} viennent du cache: pas de nouvel instantané des annonces")
+                    return raw_df
+                return df.reindex(columns=[*raw_df.columns, *LISTING_COLUMNS]).assign(run_id=timestamp)
             else:
                 logger.warning("Aucun résultat obtenu pour la destination et l'année spécifiées")
                 return None
@@ -611,7 +1012,7 @@ class AirbnbScraper:
 
 # Fonction pour utilisation directe du module
 def scrape_destination(destination, data_dir, year=None, stay_duration=7, headless=True, max_workers=3,
-                       force_refresh=False):
+                       force_refresh=False, extraction_mode=None, sampling=None):
     """
     Fonction utilitaire pour scraper une destination depuis un autre module.
 
@@ -623,6 +1024,8 @@ def scrape_destination(destination, data_dir, year=None, stay_duration=7, headle
         headless: Si True, exécute le navigateur en mode headless
         max_workers: Nombre de workers parallèles (max 3 recommandé)
         force_refresh: Si True, ignore le cache et force la récupération de nouvelles données
+        extraction_mode: 'dom' ou 'network' (défaut: settings.SCRAPER_EXTRACTION_MODE)
+        sampling: Stratégie d'échantillonnage des dates d'arrivée (défaut: settings.SCRAPER_SAMPLING_STRATEGY)
 
     Returns:
         DataFrame avec les résultats ou None en cas d'échec
@@ -632,12 +1035,24 @@ def scrape_destination(destination, data_dir, year=None, stay_duration=7, headle
     base_url = settings.AIRBNB_BASE_URL
     max_retries = settings.MAX_RETRIES
     timeout = settings.REQUEST_TIMEOUT
+    extraction_mode = extraction_mode or settings.SCRAPER_EXTRACTION_MODE
+    profiles_dir = settings.BROWSER_PROFILES_DIR if settings.SCRAPER_SHARED_PROFILE else None
+    sampling = sampling or settings.SCRAPER_SAMPLING_STRATEGY
 
-    scraper = AirbnbScraper(base_url, data_dir, headless, max_retries, timeout)
+    scraper = AirbnbScraper(base_url, data_dir, headless, max_retries, timeout, extraction_mode,
+                            profiles_dir, settings.BROWSER_PROFILE_REFRESH_HOURS,
+                            sampling, settings.SCRAPER_SAMPLES_PER_MONTH, settings.SCRAPER_DRIVERS_PER_MONTH)
     logger.info(f"Début du scraping pour {destination}")
 
     try:
-        result = scraper.run(destination, year, stay_duration, max_workers, force_refresh)
+        # Un seul scraping à la fois par recherche: les appelants concurrents partagent le résultat
+        # (une demande sans cache ne se rattache pas à un scraping qui utilise le cache)
+        result = scraper.single_flight.do(
+            ('destination', destination, year or datetime.now().year, stay_duration, DEFAULT_ADULTS, sampling,
+             force_refresh),
+            lambda: scraper.run(destination, year, stay_duration, max_workers, force_refresh),
+            cross_process=False
+        )
 
         if result is not None:
             logger.info(f"Scraping terminé avec succès pour {destination}")
@@ -675,12 +1090,14 @@ if __name__ == "__main__":
     # Destination par défaut si aucune n'est spécifiée
     destination = sys.argv[1] if len(sys.argv) > 1 else "Paris,France"
     force_refresh = "--force" in sys.argv
+    extraction_mode = 'network' if "--network" in sys.argv else 'dom'
 
     print(f"Scraping de {destination}..." + (" (refresh forcé)" if force_refresh else ""))
 
     # Instancier le scraper directement
     base_url = "https://www.airbnb.fr"
-    scraper = AirbnbScraper(base_url, data_dir, headless=False, max_retries=2, timeout=15)
+    scraper = AirbnbScraper(base_url, data_dir, headless=False, max_retries=2, timeout=15,
+                            extraction_mode=extraction_mode)
 
     # Lancer le scraping
     result = scraper.run(
@@ -0,0 +1,160 @@
+"""
+Coalescence "single-flight" des scrapings identiques.
+
+Lorsqu'un scraping est déjà en cours pour une même clé (destination, année,
+mois, durée de séjour, adultes), les appelants concurrents s'y rattachent
+au lieu de lancer leurs propres navigateurs:
+
+- dans le même processus, ils attendent le résultat du premier appelant;
+- dans un autre processus (serveur web et commande run_scraper), un fichier
+  de verrou signale le scraping en cours; l'appelant attend sa libération
+  puis relit le résultat partagé (cache JSON du mois).
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+
+class SingleFlight:
+    """
+    Registre des exécutions en cours, partagé par toutes les instances du scraper.
+    """
+
+    def __init__(self, lock_dir, stale_after=3600, poll_interval=1.0):
+        """
+        Initialise le registre.
+
+        Args:
+            lock_dir: Répertoire des fichiers de verrou inter-processus
+            stale_after: Âge (en secondes) au-delà duquel un verrou est considéré abandonné
+            poll_interval: Intervalle de vérification d'un verrou détenu par un autre processus
+        """
+        self.lock_dir = Path(lock_dir)
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+
+    def _lock_path(self, key):
+        """Chemin du fichier de verrou associé à une clé"""
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return self.lock_dir / f"{digest}.lock"
+
+    def _try_acquire_file_lock(self, lock_path):
+        """Tente de créer le verrou inter-processus; retourne True en cas de succès"""
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > self.stale_after:
+                    logger.warning(f"Verrou abandonné supprimé: {lock_path}")
+                    os.remove(lock_path)
+            except OSError:
+                pass
+            return False
+
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+
+    def _run_cross_process(self, key, fn, shared_result):
+        """Exécute fn sous verrou fichier, ou attend le processus qui la détient"""
+        lock_path = self._lock_path(key)
+        waited = False
+
+        while True:
+            if self._try_acquire_file_lock(lock_path):
+                try:
+                    # Un autre processus a pu terminer entre-temps
+                    if waited and shared_result is not None:
+                        result = shared_result()
+                        if result is not None:
+                            return result
+                    return fn()
+                finally:
+                    try:
+                        os.remove(lock_path)
+                    except OSError:
+                        pass
+
+            if not waited:
+                logger.info(f"Scraping déjà en cours dans un autre processus pour {key}, en attente du résultat")
+                waited = True
+
+            time.sleep(self.poll_interval)
+
+            if shared_result is not None and not lock_path.exists():
+                result = shared_result()
+                if result is not None:
+                    logger.info(f"Résultat partagé récupéré pour {key}")
+                    return result
+
+    def do(self, key, fn, shared_result=None, cross_process=True):
+        """
+        Exécute fn une seule fois pour des appels concurrents de même clé.
+
+        Args:
+            key: Clé hashable identifiant le travail
+            fn: Fonction sans argument produisant le résultat
+            shared_result: Fonction sans argument relisant le résultat produit par un
+                autre processus (None si aucun résultat partagé n'est disponible)
+            cross_process: Si True, coordonne aussi les processus via un fichier de verrou
+
+        Returns:
+            Résultat de fn (ou de l'exécution à laquelle l'appel s'est rattaché)
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            logger.info(f"Rattachement au scraping en cours pour {key}")
+            return future.result()
+
+        try:
+            if cross_process:
+                result = self._run_cross_process(key, fn, shared_result)
+            else:
+                result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_single_flight(lock_dir):
+    """
+    Retourne le registre single-flight partagé pour un répertoire de verrous.
+
+    Args:
+        lock_dir: Répertoire des fichiers de verrou
+
+    Returns:
+        Instance de SingleFlight commune au processus
+    """
+    lock_dir = os.path.abspath(lock_dir)
+    with _registries_lock:
+        if lock_dir not in _registries:
+            _registries[lock_dir] = SingleFlight(lock_dir)
+        return _registries[lock_dir]
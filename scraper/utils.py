@@ -8,7 +8,8 @@ import logging
 import re
 from datetime import datetime, timedelta
 from urllib.parse import quote_plus
-from .constants import USER_AGENTS, SEASONS
+import calendar
+from .constants import USER_AGENTS, SEASONS, SAMPLING_WEEKDAYS, DEFAULT_SAMPLES_PER_MONTH
 
 # Configuration du logger
 logger = logging.getLogger('scraper')
@@ -89,26 +90,33 @@ def clean_price_text(price_text):
     """
     Nettoie et convertit un texte de prix en nombre.
 
+    Les séparateurs de milliers peuvent être une espace (simple, insécable ou fine
+    insécable U+202F, utilisée par l'API d'Airbnb), une virgule ou un point; le
+    séparateur décimal est le dernier séparateur suivi de un ou deux chiffres.
+
     Args:
-        price_text: Texte du prix (ex: "145 €", "1 045,50 €")
+        price_text: Texte du prix (ex: "145 €", "1 045,50 €", "1\u202f234 €", "€1,234.50")
 
     Returns:
         Prix en nombre flottant, ou None si la conversion échoue
     """
     try:
-        # Supprimer la devise et les espaces
-        price_text = price_text.replace('€', '').replace(' ', '').replace('\xa0', '')
-
-        # Remplacer les virgules par des points pour la décimale
-        price_text = price_text.replace(',', '.')
+        # Supprimer les espaces entre les groupes de chiffres (séparateurs de milliers)
+        price_text = re.sub(r'(?<=\d)\s+(?=\d{3}(?!\d))', '', price_text)
 
-        # Extraire le nombre avec regex
-        match = re.search(r'(\d+(?:\.\d+)?)', price_text)
-        if match:
-            return float(match.group(1))
-        else:
+        # Premier nombre du texte, avec ses séparateurs
+        match = re.search(r'\d+(?:[.,]\d+)*', price_text)
+        if not match:
             return None
-    except (ValueError, AttributeError):
+        number = match.group(0)
+
+        # Partie décimale: dernier séparateur suivi de 1 ou 2 chiffres
+        decimal = re.search(r'[.,](\d{1,2})$', number)
+        if decimal:
+            integer_part = number[:decimal.start()]
+            return float(re.sub(r'[.,]', '', integer_part) + '.' + decimal.group(1))
+        return float(re.sub(r'[.,]', '', number))
+    except (ValueError, AttributeError, TypeError):
         logger.warning(f"Impossible de convertir le prix: {price_text}")
         return None
 
@@ -136,6 +144,46 @@ def get_month_dates(year, month, stay_duration=7):
     return check_in_str, check_out_str
 
 
+def get_sample_dates(year, month, stay_duration=7, strategy='mid_month', samples=DEFAULT_SAMPLES_PER_MONTH):
+    """
+    Calcule les dates d'arrivée et de départ échantillonnées dans un mois.
+
+    Args:
+        year: Année du séjour
+        month: Mois du séjour (1-12)
+        stay_duration: Durée du séjour en jours
+        strategy: 'mid_month', 'weekdays', 'evenly_spaced' ou 'daily'
+        samples: Nombre d'arrivées pour la stratégie 'evenly_spaced'
+
+    Returns:
+        Liste de tuples (check_in, check_out) au format 'YYYY-MM-DD', triée par date
+    """
+    if strategy == 'mid_month':
+        return [get_month_dates(year, month, stay_duration)]
+
+    days_in_month = calendar.monthrange(year, month)[1]
+
+    if strategy == 'weekdays':
+        days = [day for day in range(1, days_in_month + 1)
+                if calendar.weekday(year, month, day) in SAMPLING_WEEKDAYS]
+    elif strategy == 'evenly_spaced':
+        # Milieu de chacune des N tranches égales du mois
+        samples = max(1, min(samples, days_in_month))
+        days = sorted({days_in_month * (2 * k + 1) // (2 * samples) + 1 for k in range(samples)})
+    elif strategy == 'daily':
+        days = range(1, days_in_month + 1)
+    else:
+        raise ValueError(f"Stratégie d'échantillonnage inconnue: {strategy}")
+
+    dates = []
+    for day in days:
+        check_in_date = datetime(year, month, day)
+        check_out_date = check_in_date + timedelta(days=stay_duration)
+        dates.append((check_in_date.strftime('%Y-%m-%d'), check_out_date.strftime('%Y-%m-%d')))
+
+    return dates
+
+
 def get_season(month):
     """
     Renvoie la saison correspondant à un mois donné.
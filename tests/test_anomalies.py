@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analyzer.anomalies import grouped_median, score_anomalies
+
+
+def monthly_results(destination, prices, sample_size=50):
+    """Résultats mensuels d'une destination (12 mois)"""
+    return pd.DataFrame({
+        'destination': destination,
+        'month': np.arange(1, 13),
+        'avg_price': prices,
+        'sample_size': sample_size,
+    })
+
+
+class GroupedMedianTestCase(unittest.TestCase):
+    """Médianes groupées en un seul tri"""
+
+    def test_matches_numpy_median(self):
+        rng = np.random.default_rng(0)
+        codes = rng.integers(0, 5, 200)
+        codes[codes == 3] = 4  # groupe 3 vide
+        values = rng.normal(size=200)
+
+        medians, counts = grouped_median(codes, values, 6)
+
+        for group in range(6):
+            members = values[codes == group]
+            self.assertEqual(counts[group], len(members))
+            if len(members):
+                self.assertAlmostEqual(medians[group], np.median(members))
+            else:
+                self.assertTrue(np.isnan(medians[group]))
+
+
+class ScoreAnomaliesTestCase(unittest.TestCase):
+    """Scores et statuts d'anomalie des mois"""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.prices = 120 * np.exp(rng.normal(0, 0.05, 12))
+
+    def test_regular_months_are_ok(self):
+        scores = score_anomalies(monthly_results('Paris,France', self.prices))
+        self.assertEqual(set(scores['anomaly_status']), {'ok'})
+        self.assertEqual(set(scores['anomaly_reason']), {''})
+
+    def test_outlier_and_small_sample_are_quarantined(self):
+        frame = monthly_results('Paris,France', self.prices)
+        frame.loc[2, 'avg_price'] = 5.0
+        frame.loc[5, 'sample_size'] = 3
+        frame.loc[8, 'avg_price'] = np.nan
+
+        scores = score_anomalies(frame)
+
+        self.assertEqual(scores.loc[[2, 5, 8], 'anomaly_status'].tolist(), ['quarantined'] * 3)
+        self.assertEqual(scores.loc[2, 'anomaly_reason'][:len('autres mois (-')], 'autres mois (-')
+        self.assertEqual(scores.loc[5, 'anomaly_reason'], "échantillon insuffisant (3 prix)")
+        self.assertEqual(scores.loc[8, 'anomaly_reason'], "prix invalide")
+        self.assertEqual((scores['anomaly_status'] == 'ok').sum(), 9)
+
+    def test_seasonal_peak_confirmed_by_history_or_peers(self):
+        prices = self.prices.copy()
+        prices[7] = 360.0
+        frame = monthly_results('Paris,France', prices)
+        self.assertNotEqual(score_anomalies(frame).loc[7, 'anomaly_status'], 'ok')
+
+        # Pic d'août déjà relevé par les scrapings précédents
+        history = pd.DataFrame({'destination': 'Paris,France', 'month': 8, 'avg_price': [340.0, 355.0, 370.0]})
+        self.assertEqual(score_anomalies(frame, history=history).loc[7, 'anomaly_status'], 'ok')
+
+        # Pic d'août commun aux destinations comparables
+        peers = np.tile(np.where(np.arange(12) == 7, 300.0, 100.0), (5, 1))
+        self.assertEqual(score_anomalies(frame, peers=peers).loc[7, 'anomaly_status'], 'ok')
+
+    def test_batch_matches_single_destinations(self):
+        rng = np.random.default_rng(2)
+        frames = [monthly_results(f"Ville{i},Pays", 100 * np.exp(rng.normal(0, 0.3, 12)), rng.integers(2, 60, 12))
+                  for i in range(4)]
+        history = pd.DataFrame({
+            'destination': np.repeat([f"Ville{i},Pays" for i in range(4)], 36),
+            'month': np.tile(np.arange(1, 13), 12),
+            'avg_price': 100 * np.exp(rng.normal(0, 0.3, 144)),
+        })
+
+        batch = score_anomalies(pd.concat(frames, ignore_index=True), history=history)
+        single = pd.concat([score_anomalies(frame, history=history) for frame in frames], ignore_index=True)
+
+        pd.testing.assert_frame_equal(batch, single)
+
+
+if __name__ == '__main__':
+    unittest.main()
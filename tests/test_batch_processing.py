@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from analyzer.benchmarks.fixtures import make_raw_frame
+from analyzer.data_processor import AirbnbDataProcessor
+from analyzer.manifest import DataManifest, format_destination
+from analyzer.storage import RAW_SCHEMA, to_bytes
+
+
+class GetOrProcessBatchTestCase(unittest.TestCase):
+    """Traitement groupé comparé au traitement destination par destination"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.processor = AirbnbDataProcessor(self.data_dir)
+        manifest = DataManifest(self.data_dir)
+
+        self.raw = {}
+        for destination, group in make_raw_frame(3, seed=4).groupby('destination', sort=True):
+            raw = group.drop(columns='destination').reset_index(drop=True)
+            # Une destination sans le mois de décembre
+            if destination == 'Ville1,Pays':
+                raw = raw[raw['month'] != 12]
+            content, ext = to_bytes(raw, RAW_SCHEMA, 'csv')
+            manifest.write_bytes(content, 'raw', destination,
+                                 f"{format_destination(destination)}_2026_20260101_000000.{ext}", 2026)
+            self.raw[destination] = raw
+
+    def test_batch_matches_single_destination_processing(self):
+        destinations = [*self.raw, 'Inconnue,Pays']
+        results = self.processor.get_or_process_batch(destinations, refresh=True)
+
+        self.assertEqual(sorted(results), sorted(self.raw))
+        for destination in self.raw:
+            df, stats, saved_file = results[destination]
+            raw = self.processor.load_data(self.processor.get_latest_data(destination))
+            expected = self.processor.process_data(raw)
+
+            # Les catégories (month_name...) du lot regroupent celles de toutes ses destinations
+            pd.testing.assert_frame_equal(df, expected.reset_index(drop=True), check_categorical=False)
+            self.assertEqual(stats, self.processor.calculate_statistics(expected))
+            self.assertIsNotNone(saved_file)
+
+    def test_batch_results_are_memoized(self):
+        batch = self.processor.get_or_process_batch(list(self.raw), refresh=True)
+
+        for destination in self.raw:
+            df, stats, _ = self.processor.get_or_process_data(destination)
+            pd.testing.assert_frame_equal(df, batch[destination][0])
+            self.assertEqual(stats, batch[destination][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
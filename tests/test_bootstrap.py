@@ -0,0 +1,84 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from analyzer.benchmarks.bootstrap import reference_bootstrap
+from analyzer.bootstrap import bootstrap_months, price_uncertainty
+from analyzer.churn import ListingSnapshotStore
+
+
+class BootstrapMonthsTestCase(unittest.TestCase):
+    """Intervalles de confiance par bootstrap des prix mensuels"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.prices_by_month = {month: rng.lognormal(np.log(80 + 5 * month), 0.4, rng.integers(5, 60))
+                                for month in (7, 2, 11, 4)}
+
+    def test_matches_reference(self):
+        result = bootstrap_months(self.prices_by_month, 200, seed=3)
+        expected = reference_bootstrap(self.prices_by_month, 200, seed=3)
+
+        self.assertEqual(result['months'].tolist(), [2, 4, 7, 11])
+        self.assertEqual(result['listings'].tolist(), [len(self.prices_by_month[m]) for m in (2, 4, 7, 11)])
+        for key, values in expected.items():
+            np.testing.assert_allclose(result[key], values, rtol=1e-12, err_msg=key)
+
+    def test_intervals_and_probabilities(self):
+        result = bootstrap_months(self.prices_by_month, 500)
+
+        self.assertAlmostEqual(result['cheapest_probability'].sum(), 1.0)
+        self.assertTrue(np.all(result['mean_low'] <= result['mean']))
+        self.assertTrue(np.all(result['mean'] <= result['mean_high']))
+        self.assertTrue(np.all(result['median_low'] <= result['median_high']))
+        np.testing.assert_allclose(result['median'], [np.median(self.prices_by_month[m]) for m in (2, 4, 7, 11)])
+
+        # Même graine, mêmes tirages
+        again = bootstrap_months(self.prices_by_month, 500)
+        np.testing.assert_array_equal(result['mean_low'], again['mean_low'])
+
+    def test_no_months(self):
+        result = bootstrap_months({}, 100)
+        self.assertEqual(len(result['months']), 0)
+        self.assertEqual(len(result['cheapest_probability']), 0)
+
+
+class PriceUncertaintyTestCase(unittest.TestCase):
+    """Intervalles de confiance de la dernière exécution d'une destination"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.store = ListingSnapshotStore(self.data_dir)
+
+    def test_months_taken_from_latest_snapshots(self):
+        rng = np.random.default_rng(1)
+
+        def listings(center, size=30):
+            return list(range(size)), rng.normal(center, 5, size).tolist()
+
+        # Le mois 1 de la première exécution est remplacé par la seconde, le mois 3 n'a
+        # pas assez d'annonces et le mois 4 est exclu
+        self.store.save('Paris,France', 2026, '20260101_000000', {1: listings(500), 2: listings(80)})
+        self.store.save('Paris,France', 2026, '20260201_000000', {
+            1: listings(120), 3: listings(10, size=3), 4: listings(50)})
+
+        result = price_uncertainty(self.data_dir, 'Paris,France', exclude_months=[4], resamples=200)
+
+        self.assertEqual(result['run'], '20260201_000000')
+        self.assertEqual(result['year'], 2026)
+        self.assertEqual([month['month'] for month in result['months']], [1, 2])
+        self.assertLess(result['months'][0]['mean'], 200)
+        self.assertEqual(result['cheapest_month']['month'], 2)
+        self.assertEqual(result['cheapest_month']['runner_up']['month'], 1)
+
+    def test_not_enough_months(self):
+        self.assertEqual(price_uncertainty(self.data_dir, 'Paris,France'), {})
+        self.store.save('Paris,France', 2026, '20260101_000000', {1: (list(range(10)), [100.0] * 10)})
+        self.assertEqual(price_uncertainty(self.data_dir, 'Paris,France'), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
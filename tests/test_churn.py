@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from analyzer.churn import ListingSnapshotStore, compare_listing_sets, latest_listing_churn
+
+
+class ListingSnapshotStoreTestCase(unittest.TestCase):
+    """Enregistrement et relecture des instantanés d'annonces"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.store = ListingSnapshotStore(self.data_dir)
+
+    def test_round_trip(self):
+        path = self.store.save('Paris,France', 2026, '20260101_000000', {
+            # Identifiants non triés avec un doublon: le premier prix relevé est conservé
+            1: ([30, 10, 20, 10], [300.0, 100.0, 200.0, 999.0], [(48.8, 2.3), None, (48.9, 2.4), None]),
+            2: ([], []),
+            3: ([2 ** 40 + 5], [150.5]),
+        })
+
+        snapshot = self.store.load(path, coordinates=True)
+        self.assertEqual(sorted(snapshot), [1, 3])
+        ids, prices, coordinates = snapshot[1]
+        self.assertEqual(ids.tolist(), [10, 20, 30])
+        self.assertEqual(prices.tolist(), [100.0, 200.0, 300.0])
+        np.testing.assert_allclose(coordinates, [[np.nan, np.nan], [48.9, 2.4], [48.8, 2.3]], rtol=1e-6)
+        self.assertEqual(snapshot[3][0].tolist(), [2 ** 40 + 5])
+
+        ids, prices = self.store.load(path, month=3)[3]
+        self.assertEqual(prices.tolist(), [150.5])
+
+    def test_empty_run_is_not_saved(self):
+        self.assertIsNone(self.store.save('Paris,France', 2026, '20260101_000000', {1: ([], [])}))
+        self.assertEqual(self.store.list_runs('Paris,France'), [])
+
+    def test_list_runs(self):
+        for year, run_id in ((2026, '20260201_000000'), (2025, '20260101_000000'), (2026, '20260301_000000')):
+            self.store.save('Paris,France', year, run_id, {1: ([1], [100.0])})
+
+        self.assertEqual([run[:2] for run in self.store.list_runs('Paris,France')],
+                         [(2025, '20260101_000000'), (2026, '20260201_000000'), (2026, '20260301_000000')])
+        self.assertEqual([run[1] for run in self.store.list_runs('Paris,France', 2026)],
+                         ['20260201_000000', '20260301_000000'])
+
+    def test_legacy_directory_is_renamed(self):
+        legacy_dir = self.store.listings_dir / 'Saint_Malo_France'
+        os.makedirs(legacy_dir)
+        shutil.copy(self.store.save('Autre,Pays', 2026, '20260101_000000', {1: ([1], [100.0])}), legacy_dir)
+
+        runs = self.store.list_runs('Saint Malo,France')
+        self.assertEqual([run[1] for run in runs], ['20260101_000000'])
+        self.assertFalse(legacy_dir.exists())
+
+
+class CompareListingSetsTestCase(unittest.TestCase):
+    """Comparaison de deux ensembles d'annonces"""
+
+    def test_counts_and_price_deltas(self):
+        stats = compare_listing_sets(
+            np.array([1, 2, 3, 4], dtype=np.uint64), np.array([100, 200, 300, 400], dtype=np.float32),
+            np.array([2, 3, 5], dtype=np.uint64), np.array([220, 270, 500], dtype=np.float32),
+        )
+
+        self.assertEqual(stats, {
+            'new_listings': 1,
+            'removed_listings': 2,
+            'retained_listings': 2,
+            'retention_rate': 50.0,
+            'avg_price_delta': -5.0,
+            'median_price_delta': -5.0,
+            'avg_price_delta_pct': 0.0,
+        })
+
+    def test_no_previous_listings(self):
+        stats = compare_listing_sets(np.array([], dtype=np.uint64), np.array([], dtype=np.float32),
+                                     np.array([1], dtype=np.uint64), np.array([100], dtype=np.float32))
+        self.assertEqual((stats['new_listings'], stats['retention_rate']), (1, 0))
+
+
+class LatestListingChurnTestCase(unittest.TestCase):
+    """Résumé du renouvellement entre les deux dernières exécutions"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.store = ListingSnapshotStore(self.data_dir)
+
+    def test_months_of_both_runs_are_compared(self):
+        self.assertEqual(latest_listing_churn(self.data_dir, 'Paris,France', 2026), {})
+
+        self.store.save('Paris,France', 2026, '20260101_000000', {1: ([1, 2], [100, 100]), 2: ([3], [100])})
+        self.store.save('Paris,France', 2026, '20260201_000000', {1: ([2, 4, 5], [110, 90, 90])})
+
+        churn = latest_listing_churn(self.data_dir, 'Paris,France', 2026)
+        self.assertEqual((churn['previous_run'], churn['run']), ('20260101_000000', '20260201_000000'))
+        self.assertEqual(list(churn['by_month']), ['1'])
+        self.assertEqual((churn['new_listings'], churn['removed_listings'], churn['retained_listings']), (2, 1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from analyzer import explorer
+from analyzer.benchmarks.fixtures import make_raw_frame
+from analyzer.explorer import DataExplorer
+from analyzer.manifest import DataManifest
+from analyzer.storage import RAW_SCHEMA, to_bytes
+
+
+class ExplorerTestCase(unittest.TestCase):
+    """Vues SQL sur un répertoire de données temporaire"""
+
+    engine = 'sqlite'
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        manifest = DataManifest(self.data_dir)
+        for i, run_id in enumerate(['20260101_000000', '20260201_000000']):
+            content, ext = to_bytes(make_raw_frame(1, seed=i).drop(columns='destination'), RAW_SCHEMA, 'csv')
+            manifest.write_bytes(content, 'raw', 'Madrid,Spain', f"Madrid_Spain_2026_{run_id}.{ext}", 2026)
+
+        # Fichier hors du répertoire des données
+        fd, self.outside = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as f:
+            f.write("secret\n42\n")
+        self.addCleanup(os.remove, self.outside)
+
+        self.explorer = DataExplorer(self.data_dir, engine=self.engine)
+
+    def test_views(self):
+        result = self.explorer.query("SELECT count(*), count(DISTINCT run_id) FROM raw WHERE destination = 'Madrid,Spain'")
+        self.assertEqual(result['engine'], self.engine)
+        self.assertEqual(result['rows'][0][1], 2)
+        self.assertGreater(result['rows'][0][0], 0)
+
+        result = self.explorer.query("SELECT median(avg_price) FROM history")
+        self.assertIsNotNone(result['rows'][0][0])
+
+    def test_limit(self):
+        result = self.explorer.query("SELECT * FROM raw", limit=3)
+        self.assertEqual(result['row_count'], 3)
+        self.assertTrue(result['truncated'])
+
+    def test_rejects_non_read_queries(self):
+        for sql in ["DELETE FROM raw", "SELECT 1; SELECT 2", "", "ATTACH 'x.db' AS x"]:
+            with self.subTest(sql=sql), self.assertRaises(ValueError):
+                self.explorer.query(sql)
+
+    def test_rejects_files_outside_data_dir(self):
+        for sql in [f"SELECT * FROM read_text('{self.outside}')",
+                    f"SELECT * FROM read_csv('{self.outside}')",
+                    "SELECT * FROM read_parquet('https://example.com/data.parquet')"]:
+            with self.subTest(sql=sql), self.assertRaises(ValueError):
+                self.explorer.query(sql)
+
+    def test_timeout(self):
+        with self.assertRaises(TimeoutError):
+            self.explorer.query(
+                "WITH RECURSIVE t(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM t) SELECT count(*) FROM t", timeout=1)
+
+    def test_timeout_covers_loading(self):
+        if self.engine != 'sqlite':
+            self.skipTest("Vues chargées à la demande par SQLite uniquement")
+        with self.assertRaises(TimeoutError):
+            self.explorer.query("SELECT count(*) FROM history", timeout=0)
+
+
+@unittest.skipIf(explorer.duckdb is None, "duckdb n'est pas installé")
+class DuckDBExplorerTestCase(ExplorerTestCase):
+    engine = 'duckdb'
@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from analyzer.forecast import MIN_FORECAST_MONTHS, ForecastModels, fit_seasonal_models
+
+
+def seasonal_series(start, length, trend=0.05):
+    """Série de prix mensuels avec une saisonnalité estivale et une tendance annuelle"""
+    months = np.arange(start, start + length, dtype=np.int64)
+    seasonal = np.where(np.isin(months % 12, [6, 7]), 0.4, 0.0)
+    return months, np.exp(np.log(100.0) + trend * (months - start) / 12 + seasonal)
+
+
+class FitSeasonalModelsTestCase(unittest.TestCase):
+    """Ajustement groupé des modèles saisonniers"""
+
+    start = (2024 - 1970) * 12
+
+    def test_empty_series_are_not_fitted(self):
+        empty = (np.empty(0, dtype=np.int64), np.empty(0))
+        fitted = fit_seasonal_models([empty, empty])
+
+        self.assertEqual(fitted['coefficients'].shape, (2, 14))
+        self.assertTrue(np.isnan(fitted['coefficients']).all())
+        self.assertEqual(fitted['observations'].tolist(), [0, 0])
+
+    def test_short_series_is_not_fitted(self):
+        fitted = fit_seasonal_models([
+            seasonal_series(self.start, MIN_FORECAST_MONTHS - 1),
+            seasonal_series(self.start, 24),
+        ])
+
+        self.assertTrue(np.isnan(fitted['coefficients'][0]).all())
+        self.assertTrue(np.isfinite(fitted['coefficients'][1]).all())
+        self.assertEqual(fitted['observations'].tolist(), [MIN_FORECAST_MONTHS - 1, 24])
+
+    def test_trend_and_season_are_recovered(self):
+        fitted = fit_seasonal_models([seasonal_series(self.start, 36)])
+        coefficients = fitted['coefficients'][0]
+
+        self.assertAlmostEqual(coefficients[1], 0.05, delta=0.01)
+        self.assertAlmostEqual(coefficients[2 + 6] - coefficients[2 + 3], 0.4, delta=0.01)
+        self.assertEqual(int(fitted['origin'][0]), self.start + 36)
+
+
+class ForecastModelsTestCase(unittest.TestCase):
+    """Réajustement des modèles enregistrés"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+
+    def test_refresh_skips_destinations_without_history(self):
+        models = ForecastModels(self.data_dir)
+
+        self.assertEqual(models.refresh(['Paris,France']), [])
+        self.assertIsNone(models.forecast('Paris,France'))
+
+    def test_forecast_uses_stored_month_names(self):
+        models = ForecastModels(self.data_dir)
+        fitted = fit_seasonal_models([seasonal_series(FitSeasonalModelsTestCase.start, 24)])
+        models._save({**fitted, 'names': np.array(['Paris,France']), 'signatures': np.array([''])})
+
+        forecast = models.forecast('Paris,France', horizon=2, month_names={1: 'janvier'})
+        self.assertEqual([month['month'] for month in forecast['months']], ['2026-01', '2026-02'])
+        self.assertEqual(forecast['months'][0]['month_name'], 'janvier')
+
+
+if __name__ == '__main__':
+    unittest.main()
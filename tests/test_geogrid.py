@@ -0,0 +1,75 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from analyzer.churn import ListingSnapshotStore
+from analyzer.geogrid import PriceGridStore, bin_prices, build_price_grid, cell_size, grid_cells
+
+
+class BinPricesTestCase(unittest.TestCase):
+    """Regroupement vectorisé des prix par (mois, cellule)"""
+
+    def test_cells_match_per_cell_statistics(self):
+        rng = np.random.default_rng(0)
+        n = 500
+        latitudes = rng.uniform(48.80, 48.90, n)
+        longitudes = rng.uniform(2.25, 2.40, n)
+        prices = rng.lognormal(np.log(120), 0.4, n)
+        months = rng.integers(1, 4, n)
+        size = cell_size(1)
+
+        cells = bin_prices(latitudes, longitudes, prices, months, size)
+
+        self.assertEqual(int(cells['count'].sum()), n)
+        for month, ix, iy, count, avg_price, median_price, min_price, max_price in cells.tolist():
+            in_cell = (np.floor(longitudes / size) == ix) & (np.floor(latitudes / size) == iy)
+            members = prices[(months == month) & in_cell]
+            self.assertEqual(count, len(members))
+            np.testing.assert_allclose([avg_price, median_price, min_price, max_price],
+                                       [members.mean(), np.median(members), members.min(), members.max()], rtol=1e-6)
+
+    def test_negative_coordinates_and_empty_input(self):
+        cells = bin_prices([-33.87, -33.87], [-0.01, 0.01], [100.0, 200.0], [0, 0], 0.04)
+        self.assertEqual(sorted((ix, iy) for ix, iy in zip(cells['ix'], cells['iy'])), [(-1, -847), (0, -847)])
+        self.assertEqual(len(bin_prices([], [], [], [], 0.04)), 0)
+
+
+class BuildPriceGridTestCase(unittest.TestCase):
+    """Grille de prix de la dernière exécution"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+
+    def test_grid_of_latest_snapshot(self):
+        snapshots = ListingSnapshotStore(self.data_dir)
+        snapshots.save('Paris,France', 2026, '20260101_000000', {
+            1: ([1, 2, 3], [100.0, 140.0, 80.0], [(48.851, 2.351), (48.852, 2.352), None]),
+            7: ([1, 4], [180.0, 90.0], [(48.851, 2.351), (48.95, 2.45)]),
+        })
+
+        grid_path = build_price_grid(self.data_dir, 'Paris,France', 2026, levels=2)
+        self.assertEqual(str(grid_path), PriceGridStore(self.data_dir).latest('Paris,France'))
+        np.testing.assert_allclose(PriceGridStore.read_metadata(grid_path)['bounds'],
+                                   [48.851, 2.351, 48.95, 2.45], rtol=1e-6)
+
+        # Année entière (mois 0): les annonces localisées des deux mois
+        year_cells = grid_cells(grid_path, 0)
+        self.assertEqual(sorted(cell['count'] for cell in year_cells), [1, 3])
+        paris = max(year_cells, key=lambda cell: cell['count'])
+        self.assertEqual((paris['min_price'], paris['median_price'], paris['max_price']), (100.0, 140.0, 180.0))
+
+        july = grid_cells(grid_path, 1, month=7)
+        self.assertEqual(sorted(cell['avg_price'] for cell in july), [90.0, 180.0])
+        self.assertEqual(grid_cells(grid_path, 5), [])
+
+    def test_no_coordinates(self):
+        ListingSnapshotStore(self.data_dir).save('Paris,France', 2026, '20260101_000000', {1: ([1], [100.0])})
+        self.assertIsNone(build_price_grid(self.data_dir, 'Paris,France', 2026))
+        self.assertIsNone(build_price_grid(self.data_dir, 'Lyon,France', 2026))
+
+
+if __name__ == '__main__':
+    unittest.main()
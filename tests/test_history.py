@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from analyzer.benchmarks.fixtures import make_raw_frame
+from analyzer.history import HistoryStore, compact_destination, fold_runs, load_history, retained_runs
+from analyzer.manifest import DataManifest
+from analyzer.storage import RAW_SCHEMA, to_bytes
+
+NOW = datetime(2026, 6, 30)
+
+
+class RetentionTestCase(unittest.TestCase):
+    """Règles de rétention des exécutions"""
+
+    def test_daily_weekly_and_monthly_runs(self):
+        dates = pd.to_datetime([
+            '2026-06-29', '2026-06-28',  # récentes: toutes conservées
+            '2026-04-06', '2026-04-08',  # même semaine: la dernière
+            '2025-01-10', '2025-01-20',  # même mois, au-delà d'un an: la dernière
+        ])
+        keep = retained_runs(dates, NOW, daily_days=30, weekly_weeks=52)
+        self.assertEqual(keep.tolist(), [True, True, False, True, False, True])
+
+    def test_identical_runs_are_folded(self):
+        raw = make_raw_frame(1).drop(columns='destination')
+        changed = raw.assign(avg_price=raw['avg_price'] + 1)
+        frame = pd.concat([
+            raw.assign(run_id='20260601_000000', scrape_date=pd.Timestamp('2026-06-01')),
+            raw.assign(run_id='20260602_000000', scrape_date=pd.Timestamp('2026-06-02')),
+            changed.assign(run_id='20260603_000000', scrape_date=pd.Timestamp('2026-06-03')),
+        ], ignore_index=True)
+
+        kept, duplicates, expired = fold_runs(frame, NOW)
+
+        self.assertEqual((duplicates, expired), (1, 0))
+        self.assertEqual(kept['run_id'].unique().tolist(), ['20260601_000000', '20260603_000000'])
+
+
+class CompactDestinationTestCase(unittest.TestCase):
+    """Compaction des fichiers horodatés d'une destination"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.manifest = DataManifest(self.data_dir)
+        self.raw = make_raw_frame(1).drop(columns='destination')
+
+    def write_run(self, run_id, price_shift):
+        content, ext = to_bytes(self.raw.assign(avg_price=self.raw['avg_price'] + price_shift), RAW_SCHEMA)
+        return self.manifest.write_bytes(content, 'raw', 'Ville0,Pays', f"Ville0_Pays_2026_{run_id}.{ext}", 2026)
+
+    def test_compaction_keeps_history_and_latest_file(self):
+        paths = [
+            self.write_run('20260601_000000', 0),
+            self.write_run('20260602_000000', 0),  # doublon de l'exécution précédente
+            self.write_run('20260610_000000', 5),
+            self.write_run('20260620_000000', 10),
+        ]
+        before = load_history(self.data_dir, 'Ville0,Pays')
+
+        summary = compact_destination(self.data_dir, 'Ville0,Pays', now=NOW)
+
+        self.assertEqual((summary['files'], summary['runs'], summary['duplicates'], summary['deleted']), (4, 4, 1, 3))
+        self.assertEqual([os.path.exists(path) for path in paths], [False, False, False, True])
+        self.assertEqual(len(HistoryStore(self.data_dir).partition_files('raw', 'Ville0,Pays')), 1)
+
+        after = load_history(self.data_dir, 'Ville0,Pays')
+        self.assertEqual(after['run_id'].unique().tolist(),
+                         ['20260601_000000', '20260610_000000', '20260620_000000'])
+        expected = before[before['run_id'] != '20260602_000000'].reset_index(drop=True)
+        np.testing.assert_allclose(after['avg_price'], expected['avg_price'], rtol=1e-6)
+        self.assertEqual(after['year'].unique().tolist(), [2026])
+
+        # Une nouvelle compaction n'ajoute pas deux fois le fichier le plus récent conservé
+        summary = compact_destination(self.data_dir, 'Ville0,Pays', now=NOW)
+        self.assertEqual((summary['partitions'], summary['deleted']), (0, 0))
+        self.assertEqual(load_history(self.data_dir, 'Ville0,Pays')['run_id'].nunique(), 3)
+
+    def test_dry_run_changes_nothing(self):
+        paths = [self.write_run('20260601_000000', 0), self.write_run('20260610_000000', 5)]
+
+        summary = compact_destination(self.data_dir, 'Ville0,Pays', dry_run=True, now=NOW)
+
+        self.assertEqual((summary['partitions'], summary['deleted']), (1, 1))
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+        self.assertEqual(HistoryStore(self.data_dir).partition_files('raw', 'Ville0,Pays'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from analyzer import data_processor
+from analyzer.benchmarks.fixtures import make_raw_frame
+from analyzer.data_processor import AirbnbDataProcessor
+from analyzer.incremental import MonthlyAggregates
+from analyzer.manifest import DataManifest
+from analyzer.storage import RAW_SCHEMA, to_bytes
+
+# Colonnes dérivées numériques (float32 dans PROCESSED_SCHEMA)
+NUMERIC_DERIVED = ['price_range', 'relative_price', 'price_rank', 'pct_diff_from_max', 'pct_diff_from_min']
+
+
+class MonthlyAggregatesTestCase(unittest.TestCase):
+    """Mises à jour incrémentales comparées au traitement complet"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.processor = AirbnbDataProcessor(self.data_dir)
+        self.raw = make_raw_frame(1).drop(columns='destination')
+
+    def assertSameResults(self, processed, stats, frame, incremental_stats):
+        self.assertEqual(list(processed.columns), list(frame.columns))
+        np.testing.assert_allclose(processed[NUMERIC_DERIVED].to_numpy(float),
+                                   frame[NUMERIC_DERIVED].to_numpy(float), rtol=1e-6)
+        np.testing.assert_array_equal(processed['is_cheapest'].to_numpy(), frame['is_cheapest'].to_numpy())
+        np.testing.assert_array_equal(processed['season'].astype(str), frame['season'].astype(str))
+
+        # Seul l'ordre des mois ex aequo du classement peut différer
+        for item in (stats, incremental_stats):
+            item['price_ranking'].sort(key=lambda entry: (entry['price'], entry['month']))
+        self.assertEqual(stats, incremental_stats)
+
+    def test_initial_state_matches_process_data(self):
+        aggregates = MonthlyAggregates(self.raw)
+        processed = self.processor.process_data(self.raw)
+        self.assertSameResults(processed, self.processor.calculate_statistics(processed),
+                               aggregates.frame(), aggregates.statistics())
+
+    def test_updates_match_process_data(self):
+        aggregates = MonthlyAggregates(self.raw)
+        rng = np.random.default_rng(3)
+        for _ in range(50):
+            month = int(rng.integers(1, 13))
+            # Prix parfois égal à celui d'un autre mois (ex aequo)
+            price = float(np.round(rng.normal(150, 40), 2)) if rng.random() > 0.2 else float(self.raw['avg_price'].iloc[0])
+            self.raw.loc[self.raw['month'] == month, 'avg_price'] = price
+            aggregates.update_month(self.raw[self.raw['month'] == month].iloc[0])
+
+            processed = self.processor.process_data(self.raw)
+            self.assertSameResults(processed, self.processor.calculate_statistics(processed),
+                                   aggregates.frame(), aggregates.statistics())
+
+    def test_changed_rows(self):
+        aggregates = MonthlyAggregates(self.raw)
+        self.assertEqual(aggregates.changed_rows(self.raw), [])
+
+        self.raw.loc[self.raw['month'] == 4, 'sample_size'] = 1
+        self.assertEqual([row['month'] for row in aggregates.changed_rows(self.raw)], [4])
+        self.assertIsNone(aggregates.changed_rows(self.raw[self.raw['month'] != 4]))
+
+    def test_get_or_process_data_updates_changed_months(self):
+        manifest = DataManifest(self.data_dir)
+        destination = 'Ville0,Pays'
+        data_processor._aggregates.pop(destination, None)
+        self.addCleanup(data_processor._aggregates.pop, destination, None)
+
+        for run, price in enumerate([None, 999.0]):
+            if price is not None:
+                self.raw.loc[self.raw['month'] == 7, 'avg_price'] = price
+            content, ext = to_bytes(self.raw, RAW_SCHEMA, 'csv')
+            manifest.write_bytes(content, 'raw', destination, f"Ville0_Pays_2026_2026010{run + 1}_000000.{ext}", 2026)
+
+            with self.assertLogs('analyzer', level='INFO') as logs:
+                df, stats, _ = self.processor.get_or_process_data(destination)
+            incremental = any("de façon incrémentale" in line for line in logs.output)
+            self.assertEqual(incremental, run == 1)
+
+        processed = self.processor.process_data(self.raw)
+        self.assertSameResults(processed, self.processor.calculate_statistics(processed), df, stats)
+        self.assertEqual(stats['most_expensive_month']['avg_price'], 999.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import base64
+import unittest
+
+from scraper.network_capture import decode_search_payload
+
+
+def encoded_id(listing_id):
+    """Identifiant d'annonce au format base64 de l'API ('DemandStayListing:<id>', sans remplissage)"""
+    return base64.b64encode(f"DemandStayListing:{listing_id}".encode()).decode().rstrip('=')
+
+
+def search_result(listing, price):
+    """Résultat de recherche au format GraphQL (blocs de l'annonce et prix affiché)"""
+    return {**listing, 'pricingQuote': {'structuredStayDisplayPrice': {'primaryLine': {'price': price}}}}
+
+
+class DecodeSearchPayloadTestCase(unittest.TestCase):
+    """Extraction des annonces d'une réponse de l'API de recherche"""
+
+    def test_nested_results_and_cursor(self):
+        payload = {'data': {'presentation': {'staysSearch': {'results': {
+            'searchResults': [
+                search_result({'listing': {'id': '123', 'coordinate': {'latitude': 48.85, 'longitude': 2.35}}},
+                              "145 €"),
+                search_result({'demandStayListing': {'id': encoded_id(456),
+                                                     'location': {'coordinate': {'latitude': 45.0, 'longitude': 4.0}}}},
+                              "1 234 €"),
+            ],
+            'paginationInfo': {'nextPageCursor': 'curseur-2'},
+        }}}}}
+
+        listings, cursor = decode_search_payload(payload)
+
+        self.assertEqual(cursor, 'curseur-2')
+        self.assertCountEqual(listings, [
+            {'id': 123, 'price': 145.0, 'coordinates': (48.85, 2.35)},
+            {'id': 456, 'price': 1234.0, 'coordinates': (45.0, 4.0)},
+        ])
+
+    def test_results_without_price_or_id(self):
+        payload = [
+            search_result({'listing': {'id': 'identifiant inconnu', 'lat': 1.5, 'lng': 2.5}}, "99 €"),
+            {'listing': {'id': '789'}, 'pricingQuote': {'rate': {'amount': 0}}},
+            {'listing': {'id': '790'}, 'pricingQuote': {'rate': {'amount': 80}}},
+        ]
+
+        listings, cursor = decode_search_payload(payload)
+
+        self.assertIsNone(cursor)
+        self.assertCountEqual(listings, [
+            {'id': None, 'price': 99.0, 'coordinates': (1.5, 2.5)},
+            {'id': 790, 'price': 80.0, 'coordinates': None},
+        ])
+
+    def test_empty_payload(self):
+        self.assertEqual(decode_search_payload({}), ([], None))
+        self.assertEqual(decode_search_payload(None), ([], None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from analyzer.price_calendar import PriceCalendarStore
+
+
+class PriceCalendarStoreTestCase(unittest.TestCase):
+    """Fichiers d'échantillons par date d'arrivée"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.store = PriceCalendarStore(self.data_dir)
+        os.makedirs(self.store.samples_dir)
+
+    def write_samples(self, name, price):
+        pd.DataFrame({
+            'month': [1], 'check_in': ['2026-01-05'], 'check_out': ['2026-01-12'], 'nights': [7], 'avg_price': [price],
+        }).to_csv(self.store.samples_dir / name, index=False)
+
+    def test_sample_files_ignore_destinations_with_same_prefix(self):
+        self.write_samples('Paris_France_2026_20260101_000000.csv', 100)
+        self.write_samples('Paris_France_Sud_2026_20260102_000000.csv', 999)
+
+        files = [os.path.basename(path) for path in self.store.sample_files('Paris,France')]
+        self.assertEqual(files, ['Paris_France_2026_20260101_000000.csv'])
+
+        calendar = self.store.refresh('Paris,France')
+        self.assertEqual(calendar.heatmap(horizon_days=1), {'start': '2026-01-05', 'rate_nights': 7, 'rates': [100.0]})
+
+    def test_load_does_not_read_new_samples(self):
+        self.write_samples('Paris_France_2026_20260101_000000.csv', 100)
+        self.assertIsNone(self.store.load('Paris,France'))
+
+        self.store.refresh('Paris,France')
+        self.write_samples('Paris_France_2026_20260102_000000.csv', 200)
+        self.assertEqual(self.store.load('Paris,France').heatmap(horizon_days=1)['rates'], [100.0])
+
+        self.store.refresh('Paris,France')
+        self.assertEqual(self.store.load('Paris,France').heatmap(horizon_days=1)['rates'], [200.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analyzer.benchmarks.fixtures import make_history_frame, make_raw_frame
+from analyzer.manifest import DataManifest
+from analyzer.price_history import PriceHistoryCache, build_price_matrix, merge_price_matrices
+from analyzer.storage import RAW_SCHEMA, to_bytes
+
+
+def assert_same_matrix(test, left, right):
+    """Compare deux tuples (run_ids, scrape_dates, targets, matrix)"""
+    for left_array, right_array in zip(left[:3], right[:3]):
+        test.assertEqual(left_array.tolist(), right_array.tolist())
+    np.testing.assert_allclose(left[3], right[3], rtol=1e-6)
+
+
+class MergePriceMatricesTestCase(unittest.TestCase):
+    """Fusion incrémentale des matrices de prix"""
+
+    def setUp(self):
+        history = make_history_frame(1, 6)
+        history['year'] = 2026
+        # Les dernières exécutions visent aussi des mois de l'année suivante
+        later = history[history['run_id'] >= history['run_id'].unique()[4]].assign(year=2027)
+        self.history = pd.concat([history, later], ignore_index=True)
+
+    def test_merge_matches_full_build(self):
+        run_ids = self.history['run_id'].unique()
+        old = self.history[self.history['run_id'].isin(run_ids[:3])]
+        new = self.history[self.history['run_id'].isin(run_ids[3:])]
+
+        merged = merge_price_matrices(build_price_matrix(old), build_price_matrix(new))
+
+        assert_same_matrix(self, merged, build_price_matrix(self.history))
+        self.assertEqual(len(merged[2]), 24)
+
+    def test_merge_sorts_runs_by_date(self):
+        run_ids = self.history['run_id'].unique()
+        late = self.history[self.history['run_id'].isin(run_ids[3:])]
+        early = self.history[self.history['run_id'].isin(run_ids[:3])]
+
+        merged = merge_price_matrices(build_price_matrix(late), build_price_matrix(early))
+
+        assert_same_matrix(self, merged, build_price_matrix(self.history))
+
+    def test_merge_into_empty_matrix(self):
+        full = build_price_matrix(self.history)
+        assert_same_matrix(self, merge_price_matrices(build_price_matrix(self.history.iloc[:0]), full), full)
+
+
+class PriceHistoryCacheTestCase(unittest.TestCase):
+    """Mise à jour incrémentale du cache de l'historique des prix"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.manifest = DataManifest(self.data_dir)
+        self.cache = PriceHistoryCache(self.data_dir)
+
+    def write_run(self, run_id, seed):
+        content, ext = to_bytes(make_raw_frame(1, seed).drop(columns='destination'), RAW_SCHEMA)
+        self.manifest.write_bytes(content, 'raw', 'Ville0,Pays', f"Ville0_Pays_2026_{run_id}.{ext}", 2026)
+
+    def test_new_runs_are_appended(self):
+        self.assertIsNone(self.cache.load('Ville0,Pays'))
+        self.write_run('20260101_000000', 0)
+        self.write_run('20260201_000000', 1)
+        first = self.cache.refresh('Ville0,Pays')
+        self.assertEqual(len(first[0]), 2)
+
+        self.write_run('20260301_000000', 2)
+        updated = self.cache.refresh('Ville0,Pays')
+
+        self.assertEqual(updated[0].tolist(), ['20260101_000000', '20260201_000000', '20260301_000000'])
+        # Exécutions déjà en cache inchangées
+        run_ids, scrape_dates, targets, matrix = updated
+        assert_same_matrix(self, (run_ids[:2], scrape_dates[:2], targets, matrix[:2]), first)
+        assert_same_matrix(self, self.cache.load('Ville0,Pays'), updated)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+from scraper.network_capture import _extract_quote_price
+from scraper.utils import clean_price_text
+
+
+class CleanPriceTextTestCase(unittest.TestCase):
+    """Conversion des prix affichés en nombres"""
+
+    def test_thousands_separators(self):
+        self.assertEqual(clean_price_text("1\u202f234\u00a0€"), 1234.0)
+        self.assertEqual(clean_price_text("12\u00a0345 €"), 12345.0)
+        self.assertEqual(clean_price_text("1 045,50 €"), 1045.5)
+        self.assertEqual(clean_price_text("€1,234.50"), 1234.5)
+
+    def test_simple_prices(self):
+        self.assertEqual(clean_price_text("145 €"), 145.0)
+        self.assertEqual(clean_price_text("145 € x 7 nuits"), 145.0)
+        self.assertIsNone(clean_price_text("Prix indisponible"))
+
+    def test_quote_with_narrow_no_break_space(self):
+        quote = {'structuredStayDisplayPrice': {'primaryLine': {'price': "1\u202f234\u00a0€"}}}
+        self.assertEqual(_extract_quote_price(quote), 1234.0)
@@ -0,0 +1,72 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from analyzer.profiling import SamplingProfiler
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PROFILES_DIR = ROOT_DIR / 'logs' / 'profiles'
+
+
+class DataProcessorProfileTestCase(unittest.TestCase):
+    """Point d'entrée `python -m analyzer.data_processor --profile`"""
+
+    def test_profile_option_writes_summary(self):
+        before = set(os.listdir(PROFILES_DIR)) if PROFILES_DIR.exists() else set()
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'airbnb_analytics.settings'}
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'analyzer.data_processor', 'Profil,Test', '--profile'],
+            cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        created = [name for name in set(os.listdir(PROFILES_DIR)) - before if name.startswith('data_processor_')]
+        for name in created:
+            self.addCleanup(shutil.rmtree, PROFILES_DIR / name, True)
+        self.assertEqual(len(created), 1)
+        self.assertTrue((PROFILES_DIR / created[0] / 'summary.txt').exists())
+        self.assertTrue((PROFILES_DIR / created[0] / 'Profil_Test' / 'summary.txt').exists())
+
+
+def busy_loop(seconds):
+    """Calcul en Python pur pendant une durée donnée"""
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+class SamplingProfilerTestCase(unittest.TestCase):
+    """Échantillonnage des threads actifs"""
+
+    def test_idle_threads_are_not_sampled(self):
+        stop = threading.Event()
+        waiters = [threading.Thread(target=stop.wait, daemon=True) for _ in range(3)]
+        for waiter in waiters:
+            waiter.start()
+        self.addCleanup(stop.set)
+
+        profiler = SamplingProfiler(interval=0.005)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # Un seul worker occupé, les autres attendent une tâche; le thread principal attend le résultat
+            executor.submit(time.sleep, 0).result()
+            profiler.start()
+            executor.submit(busy_loop, 0.3).result()
+            profiler.stop()
+
+        self_counts, _ = profiler.function_counts()
+        self.assertTrue(self_counts)
+        self.assertTrue(self_counts.most_common(1)[0][0].startswith('busy_loop '))
+        self.assertFalse([label for label in self_counts if label.startswith(('wait ', '_worker ', 'result '))])
+
+
+if __name__ == '__main__':
+    unittest.main()
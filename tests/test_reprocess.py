@@ -0,0 +1,45 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from analyzer import reprocess
+from analyzer.benchmarks.fixtures import make_raw_frame
+from analyzer.manifest import DataManifest
+from analyzer.reprocess import latest_data_year, reprocess_destinations
+from analyzer.storage import RAW_SCHEMA, to_bytes
+
+
+class ReprocessDestinationsTestCase(unittest.TestCase):
+    """Retraitement d'un lot de destinations"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.manifest = DataManifest(self.data_dir)
+
+    def write_raw(self, destination, year, timestamp):
+        raw = make_raw_frame(1).drop(columns='destination')
+        content, ext = to_bytes(raw, RAW_SCHEMA, 'csv')
+        filename = f"{destination.replace(',', '_')}_{year}_{timestamp}.{ext}"
+        self.manifest.write_bytes(content, 'raw', destination, filename, year)
+
+    def test_latest_data_year_reads_manifest(self):
+        self.assertIsNone(latest_data_year(self.data_dir, 'Ville0,Pays'))
+
+        self.write_raw('Ville0,Pays', 2024, '20240101_000000')
+        self.write_raw('Ville0,Pays', 2025, '20250101_000000')
+        self.assertEqual(latest_data_year(self.data_dir, 'Ville0,Pays'), 2025)
+
+    def test_derived_data_use_data_year(self):
+        self.write_raw('Ville0,Pays', 2024, '20240101_000000')
+
+        with mock.patch.object(reprocess, 'refresh_derived_data', side_effect=lambda *args, **kwargs: args[2]) as refresh:
+            results = reprocess_destinations(self.data_dir, ['Ville0,Pays'])
+
+        self.assertEqual(results[0]['year'], 2024)
+        self.assertEqual(refresh.call_args.kwargs['year'], 2024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analyzer import storage
+from analyzer.similarity import ProfileIndex
+
+
+def _update_profiles(data_dir, names):
+    index = ProfileIndex(data_dir)
+    for name in names:
+        index.update(name, range(1, 13), np.linspace(80, 140, 12), 2026)
+
+
+class ProfileIndexTestCase(unittest.TestCase):
+    """Mises à jour de l'index persistant des profils de prix"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.index = ProfileIndex(self.data_dir)
+        self.index.rebuild(pd.DataFrame({
+            'destination': 'Paris,France',
+            'year': 2026,
+            'month': range(1, 13),
+            'avg_price': np.linspace(100, 210, 12),
+        }))
+
+    def test_older_year_does_not_replace_profile(self):
+        self.index.update('Paris,France', range(1, 13), np.full(12, 50.0), 2025)
+        profiles = self.index.load()
+        self.assertEqual(profiles.prices[profiles.index['Paris,France'], 0], 100.0)
+
+        self.index.update('Paris,France', range(1, 13), np.full(12, 50.0), 2027)
+        profiles = self.index.load()
+        self.assertEqual(profiles.prices[profiles.index['Paris,France'], 0], 50.0)
+        self.assertEqual(profiles.years[profiles.index['Paris,France']], 2027)
+
+    @unittest.skipIf(storage.fcntl is None, "verrou de fichier indisponible")
+    def test_concurrent_updates_are_kept(self):
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=_update_profiles, args=(self.data_dir, [f"Ville{i}-{j}" for j in range(10)]))
+            for i in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        self.assertEqual(len(self.index.load()), 41)
+
+
+if __name__ == '__main__':
+    unittest.main()
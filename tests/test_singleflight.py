@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from scraper.singleflight import SingleFlight
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    """Coalescence des appels concurrents de même clé"""
+
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.lock_dir)
+        self.flight = SingleFlight(self.lock_dir, poll_interval=0.01)
+
+    def test_concurrent_calls_share_one_execution(self):
+        release = threading.Event()
+        calls = []
+
+        def scrape():
+            calls.append(threading.get_ident())
+            release.wait(5)
+            return {'avg_price': 120.0}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(self.flight.do, 'Paris', scrape, None, False) for _ in range(4)]
+            # Laisser les appels suivants se rattacher avant de terminer le premier
+            time.sleep(0.1)
+            release.set()
+            results = [future.result(5) for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'avg_price': 120.0}] * 4)
+        self.assertEqual(self.flight._in_flight, {})
+
+    def test_error_is_raised_for_every_caller(self):
+        release = threading.Event()
+
+        def scrape():
+            release.wait(5)
+            raise RuntimeError("page indisponible")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(self.flight.do, 'Paris', scrape, None, False) for _ in range(2)]
+            time.sleep(0.1)
+            release.set()
+            for future in futures:
+                with self.assertRaises(RuntimeError):
+                    future.result(5)
+
+        # Un nouvel appel relance le travail
+        self.assertEqual(self.flight.do('Paris', lambda: 1, cross_process=False), 1)
+
+    def test_lock_file_is_released(self):
+        self.assertEqual(self.flight.do('Paris', lambda: 'résultat'), 'résultat')
+        self.assertEqual(os.listdir(self.lock_dir), [])
+
+    def test_waits_for_other_process_and_reads_shared_result(self):
+        # Verrou détenu par un "autre processus", libéré après avoir écrit le résultat partagé
+        lock_path = self.flight._lock_path('Paris')
+        lock_path.write_text('12345')
+        shared = {}
+
+        def other_process():
+            time.sleep(0.1)
+            shared['result'] = 'résultat partagé'
+            os.remove(lock_path)
+
+        threading.Thread(target=other_process).start()
+        result = self.flight.do('Paris', lambda: self.fail("scraping relancé"), shared_result=lambda: shared.get('result'))
+
+        self.assertEqual(result, 'résultat partagé')
+
+    def test_stale_lock_is_removed(self):
+        flight = SingleFlight(self.lock_dir, stale_after=60, poll_interval=0.01)
+        lock_path = flight._lock_path('Paris')
+        lock_path.write_text('12345')
+        os.utime(lock_path, (time.time() - 3600, time.time() - 3600))
+
+        self.assertEqual(flight.do('Paris', lambda: 'nouveau scraping', shared_result=lambda: None), 'nouveau scraping')
+        self.assertFalse(lock_path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()